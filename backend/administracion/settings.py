@@ -73,6 +73,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # ETag por versión de datos y 304 en las lecturas de la API
+    'status.middleware.ETagVersionMiddleware',
 ]
 
 ROOT_URLCONF = 'administracion.urls'
@@ -115,6 +117,42 @@ DATABASES = {
 
 
 
+# Caché
+# "default" es la de siempre (locks de fantasy...). "respuestas" es la caché
+# de respuestas de la API (status.cache_api): API_CACHE_BACKEND=locmem | redis | off.
+API_CACHE_BACKEND = os.getenv('API_CACHE_BACKEND', 'locmem').lower()
+API_CACHE_TTL = int(os.getenv('API_CACHE_TTL', '900'))
+
+if API_CACHE_BACKEND == 'redis':
+    # Requiere el paquete `redis`; la expulsión LRU la hace el servidor (maxmemory-policy allkeys-lru)
+    _cache_respuestas = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('API_CACHE_REDIS_URL', 'redis://127.0.0.1:6379/1'),
+        'TIMEOUT': API_CACHE_TTL,
+        'KEY_PREFIX': 'pcfutsal',
+    }
+elif API_CACHE_BACKEND == 'off':
+    _cache_respuestas = {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+else:
+    _cache_respuestas = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'respuestas-api',
+        'TIMEOUT': API_CACHE_TTL,
+        'OPTIONS': {
+            # Al llenarse se expulsa la décima parte menos usada recientemente
+            'MAX_ENTRIES': int(os.getenv('API_CACHE_MAX_ENTRADAS', '5000')),
+            'CULL_FREQUENCY': 10,
+        },
+    }
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'respuestas': _cache_respuestas,
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -2,7 +2,7 @@ from django.contrib import admin
 from django.urls import path, include
 
 
-from status.views import LastUpdateView
+from status.views import CacheApiView, LastUpdateView
 
 
 urlpatterns = [
@@ -10,6 +10,7 @@ urlpatterns = [
 
     #APIS
     path("api/status/last_update/", LastUpdateView.as_view(), name="last_update"),
+    path("api/status/cache/", CacheApiView.as_view(), name="cache_api"),
     path("api/nucleo/", include("nucleo.urls")),
     path("api/estadisticas/", include("estadisticas.urls")),
     path("api/clubes/", include("clubes.urls")),
@@ -1,6 +1,6 @@
 # clasificaciones/admin.py
 from django.contrib import admin
-from .models import ClasificacionJornada, PosicionJornada
+from .models import ClasificacionJornada, PosicionJornada, FilaClasificacion
 
 
 class PosicionJornadaInline(admin.TabularInline):
@@ -87,3 +87,33 @@ class PosicionJornadaAdmin(admin.ModelAdmin):
         "racha",
     )
     ordering = ("clasificacion_jornada", "posicion")
+
+
+@admin.register(FilaClasificacion)
+class FilaClasificacionAdmin(admin.ModelAdmin):
+    """Solo lectura: lo escribe clasificaciones.motor"""
+    list_display = (
+        "grupo",
+        "jornada",
+        "club",
+        "pj_local",
+        "pj_visitante",
+        "racha",
+    )
+    list_filter = (
+        "grupo__temporada",
+        "grupo__competicion",
+    )
+    search_fields = (
+        "club__nombre_oficial",
+        "club__nombre_corto",
+        "grupo__nombre",
+    )
+    raw_id_fields = ("grupo", "club")
+    ordering = ("grupo", "-jornada", "club")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class ClasificacionesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'clasificaciones'
+
+    def ready(self):
+        """
+        Registra las señales del motor de clasificación (clasificaciones.signals).
+        """
+        import clasificaciones.signals  # noqa: F401
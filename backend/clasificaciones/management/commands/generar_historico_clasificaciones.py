@@ -16,6 +16,7 @@ from nucleo.models import Grupo, Temporada
 from clubes.models import Club, ClubEnGrupo
 from partidos.models import Partido
 from clasificaciones.models import ClasificacionJornada, PosicionJornada
+from status import versiones
 
 
 class Command(BaseCommand):
@@ -282,6 +283,7 @@ class Command(BaseCommand):
         return generadas
 
     @transaction.atomic
+    @versiones.al_terminar
     def handle(self, *args, **options):
         grupo_id = options.get("grupo_id")
         temporada_id = options.get("temporada_id")
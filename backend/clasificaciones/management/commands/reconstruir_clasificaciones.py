@@ -0,0 +1,25 @@
+# clasificaciones/management/commands/reconstruir_clasificaciones.py
+from django.core.management.base import BaseCommand
+
+from clasificaciones import motor
+from nucleo.models import Grupo
+
+
+class Command(BaseCommand):
+    help = "Rehace las filas del motor de clasificación (FilaClasificacion) de todos los grupos o de uno"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--grupo_id", type=int, default=None, help="Solo este grupo (pk)")
+
+    def handle(self, *args, **options):
+        if options.get("grupo_id"):
+            ids = [options["grupo_id"]]
+        else:
+            ids = list(Grupo.objects.order_by("id").values_list("id", flat=True))
+
+        self.stdout.write(f"Rehaciendo la clasificación de {len(ids)} grupos...")
+        total = 0
+        for grupo_id in ids:
+            total += motor.reconstruir_grupo(grupo_id)
+
+        self.stdout.write(self.style.SUCCESS(f"✓ {total} filas de clasificación escritas."))
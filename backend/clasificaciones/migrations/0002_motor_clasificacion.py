@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clasificaciones', '0001_initial'),
+        ('clubes', '0004_alter_club_telefono_alter_clubboardmember_telefono_and_more'),
+        ('nucleo', '0001_initial'),
+        ('partidos', '0003_partido_score_interes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FilaClasificacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jornada', models.PositiveIntegerField()),
+                ('pj_local', models.PositiveIntegerField(default=0)),
+                ('pg_local', models.PositiveIntegerField(default=0)),
+                ('pe_local', models.PositiveIntegerField(default=0)),
+                ('pp_local', models.PositiveIntegerField(default=0)),
+                ('gf_local', models.PositiveIntegerField(default=0)),
+                ('gc_local', models.PositiveIntegerField(default=0)),
+                ('pj_visitante', models.PositiveIntegerField(default=0)),
+                ('pg_visitante', models.PositiveIntegerField(default=0)),
+                ('pe_visitante', models.PositiveIntegerField(default=0)),
+                ('pp_visitante', models.PositiveIntegerField(default=0)),
+                ('gf_visitante', models.PositiveIntegerField(default=0)),
+                ('gc_visitante', models.PositiveIntegerField(default=0)),
+                ('racha', models.TextField(blank=True, default='')),
+                ('racha_local', models.TextField(blank=True, default='')),
+                ('racha_visitante', models.TextField(blank=True, default='')),
+                ('club', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='filas_clasificacion', to='clubes.club')),
+                ('grupo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='filas_clasificacion', to='nucleo.grupo')),
+            ],
+            options={
+                'verbose_name': 'Fila de clasificación',
+                'verbose_name_plural': 'Filas de clasificación',
+                'indexes': [models.Index(fields=['grupo', 'club', 'jornada'], name='clasificaci_grupo_i_6a539e_idx')],
+                'unique_together': {('grupo', 'jornada', 'club')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ResultadoAplicado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jornada', models.PositiveIntegerField()),
+                ('fecha_hora', models.DateTimeField(blank=True, null=True)),
+                ('goles_local', models.PositiveIntegerField()),
+                ('goles_visitante', models.PositiveIntegerField()),
+                ('grupo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resultados_aplicados', to='nucleo.grupo')),
+                ('local', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='clubes.club')),
+                ('partido', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='resultado_clasificacion', to='partidos.partido')),
+                ('visitante', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='clubes.club')),
+            ],
+            options={
+                'verbose_name': 'Resultado aplicado',
+                'verbose_name_plural': 'Resultados aplicados',
+                'indexes': [models.Index(fields=['grupo', 'jornada'], name='clasificaci_grupo_i_081799_idx'), models.Index(fields=['grupo', 'local'], name='clasificaci_grupo_i_8f1cd1_idx'), models.Index(fields=['grupo', 'visitante'], name='clasificaci_grupo_i_523ef2_idx')],
+            },
+        ),
+    ]
@@ -99,3 +99,91 @@ class PosicionJornada(models.Model):
 
     def __str__(self):
         return f"{self.club} - {self.clasificacion_jornada} - Pos {self.posicion}"
+
+
+class FilaClasificacion(models.Model):
+    """
+    Clasificación acumulada de un club en un grupo hasta una jornada
+    (clasificaciones.motor). Hay una fila por club en cada jornada con algún
+    resultado, con lo de local y lo de visitante por separado; los totales,
+    los puntos y la posición se sacan al leer.
+    """
+    grupo = models.ForeignKey(
+        Grupo,
+        on_delete=models.CASCADE,
+        related_name="filas_clasificacion"
+    )
+    jornada = models.PositiveIntegerField()
+    club = models.ForeignKey(
+        Club,
+        on_delete=models.CASCADE,
+        related_name="filas_clasificacion"
+    )
+
+    pj_local = models.PositiveIntegerField(default=0)
+    pg_local = models.PositiveIntegerField(default=0)
+    pe_local = models.PositiveIntegerField(default=0)
+    pp_local = models.PositiveIntegerField(default=0)
+    gf_local = models.PositiveIntegerField(default=0)
+    gc_local = models.PositiveIntegerField(default=0)
+
+    pj_visitante = models.PositiveIntegerField(default=0)
+    pg_visitante = models.PositiveIntegerField(default=0)
+    pe_visitante = models.PositiveIntegerField(default=0)
+    pp_visitante = models.PositiveIntegerField(default=0)
+    gf_visitante = models.PositiveIntegerField(default=0)
+    gc_visitante = models.PositiveIntegerField(default=0)
+
+    # Resultados en orden cronológico hasta la jornada ("VVEDV..."), completos
+    racha = models.TextField(blank=True, default="")
+    racha_local = models.TextField(blank=True, default="")
+    racha_visitante = models.TextField(blank=True, default="")
+
+    class Meta:
+        # El índice único (grupo, jornada, club) sirve la lectura de una jornada
+        unique_together = (("grupo", "jornada", "club"),)
+        indexes = [
+            # Filas de un club a partir de una jornada (las que mueve cada resultado)
+            models.Index(fields=["grupo", "club", "jornada"]),
+        ]
+        verbose_name = "Fila de clasificación"
+        verbose_name_plural = "Filas de clasificación"
+
+    def __str__(self):
+        return f"{self.grupo.nombre} - J{self.jornada} - {self.club}"
+
+
+class ResultadoAplicado(models.Model):
+    """
+    Resultado de un partido tal como está sumado en FilaClasificacion. Si el
+    partido cambia (marcador corregido, jornada movida, anulado) se resta
+    esto y se suma lo nuevo.
+    """
+    partido = models.OneToOneField(
+        "partidos.Partido",
+        on_delete=models.CASCADE,
+        related_name="resultado_clasificacion"
+    )
+    grupo = models.ForeignKey(
+        Grupo,
+        on_delete=models.CASCADE,
+        related_name="resultados_aplicados"
+    )
+    jornada = models.PositiveIntegerField()
+    fecha_hora = models.DateTimeField(null=True, blank=True)
+    local = models.ForeignKey(Club, on_delete=models.CASCADE, related_name="+")
+    visitante = models.ForeignKey(Club, on_delete=models.CASCADE, related_name="+")
+    goles_local = models.PositiveIntegerField()
+    goles_visitante = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["grupo", "jornada"]),
+            models.Index(fields=["grupo", "local"]),
+            models.Index(fields=["grupo", "visitante"]),
+        ]
+        verbose_name = "Resultado aplicado"
+        verbose_name_plural = "Resultados aplicados"
+
+    def __str__(self):
+        return f"{self.partido_id}: {self.goles_local}-{self.goles_visitante}"
@@ -0,0 +1,296 @@
+from django.db import transaction
+from django.db.models import F, Q
+
+from clubes.models import ClubEnGrupo
+from partidos.models import Partido
+from .models import FilaClasificacion, ResultadoAplicado
+
+# Motor de clasificación incremental.
+#
+# FilaClasificacion guarda, por grupo, la clasificación acumulada de cada
+# club en cada jornada con resultados (local y visitante por separado, más
+# las rachas). ResultadoAplicado guarda el resultado de cada partido tal
+# como está sumado.
+#
+# Cuando se guarda un Partido (clasificaciones.signals) aplicar_partido()
+# compara con lo aplicado: si cambia, resta lo anterior y suma lo nuevo solo
+# en las filas de los dos clubes desde esa jornada, y les rehace la racha.
+# Así un marcador corregido o un partido anulado se deshacen solos.
+#
+# tabla() lee una jornada con una consulta por el índice (grupo, jornada) y
+# ordena al vuelo: puntos, diferencia de goles, goles a favor y nombre.
+# reconstruir_grupo() la rehace entera desde los partidos (recalcular_clasificacion,
+# reconstruir_clasificaciones, o la primera lectura de un grupo sin filas).
+LADOS = ("local", "visitante")
+CONTADORES = ("pj", "pg", "pe", "pp", "gf", "gc")
+CAMPOS = tuple(f"{c}_{lado}" for lado in LADOS for c in CONTADORES) + ("racha", "racha_local", "racha_visitante")
+SCOPES = {"overall": LADOS, "home": ("local",), "away": ("visitante",)}
+RESULTADO = {"V": "pg", "E": "pe", "D": "pp"}
+
+
+def _letra(gf: int, gc: int) -> str:
+    return "V" if gf > gc else "E" if gf == gc else "D"
+
+
+def _por_club(r):
+    """(club_id, lado, goles a favor, goles en contra) de los dos clubes."""
+    return (
+        (r.local_id, "local", r.goles_local, r.goles_visitante),
+        (r.visitante_id, "visitante", r.goles_visitante, r.goles_local),
+    )
+
+
+def _resultado(partido) -> dict | None:
+    """Lo que el partido debe sumar en la clasificación (None si no cuenta)."""
+    if not partido.grupo_id or not partido.jugado or partido.goles_local is None or partido.goles_visitante is None:
+        return None
+    return {
+        "grupo_id": partido.grupo_id,
+        "jornada": partido.jornada_numero,
+        "fecha_hora": partido.fecha_hora,
+        "local_id": partido.local_id,
+        "visitante_id": partido.visitante_id,
+        "goles_local": partido.goles_local,
+        "goles_visitante": partido.goles_visitante,
+    }
+
+
+def _resultados(grupo_id):
+    return ResultadoAplicado.objects.filter(grupo_id=grupo_id).order_by("jornada", "fecha_hora", "partido_id")
+
+
+# ---------------------------------------------------------------------------
+# Escritura incremental
+# ---------------------------------------------------------------------------
+
+def _abrir_jornada(grupo_id: int, jornada: int, club_ids):
+    """
+    Deja filas en `jornada` (copia de la jornada anterior con filas, o los
+    inscritos a cero) y filas de `club_ids` de ahí en adelante: un club que
+    no está inscrito en el grupo aparece desde su primer partido.
+    """
+    filas = FilaClasificacion.objects.filter(grupo_id=grupo_id)
+    if not filas.filter(jornada=jornada).exists():
+        previa = filas.filter(jornada__lt=jornada).order_by("-jornada").values_list("jornada", flat=True).first()
+        if previa is None:
+            FilaClasificacion.objects.bulk_create([
+                FilaClasificacion(grupo_id=grupo_id, jornada=jornada, club_id=cid)
+                for cid in ClubEnGrupo.objects.filter(grupo_id=grupo_id).values_list("club_id", flat=True)
+            ])
+        else:
+            FilaClasificacion.objects.bulk_create([
+                FilaClasificacion(grupo_id=grupo_id, jornada=jornada, club_id=f.pop("club_id"), **f)
+                for f in filas.filter(jornada=previa).values("club_id", *CAMPOS)
+            ])
+
+    # Sin fila desde aquí = sin resultados hasta esa jornada: a cero
+    siguientes = set(filas.filter(jornada__gte=jornada).values_list("jornada", flat=True).distinct())
+    tienen = set(filas.filter(jornada__gte=jornada, club_id__in=club_ids).values_list("jornada", "club_id"))
+    FilaClasificacion.objects.bulk_create([
+        FilaClasificacion(grupo_id=grupo_id, jornada=j, club_id=cid)
+        for j in siguientes for cid in club_ids if (j, cid) not in tienen
+    ])
+
+
+def _mover(r: ResultadoAplicado, signo: int):
+    """Suma (signo=1) o resta (signo=-1) el resultado en las filas de sus dos clubes."""
+    for club_id, lado, gf, gc in _por_club(r):
+        cambios = {f"pj_{lado}": 1, f"{RESULTADO[_letra(gf, gc)]}_{lado}": 1, f"gf_{lado}": gf, f"gc_{lado}": gc}
+        FilaClasificacion.objects.filter(grupo_id=r.grupo_id, club_id=club_id, jornada__gte=r.jornada).update(
+            **{campo: F(campo) + signo * n for campo, n in cambios.items() if n}
+        )
+
+
+def _rehacer_rachas(grupo_id: int, club_ids, desde: int):
+    """Rachas de esos clubes en sus filas desde `desde`, a partir de sus resultados."""
+    club_ids = set(club_ids)
+    hechos = {cid: [] for cid in club_ids}  # (jornada, letra, lado)
+    for r in _resultados(grupo_id).filter(Q(local_id__in=club_ids) | Q(visitante_id__in=club_ids)):
+        for cid, lado, gf, gc in _por_club(r):
+            if cid in hechos:
+                hechos[cid].append((r.jornada, _letra(gf, gc), lado))
+
+    filas = list(FilaClasificacion.objects.filter(grupo_id=grupo_id, club_id__in=club_ids, jornada__gte=desde))
+    for f in filas:
+        hasta = [(letra, lado) for j, letra, lado in hechos[f.club_id] if j <= f.jornada]
+        f.racha = "".join(letra for letra, _ in hasta)
+        f.racha_local = "".join(letra for letra, lado in hasta if lado == "local")
+        f.racha_visitante = "".join(letra for letra, lado in hasta if lado == "visitante")
+    FilaClasificacion.objects.bulk_update(filas, ["racha", "racha_local", "racha_visitante"])
+
+
+def _cerrar_jornada(grupo_id: int, jornada: int):
+    # Una jornada sin resultados no tiene filas
+    if not ResultadoAplicado.objects.filter(grupo_id=grupo_id, jornada=jornada).exists():
+        FilaClasificacion.objects.filter(grupo_id=grupo_id, jornada=jornada).delete()
+
+
+def _podar(grupo_id: int, club_ids):
+    """Clubes no inscritos: fuera las filas anteriores a su primer resultado."""
+    inscritos = set(ClubEnGrupo.objects.filter(grupo_id=grupo_id, club_id__in=club_ids).values_list("club_id", flat=True))
+    for cid in set(club_ids) - inscritos:
+        primera = _resultados(grupo_id).filter(Q(local_id=cid) | Q(visitante_id=cid)).values_list("jornada", flat=True).first()
+        filas = FilaClasificacion.objects.filter(grupo_id=grupo_id, club_id=cid)
+        (filas if primera is None else filas.filter(jornada__lt=primera)).delete()
+
+
+@transaction.atomic
+def aplicar_partido(partido) -> bool:
+    """
+    Pone la clasificación al día con el estado de `partido`. Devuelve False
+    si ya estaba aplicado tal cual.
+    """
+    previo = ResultadoAplicado.objects.select_for_update().filter(partido_id=partido.pk).first()
+    nuevo = _resultado(partido)
+    if previo is None and nuevo is None:
+        return False
+    if previo is not None and nuevo is not None and all(getattr(previo, k) == v for k, v in nuevo.items()):
+        return False
+
+    tocados = {}  # grupo_id -> (clubes, desde qué jornada)
+    if previo is not None:
+        _mover(previo, -1)
+        previo.delete()
+        _cerrar_jornada(previo.grupo_id, previo.jornada)
+        tocados[previo.grupo_id] = ({previo.local_id, previo.visitante_id}, previo.jornada)
+    if nuevo is not None:
+        _abrir_jornada(nuevo["grupo_id"], nuevo["jornada"], (nuevo["local_id"], nuevo["visitante_id"]))
+        _mover(ResultadoAplicado.objects.create(partido_id=partido.pk, **nuevo), 1)
+        clubes, desde = tocados.get(nuevo["grupo_id"], (set(), nuevo["jornada"]))
+        tocados[nuevo["grupo_id"]] = (
+            clubes | {nuevo["local_id"], nuevo["visitante_id"]}, min(desde, nuevo["jornada"])
+        )
+
+    for grupo_id, (clubes, desde) in tocados.items():
+        _podar(grupo_id, clubes)
+        _rehacer_rachas(grupo_id, clubes, desde)
+    return True
+
+
+@transaction.atomic
+def retirar_partido(partido_id: int) -> bool:
+    """Quita de la clasificación un partido (p.ej. antes de borrarlo)."""
+    previo = ResultadoAplicado.objects.select_for_update().filter(partido_id=partido_id).first()
+    if previo is None:
+        return False
+    _mover(previo, -1)
+    previo.delete()
+    _cerrar_jornada(previo.grupo_id, previo.jornada)
+    _podar(previo.grupo_id, (previo.local_id, previo.visitante_id))
+    _rehacer_rachas(previo.grupo_id, (previo.local_id, previo.visitante_id), previo.jornada)
+    return True
+
+
+def inscribir_club(grupo_id: int, club_id: int):
+    """Club nuevo en el grupo: filas a cero en las jornadas anteriores a su primer resultado."""
+    filas = FilaClasificacion.objects.filter(grupo_id=grupo_id)
+    tiene = set(filas.filter(club_id=club_id).values_list("jornada", flat=True))
+    FilaClasificacion.objects.bulk_create([
+        FilaClasificacion(grupo_id=grupo_id, jornada=j, club_id=club_id)
+        for j in filas.values_list("jornada", flat=True).distinct() if j not in tiene
+    ])
+
+
+# ---------------------------------------------------------------------------
+# Reconstrucción completa
+# ---------------------------------------------------------------------------
+
+@transaction.atomic
+def reconstruir_grupo(grupo_id: int) -> int:
+    """
+    Rehace las filas del grupo desde sus partidos jugados. Devuelve cuántas
+    filas ha escrito.
+    """
+    ResultadoAplicado.objects.filter(grupo_id=grupo_id).delete()
+    FilaClasificacion.objects.filter(grupo_id=grupo_id).delete()
+
+    resultados = []
+    for p in (
+        Partido.objects
+        .filter(grupo_id=grupo_id, jugado=True, goles_local__isnull=False, goles_visitante__isnull=False)
+        .order_by("jornada_numero", "fecha_hora", "id")
+    ):
+        resultados.append(ResultadoAplicado(partido_id=p.pk, **_resultado(p)))
+    ResultadoAplicado.objects.bulk_create(resultados)
+    if not resultados:
+        return 0
+
+    # Inscritos desde el principio; el resto desde su primer partido
+    vacia = {**{f"{c}_{lado}": 0 for lado in LADOS for c in CONTADORES}, "racha": "", "racha_local": "", "racha_visitante": ""}
+    acumulado = {
+        cid: dict(vacia) for cid in ClubEnGrupo.objects.filter(grupo_id=grupo_id).values_list("club_id", flat=True)
+    }
+
+    filas = []
+    for i, r in enumerate(resultados):
+        for cid, lado, gf, gc in _por_club(r):
+            a = acumulado.setdefault(cid, dict(vacia))
+            letra = _letra(gf, gc)
+            a[f"pj_{lado}"] += 1
+            a[f"{RESULTADO[letra]}_{lado}"] += 1
+            a[f"gf_{lado}"] += gf
+            a[f"gc_{lado}"] += gc
+            a["racha"] += letra
+            a[f"racha_{lado}"] += letra
+        # Última de su jornada: foto de todos los clubes
+        if i + 1 == len(resultados) or resultados[i + 1].jornada != r.jornada:
+            filas.extend(
+                FilaClasificacion(grupo_id=grupo_id, jornada=r.jornada, club_id=cid, **a)
+                for cid, a in acumulado.items()
+            )
+    FilaClasificacion.objects.bulk_create(filas, batch_size=1000)
+    return len(filas)
+
+
+# ---------------------------------------------------------------------------
+# Lectura
+# ---------------------------------------------------------------------------
+
+def jornadas(grupo_id: int) -> list[int]:
+    """Jornadas del grupo con algún resultado, en orden."""
+    return list(
+        FilaClasificacion.objects.filter(grupo_id=grupo_id)
+        .order_by("jornada").values_list("jornada", flat=True).distinct()
+    )
+
+
+def tabla(grupo_id: int, jornada: int | None = None, scope: str = "overall"):
+    """
+    (jornadas disponibles, jornada aplicada, filas ordenadas) de la
+    clasificación del grupo. Si `jornada` no tiene resultados se usa la
+    última. Sin resultados devuelve ([], None, []).
+
+    Cada fila: pos, club_id, nombre, escudo, slug, pj, pg, pe, pp, gf, gc,
+    dg, puntos y racha (lista cronológica completa). scope=home/away cuenta
+    solo los partidos como local/visitante.
+    """
+    disponibles = jornadas(grupo_id)
+    if not disponibles and Partido.objects.filter(
+        grupo_id=grupo_id, jugado=True, goles_local__isnull=False, goles_visitante__isnull=False
+    ).exists():
+        # Grupo aún sin filas (p.ej. anterior al motor): se construye ahora
+        reconstruir_grupo(grupo_id)
+        disponibles = jornadas(grupo_id)
+    if not disponibles:
+        return [], None, []
+    aplicada = jornada if jornada in disponibles else disponibles[-1]
+
+    lados = SCOPES.get(scope, ())
+    out = []
+    for f in FilaClasificacion.objects.filter(grupo_id=grupo_id, jornada=aplicada).select_related("club"):
+        fila = {c: sum(getattr(f, f"{c}_{lado}") for lado in lados) for c in CONTADORES}
+        racha = f.racha if len(lados) == 2 else getattr(f, f"racha_{lados[0]}") if lados else ""
+        out.append({
+            "club_id": f.club_id,
+            "nombre": f.club.nombre_corto or f.club.nombre_oficial,
+            "escudo": f.club.escudo_url or "",
+            "slug": f.club.slug or None,
+            **fila,
+            "dg": fila["gf"] - fila["gc"],
+            "puntos": 3 * fila["pg"] + fila["pe"],
+            "racha": list(racha),
+        })
+    out.sort(key=lambda r: (-r["puntos"], -r["dg"], -r["gf"], r["nombre"].lower()))
+    for pos, fila in enumerate(out, start=1):
+        fila["pos"] = pos
+    return disponibles, aplicada, out
@@ -0,0 +1,41 @@
+"""
+Señales que mantienen al día el motor de clasificación (clasificaciones.motor)
+cuando cambia un partido o se inscribe (o se da de baja) un club en un grupo.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from clubes.models import ClubEnGrupo
+from nucleo.models import Grupo
+from partidos.models import Partido
+from clasificaciones import motor
+
+
+@receiver(post_save, sender=Partido)
+def actualizar_clasificacion(sender, instance, **kwargs):
+    motor.aplicar_partido(instance)
+
+
+@receiver(pre_delete, sender=Partido)
+def retirar_de_clasificacion(sender, instance, **kwargs):
+    motor.retirar_partido(instance.pk)
+
+
+@receiver(post_save, sender=ClubEnGrupo)
+def inscribir_en_clasificacion(sender, instance, created, **kwargs):
+    if created:
+        motor.inscribir_club(instance.grupo_id, instance.club_id)
+
+
+@receiver(post_delete, sender=ClubEnGrupo)
+def dar_de_baja_en_clasificacion(sender, instance, **kwargs):
+    # Sin inscripción solo sale desde su primer partido (si jugó): se rehace
+    # el grupo. Tras confirmar: si se borra el grupo entero, ya no existe.
+    grupo_id = instance.grupo_id
+
+    def _reconstruir():
+        if Grupo.objects.filter(pk=grupo_id).exists():
+            motor.reconstruir_grupo(grupo_id)
+
+    transaction.on_commit(_reconstruir)
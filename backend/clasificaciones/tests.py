@@ -1,3 +1,222 @@
+import random
+from datetime import datetime, timedelta, timezone
+
 from django.test import TestCase
 
-# Create your tests here.
+from clubes.models import Club, ClubEnGrupo
+from nucleo.models import Competicion, Grupo, Temporada
+from partidos.models import Partido
+from . import motor
+from .models import FilaClasificacion, ResultadoAplicado
+
+
+def _tabla_antigua(grupo_id, jornada=None, scope="overall"):
+    """
+    El cálculo que hacía ClasificacionCompletaView antes del motor: recorre
+    los partidos jugados del grupo hasta la jornada en cada petición.
+    """
+    partidos = list(
+        Partido.objects
+        .filter(grupo_id=grupo_id, jugado=True, goles_local__isnull=False, goles_visitante__isnull=False)
+        .select_related("local", "visitante")
+        .order_by("jornada_numero", "fecha_hora", "id")
+    )
+    disponibles = sorted({p.jornada_numero for p in partidos})
+    if not disponibles:
+        return [], None, []
+    aplicada = jornada if jornada in disponibles else disponibles[-1]
+
+    def _fila(club):
+        return {
+            "club_id": club.pk, "nombre": club.nombre_corto or club.nombre_oficial,
+            "escudo": club.escudo_url or "", "slug": club.slug or None,
+            "pj": 0, "pg": 0, "pe": 0, "pp": 0, "gf": 0, "gc": 0, "dg": 0, "puntos": 0, "racha": [],
+        }
+
+    stats = {c.club_id: _fila(c.club) for c in ClubEnGrupo.objects.filter(grupo_id=grupo_id).select_related("club")}
+    for p in partidos:
+        if p.jornada_numero > aplicada:
+            continue
+        for club, lado, gf, gc in ((p.local, "local", p.goles_local, p.goles_visitante),
+                                   (p.visitante, "visitante", p.goles_visitante, p.goles_local)):
+            fila = stats.setdefault(club.pk, _fila(club))
+            if scope not in ("overall", "home" if lado == "local" else "away"):
+                continue
+            letra = "V" if gf > gc else "E" if gf == gc else "D"
+            fila["pj"] += 1
+            fila["gf"] += gf
+            fila["gc"] += gc
+            fila[{"V": "pg", "E": "pe", "D": "pp"}[letra]] += 1
+            fila["puntos"] += {"V": 3, "E": 1, "D": 0}[letra]
+            fila["racha"].append(letra)
+
+    out = list(stats.values())
+    for fila in out:
+        fila["dg"] = fila["gf"] - fila["gc"]
+    out.sort(key=lambda r: (-r["puntos"], -r["dg"], -r["gf"], r["nombre"].lower()))
+    return disponibles, aplicada, out
+
+
+def _sin_pos(tabla):
+    disponibles, aplicada, filas = tabla
+    return disponibles, aplicada, [{k: v for k, v in f.items() if k != "pos"} for f in filas]
+
+
+class MotorClasificacionTests(TestCase):
+    def setUp(self):
+        temporada = Temporada.objects.create(nombre="2099/2100")
+        competicion = Competicion.objects.create(nombre="Competición de prueba")
+        self.grupo = Grupo.objects.create(nombre="Grupo de prueba", temporada=temporada, competicion=competicion)
+        self.clubs = [Club.objects.create(nombre_oficial=f"Club {letra}") for letra in "ABCD"]
+        for club in self.clubs:
+            ClubEnGrupo.objects.create(club=club, grupo=self.grupo)
+        # Juega en el grupo sin estar inscrito
+        self.invitado = Club.objects.create(nombre_oficial="Club Invitado")
+
+    def _partido(self, local, visitante, gl, gv, jornada=1, jugado=True, **extra):
+        return Partido.objects.create(
+            grupo=self.grupo, jornada_numero=jornada, local=local, visitante=visitante,
+            goles_local=gl, goles_visitante=gv, jugado=jugado, **extra,
+        )
+
+    def _fila(self, club, jornada=None, scope="overall"):
+        _, _, filas = motor.tabla(self.grupo.pk, jornada, scope)
+        return next(f for f in filas if f["club_id"] == club.pk)
+
+    def assertIgualQueAntes(self):
+        jornadas = motor.jornadas(self.grupo.pk)
+        for jornada in jornadas + [None]:
+            for scope in motor.SCOPES:
+                self.assertEqual(
+                    _sin_pos(motor.tabla(self.grupo.pk, jornada, scope)),
+                    _tabla_antigua(self.grupo.pk, jornada, scope),
+                    f"jornada={jornada} scope={scope}",
+                )
+
+    def test_aplicar_suma_en_los_dos_clubes(self):
+        a, b = self.clubs[:2]
+        self._partido(a, b, 2, 1)
+
+        fila_a, fila_b = self._fila(a), self._fila(b)
+        self.assertEqual((fila_a["pj"], fila_a["pg"], fila_a["gf"], fila_a["gc"], fila_a["puntos"]), (1, 1, 2, 1, 3))
+        self.assertEqual((fila_b["pj"], fila_b["pp"], fila_b["puntos"], fila_b["racha"]), (1, 1, 0, ["D"]))
+        self.assertEqual(self._fila(a, scope="away")["pj"], 0)
+        self.assertEqual(self._fila(a)["pos"], 1)
+
+    def test_guardar_sin_cambios_no_reaplica(self):
+        partido = self._partido(*self.clubs[:2], 1, 1)
+        self.assertFalse(motor.aplicar_partido(partido))
+        self.assertEqual(ResultadoAplicado.objects.filter(partido=partido).count(), 1)
+
+    def test_corregir_marcador_deshace_lo_anterior(self):
+        a, b = self.clubs[:2]
+        partido = self._partido(a, b, 2, 1)
+        partido.goles_local, partido.goles_visitante = 0, 3
+        partido.save()
+
+        fila_a = self._fila(a)
+        self.assertEqual((fila_a["pj"], fila_a["pg"], fila_a["pp"], fila_a["gf"], fila_a["gc"]), (1, 0, 1, 0, 3))
+        self.assertEqual(fila_a["racha"], ["D"])
+        self.assertEqual(self._fila(b)["puntos"], 3)
+
+    def test_mover_de_jornada_cierra_la_jornada_vacia(self):
+        a, b, c, d = self.clubs
+        self._partido(a, b, 1, 0, jornada=1)
+        movido = self._partido(c, d, 2, 2, jornada=2)
+        self.assertEqual(motor.jornadas(self.grupo.pk), [1, 2])
+
+        movido.jornada_numero = 3
+        movido.save()
+
+        self.assertEqual(motor.jornadas(self.grupo.pk), [1, 3])
+        self.assertEqual(self._fila(c, jornada=1)["pj"], 0)
+        self.assertEqual(self._fila(c, jornada=3)["pe"], 1)
+        self.assertIgualQueAntes()
+
+    def test_anular_y_borrar_retiran_el_resultado(self):
+        a, b, c, d = self.clubs
+        anulado = self._partido(a, b, 3, 0)
+        borrado = self._partido(c, d, 0, 1)
+
+        anulado.jugado = False
+        anulado.save()
+        self.assertEqual(self._fila(a)["pj"], 0)
+
+        borrado.delete()
+        self.assertEqual(motor.jornadas(self.grupo.pk), [])
+        self.assertFalse(FilaClasificacion.objects.filter(grupo=self.grupo).exists())
+        self.assertEqual(motor.tabla(self.grupo.pk), ([], None, []))
+
+    def test_club_no_inscrito_aparece_desde_su_primer_partido(self):
+        a, b = self.clubs[:2]
+        self._partido(a, b, 1, 0, jornada=1)
+        self._partido(self.invitado, a, 2, 0, jornada=2)
+
+        self.assertNotIn(self.invitado.pk, [f["club_id"] for f in motor.tabla(self.grupo.pk, 1)[2]])
+        self.assertEqual(self._fila(self.invitado, jornada=2)["puntos"], 3)
+        self.assertIgualQueAntes()
+
+    def test_dar_de_baja_un_club_lo_quita_de_la_tabla(self):
+        a, b, c, d = self.clubs
+        self._partido(a, b, 1, 0, jornada=1)
+        self._partido(c, a, 0, 2, jornada=2)
+
+        # Mal inscrito y sin partidos: desaparece
+        with self.captureOnCommitCallbacks(execute=True):
+            ClubEnGrupo.objects.get(grupo=self.grupo, club=d).delete()
+        self.assertNotIn(d.pk, [f["club_id"] for f in motor.tabla(self.grupo.pk)[2]])
+
+        # Con partidos: solo desde el primero, como un club no inscrito
+        with self.captureOnCommitCallbacks(execute=True):
+            ClubEnGrupo.objects.get(grupo=self.grupo, club=c).delete()
+        self.assertNotIn(c.pk, [f["club_id"] for f in motor.tabla(self.grupo.pk, 1)[2]])
+        self.assertEqual(self._fila(c, jornada=2)["pp"], 1)
+        self.assertIgualQueAntes()
+
+        # Borrar el grupo entero no intenta rehacerlo
+        with self.captureOnCommitCallbacks(execute=True):
+            self.grupo.delete()
+        self.assertFalse(FilaClasificacion.objects.exists())
+
+    def test_reconstruir_da_lo_mismo_que_el_incremental(self):
+        a, b, c, d = self.clubs
+        self._partido(a, b, 1, 0, jornada=1)
+        self._partido(c, d, 2, 2, jornada=1)
+        self._partido(b, c, 0, 4, jornada=2)
+        antes = [motor.tabla(self.grupo.pk, j) for j in (1, 2)]
+
+        motor.reconstruir_grupo(self.grupo.pk)
+
+        self.assertEqual([motor.tabla(self.grupo.pk, j) for j in (1, 2)], antes)
+
+    def test_pasos_aleatorios_igual_que_el_calculo_anterior(self):
+        rnd = random.Random(2024)
+        clubs = self.clubs + [self.invitado]
+        base = datetime(2099, 9, 1, 18, 0, tzinfo=timezone.utc)
+        partidos = []
+        for paso in range(120):
+            accion = rnd.choice(["crear", "crear", "corregir", "mover", "anular", "borrar"]) if partidos else "crear"
+            if accion == "crear":
+                local, visitante = rnd.sample(clubs, 2)
+                fecha = None if rnd.random() < 0.2 else base + timedelta(days=rnd.randrange(60), hours=rnd.randrange(4))
+                partidos.append(self._partido(
+                    local, visitante, rnd.randrange(5), rnd.randrange(5),
+                    jornada=rnd.randint(1, 6), jugado=rnd.random() < 0.85, fecha_hora=fecha,
+                ))
+                continue
+            partido = rnd.choice(partidos)
+            if accion == "borrar":
+                partidos.remove(partido)
+                partido.delete()
+                continue
+            if accion == "corregir":
+                partido.goles_local, partido.goles_visitante = rnd.randrange(5), rnd.randrange(5)
+            elif accion == "mover":
+                partido.jornada_numero = rnd.randint(1, 6)
+            else:
+                partido.jugado = not partido.jugado
+            partido.save()
+
+            if paso % 10 == 0:
+                self.assertIgualQueAntes()
+        self.assertIgualQueAntes()
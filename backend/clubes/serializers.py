@@ -2,6 +2,7 @@
 from rest_framework import serializers
 from django.apps import apps as django_apps
 
+from nucleo.media import norm_media
 from .models import Club, ClubEnGrupo
 from jugadores.models import JugadorEnClubTemporada
 from staff.models import StaffClub
@@ -12,17 +13,8 @@ from staff.models import StaffClub
 # Helper para normalizar URLs de media.
 # Asegura que todas las URLs de imágenes tengan el prefijo /media/ correcto.
 # Esto es necesario porque FFCV a veces devuelve rutas relativas sin prefijo.
-def _norm_media(url: str | None) -> str:
-    if not url:
-        return ""
-    u = url.strip()
-    # Si ya es URL absoluta o tiene /media/, dejarla como está
-    if u.startswith("http://") or u.startswith("https://"):
-        return u
-    if u.startswith("/media/"):
-        return u
-    # Añadir prefijo /media/ si falta
-    return "/media/" + u.lstrip("/")
+def _norm_media(url: str | None, tam: int | None = None) -> str:
+    return norm_media(url, tam)
 
 
 # --------------------------------------------
@@ -1,3 +1,11 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import SeccionGrupoInfo
+
+
+@admin.register(SeccionGrupoInfo)
+class SeccionGrupoInfoAdmin(admin.ModelAdmin):
+    list_display = ("grupo", "jornada", "seccion", "actualizada")
+    list_filter = ("seccion",)
+    exclude = ("datos",)
+    ordering = ("-actualizada",)
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class EstadisticasConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'estadisticas'
+
+    def ready(self):
+        """
+        Registra las señales que mantienen la pantalla del grupo (estadisticas.signals).
+        """
+        import estadisticas.signals  # noqa: F401
@@ -0,0 +1,135 @@
+from django.db.models import OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from clubes.models import ClubEnGrupo
+from partidos.models import Partido
+from status.models import VersionDatos
+from .models import SeccionGrupoInfo
+
+# Pantalla del grupo materializada por secciones (estadisticas.models.SeccionGrupoInfo).
+#
+# GrupoInfoFullView guarda cada sección que calcula: las de una jornada con
+# su número y las de toda la temporada con jornada TEMPORADA. La siguiente
+# lectura de ese (grupo, jornada) las lee con una consulta y solo recalcula
+# las que falten.
+#
+# Quien cambia los datos de origen llama a invalidar() con el tipo de cambio,
+# y se borran solo las secciones que dependen de él (SECCIONES):
+#   - partidos:  Partido guardado/borrado (estadisticas.signals)
+#   - eventos:   EventoPartido y actas por lotes (scraping.core.persistencia)
+#   - arbitros:  actas por lotes
+#   - jugadores: actas por lotes y los comandos que reescriben fichas
+#                (status.versiones.datos_reescritos)
+#   - clubes:    Club, ClubEnGrupo y esos mismos comandos
+# `manage.py reconstruir_grupo_info` las borra a mano.
+#
+# Las señales invalidan al confirmarse la transacción (on_commit), pero una
+# petición que leyó los datos antes puede guardar después lo que calculó con
+# ellos. Por eso cada sección lleva la versión del grupo (status.versiones)
+# que leyó la petición: las que van por detrás no se usan y se reemplazan al
+# guardar. invalidar() pone al día la versión de las que no dependen del
+# cambio, para que una subida no obligue a recalcularlas todas.
+TEMPORADA = 0
+
+# sección -> (dónde se guarda, {cambio: alcance}). Alcance "jornada": solo
+# si el cambio es de su jornada; "grupo": cualquier cambio del grupo.
+_TODO = {"partidos": "grupo", "eventos": "grupo", "clubes": "grupo", "jugadores": "grupo"}
+SECCIONES = {
+    "calendario": ("temporada", {"partidos": "grupo"}),
+    "clasificacion": ("temporada", {"partidos": "grupo", "clubes": "grupo"}),
+    "pichichi_temporada": ("temporada", _TODO),
+    "jugadores_mas_sancionados": ("temporada", _TODO),
+    "fair_play_equipos": ("temporada", {"partidos": "grupo", "eventos": "grupo", "clubes": "grupo"}),
+    "goles_por_equipo": ("temporada", {"partidos": "grupo", "eventos": "grupo", "clubes": "grupo"}),
+    "resultados_jornada": ("jornada", {"partidos": "jornada", "arbitros": "jornada", "clubes": "grupo"}),
+    "kpis_jornada": ("jornada", {"partidos": "jornada", "eventos": "jornada"}),
+    # Usa la posición y los goles a favor de la clasificación actual
+    "goleadores_jornada": ("jornada", {
+        "partidos": "grupo", "eventos": "jornada", "clubes": "grupo", "jugadores": "grupo",
+    }),
+    "sanciones_jornada": ("jornada", {
+        "partidos": "jornada", "eventos": "jornada", "clubes": "grupo", "jugadores": "grupo",
+    }),
+}
+
+
+def leer(grupo_id: int, jornadas, version: int) -> dict:
+    """
+    {(jornada, sección): datos} guardados de esas jornadas (TEMPORADA
+    incluida si se pide) que no van por detrás de `version`.
+    """
+    return {
+        (j, s): datos
+        for j, s, datos in SeccionGrupoInfo.objects
+        .filter(grupo_id=grupo_id, jornada__in=list(jornadas), version__gte=version)
+        .values_list("jornada", "seccion", "datos")
+    }
+
+
+def guardar(grupo_id: int, secciones: dict, version: int) -> None:
+    """
+    Guarda {(jornada, sección): datos} calculados con `version`. Reemplaza
+    las que iban por detrás; si otra petición se adelantó, vale la suya.
+    """
+    SeccionGrupoInfo.objects.filter(
+        grupo_id=grupo_id, jornada__in={j for j, _ in secciones}, seccion__in={s for _, s in secciones},
+        version__lt=version,
+    ).delete()
+    SeccionGrupoInfo.objects.bulk_create(
+        [
+            SeccionGrupoInfo(grupo_id=grupo_id, jornada=j, seccion=s, datos=datos, version=version)
+            for (j, s), datos in secciones.items()
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def invalidar(grupo_ids, cambios, jornadas=None) -> int:
+    """
+    Borra las secciones que dependen de esos cambios y pone las demás en la
+    versión actual de su grupo. grupo_ids=None: todos los grupos;
+    jornadas=None: el cambio afecta a todas las jornadas.
+    """
+    por_grupo, por_jornada = set(), set()
+    for seccion, (_, deps) in SECCIONES.items():
+        alcances = {deps.get(c) for c in cambios}
+        if "grupo" in alcances:
+            por_grupo.add(seccion)
+        elif "jornada" in alcances:
+            por_jornada.add(seccion)
+
+    condiciones = []
+    if por_grupo:
+        condiciones.append(Q(seccion__in=por_grupo))
+    if por_jornada:
+        q = Q(seccion__in=por_jornada)
+        if jornadas is not None:
+            q &= Q(jornada__in=[j for j in jornadas if j is not None])
+        condiciones.append(q)
+    if not condiciones:
+        return 0
+
+    q = condiciones[0]
+    for extra in condiciones[1:]:
+        q |= extra
+    qs = SeccionGrupoInfo.objects.all()
+    if grupo_ids is not None:
+        qs = qs.filter(grupo_id__in=[g for g in grupo_ids if g is not None])
+    borradas = qs.filter(q).delete()[0]
+    # Las que guarde ahora una petición que leyó antes del cambio siguen atrás
+    version_grupo = VersionDatos.objects.filter(ambito="grupo", objeto_id=OuterRef("grupo_id")).values("version")[:1]
+    qs.exclude(q).update(version=Coalesce(Subquery(version_grupo), 0))
+    return borradas
+
+
+def invalidar_partidos(partido_ids, cambios) -> int:
+    """Lo mismo para los grupos y jornadas de esos partidos."""
+    por_grupo = {}
+    for grupo_id, jornada in Partido.objects.filter(pk__in=list(partido_ids)).values_list("grupo_id", "jornada_numero"):
+        por_grupo.setdefault(grupo_id, set()).add(jornada)
+    return sum(invalidar([grupo_id], cambios, jornadas) for grupo_id, jornadas in por_grupo.items())
+
+
+def invalidar_club(club_id: int) -> int:
+    grupo_ids = list(ClubEnGrupo.objects.filter(club_id=club_id).values_list("grupo_id", flat=True))
+    return invalidar(grupo_ids, ("clubes",)) if grupo_ids else 0
@@ -5,7 +5,13 @@ from django.db.models import Max
 from nucleo.models import Grupo
 from clubes.models import Club, ClubEnGrupo
 from partidos.models import Partido
+from clasificaciones import motor
 from clasificaciones.models import ClasificacionJornada, PosicionJornada
+from scraping.core import cambios
+from status import versiones
+
+# Cursor de este comando en scraping.CambioPartido (--desde-cambios)
+CONSUMIDOR = "clasificacion"
 
 
 class Command(BaseCommand):
@@ -15,13 +21,34 @@ class Command(BaseCommand):
         parser.add_argument(
             "--grupo",
             type=int,
-            required=True,
             help="ID del Grupo (nucleo.Grupo) para el que recalcular la clasificación",
         )
+        parser.add_argument(
+            "--desde-cambios",
+            action="store_true",
+            help=(
+                "Recalcula los grupos con resultados/estados cambiados por el scraping "
+                "desde la última pasada de este comando (scraping.CambioPartido)"
+            ),
+        )
 
-    @transaction.atomic
+    @versiones.al_terminar
     def handle(self, *args, **options):
-        grupo_id = options["grupo"]
+        grupo_id = options.get("grupo")
+
+        if options.get("desde_cambios"):
+            if grupo_id:
+                raise CommandError("--desde-cambios no se combina con --grupo")
+            pares, hasta = cambios.pendientes(CONSUMIDOR, tipos=cambios.TIPOS_CLASIFICACION)
+            grupo_ids = sorted({g for g, _ in pares})
+            self.stdout.write(self.style.NOTICE(f"{len(grupo_ids)} grupos con cambios del scraping"))
+            for grupo in Grupo.objects.select_related("competicion", "temporada").filter(id__in=grupo_ids):
+                self._recalcular_grupo(grupo)
+            cambios.confirmar(CONSUMIDOR, hasta)
+            return
+
+        if not grupo_id:
+            raise CommandError("Indica --grupo o --desde-cambios")
 
         # 1. Obtenemos el grupo
         try:
@@ -29,10 +56,19 @@ class Command(BaseCommand):
         except Grupo.DoesNotExist:
             raise CommandError(f"Grupo con id={grupo_id} no existe")
 
+        self._recalcular_grupo(grupo)
+
+    @transaction.atomic
+    def _recalcular_grupo(self, grupo):
         self.stdout.write(self.style.NOTICE(
             f"Recalculando clasificación para Grupo {grupo.id} ({grupo.nombre}) / {grupo.competicion.nombre} / {grupo.temporada.nombre}"
         ))
 
+        # Motor de clasificación (lo que leen las vistas): se rehace entero por
+        # si algún resultado entró sin pasar por Partido.save()
+        filas = motor.reconstruir_grupo(grupo.id)
+        self.stdout.write(f"  Motor de clasificación: {filas} filas")
+
         # 2. Obtenemos todos los clubs que han jugado (o deberían estar en este grupo).
         # Combinamos clubs que aparecen en partidos (local o visitante) con clubs
         # registrados en ClubEnGrupo para asegurar que no se nos escape ningún club.
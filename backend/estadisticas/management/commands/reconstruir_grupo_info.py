@@ -0,0 +1,18 @@
+# estadisticas/management/commands/reconstruir_grupo_info.py
+from django.core.management.base import BaseCommand
+
+from estadisticas.models import SeccionGrupoInfo
+
+
+class Command(BaseCommand):
+    help = 'Borra las secciones guardadas de la pantalla del grupo (GrupoInfoFullView) para que se recalculen al leerlas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grupo_id', type=int, default=None, help='Solo este grupo')
+
+    def handle(self, *args, **options):
+        qs = SeccionGrupoInfo.objects.all()
+        if options.get('grupo_id'):
+            qs = qs.filter(grupo_id=options['grupo_id'])
+        n = qs.delete()[0]
+        self.stdout.write(self.style.SUCCESS(f'✓ {n} secciones borradas.'))
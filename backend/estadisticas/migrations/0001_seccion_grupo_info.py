@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:03
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('nucleo', '0002_grupo_competicion_slug_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeccionGrupoInfo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jornada', models.PositiveIntegerField()),
+                ('seccion', models.CharField(max_length=40)),
+                ('datos', models.JSONField()),
+                ('actualizada', models.DateTimeField(default=django.utils.timezone.now)),
+                ('grupo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='secciones_info', to='nucleo.grupo')),
+            ],
+            options={
+                'verbose_name': 'Sección de la pantalla de grupo',
+                'verbose_name_plural': 'Secciones de la pantalla de grupo',
+                'unique_together': {('grupo', 'jornada', 'seccion')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('estadisticas', '0001_seccion_grupo_info'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='secciongrupoinfo',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -1,3 +1,28 @@
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+
+class SeccionGrupoInfo(models.Model):
+    """
+    Una sección ya calculada de la pantalla del grupo (GrupoInfoFullView):
+    las de una jornada (resultados, KPIs, goleadores, sanciones) con su
+    número de jornada y las de toda la temporada con jornada 0. Se borran
+    cuando cambian sus datos de origen (estadisticas.grupo_info) y se vuelven
+    a calcular en la siguiente lectura, igual que las que van por detrás de
+    la versión del grupo.
+    """
+    grupo = models.ForeignKey("nucleo.Grupo", on_delete=models.CASCADE, related_name="secciones_info")
+    jornada = models.PositiveIntegerField()
+    seccion = models.CharField(max_length=40)
+    datos = models.JSONField()
+    # Versión del grupo (status.versiones) con la que se calculó
+    version = models.PositiveIntegerField(default=0)
+    actualizada = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = (("grupo", "jornada", "seccion"),)
+        verbose_name = "Sección de la pantalla de grupo"
+        verbose_name_plural = "Secciones de la pantalla de grupo"
+
+    def __str__(self):
+        return f"grupo {self.grupo_id} J{self.jornada} {self.seccion}"
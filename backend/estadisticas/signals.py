@@ -0,0 +1,56 @@
+"""
+Señales que borran las secciones de la pantalla del grupo
+(estadisticas.grupo_info) cuyos datos de origen cambian. Borran al
+confirmarse la transacción (on_commit): antes, una lectura aún vería los
+datos viejos y volvería a guardarlos. Las actas por lotes del scraping no
+pasan por aquí: lo hace scraping.core.persistencia.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from clubes.models import Club, ClubEnGrupo
+from partidos.models import EventoPartido, Partido
+from status.versiones import datos_reescritos
+from estadisticas import grupo_info
+
+
+@receiver([post_save, post_delete], sender=Partido)
+def secciones_partido(sender, instance, **kwargs):
+    grupo_id, jornada = instance.grupo_id, instance.jornada_numero
+    transaction.on_commit(lambda: grupo_info.invalidar([grupo_id], ("partidos",), [jornada]))
+
+
+@receiver(pre_save, sender=Partido)
+def secciones_partido_movido(sender, instance, **kwargs):
+    # Si el partido cambia de jornada (o de grupo), la de antes también cambia
+    if instance.pk is None:
+        return
+    antes = Partido.objects.filter(pk=instance.pk).values_list("grupo_id", "jornada_numero").first()
+    if antes is not None and antes != (instance.grupo_id, instance.jornada_numero):
+        transaction.on_commit(lambda: grupo_info.invalidar([antes[0]], ("partidos",), [antes[1]]))
+
+
+@receiver([post_save, post_delete], sender=EventoPartido)
+def secciones_evento(sender, instance, **kwargs):
+    partido_id = instance.partido_id
+    transaction.on_commit(lambda: grupo_info.invalidar_partidos([partido_id], ("eventos",)))
+
+
+@receiver([post_save, post_delete], sender=ClubEnGrupo)
+def secciones_inscripcion(sender, instance, **kwargs):
+    grupo_id = instance.grupo_id
+    transaction.on_commit(lambda: grupo_info.invalidar([grupo_id], ("clubes",)))
+
+
+@receiver(post_save, sender=Club)
+def secciones_club(sender, instance, created, **kwargs):
+    if not created:
+        club_id = instance.pk
+        transaction.on_commit(lambda: grupo_info.invalidar_club(club_id))
+
+
+@receiver(datos_reescritos)
+def secciones_tras_comando(sender, **kwargs):
+    # Fichas y clubes reescritos por lotes: todas las secciones que los muestran
+    transaction.on_commit(lambda: grupo_info.invalidar(None, ("jugadores", "clubes")))
@@ -1,3 +1,144 @@
+import json
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
 from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+
+from clubes.models import Club, ClubEnGrupo
+from nucleo.models import Competicion, Grupo, Temporada
+from partidos.models import Partido
+from status import versiones
+from status.versiones import datos_reescritos
+from . import grupo_info
+from .models import SeccionGrupoInfo
+from .views_grupo_info import GrupoInfoFullView
+
+_DE_JORNADA = {s for s, (donde, _) in grupo_info.SECCIONES.items() if donde == "jornada"}
+_DE_TEMPORADA = set(grupo_info.SECCIONES) - _DE_JORNADA
+
+
+class GrupoInfoTests(TestCase):
+    def setUp(self):
+        temporada = Temporada.objects.create(nombre="2099/2100")
+        self.competicion = Competicion.objects.create(nombre="Competición de prueba")
+        self.grupo = Grupo.objects.create(nombre="Grupo de prueba", temporada=temporada, competicion=self.competicion)
+        self.a = Club.objects.create(nombre_oficial="Club A")
+        self.b = Club.objects.create(nombre_oficial="Club B")
+        for club in (self.a, self.b):
+            ClubEnGrupo.objects.create(club=club, grupo=self.grupo)
+        self.jugado = Partido.objects.create(
+            grupo=self.grupo, jornada_numero=1, local=self.a, visitante=self.b,
+            goles_local=2, goles_visitante=1, jugado=True,
+        )
+        self.pendiente = Partido.objects.create(grupo=self.grupo, jornada_numero=2, local=self.b, visitante=self.a)
+        self.factory = APIRequestFactory()
+        self.vista = GrupoInfoFullView.as_view()
+
+    def _get(self, **params):
+        return self.vista(self.factory.get("/api/estadisticas/grupo-info/", {
+            "competicion_slug": self.competicion.slug, "grupo_slug": self.grupo.slug, **params,
+        }))
+
+    def _guardadas(self, jornada=None):
+        qs = SeccionGrupoInfo.objects.filter(grupo=self.grupo)
+        if jornada is not None:
+            qs = qs.filter(jornada=jornada)
+        return set(qs.values_list("seccion", flat=True))
+
+    def test_segunda_lectura_sale_de_las_secciones(self):
+        primera = self._get()
+        self.assertEqual(primera.status_code, 200)
+        self.assertEqual(primera.data["meta"]["jornada_actual"], 1)
+        self.assertEqual(primera.data["data"]["kpis_jornada"]["stats"]["goles_totales"], 3)
+        self.assertEqual(self._guardadas(grupo_info.TEMPORADA), _DE_TEMPORADA)
+        self.assertEqual(self._guardadas(1), _DE_JORNADA)
+
+        with mock.patch.object(GrupoInfoFullView, "_seccion_kpis_jornada", autospec=True) as kpis, \
+                mock.patch.object(GrupoInfoFullView, "_seccion_calendario", autospec=True) as calendario:
+            segunda = self._get()
+        kpis.assert_not_called()
+        calendario.assert_not_called()
+        # Lo guardado es JSON: igual que lo que se sirvió la primera vez
+        self.assertEqual(json.loads(segunda.render().content), json.loads(primera.render().content))
+
+    def test_un_partido_borra_solo_lo_que_depende_de_el(self):
+        self._get(jornada=1)
+        self._get(jornada=2)
+
+        self.pendiente.goles_local = 0
+        self.pendiente.goles_visitante = 0
+        self.pendiente.jugado = True
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.pendiente.save()
+        # Hasta que se confirma la transacción no se borra nada
+        self.assertEqual(self._guardadas(2), _DE_JORNADA)
+        for callback in callbacks:
+            callback()
+
+        # Las de toda la temporada y la jornada 2 se van; de la 1 quedan las que
+        # solo dependen de sus propios partidos
+        self.assertEqual(self._guardadas(grupo_info.TEMPORADA), set())
+        self.assertEqual(self._guardadas(2), set())
+        self.assertEqual(self._guardadas(1), {"resultados_jornada", "kpis_jornada", "sanciones_jornada"})
+
+        # Las que quedan están al día con la versión que subió el partido
+        with mock.patch.object(GrupoInfoFullView, "_seccion_kpis_jornada", autospec=True,
+                               side_effect=GrupoInfoFullView._seccion_kpis_jornada) as kpis:
+            self._get(jornada=1)
+            kpis.assert_not_called()
+            respuesta = self._get()
+        self.assertEqual(respuesta.data["meta"]["jornada_actual"], 2)
+        self.assertEqual(respuesta.data["data"]["kpis_jornada"]["stats"]["empates"], 1)
+
+    def test_seccion_de_una_version_anterior_no_se_usa(self):
+        # Una petición que leyó antes del cambio guarda lo que calculó después
+        with mock.patch.object(versiones, "actuales", return_value={("grupo", self.grupo.pk): 0}):
+            self._get()
+        self.assertEqual(self._guardadas(1), _DE_JORNADA)
+
+        with mock.patch.object(GrupoInfoFullView, "_seccion_kpis_jornada", autospec=True,
+                               side_effect=GrupoInfoFullView._seccion_kpis_jornada) as kpis:
+            self._get()
+            self._get()
+        self.assertEqual(kpis.call_count, 1)
+        version = versiones.actuales(grupo_id=self.grupo.pk)[("grupo", self.grupo.pk)]
+        self.assertEqual(
+            set(SeccionGrupoInfo.objects.filter(grupo=self.grupo).values_list("version", flat=True)), {version},
+        )
+
+    def test_jornada_fuera_del_calendario_no_se_guarda(self):
+        respuesta = self._get(jornada=99)
+        self.assertEqual((respuesta.status_code, respuesta.data["data"]["resultados_jornada"]["partidos"]), (200, []))
+        self.assertEqual(self._guardadas(99), set())
+        self.assertEqual(self._guardadas(grupo_info.TEMPORADA), _DE_TEMPORADA)
+
+    def test_invalidar_por_tipo_de_cambio(self):
+        self._get(jornada=1)
+        self._get(jornada=2)
+
+        # Árbitros: solo los resultados de esa jornada
+        self.assertEqual(grupo_info.invalidar([self.grupo.pk], ("arbitros",), [2]), 1)
+        self.assertEqual(self._guardadas(2), _DE_JORNADA - {"resultados_jornada"})
+        self.assertEqual(grupo_info.invalidar([self.grupo.pk], ("otro",)), 0)
+
+        # Comando que reescribe fichas y clubes: todas las que los muestran
+        with self.captureOnCommitCallbacks(execute=True):
+            datos_reescritos.send(sender=__name__)
+        self.assertEqual(self._guardadas(grupo_info.TEMPORADA), {"calendario"})
+        self.assertEqual(self._guardadas(1), {"kpis_jornada"})
+
+    def test_reconstruir_grupo_info(self):
+        self._get()
+        otro = Grupo.objects.create(
+            nombre="Otro grupo", temporada=self.grupo.temporada, competicion=self.competicion,
+        )
+        grupo_info.guardar(otro.pk, {(grupo_info.TEMPORADA, "calendario"): {}}, 1)
+
+        call_command("reconstruir_grupo_info", grupo_id=self.grupo.pk, stdout=StringIO())
+        self.assertEqual(self._guardadas(), set())
+        self.assertTrue(SeccionGrupoInfo.objects.filter(grupo=otro).exists())
 
-# Create your tests here.
+        call_command("reconstruir_grupo_info", stdout=StringIO())
+        self.assertFalse(SeccionGrupoInfo.objects.exists())
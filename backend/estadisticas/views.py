@@ -10,13 +10,17 @@ from nucleo.models import Grupo, Temporada
 from partidos.models import Partido, EventoPartido
 from jugadores.models import Jugador
 from arbitros.models import ArbitrajePartido
+from clasificaciones import motor as motor_clasificacion
 from valoraciones.views import _coef_division_lookup, _get_temporada_id, _get_int, _abs_media
+from status.cache_api import cacheada
+from status.instantaneas import instantanea
 
 class ClasificacionMiniView(APIView):
     """
     GET /api/estadisticas/clasificacion-mini/?grupo_id=15
     """
 
+    @cacheada("grupo")
     def get(self, request, format=None):
         grupo_id = request.GET.get("grupo_id")
 
@@ -28,45 +32,45 @@ class ClasificacionMiniView(APIView):
         except Grupo.DoesNotExist:
             return Response({"detail": "Grupo no encontrado"}, status=status.HTTP_404_NOT_FOUND)
 
-        posiciones = (
-            ClubEnGrupo.objects
-            .filter(grupo=grupo)
-            .select_related("club")
-        )
+        # Clasificación de la última jornada con resultados (clasificaciones.motor)
+        _, _, filas = motor_clasificacion.tabla(grupo.id)
+
+        tabla = [
+            {
+                "pos": row["pos"],
+                "club_id": row["club_id"],
+                "nombre": row["nombre"],
+                "escudo": row["escudo"],
+                "slug": row["slug"],
+                "pj": row["pj"],
+                "puntos": row["puntos"],
+                "racha": row["racha"][-5:],
+            }
+            for row in filas
+        ]
 
-        # Ordenar por posición actual, usando 9999 para equipos sin posición (van al final)
-        # Si hay empate en posición, ordenar por puntos descendente
-        posiciones = sorted(
-            posiciones,
-            key=lambda row: (
-                row.posicion_actual if row.posicion_actual is not None else 9999,
-                -(row.puntos or 0),
+        # Sin resultados todavía: los clubes inscritos, tal cual están en ClubEnGrupo
+        if not tabla:
+            posiciones = sorted(
+                ClubEnGrupo.objects.filter(grupo=grupo).select_related("club"),
+                key=lambda row: (
+                    row.posicion_actual if row.posicion_actual is not None else 9999,
+                    -(row.puntos or 0),
+                )
             )
-        )
-
-        tabla = []
-        for row in posiciones:
-            raw_racha = getattr(row, "racha", "") or ""
-            racha_list = list(raw_racha.strip().upper())[:5]
-
-            club = row.club
-            if club:
-                nombre_club = getattr(club, "nombre_corto", None) or getattr(club, "nombre_oficial", "") or ""
-                escudo = getattr(club, "escudo_url", "") or ""
-            else:
-                nombre_club = ""
-                escudo = ""
-
-            tabla.append({
-                "pos": row.posicion_actual,
-                "club_id": club.id if club else None,
-                "nombre": nombre_club,
-                "escudo": escudo,
-                "slug": club.slug if club else None,
-                "pj": row.partidos_jugados or 0,
-                "puntos": row.puntos or 0,
-                "racha": racha_list,
-            })
+            for row in posiciones:
+                raw_racha = getattr(row, "racha", "") or ""
+                club = row.club
+                tabla.append({
+                    "pos": row.posicion_actual,
+                    "club_id": club.id,
+                    "nombre": club.nombre_corto or club.nombre_oficial or "",
+                    "escudo": club.escudo_url or "",
+                    "slug": club.slug,
+                    "pj": row.partidos_jugados or 0,
+                    "puntos": row.puntos or 0,
+                    "racha": list(raw_racha.strip().upper())[:5],
+                })
 
         payload = {
             "grupo": {
@@ -85,6 +89,8 @@ class ResultadosJornadaView(APIView):
     GET /api/estadisticas/resultados-jornada/?grupo_id=15&jornada=6
     """
 
+    @instantanea
+    @cacheada("grupo")
     def get(self, request, format=None):
         grupo_id = request.GET.get("grupo_id")
         jornada_param = request.GET.get("jornada")
@@ -216,6 +222,8 @@ class GoleadoresJornadaView(APIView):
       - fecha_hora
     """
 
+    @instantanea
+    @cacheada("grupo")
     def get(self, request, format=None):
         grupo_id = request.GET.get("grupo_id")
         jornada_param = request.GET.get("jornada")
@@ -476,6 +484,7 @@ class PichichiTemporadaView(APIView):
       - foto
     """
 
+    @cacheada("grupo")
     def get(self, request, format=None):
         grupo_id = request.GET.get("grupo_id")
 
@@ -706,6 +715,8 @@ class KPIsJornadaView(APIView):
     }
     """
 
+    @instantanea
+    @cacheada("grupo")
     def get(self, request, format=None):
         grupo_id = request.GET.get("grupo_id")
         jornada_param = request.GET.get("jornada")
@@ -891,6 +902,7 @@ class GolesPorEquipoView(APIView):
     - goles 1ª parte / goles 2ª parte
     """
 
+    @cacheada("grupo")
     def get(self, request, format=None):
         grupo_id = request.GET.get("grupo_id")
 
@@ -1149,6 +1161,8 @@ class SancionesJornadaView(APIView):
     (máx 10 jugadores)
     """
 
+    @instantanea
+    @cacheada("grupo")
     def get(self, request, format=None):
         grupo_id = request.GET.get("grupo_id")
         jornada_param = request.GET.get("jornada")
@@ -1432,6 +1446,7 @@ class SancionesJugadoresAcumuladoView(APIView):
     (máx 10)
     """
 
+    @cacheada("grupo")
     def get(self, request, format=None):
         grupo_id = request.GET.get("grupo_id")
 
@@ -1647,6 +1662,7 @@ class FairPlayEquiposView(APIView):
     Orden ASC por puntos_fair_play (el más limpio primero)
     """
 
+    @cacheada("grupo")
     def get(self, request, format=None):
         grupo_id = request.GET.get("grupo_id")
 
@@ -1815,8 +1831,12 @@ class ClasificacionCompletaView(APIView):
       - racha: lista de resultados en orden cronológico hasta esa jornada,
                ej: ["V","V","E","D","V"]
                (NO limitamos a 5, se devuelven todos)
+
+    La tabla sale del motor de clasificación (clasificaciones.motor), que
+    se mantiene al guardar cada partido.
     """
 
+    @cacheada("grupo")
     def get(self, request, format=None):
         grupo_id = request.GET.get("grupo_id")
         scope = (request.GET.get("scope") or "overall").lower()
@@ -1828,6 +1848,16 @@ class ClasificacionCompletaView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        jornada_pedida = None
+        if jornada_param:
+            try:
+                jornada_pedida = int(jornada_param)
+            except ValueError:
+                return Response(
+                    {"detail": "jornada debe ser número"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
         # 1. grupo
         try:
             grupo = (
@@ -1841,38 +1871,14 @@ class ClasificacionCompletaView(APIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        # 2. filas base (clubes inscritos en el grupo)
-        filas = (
-            ClubEnGrupo.objects
-            .filter(grupo=grupo)
-            .select_related("club")
-        )
-
-        # 3. partidos jugados con marcador
-        partidos_qs = (
-            Partido.objects
-            .filter(
-                grupo=grupo,
-                jugado=True,
-                goles_local__isnull=False,
-                goles_visitante__isnull=False,
-            )
-            .select_related("local", "visitante")
-            .order_by("jornada_numero", "fecha_hora", "id")
-        )
-
-        # 4. jornadas disponibles
-        jornadas_disponibles = sorted(
-            set(
-                partidos_qs.values_list("jornada_numero", flat=True)
-            )
+        # 2. tabla de la jornada (la última con resultados si no se pide otra)
+        jornadas_disponibles, jornada_aplicada, resultado = motor_clasificacion.tabla(
+            grupo.id, jornada_pedida, scope
         )
 
         # ⬇️ CASO SIN PARTIDOS: devolvemos lo que hay en ClubEnGrupo y APROVECHAMOS su racha
         if not jornadas_disponibles:
-            resultado = []
-            for c in filas:
-                # aquí intentamos sacar racha del modelo, igual que en la mini
+            for c in ClubEnGrupo.objects.filter(grupo=grupo).select_related("club"):
                 raw_racha = getattr(c, "racha", "") or ""
                 racha_list = list(raw_racha.strip().upper())  # aquí NO recortamos
 
@@ -1882,17 +1888,16 @@ class ClasificacionCompletaView(APIView):
                     "escudo": getattr(c.club, "escudo_url", "") or "",
                     "slug": c.club.slug if c.club else None,
                     "pj": c.partidos_jugados or 0,
-                    "pg": c.partidos_ganados or 0,
-                    "pe": c.partidos_empatados or 0,
-                    "pp": c.partidos_perdidos or 0,
+                    "pg": c.victorias or 0,
+                    "pe": c.empates or 0,
+                    "pp": c.derrotas or 0,
                     "gf": c.goles_favor or 0,
                     "gc": c.goles_contra or 0,
                     "dg": (c.goles_favor or 0) - (c.goles_contra or 0),
                     "puntos": c.puntos or 0,
-                    "racha": racha_list,  # 👈 NUEVO
+                    "racha": racha_list,
                 })
 
-
             resultado.sort(
                 key=lambda r: (
                     -r["puntos"],
@@ -1902,158 +1907,6 @@ class ClasificacionCompletaView(APIView):
                 )
             )
 
-            payload = {
-                "grupo": {
-                    "id": grupo.id,
-                    "nombre": grupo.nombre,
-                    "competicion": grupo.competicion.nombre,
-                    "temporada": grupo.temporada.nombre,
-                },
-                "scope": scope,
-                "jornadas_disponibles": [],
-                "jornada_aplicada": None,
-                "tabla": resultado,
-            }
-            return Response(payload, status=status.HTTP_200_OK)
-
-        # 5. determinar jornada a aplicar
-        if jornada_param:
-            try:
-                jornada_aplicada = int(jornada_param)
-            except ValueError:
-                return Response(
-                    {"detail": "jornada debe ser número"},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-            if jornada_aplicada not in jornadas_disponibles:
-                jornada_aplicada = jornadas_disponibles[-1]
-        else:
-            jornada_aplicada = jornadas_disponibles[-1]
-
-        # 6. diccionario inicial de stats
-        # 👇 puntos = 0 siempre; racha la iremos rellenando luego
-        stats_por_club = {}
-        for c in filas:
-            stats_por_club[c.club_id] = {
-                "club_id": c.club_id,
-                "nombre": c.club.nombre_corto or c.club.nombre_oficial,
-                "escudo": c.club.escudo_url or "",
-                "slug": c.club.slug or None,
-                "pj": 0,
-                "pg": 0,
-                "pe": 0,
-                "pp": 0,
-                "gf": 0,
-                "gc": 0,
-                "dg": 0,
-                "puntos": 0,
-                "racha": [],    # 👈 AQUÍ la dejamos lista
-            }
-
-        # 7. filtrar partidos hasta la jornada elegida
-        partidos_hasta_jornada = [
-            p for p in partidos_qs if p.jornada_numero <= jornada_aplicada
-        ]
-
-        # vamos a recorrerlos en orden y a ir metiendo la letra de resultado
-        for p in partidos_hasta_jornada:
-            local_id = p.local_id
-            visit_id = p.visitante_id
-            gl = p.goles_local or 0
-            gv = p.goles_visitante or 0
-
-            # asegurar que existen en el dict (por si hay partido con club no inscrito)
-            if local_id not in stats_por_club:
-                stats_por_club[local_id] = {
-                    "club_id": local_id,
-                    "nombre": p.local.nombre_corto or p.local.nombre_oficial,
-                    "escudo": p.local.escudo_url or "",
-                    "slug": p.local.slug if p.local else None,
-                    "pj": 0,
-                    "pg": 0,
-                    "pe": 0,
-                    "pp": 0,
-                    "gf": 0,
-                    "gc": 0,
-                    "dg": 0,
-                    "puntos": 0,
-                    "racha": [],
-                }
-            if visit_id not in stats_por_club:
-                stats_por_club[visit_id] = {
-                    "club_id": visit_id,
-                    "nombre": p.visitante.nombre_corto or p.visitante.nombre_oficial,
-                    "escudo": p.visitante.escudo_url or "",
-                    "slug": p.visitante.slug if p.visitante else None,
-                    "pj": 0,
-                    "pg": 0,
-                    "pe": 0,
-                    "pp": 0,
-                    "gf": 0,
-                    "gc": 0,
-                    "dg": 0,
-                    "puntos": 0,
-                    "racha": [],
-                }
-
-            # === aplicar scope + construir racha ===
-            # OVERALL cuenta los dos
-            # HOME solo local
-            # AWAY solo visitante
-
-            # resultado real del partido (para racha)
-            # local
-            if scope in ("overall", "home"):
-                stats_por_club[local_id]["pj"] += 1
-                stats_por_club[local_id]["gf"] += gl
-                stats_por_club[local_id]["gc"] += gv
-
-                if gl > gv:
-                    stats_por_club[local_id]["pg"] += 1
-                    stats_por_club[local_id]["puntos"] += 3
-                    stats_por_club[local_id]["racha"].append("V")
-                elif gl == gv:
-                    stats_por_club[local_id]["pe"] += 1
-                    stats_por_club[local_id]["puntos"] += 1
-                    stats_por_club[local_id]["racha"].append("E")
-                else:
-                    stats_por_club[local_id]["pp"] += 1
-                    stats_por_club[local_id]["racha"].append("D")
-
-            # visitante
-            if scope in ("overall", "away"):
-                stats_por_club[visit_id]["pj"] += 1
-                stats_por_club[visit_id]["gf"] += gv
-                stats_por_club[visit_id]["gc"] += gl
-
-                if gv > gl:
-                    stats_por_club[visit_id]["pg"] += 1
-                    stats_por_club[visit_id]["puntos"] += 3
-                    stats_por_club[visit_id]["racha"].append("V")
-                elif gv == gl:
-                    stats_por_club[visit_id]["pe"] += 1
-                    stats_por_club[visit_id]["puntos"] += 1
-                    stats_por_club[visit_id]["racha"].append("E")
-                else:
-                    stats_por_club[visit_id]["pp"] += 1
-                    stats_por_club[visit_id]["racha"].append("D")
-
-        # 8. calcular DG y pasar a lista
-        resultado = []
-        for cid, row in stats_por_club.items():
-            row["dg"] = row["gf"] - row["gc"]
-            resultado.append(row)
-
-        # 9. ordenar
-        resultado.sort(
-            key=lambda r: (
-                -r["puntos"],
-                -r["dg"],
-                -r["gf"],
-                r["nombre"].lower(),
-            )
-        )
-
         payload = {
             "grupo": {
                 "id": grupo.id,
@@ -2079,6 +1932,7 @@ class ClasificacionEvolucionView(APIView):
     Devuelve, por club, la serie jornada→valor para pintar líneas.
     """
 
+    @cacheada("grupo")
     def get(self, request, format=None):
         grupo_id = request.GET.get("grupo_id")
         if not grupo_id:
@@ -2214,6 +2068,7 @@ class GoleadoresGlobalOptimizedView(APIView):
         except Exception:
             return None
     
+    @cacheada("temporada")
     def get(self, request, format=None):
         temporada_id = _get_temporada_id(request, self.TEMPORADA_ID_BASE)
         top_n = _get_int(request, "top", 200)
@@ -2443,6 +2298,7 @@ class SancionesGlobalOptimizedView(APIView):
         except Exception:
             return None
     
+    @cacheada("temporada")
     def get(self, request, format=None):
         temporada_id = _get_temporada_id(request, self.TEMPORADA_ID_BASE)
         top_n = _get_int(request, "top", 200)
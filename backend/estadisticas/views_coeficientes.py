@@ -6,6 +6,7 @@ from rest_framework import status
 from nucleo.models import Grupo
 from clubes.models import ClubEnGrupo
 from valoraciones.models import CoeficienteClub
+from status.cache_api import cacheada
 
 
 class CoeficientesClubesView(APIView):
@@ -29,6 +30,7 @@ class CoeficientesClubesView(APIView):
     }
     """
 
+    @cacheada("grupo")
     def get(self, request, format=None):
         grupo_id = request.GET.get("grupo_id")
         jornada_param = request.GET.get("jornada")
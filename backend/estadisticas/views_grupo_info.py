@@ -11,6 +11,9 @@ from clubes.models import ClubEnGrupo
 from partidos.models import Partido, EventoPartido
 from jugadores.models import Jugador
 from arbitros.models import ArbitrajePartido
+from clasificaciones import motor as motor_clasificacion
+from estadisticas import grupo_info
+from status import versiones
 
 
 class GrupoInfoFullView(APIView):
@@ -21,6 +24,12 @@ class GrupoInfoFullView(APIView):
       &jornada=6
 
     Devuelve TODO el paquete de datos necesario para pintar la pantalla pública del grupo.
+
+    Cada sección se calcula en su método (_seccion_*) y se guarda en
+    estadisticas.grupo_info: las de la jornada por (grupo, jornada) y las de
+    toda la temporada una vez por grupo. Una petición lee las guardadas en una
+    consulta y solo calcula las que falten (las que invalidó un cambio o van
+    por detrás de la versión del grupo).
     """
 
     def get(self, request, format=None):
@@ -35,147 +44,255 @@ class GrupoInfoFullView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # 1. Competición
-        try:
-            competicion = Competicion.objects.get(slug=competicion_slug)
-        except Competicion.DoesNotExist:
-            return Response(
-                {"detail": f"Competición '{competicion_slug}' no encontrada"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-
-        # 2. Grupos candidatos (misma competición y mismo slug de grupo)
+        # 1. Grupo: misma competición y slug; con temporada=..., esa temporada
+        # exacta, y si no la más reciente (la base de datos ordena por nombre de
+        # temporada, ej "2025/2026", y devuelve solo el primero).
         grupos_qs = (
             Grupo.objects
             .select_related("competicion", "temporada")
-            .filter(competicion=competicion, slug=grupo_slug)
+            .filter(competicion__slug=competicion_slug, slug=grupo_slug)
         )
-
-        if not grupos_qs.exists():
-            return Response(
-                {"detail": f"Grupo '{grupo_slug}' no encontrado para esa competición"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-
-        # 3. Si el usuario ha pasado temporada=..., filtramos por esa temporada exacta
         if temporada_param:
             grupos_qs = grupos_qs.filter(temporada__nombre=temporada_param)
+        grupo = grupos_qs.order_by("-temporada__nombre", "id").first()
+
+        if grupo is None:
+            return self._no_encontrado(competicion_slug, grupo_slug, temporada_param)
 
-            if not grupos_qs.exists():
+        jornada_pedida = None
+        if jornada_param:
+            try:
+                jornada_pedida = int(jornada_param)
+            except ValueError:
                 return Response(
-                    {"detail": f"No hay grupo '{grupo_slug}' en temporada '{temporada_param}'"},
-                    status=status.HTTP_404_NOT_FOUND,
+                    {"detail": "jornada debe ser número"},
+                    status=status.HTTP_400_BAD_REQUEST,
                 )
 
-        # 4. Elegir un grupo definitivo.
-        # Si hay varios grupos con el mismo slug pero de diferentes temporadas,
-        # nos quedamos con la "más reciente" (temporada más actual).
-        # Esto es útil cuando se accede a una URL sin especificar temporada:
-        # automáticamente muestra los datos de la temporada actual.
-        grupos_ordenados = sorted(
-            grupos_qs,
-            key=lambda g: g.temporada.nombre,  # Ordenar por nombre de temporada (ej: "2025/2026")
-            reverse=True,  # Más reciente primero
-        )
-        grupo = grupos_ordenados[0]
+        # 2. Secciones guardadas (las de temporada y, si viene, las de esa
+        # jornada), de la versión del grupo leída antes de calcular nada
+        version = versiones.actuales(grupo_id=grupo.id)[("grupo", grupo.id)]
+        jornadas_leidas = {grupo_info.TEMPORADA}
+        if jornada_pedida is not None:
+            jornadas_leidas.add(jornada_pedida)
+        guardadas = grupo_info.leer(grupo.id, jornadas_leidas, version)
+        nuevas = {}
+
+        def seccion(nombre, jornada, construir):
+            clave = (jornada, nombre)
+            if clave not in guardadas:
+                guardadas[clave] = construir()
+                nuevas[clave] = guardadas[clave]
+            return guardadas[clave]
+
+        calendario = seccion("calendario", grupo_info.TEMPORADA, lambda: self._seccion_calendario(grupo))
+        jornadas_disponibles = calendario["jornadas_disponibles"]
 
-        grupo_id = grupo.id
+        # determinar jornada activa
+        if jornada_pedida is not None:
+            jornada_num = jornada_pedida
+        elif calendario["ultima_jugada"] is not None:
+            jornada_num = calendario["ultima_jugada"]  # última jugada
+        else:
+            jornada_num = max(jornadas_disponibles) if jornadas_disponibles else None
 
-        # ---------------------------------------------------------------------
-        # A partir de aquí REPLICAMOS la lógica de otras views inline.
-        # Esto evita tener que instanciar múltiples subclases DRF y hacer
-        # múltiples peticiones HTTP, mejorando el rendimiento al consolidar
-        # toda la información del grupo en una sola respuesta.
-        # ---------------------------------------------------------------------
+        if jornada_num is not None and jornada_num not in jornadas_leidas:
+            guardadas.update(grupo_info.leer(grupo.id, [jornada_num], version))
 
-        # ========== CLASIFICACION (similar a ClasificacionMiniView) ==========
-        # Obtenemos todas las posiciones del grupo ordenadas por posición actual.
-        # Usamos select_related para optimizar las consultas y evitar N+1 queries.
-        posiciones = (
-            ClubEnGrupo.objects
-            .filter(grupo=grupo)
-            .select_related("club")
-        )
+        tabla_clasificacion = seccion("clasificacion", grupo_info.TEMPORADA, lambda: self._seccion_clasificacion(grupo))
 
-        # Ordenar por posición actual (si es None, ponerlo al final con 9999).
-        # Si hay empate en posición, desempatar por puntos (más puntos = mejor).
-        posiciones_ordenadas = sorted(
-            posiciones,
-            key=lambda row: (
-                row.posicion_actual if row.posicion_actual is not None else 9999,
-                -row.puntos,  # Negativo para orden descendente (más puntos primero)
-            )
+        # Posición, nombre y GF de cada club, para goleadores y pichichi
+        clasif_por_club = {
+            row["club_id"]: {
+                "posicion_actual": row["pos"] if row["pos"] is not None else 9999,
+                "club_nombre": row["nombre"],
+                "goles_favor": row["gf"] or 0,
+            }
+            for row in tabla_clasificacion
+        }
+
+        temporada = grupo_info.TEMPORADA
+        partidos_payload = seccion(
+            "resultados_jornada", jornada_num, lambda: self._seccion_resultados_jornada(grupo, jornada_num)
+        )
+        kpis = seccion("kpis_jornada", jornada_num, lambda: self._seccion_kpis_jornada(grupo, jornada_num))
+        goleadores_jornada_list = seccion(
+            "goleadores_jornada", jornada_num,
+            lambda: self._seccion_goleadores_jornada(grupo, jornada_num, clasif_por_club),
+        )
+        pichichi_list = seccion(
+            "pichichi_temporada", temporada, lambda: self._seccion_pichichi_temporada(grupo, clasif_por_club)
+        )
+        sancionados_lista = seccion(
+            "sanciones_jornada", jornada_num, lambda: self._seccion_sanciones_jornada(grupo, jornada_num)
         )
+        sanciones_acum_list = seccion(
+            "jugadores_mas_sancionados", temporada, lambda: self._seccion_jugadores_mas_sancionados(grupo)
+        )
+        fair_play_equipos_list = seccion("fair_play_equipos", temporada, lambda: self._seccion_fair_play_equipos(grupo))
+        equipos_ofensivos_list = seccion("goles_por_equipo", temporada, lambda: self._seccion_goles_por_equipo(grupo))
+
+        # Se guarda lo calculado, salvo las secciones de una jornada que no
+        # está en el calendario (jornada=99, grupo sin partidos...)
+        guardables = {
+            (j, s): datos for (j, s), datos in nuevas.items()
+            if j == grupo_info.TEMPORADA or j in jornadas_disponibles
+        }
+        if guardables:
+            grupo_info.guardar(grupo.id, guardables, version)
+
+        # ---------------------------------------------------------------------
+        # RESPUESTA FINAL
+        # ---------------------------------------------------------------------
 
-        tabla_clasificacion = []
-        for row in posiciones_ordenadas:
-            raw_racha = getattr(row, "racha", "") or ""
-            racha_list = list(raw_racha.strip().upper())[:5]
-
-            tabla_clasificacion.append({
-                "pos": row.posicion_actual,
-                "club_id": row.club.id,
-                "nombre": row.club.nombre_corto or row.club.nombre_oficial,
-                "escudo": row.club.escudo_url or "",
-                "pj": row.partidos_jugados,
-                "puntos": row.puntos,
-                "racha": racha_list,
-                "gf": row.goles_favor,
-                "gc": row.goles_contra,
-            })
-
-        clasificacion_payload = {
+        cabecera = {
+            "id": grupo.id,
+            "nombre": grupo.nombre,
+            "competicion": grupo.competicion.nombre,
+            "temporada": grupo.temporada.nombre,
+        }
+
+        meta = {
             "grupo": {
                 "id": grupo.id,
                 "nombre": grupo.nombre,
+                "slug": grupo.slug,
                 "competicion": grupo.competicion.nombre,
+                "competicion_slug": grupo.competicion.slug,
                 "temporada": grupo.temporada.nombre,
             },
-            "tabla": tabla_clasificacion,
+            "jornada_actual": jornada_num,
+            "jornadas_disponibles": jornadas_disponibles,
         }
 
-        # ========== PARTIDOS Y JORNADAS (similar a ResultadosJornadaView) ==========
+        data = {
+            "clasificacion": {"grupo": cabecera, "tabla": tabla_clasificacion},
+            "resultados_jornada": {
+                "grupo": cabecera,
+                "jornada": jornada_num,
+                "jornadas_disponibles": jornadas_disponibles,
+                "partidos": partidos_payload,
+            },
+            "kpis_jornada": {"grupo": cabecera, "jornada": jornada_num, "stats": kpis},
+            "goleadores_jornada": {"grupo": cabecera, "jornada": jornada_num, "goleadores": goleadores_jornada_list},
+            "pichichi_temporada": {"grupo": cabecera, "goleadores": pichichi_list},
+            "sanciones_jornada": {"grupo": cabecera, "jornada": jornada_num, "sancionados": sancionados_lista},
+            "jugadores_mas_sancionados": {"grupo": cabecera, "jugadores": sanciones_acum_list},
+            "fair_play_equipos": {"grupo": cabecera, "equipos": fair_play_equipos_list},
+            "goles_por_equipo": {"grupo": cabecera, "equipos": equipos_ofensivos_list},
+        }
 
-        qs_partidos_grupo = (
-            Partido.objects
-            .filter(grupo=grupo)
-            .select_related("local", "visitante")
+        return Response({"meta": meta, "data": data}, status=status.HTTP_200_OK)
+
+    def _no_encontrado(self, competicion_slug, grupo_slug, temporada_param):
+        """El 404 con el motivo concreto (solo en el camino de error)."""
+        if not Competicion.objects.filter(slug=competicion_slug).exists():
+            return Response(
+                {"detail": f"Competición '{competicion_slug}' no encontrada"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        if not temporada_param or not Grupo.objects.filter(competicion__slug=competicion_slug, slug=grupo_slug).exists():
+            return Response(
+                {"detail": f"Grupo '{grupo_slug}' no encontrado para esa competición"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return Response(
+            {"detail": f"No hay grupo '{grupo_slug}' en temporada '{temporada_param}'"},
+            status=status.HTTP_404_NOT_FOUND,
         )
 
+    # -------------------------------------------------------------------------
+    # Secciones. Cada una devuelve solo sus datos (sin la cabecera del grupo):
+    # es lo que se guarda en estadisticas.grupo_info.
+    # -------------------------------------------------------------------------
+
+    def _seccion_calendario(self, grupo):
+        """Jornadas con partidos y la última con algún partido jugado."""
+        qs_partidos_grupo = Partido.objects.filter(grupo=grupo)
+
         jornadas_disponibles = sorted(set(
             qs_partidos_grupo.values_list("jornada_numero", flat=True).distinct()
         ))
+        jugadas = sorted(set(
+            qs_partidos_grupo
+            .filter(jugado=True)
+            .values_list("jornada_numero", flat=True)
+            .distinct()
+        ))
+        return {
+            "jornadas_disponibles": jornadas_disponibles,
+            "ultima_jugada": jugadas[-1] if jugadas else None,
+        }
 
-        # determinar jornada activa
-        if jornada_param:
-            try:
-                jornada_num = int(jornada_param)
-            except ValueError:
-                return Response(
-                    {"detail": "jornada debe ser número"},
-                    status=status.HTTP_400_BAD_REQUEST,
+    def _seccion_clasificacion(self, grupo):
+        # ========== CLASIFICACION (similar a ClasificacionMiniView) ==========
+        # Clasificación de la última jornada con resultados, tal como la lleva
+        # el motor de clasificación (una consulta). Sin resultados todavía, los
+        # clubes inscritos según ClubEnGrupo.
+        _, _, filas_clasificacion = motor_clasificacion.tabla(grupo.id)
+
+        tabla_clasificacion = [
+            {
+                "pos": row["pos"],
+                "club_id": row["club_id"],
+                "nombre": row["nombre"],
+                "escudo": row["escudo"],
+                "pj": row["pj"],
+                "puntos": row["puntos"],
+                "racha": row["racha"][-5:],
+                "gf": row["gf"],
+                "gc": row["gc"],
+            }
+            for row in filas_clasificacion
+        ]
+
+        if not tabla_clasificacion:
+            posiciones_ordenadas = sorted(
+                ClubEnGrupo.objects.filter(grupo=grupo).select_related("club"),
+                key=lambda row: (
+                    row.posicion_actual if row.posicion_actual is not None else 9999,
+                    -row.puntos,  # Negativo para orden descendente (más puntos primero)
                 )
-        else:
-            jugadas = (
-                qs_partidos_grupo
-                .filter(jugado=True)
-                .values_list("jornada_numero", flat=True)
-                .distinct()
             )
-            jugadas = sorted(set(jugadas))
-            if jugadas:
-                jornada_num = jugadas[-1]  # última jugada
-            else:
-                jornada_num = max(jornadas_disponibles) if jornadas_disponibles else None
+            for row in posiciones_ordenadas:
+                raw_racha = getattr(row, "racha", "") or ""
+                tabla_clasificacion.append({
+                    "pos": row.posicion_actual,
+                    "club_id": row.club.id,
+                    "nombre": row.club.nombre_corto or row.club.nombre_oficial,
+                    "escudo": row.club.escudo_url or "",
+                    "pj": row.partidos_jugados,
+                    "puntos": row.puntos,
+                    "racha": list(raw_racha.strip().upper())[:5],
+                    "gf": row.goles_favor,
+                    "gc": row.goles_contra,
+                })
+
+        return tabla_clasificacion
+
+    def _partidos_de_jornada(self, grupo, jornada_num):
+        if jornada_num is None:
+            return Partido.objects.none()
+        return (
+            Partido.objects
+            .filter(grupo=grupo, jornada_numero=jornada_num)
+            .select_related("local", "visitante")
+            .order_by("fecha_hora", "id")
+        )
 
+    def _partidos_jugados_ids(self, grupo):
+        return list(
+            Partido.objects.filter(
+                grupo=grupo,
+                jugado=True,
+            ).values_list("id", flat=True)
+        )
+
+    def _seccion_resultados_jornada(self, grupo, jornada_num):
+        # ========== PARTIDOS Y JORNADAS (similar a ResultadosJornadaView) ==========
         partidos_payload = []
-        partidos_de_jornada_qs = Partido.objects.none()
         if jornada_num is not None:
-            partidos_de_jornada_qs = (
-                qs_partidos_grupo
-                .filter(jornada_numero=jornada_num)
-                .order_by("fecha_hora", "id")
-            )
+            partidos_de_jornada_qs = self._partidos_de_jornada(grupo, jornada_num)
 
             # árbitros en bloque
             arbitrajes = (
@@ -212,19 +329,9 @@ class GrupoInfoFullView(APIView):
                         "goles": p.goles_visitante if p.goles_visitante is not None else None,
                     },
                 })
+        return partidos_payload
 
-        resultados_payload = {
-            "grupo": {
-                "id": grupo.id,
-                "nombre": grupo.nombre,
-                "competicion": grupo.competicion.nombre,
-                "temporada": grupo.temporada.nombre,
-            },
-            "jornada": jornada_num,
-            "jornadas_disponibles": jornadas_disponibles,
-            "partidos": partidos_payload,
-        }
-
+    def _seccion_kpis_jornada(self, grupo, jornada_num):
         # ========== KPIs jornada (similar a KPIsJornadaView) ==========
 
         goles_totales = 0
@@ -232,7 +339,8 @@ class GrupoInfoFullView(APIView):
         vict_visit = 0
         empates = 0
 
-        partidos_de_jornada_list = list(partidos_de_jornada_qs)
+        partidos_de_jornada_list = list(self._partidos_de_jornada(grupo, jornada_num))
+
 
         for p in partidos_de_jornada_list:
             if (
@@ -266,30 +374,22 @@ class GrupoInfoFullView(APIView):
             elif tipo in ("roja", "doble_amarilla"):
                 rojas_totales += cnt
 
-        kpis_payload = {
-            "grupo": {
-                "id": grupo.id,
-                "nombre": grupo.nombre,
-                "competicion": grupo.competicion.nombre,
-                "temporada": grupo.temporada.nombre,
-            },
-            "jornada": jornada_num,
-            "stats": {
-                "goles_totales": goles_totales,
-                "amarillas_totales": amarillas_totales,
-                "rojas_totales": rojas_totales,
-                "victorias_local": vict_local,
-                "empates": empates,
-                "victorias_visitante": vict_visit,
-            },
+        return {
+            "goles_totales": goles_totales,
+            "amarillas_totales": amarillas_totales,
+            "rojas_totales": rojas_totales,
+            "victorias_local": vict_local,
+            "empates": empates,
+            "victorias_visitante": vict_visit,
         }
 
+    def _seccion_goleadores_jornada(self, grupo, jornada_num, clasif_por_club):
         # ========== Goleadores jornada (similar a GoleadoresJornadaView) ==========
 
         goleadores_jornada_list = []
         if jornada_num is not None:
             # partidos concretos de ESA jornada (ids)
-            partidos_ids = [pp.id for pp in partidos_de_jornada_list]
+            partidos_ids = list(self._partidos_de_jornada(grupo, jornada_num).values_list("id", flat=True))
 
             eventos_gol = (
                 EventoPartido.objects
@@ -303,43 +403,7 @@ class GrupoInfoFullView(APIView):
                 .annotate(goles_jornada=Count("id"))
             )
 
-            # fallback GF por club en el grupo entero
-            partidos_validos_grupo = (
-                Partido.objects.filter(
-                    grupo=grupo,
-                    jugado=True,
-                    goles_local__isnull=False,
-                    goles_visitante__isnull=False,
-                )
-                .values("local_id", "visitante_id", "goles_local", "goles_visitante")
-            )
-
-            goles_favor_por_club = {}
-            for p in partidos_validos_grupo:
-                lid = p["local_id"]
-                vid = p["visitante_id"]
-                gl = p["goles_local"] or 0
-                gv = p["goles_visitante"] or 0
-
-                goles_favor_por_club[lid] = goles_favor_por_club.get(lid, 0) + gl
-                goles_favor_por_club[vid] = goles_favor_por_club.get(vid, 0) + gv
-
-            clubs_ids = [row["club_id"] for row in eventos_gol]
-            clasif_rows = (
-                ClubEnGrupo.objects
-                .filter(grupo=grupo, club_id__in=clubs_ids)
-                .select_related("club")
-            )
-            clasif_lookup = {}
-            for c in clasif_rows:
-                gf_guardado = c.goles_favor or 0
-                gf_calc = goles_favor_por_club.get(c.club_id, 0)
-                gf_final = gf_guardado or gf_calc
-                clasif_lookup[c.club_id] = {
-                    "posicion_actual": c.posicion_actual if c.posicion_actual is not None else 9999,
-                    "club_nombre": c.club.nombre_corto or c.club.nombre_oficial,
-                    "goles_favor": gf_final,
-                }
+            clasif_lookup = clasif_por_club
 
             jugadores_ids = [row["jugador_id"] for row in eventos_gol]
             jugadores_objs = Jugador.objects.filter(id__in=jugadores_ids)
@@ -391,18 +455,9 @@ class GrupoInfoFullView(APIView):
             goleadores_jornada_list.sort(
                 key=lambda x: (-x["goles_jornada"], x["club_posicion"], x["nombre"].lower())
             )
+        return goleadores_jornada_list
 
-        goleadores_jornada_payload = {
-            "grupo": {
-                "id": grupo.id,
-                "nombre": grupo.nombre,
-                "competicion": grupo.competicion.nombre,
-                "temporada": grupo.temporada.nombre,
-            },
-            "jornada": jornada_num,
-            "goleadores": goleadores_jornada_list,
-        }
-
+    def _seccion_pichichi_temporada(self, grupo, clasif_por_club):
         # ========== Pichichi temporada (similar a PichichiTemporadaView) ==========
 
         partidos_grupo_jugados = list(
@@ -428,43 +483,7 @@ class GrupoInfoFullView(APIView):
                 .annotate(goles_total=Count("id"))
             )
 
-            # build goles_favor_por_club
-            partidos_validos_grupo = (
-                Partido.objects.filter(
-                    grupo=grupo,
-                    jugado=True,
-                    goles_local__isnull=False,
-                    goles_visitante__isnull=False,
-                )
-                .values("local_id", "visitante_id", "goles_local", "goles_visitante")
-            )
-
-            goles_favor_por_club_total = {}
-            for p in partidos_validos_grupo:
-                lid = p["local_id"]
-                vid = p["visitante_id"]
-                gl = p["goles_local"] or 0
-                gv = p["goles_visitante"] or 0
-                goles_favor_por_club_total[lid] = goles_favor_por_club_total.get(lid, 0) + gl
-                goles_favor_por_club_total[vid] = goles_favor_por_club_total.get(vid, 0) + gv
-
-            clubs_ids_total = [row["club_id"] for row in eventos_gol_totales]
-            clasif_rows_total = (
-                ClubEnGrupo.objects
-                .filter(grupo=grupo, club_id__in=clubs_ids_total)
-                .select_related("club")
-            )
-            clasif_lookup_total = {}
-            for c in clasif_rows_total:
-                gf_guardado = c.goles_favor or 0
-                gf_calc = goles_favor_por_club_total.get(c.club_id, 0)
-                gf_final = gf_guardado or gf_calc
-
-                clasif_lookup_total[c.club_id] = {
-                    "posicion_actual": c.posicion_actual if c.posicion_actual is not None else 9999,
-                    "club_nombre": c.club.nombre_corto or c.club.nombre_oficial,
-                    "goles_favor": gf_final,
-                }
+            clasif_lookup_total = clasif_por_club
 
             jugadores_ids_total = [row["jugador_id"] for row in eventos_gol_totales]
             jugadores_objs_total = Jugador.objects.filter(id__in=jugadores_ids_total)
@@ -516,22 +535,14 @@ class GrupoInfoFullView(APIView):
             pichichi_list.sort(
                 key=lambda x: (-x["goles_total"], x["club_posicion"], x["nombre"].lower())
             )
+        return pichichi_list
 
-        pichichi_payload = {
-            "grupo": {
-                "id": grupo.id,
-                "nombre": grupo.nombre,
-                "competicion": grupo.competicion.nombre,
-                "temporada": grupo.temporada.nombre,
-            },
-            "goleadores": pichichi_list,
-        }
-
+    def _seccion_sanciones_jornada(self, grupo, jornada_num):
         # ========== Sanciones jornada (similar a SancionesJornadaView) ==========
 
         sancionados_lista = []
         if jornada_num is not None:
-            partidos_de_jornada_ids = [pp.id for pp in partidos_de_jornada_list]
+            partidos_de_jornada_ids = list(self._partidos_de_jornada(grupo, jornada_num).values_list("id", flat=True))
 
             eventos_disciplina_jornada = (
                 EventoPartido.objects
@@ -637,28 +648,14 @@ class GrupoInfoFullView(APIView):
                 )
             )
             sancionados_lista = sancionados_lista[:12]
+        return sancionados_lista
 
-        sanciones_jornada_payload = {
-            "grupo": {
-                "id": grupo.id,
-                "nombre": grupo.nombre,
-                "competicion": grupo.competicion.nombre,
-                "temporada": grupo.temporada.nombre,
-            },
-            "jornada": jornada_num,
-            "sancionados": sancionados_lista,
-        }
-
+    def _seccion_jugadores_mas_sancionados(self, grupo):
         # ========== Sanciones acumuladas / jugadores más sancionados ==========
         # (similar a SancionesJugadoresAcumuladoView)
 
         sanciones_acum_list = []
-        partidos_ids_all = list(
-            Partido.objects.filter(
-                grupo=grupo,
-                jugado=True,
-            ).values_list("id", flat=True)
-        )
+        partidos_ids_all = self._partidos_jugados_ids(grupo)
         if partidos_ids_all:
             eventos_disciplina_total = (
                 EventoPartido.objects
@@ -765,19 +762,12 @@ class GrupoInfoFullView(APIView):
                 )
             )
             sanciones_acum_list = sanciones_acum_list[:12]
+        return sanciones_acum_list
 
-        sanciones_acum_payload = {
-            "grupo": {
-                "id": grupo.id,
-                "nombre": grupo.nombre,
-                "competicion": grupo.competicion.nombre,
-                "temporada": grupo.temporada.nombre,
-            },
-            "jugadores": sanciones_acum_list,
-        }
-
+    def _seccion_fair_play_equipos(self, grupo):
         # ========== Fair play equipos (similar a FairPlayEquiposView) ==========
         fair_play_equipos_list = []
+        partidos_ids_all = self._partidos_jugados_ids(grupo)
         if partidos_ids_all:
             eventos_disciplina_total_fp = (
                 EventoPartido.objects
@@ -855,20 +845,12 @@ class GrupoInfoFullView(APIView):
                     x["club_nombre"].lower(),
                 )
             )
+        return fair_play_equipos_list
 
-        fair_play_payload = {
-            "grupo": {
-                "id": grupo.id,
-                "nombre": grupo.nombre,
-                "competicion": grupo.competicion.nombre,
-                "temporada": grupo.temporada.nombre,
-            },
-            "equipos": fair_play_equipos_list,
-        }
-
+    def _seccion_goles_por_equipo(self, grupo):
         # ========== Potencia ofensiva equipos (similar a GolesPorEquipoView) ==========
         equipos_ofensivos_list = []
-        if partidos_ids_all:
+        if Partido.objects.filter(grupo=grupo, jugado=True).exists():
             # construir stats básicos
             clubes_stats = {}
             partidos_grupo_vals = (
@@ -997,44 +979,4 @@ class GrupoInfoFullView(APIView):
                     row["club_nombre"].lower(),
                 )
             )
-
-        goles_por_equipo_payload = {
-            "grupo": {
-                "id": grupo.id,
-                "nombre": grupo.nombre,
-                "competicion": grupo.competicion.nombre,
-                "temporada": grupo.temporada.nombre,
-            },
-            "equipos": equipos_ofensivos_list,
-        }
-
-        # ---------------------------------------------------------------------
-        # RESPUESTA FINAL
-        # ---------------------------------------------------------------------
-
-        meta = {
-            "grupo": {
-                "id": grupo.id,
-                "nombre": grupo.nombre,
-                "slug": grupo.slug,
-                "competicion": grupo.competicion.nombre,
-                "competicion_slug": grupo.competicion.slug,
-                "temporada": grupo.temporada.nombre,
-            },
-            "jornada_actual": jornada_num,
-            "jornadas_disponibles": jornadas_disponibles,
-        }
-
-        data = {
-            "clasificacion": clasificacion_payload,
-            "resultados_jornada": resultados_payload,
-            "kpis_jornada": kpis_payload,
-            "goleadores_jornada": goleadores_jornada_payload,
-            "pichichi_temporada": pichichi_payload,
-            "sanciones_jornada": sanciones_jornada_payload,
-            "jugadores_mas_sancionados": sanciones_acum_payload,
-            "fair_play_equipos": fair_play_payload,
-            "goles_por_equipo": goles_por_equipo_payload,
-        }
-
-        return Response({"meta": meta, "data": data}, status=status.HTTP_200_OK)
+        return equipos_ofensivos_list
@@ -7,6 +7,7 @@ Uso:
     python manage.py calcular_puntos_equipo_jornada --temporada "2025/2026" --jornada 1 --grupo 5
     python manage.py calcular_puntos_equipo_jornada --temporada "2025/2026" --todas-jornadas
     python manage.py calcular_puntos_equipo_jornada --temporada "2025/2026" --jornada 1 --dry-run
+    python manage.py calcular_puntos_equipo_jornada --temporada "2025/2026" --desde-cambios
 """
 
 from django.core.management.base import BaseCommand
@@ -20,6 +21,8 @@ from valoraciones.models import CoeficienteClub
 from valoraciones.views import EquipoJornadaView
 from fantasy.models import PuntosEquipoJornada, PuntosEquipoTotal
 from django.db.models import Sum
+from scraping.core import cambios
+from status import versiones
 import logging
 
 logger = logging.getLogger(__name__)
@@ -121,6 +124,14 @@ class Command(BaseCommand):
             action="store_true",
             help="Recalcula incluso si ya existen puntos para esa jornada.",
         )
+        parser.add_argument(
+            "--desde-cambios",
+            action="store_true",
+            help=(
+                "Solo los grupos/jornadas con cambios del scraping pendientes para este "
+                "comando (scraping.CambioPartido). Los recalcula aunque ya existan."
+            ),
+        )
 
     def _bonus_rival_fuerte(self, coef_rival: float) -> float:
         """Bonus por enfrentarse a un rival fuerte."""
@@ -349,6 +360,7 @@ class Command(BaseCommand):
         
         return puntos_equipos
 
+    @versiones.al_terminar
     def handle(self, *args, **options):
         temporada_nombre = options["temporada"]
         jornada_num = options.get("jornada")
@@ -356,9 +368,17 @@ class Command(BaseCommand):
         todas_jornadas = options.get("todas_jornadas", False)
         dry_run = options.get("dry_run", False)
         forzar = options.get("forzar", False)
+        desde_cambios = options.get("desde_cambios", False)
         
         # Validar parámetros
-        if not todas_jornadas and not jornada_num:
+        if desde_cambios:
+            if grupo_id or jornada_num or todas_jornadas:
+                self.stderr.write(
+                    self.style.ERROR("--desde-cambios no se combina con --grupo, --jornada ni --todas-jornadas")
+                )
+                return
+            forzar = True
+        elif not todas_jornadas and not jornada_num:
             self.stderr.write(
                 self.style.ERROR("Debes especificar --jornada o --todas-jornadas")
             )
@@ -386,13 +406,21 @@ class Command(BaseCommand):
             )
             return
         
+        pares = None
+        if desde_cambios:
+            # Un cursor por temporada: lo de otras temporadas queda para su propia pasada
+            consumidor = f"puntos_equipo:{temporada.id}"
+            pares, hasta_cambio = cambios.pendientes(consumidor, grupos=[g.id for g in grupos])
+        
         total_creados = 0
         total_actualizados = 0
         total_errores = 0
         
         # Procesar cada grupo
         for grupo in grupos:
-            if todas_jornadas:
+            if pares is not None:
+                jornadas = sorted(j for g, j in pares if g == grupo.id)
+            elif todas_jornadas:
                 # Obtener todas las jornadas disponibles en este grupo
                 jornadas = (
                     Partido.objects
@@ -474,6 +502,10 @@ class Command(BaseCommand):
                         )
                     )
         
+        # Con errores el cursor no avanza: la próxima pasada los reintenta
+        if desde_cambios and not dry_run and not total_errores:
+            cambios.confirmar(consumidor, hasta_cambio)
+        
         # Resumen
         self.stdout.write(self.style.SUCCESS(
             f"\n✅ Proceso completado:\n"
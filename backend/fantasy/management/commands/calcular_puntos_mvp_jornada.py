@@ -7,6 +7,7 @@ Uso:
     python manage.py calcular_puntos_mvp_jornada --temporada "2025/2026" --jornada 1 --grupo 5
     python manage.py calcular_puntos_mvp_jornada --temporada "2025/2026" --todas-jornadas
     python manage.py calcular_puntos_mvp_jornada --temporada "2025/2026" --jornada 1 --dry-run
+    python manage.py calcular_puntos_mvp_jornada --temporada "2025/2026" --desde-cambios
 """
 
 from django.core.management.base import BaseCommand
@@ -22,6 +23,8 @@ from valoraciones.views import MVPGlobalView, _coef_division_lookup, _coef_club_
 from fantasy.models import PuntosMVPJornada, PuntosMVPTotalJugador
 from django.db.models import Sum, Max
 from fantasy.signals import _actualizar_sumatorio_total
+from scraping.core import cambios
+from status import versiones
 
 
 def _norm_media(url: str) -> str:
@@ -75,6 +78,14 @@ class Command(BaseCommand):
             action="store_true",
             help="Recalcula incluso si ya existen puntos para esa jornada.",
         )
+        parser.add_argument(
+            "--desde-cambios",
+            action="store_true",
+            help=(
+                "Solo los grupos/jornadas con cambios del scraping pendientes para este "
+                "comando (scraping.CambioPartido). Los recalcula aunque ya existan."
+            ),
+        )
 
     def _calcular_puntos_jugador_jornada(
         self,
@@ -261,6 +272,7 @@ class Command(BaseCommand):
         return ranking_jornada
 
     @transaction.atomic
+    @versiones.al_terminar
     def handle(self, *args, **opts):
         temporada_nombre: str = opts["temporada"]
         jornada: int | None = opts.get("jornada")
@@ -268,6 +280,13 @@ class Command(BaseCommand):
         todas_jornadas: bool = opts.get("todas_jornadas", False)
         dry_run: bool = opts.get("dry_run", False)
         forzar: bool = opts.get("forzar", False)
+        desde_cambios: bool = opts.get("desde_cambios", False)
+        
+        if desde_cambios and (grupo_id or jornada is not None or todas_jornadas):
+            self.stderr.write(
+                self.style.ERROR("--desde-cambios no se combina con --grupo, --jornada ni --todas-jornadas")
+            )
+            return
         
         # 1) Obtener temporada
         try:
@@ -296,7 +315,18 @@ class Command(BaseCommand):
         coef_club = _coef_club_lookup(temporada.id, JORNADA_REF_COEF)
         
         # 4) Determinar jornadas a procesar
-        if todas_jornadas:
+        pares = None
+        if desde_cambios:
+            # Un cursor por temporada: lo de otras temporadas queda para su propia pasada
+            consumidor = f"puntos_mvp:{temporada.id}"
+            pares, hasta_cambio = cambios.pendientes(consumidor, grupos=[g.id for g in grupos])
+            jornadas_list = sorted({j for _, j in pares})
+            forzar = True
+            if not jornadas_list and not dry_run:
+                cambios.confirmar(consumidor, hasta_cambio)
+                self.stdout.write(self.style.SUCCESS("Sin cambios pendientes del scraping."))
+                return
+        elif todas_jornadas:
             # Obtener todas las jornadas únicas de los partidos jugados
             jornadas = (
                 Partido.objects
@@ -340,6 +370,8 @@ class Command(BaseCommand):
             )
             
             for grupo in grupos:
+                if pares is not None and (grupo.id, jornada_num) not in pares:
+                    continue
                 # Verificar si ya existe (si no es forzar)
                 if not forzar:
                     existe = PuntosMVPJornada.objects.filter(
@@ -418,6 +450,9 @@ class Command(BaseCommand):
                     )
                 )
         
+        if desde_cambios and not dry_run:
+            cambios.confirmar(consumidor, hasta_cambio)
+        
         # 6) Resumen
         self.stdout.write(
             self.style.SUCCESS(
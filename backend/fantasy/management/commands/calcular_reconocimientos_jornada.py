@@ -48,6 +48,7 @@ from fantasy.models import (
 )
 from math import ceil
 from clubes.models import Club
+from status import versiones
 
 
 class MockRequest:
@@ -150,6 +151,7 @@ class Command(BaseCommand):
             help="No guarda en BD; solo muestra qué haría.",
         )
 
+    @versiones.al_terminar
     def handle(self, *args, **options):
         temporada_id = options["temporada_id"]
         grupo_id = options.get("grupo_id")
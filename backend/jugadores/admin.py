@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Jugador, JugadorEnClubTemporada, HistorialJugadorScraped
+from .models import Jugador, JugadorEnClubTemporada, HistorialJugadorScraped, TrayectoriaJugador
 
 
 @admin.display(description="Edad (estimada)")
@@ -83,3 +83,25 @@ class HistorialJugadorScrapedAdmin(admin.ModelAdmin):
     )
     list_filter = ("temporada_texto",)
     ordering = ("jugador", "temporada_texto")
+
+
+@admin.register(TrayectoriaJugador)
+class TrayectoriaJugadorAdmin(admin.ModelAdmin):
+    list_display = (
+        "jugador",
+        "orden",
+        "temporada_texto",
+        "competicion_texto",
+        "club_texto",
+        "partidos_jugados",
+        "goles",
+        "es_scraped",
+    )
+    search_fields = (
+        "jugador__nombre",
+        "jugador__apodo",
+        "club_texto",
+    )
+    list_filter = ("es_scraped",)
+    raw_id_fields = ("jugador", "temporada", "competicion", "grupo", "club")
+    ordering = ("jugador", "orden")
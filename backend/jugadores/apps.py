@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class JugadoresConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'jugadores'
+
+    def ready(self):
+        """
+        Registra las señales que mantienen la trayectoria (jugadores.signals).
+        """
+        import jugadores.signals  # noqa: F401
@@ -0,0 +1,28 @@
+# jugadores/management/commands/reconstruir_trayectorias.py
+from django.core.management.base import BaseCommand
+
+from jugadores import trayectoria
+from jugadores.models import Jugador
+from status import versiones
+
+
+class Command(BaseCommand):
+    help = 'Rehace la trayectoria consolidada (TrayectoriaJugador) de todos los jugadores o de uno'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jugador-id', type=int, default=None, help='Solo este jugador (pk)')
+
+    @versiones.al_terminar
+    def handle(self, *args, **options):
+        if options.get('jugador_id'):
+            ids = [options['jugador_id']]
+        else:
+            ids = list(Jugador.objects.values_list('id', flat=True))
+
+        self.stdout.write(f'Rehaciendo la trayectoria de {len(ids)} jugadores...')
+        total = 0
+        for i in range(0, len(ids), trayectoria.LOTE):
+            total += trayectoria.reconstruir(ids[i:i + trayectoria.LOTE])
+            self.stdout.write(f'  Procesados {min(i + trayectoria.LOTE, len(ids))}/{len(ids)}...')
+
+        self.stdout.write(self.style.SUCCESS(f'✓ {total} líneas de trayectoria escritas.'))
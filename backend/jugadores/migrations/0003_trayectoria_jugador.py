@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubes', '0004_alter_club_telefono_alter_clubboardmember_telefono_and_more'),
+        ('jugadores', '0002_add_slug_to_jugador'),
+        ('nucleo', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrayectoriaJugador',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('orden', models.PositiveIntegerField()),
+                ('temporada_texto', models.CharField(blank=True, max_length=50)),
+                ('competicion_texto', models.CharField(blank=True, max_length=200)),
+                ('grupo_texto', models.CharField(blank=True, max_length=100)),
+                ('club_texto', models.CharField(blank=True, max_length=200)),
+                ('club_nombre', models.CharField(blank=True, max_length=200)),
+                ('club_slug', models.CharField(blank=True, max_length=180)),
+                ('dorsal', models.CharField(blank=True, max_length=10)),
+                ('partidos_jugados', models.IntegerField(default=0)),
+                ('goles', models.IntegerField(default=0)),
+                ('tarjetas_amarillas', models.IntegerField(default=0)),
+                ('tarjetas_rojas', models.IntegerField(default=0)),
+                ('es_scraped', models.BooleanField(default=False)),
+                ('club', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='clubes.club')),
+                ('competicion', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='nucleo.competicion')),
+                ('grupo', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='nucleo.grupo')),
+                ('jugador', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trayectoria', to='jugadores.jugador')),
+                ('temporada', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='nucleo.temporada')),
+            ],
+            options={
+                'verbose_name': 'Trayectoria de jugador',
+                'verbose_name_plural': 'Trayectorias de jugador',
+                'unique_together': {('jugador', 'orden')},
+            },
+        ),
+    ]
@@ -159,37 +159,45 @@ class HistorialJugadorScraped(models.Model):
         return f"{self.jugador} / {self.temporada_texto} / {self.equipo_texto}"
 
 
-    temporada_texto = models.CharField(max_length=50, blank=True)
-    competicion_texto = models.CharField(max_length=200, blank=True)
-    equipo_texto = models.CharField(max_length=200, blank=True)
-
-    class Meta:
-        verbose_name = "Historial bruto de jugador (scraping)"
-        verbose_name_plural = "Historial bruto de jugador (scraping)"
-
-    def __str__(self):
-        return f"{self.jugador} / {self.temporada_texto} / {self.equipo_texto}"
+class TrayectoriaJugador(models.Model):
+    """
+    Trayectoria consolidada del jugador (JugadorEnClubTemporada +
+    HistorialJugadorScraped), una fila por línea tal y como la devuelve la
+    API y ya en orden. La rellena jugadores.trayectoria.reconstruir() cuando
+    cambian sus fuentes; leerla es una sola consulta por (jugador, orden).
+    """
+    jugador = models.ForeignKey(
+        Jugador,
+        on_delete=models.CASCADE,
+        related_name="trayectoria",
+    )
+    orden = models.PositiveIntegerField()  # 0 = la línea más reciente
 
+    temporada = models.ForeignKey("nucleo.Temporada", on_delete=models.CASCADE, null=True, blank=True, related_name="+")
+    competicion = models.ForeignKey("nucleo.Competicion", on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    grupo = models.ForeignKey("nucleo.Grupo", on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    club = models.ForeignKey("clubes.Club", on_delete=models.CASCADE, null=True, blank=True, related_name="+")
 
+    # Textos ya resueltos (los de la federación en las líneas scrapeadas)
     temporada_texto = models.CharField(max_length=50, blank=True)
     competicion_texto = models.CharField(max_length=200, blank=True)
-    equipo_texto = models.CharField(max_length=200, blank=True)
-
-    class Meta:
-        verbose_name = "Historial bruto de jugador (scraping)"
-        verbose_name_plural = "Historial bruto de jugador (scraping)"
-
-    def __str__(self):
-        return f"{self.jugador} / {self.temporada_texto} / {self.equipo_texto}"
+    grupo_texto = models.CharField(max_length=100, blank=True)
+    club_texto = models.CharField(max_length=200, blank=True)
+    club_nombre = models.CharField(max_length=200, blank=True)
+    club_slug = models.CharField(max_length=180, blank=True)
 
+    dorsal = models.CharField(max_length=10, blank=True)
+    partidos_jugados = models.IntegerField(default=0)
+    goles = models.IntegerField(default=0)
+    tarjetas_amarillas = models.IntegerField(default=0)
+    tarjetas_rojas = models.IntegerField(default=0)
 
-    temporada_texto = models.CharField(max_length=50, blank=True)
-    competicion_texto = models.CharField(max_length=200, blank=True)
-    equipo_texto = models.CharField(max_length=200, blank=True)
+    es_scraped = models.BooleanField(default=False)
 
     class Meta:
-        verbose_name = "Historial bruto de jugador (scraping)"
-        verbose_name_plural = "Historial bruto de jugador (scraping)"
+        unique_together = ("jugador", "orden")
+        verbose_name = "Trayectoria de jugador"
+        verbose_name_plural = "Trayectorias de jugador"
 
     def __str__(self):
-        return f"{self.jugador} / {self.temporada_texto} / {self.equipo_texto}"
+        return f"{self.jugador} / {self.temporada_texto} / {self.club_texto}"
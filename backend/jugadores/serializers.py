@@ -8,6 +8,7 @@ from valoraciones.models import ValoracionJugador
 
 # Importar Club
 from clubes.models import Club
+from nucleo.media import norm_media
 
 # Importar modelos de fantasy
 try:
@@ -19,15 +20,8 @@ except ImportError:
     PuntosMVPTotalJugador = None
 
 # Helper para normalizar URLs de media
-def _norm_media(url: str | None) -> str:
-    if not url:
-        return ""
-    u = url.strip()
-    if u.startswith("http://") or u.startswith("https://"):
-        return u
-    if u.startswith("/media/"):
-        return u
-    return "/media/" + u.lstrip("/")
+def _norm_media(url: str | None, tam: int | None = None) -> str:
+    return norm_media(url, tam)
 
 
 # --------------------------------------------
@@ -229,6 +223,7 @@ from valoraciones.models import ValoracionJugador
 
 # Importar Club
 from clubes.models import Club
+from nucleo.media import norm_media
 
 # Importar modelos de fantasy
 try:
@@ -240,15 +235,8 @@ except ImportError:
     PuntosMVPTotalJugador = None
 
 # Helper para normalizar URLs de media
-def _norm_media(url: str | None) -> str:
-    if not url:
-        return ""
-    u = url.strip()
-    if u.startswith("http://") or u.startswith("https://"):
-        return u
-    if u.startswith("/media/"):
-        return u
-    return "/media/" + u.lstrip("/")
+def _norm_media(url: str | None, tam: int | None = None) -> str:
+    return norm_media(url, tam)
 
 
 # --------------------------------------------
@@ -450,6 +438,7 @@ from valoraciones.models import ValoracionJugador
 
 # Importar Club
 from clubes.models import Club
+from nucleo.media import norm_media
 
 # Importar modelos de fantasy
 try:
@@ -461,15 +450,8 @@ except ImportError:
     PuntosMVPTotalJugador = None
 
 # Helper para normalizar URLs de media
-def _norm_media(url: str | None) -> str:
-    if not url:
-        return ""
-    u = url.strip()
-    if u.startswith("http://") or u.startswith("https://"):
-        return u
-    if u.startswith("/media/"):
-        return u
-    return "/media/" + u.lstrip("/")
+def _norm_media(url: str | None, tam: int | None = None) -> str:
+    return norm_media(url, tam)
 
 
 # --------------------------------------------
@@ -671,6 +653,7 @@ from valoraciones.models import ValoracionJugador
 
 # Importar Club
 from clubes.models import Club
+from nucleo.media import norm_media
 
 # Importar modelos de fantasy
 try:
@@ -682,15 +665,8 @@ except ImportError:
     PuntosMVPTotalJugador = None
 
 # Helper para normalizar URLs de media
-def _norm_media(url: str | None) -> str:
-    if not url:
-        return ""
-    u = url.strip()
-    if u.startswith("http://") or u.startswith("https://"):
-        return u
-    if u.startswith("/media/"):
-        return u
-    return "/media/" + u.lstrip("/")
+def _norm_media(url: str | None, tam: int | None = None) -> str:
+    return norm_media(url, tam)
 
 
 # --------------------------------------------
@@ -0,0 +1,28 @@
+"""
+Señales que rehacen la trayectoria (jugadores.trayectoria) de los jugadores
+de un club cuando entra o sale de un grupo: cambia el grupo y la
+competición de sus líneas. Los cambios de nombre o slug no hacen falta: se
+leen por join al servir.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from clubes.models import ClubEnGrupo
+from jugadores import trayectoria
+
+
+@receiver(post_save, sender=ClubEnGrupo)
+@receiver(post_delete, sender=ClubEnGrupo)
+def trayectoria_inscripcion(sender, instance, created=True, **kwargs):
+    # Las actualizaciones de la clasificación no cambian el grupo de nadie
+    if not created:
+        return
+    club_id, grupo_id = instance.club_id, instance.grupo_id
+
+    def _reconstruir():
+        jugador_ids = trayectoria.de_club_en_grupo(club_id, grupo_id)
+        if jugador_ids:
+            trayectoria.reconstruir(jugador_ids)
+
+    transaction.on_commit(_reconstruir)
@@ -1,3 +1,45 @@
 from django.test import TestCase
 
-# Create your tests here.
+from clubes.models import Club, ClubEnGrupo
+from nucleo.models import Competicion, Grupo, Temporada
+from . import trayectoria
+from .models import HistorialJugadorScraped, Jugador, JugadorEnClubTemporada
+
+
+class TrayectoriaTests(TestCase):
+    def setUp(self):
+        self.temporada = Temporada.objects.create(nombre="2099/2100")
+        self.competicion = Competicion.objects.create(nombre="Competición de prueba")
+        self.grupo = Grupo.objects.create(nombre="Grupo de prueba", temporada=self.temporada, competicion=self.competicion)
+        self.club = Club.objects.create(nombre_oficial="Club A", slug="club-a")
+        self.jugador = Jugador.objects.create(nombre="Jugador")
+        JugadorEnClubTemporada.objects.create(jugador=self.jugador, club=self.club, temporada=self.temporada, goles=3)
+        HistorialJugadorScraped.objects.create(
+            jugador=self.jugador, temporada_texto="2098/2099", competicion_texto="Otra", equipo_texto="Club Viejo",
+        )
+        trayectoria.reconstruir([self.jugador.pk])
+
+    def test_los_cambios_del_club_se_ven_sin_reconstruir(self):
+        self.club.nombre_corto = "A"
+        self.club.slug = "club-a-bueno"
+        self.club.save()
+        Grupo.objects.filter(pk=self.grupo.pk).update(nombre="Grupo renombrado")
+
+        propia, scrapeada = trayectoria.de_jugador(self.jugador)
+        self.assertEqual(
+            (propia["club"], propia["club_nombre"], propia["club_slug"], propia["goles"]),
+            ("Club A", "A", "club-a-bueno", 3),
+        )
+        self.assertEqual((scrapeada["club"], scrapeada["club_slug"], scrapeada["es_scraped"]), ("Club Viejo", None, True))
+
+    def test_inscribir_el_club_en_un_grupo_rehace_la_trayectoria(self):
+        self.assertEqual(trayectoria.de_jugador(self.jugador)[0]["grupo_id"], None)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            inscripcion = ClubEnGrupo.objects.create(club=self.club, grupo=self.grupo)
+        propia = trayectoria.de_jugador(self.jugador)[0]
+        self.assertEqual((propia["grupo"], propia["competicion"]), ("Grupo de prueba", "Competición de prueba"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            inscripcion.delete()
+        self.assertEqual(trayectoria.de_jugador(self.jugador)[0]["grupo_id"], None)
@@ -0,0 +1,191 @@
+from django.db import transaction
+
+from clubes.models import ClubEnGrupo
+from .models import HistorialJugadorScraped, JugadorEnClubTemporada, TrayectoriaJugador
+
+# Trayectoria del jugador (jugadores.models.TrayectoriaJugador).
+#
+# La ficha del jugador mezcla dos fuentes: JugadorEnClubTemporada (nuestras
+# temporadas/clubes, con estadísticas) y HistorialJugadorScraped (el
+# "Histórico Equipos" de la federación, solo texto). En vez de cruzarlas en
+# cada petición, reconstruir() las consolida por lotes de jugadores en
+# TrayectoriaJugador con el mismo formato y orden que da la API, y de_jugador()
+# la lee con una consulta por el índice (jugador, orden).
+#
+# Quien escribe en las fuentes llama a reconstruir() con los jugadores
+# tocados: scrape_jugadores_todos (vía guardar_historial), scrape_jugadores,
+# scrape_equipos y la persistencia de actas; las altas y bajas de ClubEnGrupo
+# (qué grupo tiene cada línea) lo hacen por señal (jugadores.signals).
+# reconstruir_trayectorias la rehace entera.
+#
+# Nombre y slug del club y nombres de grupo y competición se leen por join
+# al servir: un cambio en el admin sale ya en todas las trayectorias. Las
+# copias de la tabla solo se usan en las líneas de la federación.
+LOTE = 500
+
+CAMPOS = (
+    "temporada_id", "temporada_texto", "competicion_id", "competicion_texto", "grupo_id", "grupo_texto",
+    "club_id", "club_texto", "club_nombre", "club_slug", "dorsal",
+    "partidos_jugados", "goles", "tarjetas_amarillas", "tarjetas_rojas", "es_scraped",
+    "club__nombre_oficial", "club__nombre_corto", "club__slug", "grupo__nombre", "competicion__nombre",
+)
+
+
+def _lineas(jugador_ids) -> dict:
+    """
+    {jugador_id: [TrayectoriaJugador sin orden]} en el orden de la API.
+    """
+    participaciones = list(
+        JugadorEnClubTemporada.objects
+        .filter(jugador_id__in=jugador_ids)
+        .select_related("club", "temporada")
+        .order_by("-temporada__nombre", "-id")
+    )
+
+    # Grupo de cada (club, temporada): el primero en el que está inscrito el club
+    grupos = {}
+    for ceg in (
+        ClubEnGrupo.objects
+        .filter(
+            club_id__in={p.club_id for p in participaciones},
+            grupo__temporada_id__in={p.temporada_id for p in participaciones},
+        )
+        .select_related("grupo", "grupo__competicion")
+        .order_by("pk")
+    ):
+        grupos.setdefault((ceg.club_id, ceg.grupo.temporada_id), ceg.grupo)
+
+    lineas = {j: [] for j in jugador_ids}
+    for part in participaciones:
+        grupo = grupos.get((part.club_id, part.temporada_id))
+        lineas[part.jugador_id].append(TrayectoriaJugador(
+            jugador_id=part.jugador_id,
+            temporada_id=part.temporada_id,
+            temporada_texto=part.temporada.nombre,
+            competicion_id=grupo.competicion_id if grupo else None,
+            competicion_texto=grupo.competicion.nombre if grupo else "",
+            grupo_id=grupo.id if grupo else None,
+            grupo_texto=grupo.nombre if grupo else "",
+            club_id=part.club_id,
+            club_texto=part.club.nombre_oficial,
+            club_nombre=part.club.nombre_corto or part.club.nombre_oficial,
+            club_slug=part.club.slug or "",
+            dorsal=part.dorsal or "",
+            partidos_jugados=part.partidos_jugados,
+            goles=part.goles,
+            tarjetas_amarillas=part.tarjetas_amarillas,
+            tarjetas_rojas=part.tarjetas_rojas,
+            es_scraped=False,
+        ))
+
+    # Líneas de la federación que no estén ya (misma temporada y club)
+    for hist in HistorialJugadorScraped.objects.filter(jugador_id__in=jugador_ids).order_by("-temporada_texto", "id"):
+        propias = lineas[hist.jugador_id]
+        if any(l.temporada_texto == hist.temporada_texto and l.club_texto == hist.equipo_texto for l in propias):
+            continue
+        propias.append(TrayectoriaJugador(
+            jugador_id=hist.jugador_id,
+            temporada_texto=hist.temporada_texto,
+            competicion_texto=hist.competicion_texto,
+            club_texto=hist.equipo_texto,
+            club_nombre=hist.equipo_texto,
+            es_scraped=True,
+        ))
+
+    for propias in lineas.values():
+        # Temporada descendente; a igualdad, primero las participaciones (sort estable)
+        propias.sort(key=lambda l: l.temporada_texto, reverse=True)
+    return lineas
+
+
+def reconstruir(jugador_ids) -> int:
+    """
+    Rehace la trayectoria de esos jugadores (por lotes). Devuelve cuántas
+    filas ha escrito.
+    """
+    jugador_ids = sorted(set(jugador_ids))
+    total = 0
+    for i in range(0, len(jugador_ids), LOTE):
+        lote = jugador_ids[i:i + LOTE]
+        filas = []
+        for propias in _lineas(lote).values():
+            for orden, linea in enumerate(propias):
+                linea.orden = orden
+                filas.append(linea)
+        with transaction.atomic():
+            TrayectoriaJugador.objects.filter(jugador_id__in=lote).delete()
+            TrayectoriaJugador.objects.bulk_create(filas, batch_size=LOTE)
+        total += len(filas)
+    return total
+
+
+def guardar_historial(historicos: dict) -> int:
+    """
+    Sustituye el "Histórico Equipos" de la federación de varios jugadores
+    ({jugador_pk: lista de _parse_historico}) y rehace sus trayectorias.
+    """
+    if not historicos:
+        return 0
+    with transaction.atomic():
+        HistorialJugadorScraped.objects.filter(jugador_id__in=historicos).delete()
+        HistorialJugadorScraped.objects.bulk_create([
+            HistorialJugadorScraped(
+                jugador_id=jugador_pk,
+                temporada_texto=(h.get("temporada") or "").strip(),
+                competicion_texto=(h.get("competicion") or "").strip(),
+                equipo_texto=(h.get("equipo") or "").strip(),
+            )
+            for jugador_pk, historico in historicos.items()
+            for h in (historico or [])
+        ], batch_size=LOTE)
+        return reconstruir(historicos)
+
+
+def de_jugador(jugador) -> list[dict]:
+    """
+    Trayectoria completa del jugador en el formato de la API, de la más
+    reciente a la más antigua. Si aún no está consolidada, se consolida ahora.
+    """
+    filas = list(TrayectoriaJugador.objects.filter(jugador=jugador).order_by("orden").values(*CAMPOS))
+    if not filas and reconstruir([jugador.pk]):
+        filas = list(TrayectoriaJugador.objects.filter(jugador=jugador).order_by("orden").values(*CAMPOS))
+    for f in filas:
+        if f["club_id"] is not None:
+            f["club_texto"] = f["club__nombre_oficial"]
+            f["club_nombre"] = f["club__nombre_corto"] or f["club__nombre_oficial"]
+            f["club_slug"] = f["club__slug"] or ""
+        if f["grupo_id"] is not None:
+            f["grupo_texto"] = f["grupo__nombre"]
+        if f["competicion_id"] is not None:
+            f["competicion_texto"] = f["competicion__nombre"]
+    return [
+        {
+            "temporada": f["temporada_texto"],
+            "temporada_id": f["temporada_id"],
+            "competicion": f["competicion_texto"],
+            "competicion_id": f["competicion_id"],
+            "grupo": f["grupo_texto"],
+            "grupo_id": f["grupo_id"],
+            "club": f["club_texto"],
+            "club_id": f["club_id"],
+            "club_nombre": f["club_nombre"],
+            "club_slug": None if f["es_scraped"] else f["club_slug"],
+            "dorsal": f["dorsal"] or None,
+            "partidos_jugados": f["partidos_jugados"],
+            "goles": f["goles"],
+            "tarjetas_amarillas": f["tarjetas_amarillas"],
+            "tarjetas_rojas": f["tarjetas_rojas"],
+            "es_scraped": f["es_scraped"],
+        }
+        for f in filas
+    ]
+
+
+def de_club_en_grupo(club_id: int, grupo_id: int) -> list[int]:
+    """Jugadores con alguna línea de ese club en la temporada del grupo."""
+    return list(
+        JugadorEnClubTemporada.objects
+        .filter(club_id=club_id, temporada__grupos__id=grupo_id)
+        .values_list("jugador_id", flat=True)
+        .distinct()
+    )
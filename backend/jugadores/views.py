@@ -5,13 +5,15 @@ from rest_framework import status
 from django.db.models import Q, Count, Prefetch, Sum, Case, When, IntegerField, BooleanField
 from django.db.models.functions import Coalesce
 
-from .models import Jugador, JugadorEnClubTemporada, HistorialJugadorScraped
+from .models import Jugador, JugadorEnClubTemporada
+from . import trayectoria
 from .serializers import (
     JugadorSerializer,
     JugadorEnClubTemporadaSerializer,
     ValoracionJugadorSerializer,
     HistorialCompletoSerializer,
 )
+from nucleo.media import norm_media
 from nucleo.models import Temporada, Grupo
 from clubes.models import Club
 from valoraciones.models import ValoracionJugador, VotoValoracionJugador
@@ -21,17 +23,8 @@ from partidos.models import Partido, EventoPartido, AlineacionPartidoJugador
 # Helper para normalizar URLs de media
 # Asegura que todas las URLs de imágenes/escudos tengan el prefijo /media/ correcto
 # Esto es necesario porque FFCV a veces devuelve rutas relativas sin prefijo
-def _norm_media(url: str | None) -> str:
-    if not url:
-        return ""
-    u = url.strip()
-    # Si ya es URL absoluta o tiene /media/, dejarla como está
-    if u.startswith("http://") or u.startswith("https://"):
-        return u
-    if u.startswith("/media/"):
-        return u
-    # Añadir prefijo /media/ si falta
-    return "/media/" + u.lstrip("/")
+def _norm_media(url: str | None, tam: int | None = None) -> str:
+    return norm_media(url, tam)
 
 
 # Helper para obtener jugador por ID numérico o slug
@@ -265,97 +258,8 @@ class JugadorFullView(APIView):
         return Response(response)
 
     def _get_historial_completo(self, jugador):
-        """Consolida JugadorEnClubTemporada + HistorialJugadorScraped"""
-        historial = []
-
-        # De JugadorEnClubTemporada (datos reales)
-        participaciones = (
-            JugadorEnClubTemporada.objects
-            .filter(jugador=jugador)
-            .select_related("club", "temporada")
-            .prefetch_related("club__participaciones")
-            .order_by("-temporada__nombre", "-id")
-        )
-
-        for part in participaciones:
-            # Intentar obtener grupo
-            grupo = None
-            grupo_id = None
-            competicion = None
-            competicion_id = None
-
-            # Buscar grupo a través de ClubEnGrupo
-            club_en_grupo = (
-                part.club.participaciones
-                .filter(grupo__temporada=part.temporada)
-                .select_related("grupo", "grupo__competicion")
-                .first()
-            )
-
-            if club_en_grupo and club_en_grupo.grupo:
-                grupo = club_en_grupo.grupo.nombre
-                grupo_id = club_en_grupo.grupo.id
-                competicion = club_en_grupo.grupo.competicion.nombre
-                competicion_id = club_en_grupo.grupo.competicion.id
-
-            historial.append({
-                "temporada": part.temporada.nombre,
-                "temporada_id": part.temporada.id,
-                "competicion": competicion or "",
-                "competicion_id": competicion_id,
-                "grupo": grupo or "",
-                "grupo_id": grupo_id,
-                "club": part.club.nombre_oficial,
-                "club_id": part.club.id,
-                "club_nombre": part.club.nombre_corto or part.club.nombre_oficial,
-                "club_slug": part.club.slug or "",
-                "dorsal": part.dorsal or None,
-                "partidos_jugados": part.partidos_jugados,
-                "goles": part.goles,
-                "tarjetas_amarillas": part.tarjetas_amarillas,
-                "tarjetas_rojas": part.tarjetas_rojas,
-                "es_scraped": False,
-            })
-
-        # De HistorialJugadorScraped (datos brutos)
-        historial_scraped = (
-            HistorialJugadorScraped.objects
-            .filter(jugador=jugador)
-            .order_by("-temporada_texto")
-        )
-
-        for hist in historial_scraped:
-            # Verificar si ya está en participaciones (evitar duplicados)
-            ya_existe = any(
-                h["temporada"] == hist.temporada_texto and
-                h["club"] == hist.equipo_texto
-                for h in historial
-            )
-
-            if not ya_existe:
-                historial.append({
-                    "temporada": hist.temporada_texto,
-                    "temporada_id": None,
-                    "competicion": hist.competicion_texto,
-                    "competicion_id": None,
-                    "grupo": "",
-                    "grupo_id": None,
-                    "club": hist.equipo_texto,
-                    "club_id": None,
-                    "club_nombre": hist.equipo_texto,
-                    "club_slug": None,
-                    "dorsal": None,
-                    "partidos_jugados": 0,
-                    "goles": 0,
-                    "tarjetas_amarillas": 0,
-                    "tarjetas_rojas": 0,
-                    "es_scraped": True,
-                })
-
-        # Ordenar por temporada descendente
-        historial.sort(key=lambda x: x["temporada"], reverse=True)
-
-        return historial
+        """Trayectoria consolidada (JugadorEnClubTemporada + HistorialJugadorScraped)"""
+        return trayectoria.de_jugador(jugador)
 
     def _get_partidos_jugador(self, jugador, temporada_id=None, limit=20):
         """Obtiene partidos del jugador con estadísticas"""
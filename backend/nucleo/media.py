@@ -0,0 +1,66 @@
+import os
+import re
+
+# Rutas de media compartidas por la API y el scraping.
+#
+# Las imágenes que baja el scraping (escudos, fotos de jugadores) pasan por
+# scraping.core.imagenes y se guardan una sola vez por contenido:
+#
+#   img/ab/<sha256>.<ext>          original tal cual llegó
+#   img/ab/<sha256>_<tam>.webp     miniaturas WebP (lado mayor <= tam px)
+#
+# En Club.escudo_url / Jugador.foto_url se guarda la miniatura mayor; las
+# demás se deducen del nombre, sin consultar la BD. Si cambian los tamaños,
+# las imágenes ya ingeridas solo tienen los antiguos (norm_media nunca pide
+# uno mayor que el guardado, así que no se rompe nada).
+DIR_IMAGENES = "img"
+TAMANOS_IMAGEN = tuple(sorted(
+    int(t) for t in os.getenv("MEDIA_IMG_TAMANOS", "64,128,256").split(",") if t.strip()
+))
+
+_RE_MINIATURA = re.compile(r"^(img/[0-9a-f]{2}/[0-9a-f]{64})_(\d+)\.webp$")
+_RE_INGERIDA = re.compile(r"^img/[0-9a-f]{2}/[0-9a-f]{64}(_\d+)?\.[a-z0-9]+$")
+
+
+def ruta_original(sha256: str, ext: str) -> str:
+    return f"{DIR_IMAGENES}/{sha256[:2]}/{sha256}.{ext}"
+
+
+def ruta_miniatura(sha256: str, tam: int) -> str:
+    return f"{DIR_IMAGENES}/{sha256[:2]}/{sha256}_{tam}.webp"
+
+
+def es_imagen_ingerida(ruta: str | None) -> bool:
+    """
+    True si `ruta` (relativa a media, con o sin /media/) es de la ingesta
+    de imágenes y no una URL de FFCV o una ruta antigua.
+    """
+    if not ruta:
+        return False
+    r = ruta.strip()
+    if r.startswith("/media/"):
+        r = r[len("/media/"):]
+    return bool(_RE_INGERIDA.match(r))
+
+
+def norm_media(url: str | None, tam: int | None = None) -> str:
+    """
+    URL servible de una ruta de media: las absolutas se dejan como están y
+    las relativas llevan /media/. Con `tam` (px que se van a pintar), las
+    imágenes ingeridas usan la miniatura más pequeña que llegue a ese tamaño.
+    """
+    if not url:
+        return ""
+    u = url.strip()
+    # Si ya es URL absoluta, dejarla como está
+    if u.startswith("http://") or u.startswith("https://"):
+        return u
+    u = u[len("/media/"):] if u.startswith("/media/") else u.lstrip("/")
+    if tam:
+        m = _RE_MINIATURA.match(u)
+        if m:
+            guardado = int(m.group(2))
+            elegido = next((t for t in TAMANOS_IMAGEN if t >= tam), guardado)
+            if elegido < guardado:
+                u = f"{m.group(1)}_{elegido}.webp"
+    return "/media/" + u
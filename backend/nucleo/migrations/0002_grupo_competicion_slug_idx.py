@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nucleo', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='grupo',
+            index=models.Index(fields=['competicion', 'slug'], name='nucleo_grup_competi_df2ed0_idx'),
+        ),
+    ]
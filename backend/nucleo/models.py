@@ -76,3 +76,5 @@ class Grupo(models.Model):
         # El unique_together asegura que no haya grupos duplicados con el mismo slug
         # dentro de la misma competición y temporada. Esto es crucial para las URLs.
         unique_together = ("competicion", "temporada", "slug")
+        # GrupoInfoFullView resuelve competición + slug (y la temporada más reciente)
+        indexes = [models.Index(fields=["competicion", "slug"])]
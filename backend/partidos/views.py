@@ -5,6 +5,7 @@ from rest_framework import status
 from .models import Partido, EventoPartido, AlineacionPartidoJugador
 from staff.models import StaffEnPartido
 from arbitros.models import ArbitrajePartido
+from nucleo.media import norm_media
 from nucleo.models import Grupo
 from clubes.models import Club
 from jugadores.models import Jugador
@@ -25,21 +26,13 @@ class PartidoDetalleView(APIView):
     - Estadísticas agregadas
     """
 
-    def _norm_media(self, path: str | None) -> str:
+    def _norm_media(self, path: str | None, tam: int | None = None) -> str:
         """
         Normaliza rutas de media para asegurar que todas tengan el prefijo /media/ correcto.
         Esto es necesario porque FFCV a veces devuelve rutas relativas sin prefijo.
+        Con `tam`, las imágenes descargadas usan la miniatura de ese tamaño.
         """
-        if not path:
-            return ""
-        path = path.strip()
-        # Si ya es URL absoluta o tiene /media/, dejarla como está
-        if path.startswith("http://") or path.startswith("https://"):
-            return path
-        if path.startswith("/media/"):
-            return path
-        # Añadir prefijo /media/ si falta
-        return "/media/" + path.lstrip("/")
+        return norm_media(path, tam)
 
     def _get_parte(self, minuto: int | None) -> str:
         """
@@ -403,16 +396,9 @@ class PartidosListView(APIView):
     Devuelve lista de partidos con filtros.
     """
 
-    def _norm_media(self, path: str | None) -> str:
+    def _norm_media(self, path: str | None, tam: int | None = None) -> str:
         """Normaliza rutas de media."""
-        if not path:
-            return ""
-        path = path.strip()
-        if path.startswith("http://") or path.startswith("https://"):
-            return path
-        if path.startswith("/media/"):
-            return path
-        return "/media/" + path.lstrip("/")
+        return norm_media(path, tam)
 
     def get(self, request, format=None):
         scope = request.GET.get("scope", "GLOBAL").upper()
@@ -528,8 +514,10 @@ class PartidosListView(APIView):
                         if p.local
                         else ""
                     ),
+                    # El listado pinta el escudo a 44 px: miniatura para 2x
                     "escudo": self._norm_media(
-                        p.local.escudo_url if p.local else None
+                        p.local.escudo_url if p.local else None,
+                        tam=88,
                     ),
                     "slug": getattr(p.local, "slug", None) if p.local else None,
                 },
@@ -541,7 +529,8 @@ class PartidosListView(APIView):
                         else ""
                     ),
                     "escudo": self._norm_media(
-                        p.visitante.escudo_url if p.visitante else None
+                        p.visitante.escudo_url if p.visitante else None,
+                        tam=88,
                     ),
                     "slug": getattr(p.visitante, "slug", None) if p.visitante else None,
                 },
@@ -1,3 +1,11 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import CambioPartido
+
+
+@admin.register(CambioPartido)
+class CambioPartidoAdmin(admin.ModelAdmin):
+    list_display = ("partido", "grupo", "jornada", "alta", "resultado", "eventos", "alineaciones", "estado", "creado_en")
+    list_filter = ("alta", "resultado", "estado")
+    raw_id_fields = ("partido", "grupo", "ejecucion")
+    ordering = ("-id",)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ScrapingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'scraping'
+
+    def ready(self):
+        # Compila config_temporadas y registra su validación en `manage.py check`
+        from scraping.core import registro_config  # noqa: F401
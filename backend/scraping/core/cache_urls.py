@@ -0,0 +1,48 @@
+import hashlib
+
+from django.utils import timezone
+
+from scraping.core.ffcv_urls import url_canonica
+from scraping.models import PaginaDescargada
+
+
+def url_hash(url: str) -> str:
+    # Con el origen real: las pasadas contra el servidor de réplica comparten validadores
+    return hashlib.sha1(url_canonica(url).encode("utf-8")).hexdigest()
+
+
+def cargar_validadores(urls) -> dict:
+    """
+    Devuelve {url: {"etag", "last_modified", "sha256"}} de las URLs ya vistas,
+    en una sola consulta. Es lo que espera fetch_url_conditional como `previo`.
+    """
+    por_hash = {url_hash(u): u for u in urls}
+    out = {}
+    for pag in PaginaDescargada.objects.filter(url_hash__in=list(por_hash.keys())):
+        out[por_hash[pag.url_hash]] = {
+            "etag": pag.etag,
+            "last_modified": pag.last_modified,
+            "sha256": pag.contenido_sha256,
+        }
+    return out
+
+
+def guardar_validadores(resultado: dict):
+    """
+    Guarda los validadores devueltos por fetch_url_conditional.
+    Llamar SOLO después de haber persistido el contenido: si el upsert falla,
+    la próxima pasada debe volver a procesar la página.
+    """
+    defaults = {
+        "url": url_canonica(resultado["url"]),
+        "etag": (resultado.get("etag") or "")[:255],
+        "last_modified": (resultado.get("last_modified") or "")[:100],
+        "contenido_sha256": resultado.get("sha256") or "",
+    }
+    if resultado.get("estado") != "sin_cambios":
+        defaults["ultimo_cambio"] = timezone.now()
+
+    PaginaDescargada.objects.update_or_create(
+        url_hash=url_hash(resultado["url"]),
+        defaults=defaults,
+    )
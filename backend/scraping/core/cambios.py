@@ -0,0 +1,151 @@
+import os
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from partidos.models import Partido
+from scraping.core import telemetria
+from scraping.models import TIPOS_CAMBIO, CambioPartido, ConsumidorCambios
+
+# Registro de cambios del scraping (scraping.models.CambioPartido).
+#
+# Los comandos que escriben partidos (scrape_jornada, scrape_live_jornada)
+# apuntan en un RegistroCambios qué partidos han cambiado y en qué:
+#
+#   alta          partido nuevo en BD
+#   resultado     goles_local / goles_visitante
+#   estado        jugado, fecha, clubs...
+#   eventos       EventoPartido nuevos
+#   alineaciones  AlineacionPartidoJugador nuevas
+#
+# y lo vuelcan dentro de la transacción del lote: si el lote se deshace, el
+# cambio tampoco queda. Los recálculos leen los pares (grupo, jornada)
+# afectados con pendientes(consumidor) y, cuando han terminado, avanzan su
+# cursor con confirmar(); lo que llegue mientras tanto queda para la
+# siguiente vez.
+#
+# Los ids se reservan al insertar, no al confirmar la transacción: un lote
+# aún abierto puede tener ids más bajos que otro ya confirmado. Por eso el
+# cursor solo avanza hasta las filas de hace más de MARGEN_CURSOR (ningún
+# lote dura tanto); las más recientes se devuelven igualmente y se vuelven
+# a dar la siguiente vez (los recálculos son idempotentes).
+TIPOS_CLASIFICACION = ("alta", "resultado", "estado")
+MARGEN_CURSOR = timedelta(minutes=int(os.getenv("SCRAPING_CAMBIOS_MARGEN_MIN", "10")))
+
+
+class RegistroCambios:
+    """
+    Cambios de un lote pendientes de volcar.
+
+        registro.marcar(partido.pk, "resultado")
+        registro.marcar(partido.pk, "estado", grupo_id=viejo, jornada=vieja)
+        registro.volcar()  # dentro de la transacción del lote
+
+    Sin grupo_id/jornada se usan los que tenga el partido al volcar.
+    """
+
+    def __init__(self):
+        self._pendientes = defaultdict(set)  # (partido_id, grupo_id | None, jornada | None) -> tipos
+        self.partidos = set()
+        self.pares = set()
+
+    def marcar(self, partido_id, *tipos, grupo_id=None, jornada=None):
+        if tipos:
+            self._pendientes[(partido_id, grupo_id, jornada)].update(tipos)
+
+    def descartar(self):
+        self._pendientes = defaultdict(set)
+
+    def volcar(self) -> int:
+        """
+        Escribe los cambios marcados y vacía el registro. Devuelve cuántas
+        filas de CambioPartido ha creado.
+        """
+        try:
+            if not self._pendientes:
+                return 0
+            sin_par = {pid for pid, g, j in self._pendientes if g is None or j is None}
+            actuales = {
+                pk: (grupo_id, jornada)
+                for pk, grupo_id, jornada in Partido.objects.filter(pk__in=sin_par)
+                .values_list("pk", "grupo_id", "jornada_numero")
+            }
+            por_clave = defaultdict(set)
+            for (pid, grupo_id, jornada), tipos in self._pendientes.items():
+                if grupo_id is None or jornada is None:
+                    grupo_id, jornada = actuales.get(pid, (None, None))
+                if grupo_id is None or jornada is None:
+                    continue
+                por_clave[(pid, grupo_id, jornada)] |= tipos
+
+            ejecucion = telemetria.ejecucion_actual()
+            CambioPartido.objects.bulk_create([
+                CambioPartido(
+                    partido_id=pid, grupo_id=grupo_id, jornada=jornada, ejecucion=ejecucion,
+                    **{t: t in tipos for t in TIPOS_CAMBIO},
+                )
+                for (pid, grupo_id, jornada), tipos in por_clave.items()
+            ], batch_size=500)
+            self.partidos.update(pid for pid, _, _ in por_clave)
+            self.pares.update((g, j) for _, g, j in por_clave)
+            return len(por_clave)
+        finally:
+            self.descartar()
+
+    def format(self) -> str:
+        return f"[cambios] {len(self.partidos)} partidos cambiados en {len(self.pares)} grupo/jornada"
+
+
+def _filtro_tipos(tipos) -> Q:
+    q = Q()
+    for t in tipos or TIPOS_CAMBIO:
+        q |= Q(**{t: True})
+    return q
+
+
+def pares_afectados(cambios) -> dict:
+    """
+    {(grupo_id, jornada): {tipos}} de un queryset de CambioPartido.
+    """
+    pares = defaultdict(set)
+    for fila in cambios.values("grupo_id", "jornada", *TIPOS_CAMBIO):
+        pares[(fila["grupo_id"], fila["jornada"])].update(t for t in TIPOS_CAMBIO if fila[t])
+    return dict(pares)
+
+
+def pendientes(consumidor: str, tipos=None, grupos=None) -> tuple[dict, int]:
+    """
+    Pares (grupo, jornada) con cambios de `tipos` que `consumidor` aún no ha
+    procesado, y el id hasta el que confirmar cuando termine (el de la
+    última fila de hace más de MARGEN_CURSOR: las posteriores se repiten).
+    grupos: limita a esos ids de grupo (los demás cambios se dan igualmente
+    por vistos al confirmar).
+    """
+    desde = (
+        ConsumidorCambios.objects.filter(nombre=consumidor).values_list("ultimo_cambio_id", flat=True).first()
+        or 0
+    )
+    hasta = CambioPartido.objects.filter(
+        id__gt=desde, creado_en__lt=timezone.now() - MARGEN_CURSOR,
+    ).aggregate(m=Max("id"))["m"] or desde
+    cambios = CambioPartido.objects.filter(id__gt=desde).filter(_filtro_tipos(tipos))
+    if grupos is not None:
+        cambios = cambios.filter(grupo_id__in=grupos)
+    return pares_afectados(cambios), hasta
+
+
+def confirmar(consumidor: str, hasta_id: int):
+    """
+    Avanza el cursor de `consumidor` (nunca hacia atrás).
+    """
+    obj, _ = ConsumidorCambios.objects.get_or_create(nombre=consumidor)
+    if hasta_id > obj.ultimo_cambio_id:
+        obj.ultimo_cambio_id = hasta_id
+        obj.save(update_fields=["ultimo_cambio_id", "actualizado_en"])
+
+
+def purgar(dias: int) -> int:
+    borrados, _ = CambioPartido.objects.filter(creado_en__lt=timezone.now() - timedelta(days=dias)).delete()
+    return borrados
@@ -0,0 +1,237 @@
+import os
+import socket
+import traceback
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Max
+from django.utils import timezone
+
+from scraping.core.fetch_engine import DEFAULT_RPS
+from scraping.models import TareaScraping
+
+# Cola de trabajo persistente (TareaScraping) para los scrapes de horas.
+#
+#   encolar()  da de alta las tareas del recorrido completo. Es idempotente:
+#              las que ya existen (hechas o no) se dejan como están, así que
+#              volver a lanzar el comando continúa donde se quedó.
+#   drenar()   reclama tareas pendientes en orden y las ejecuta. Varios
+#              procesos pueden drenar la misma cola a la vez: la reclamación
+#              usa SELECT ... FOR UPDATE SKIP LOCKED (MySQL 8) y un UPDATE
+#              condicionado, así que una tarea nunca la cogen dos procesos.
+#
+# Estados: pendiente → en_curso → hecha | (pendiente otra vez si quedan
+# intentos) | fallida. Una tarea en_curso de un proceso que murió vuelve a
+# pendiente cuando lleva más de TIMEOUT sin terminar.
+#
+# Ritmo global: el presupuesto --rps-global se reparte entre los trabajadores
+# activos de la cola (los que tienen una tarea en curso), de modo que con N
+# procesos FFCV sigue viendo como mucho rps-global peticiones/segundo.
+MAX_INTENTOS = int(os.getenv("SCRAPING_COLA_MAX_INTENTOS", "3"))
+TIMEOUT = timedelta(minutes=int(os.getenv("SCRAPING_COLA_TIMEOUT_MIN", "60")))
+
+
+def nombre_trabajador() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def encolar(cola: str, tareas) -> int:
+    """
+    tareas: iterable de (clave, params). Devuelve cuántas eran nuevas.
+    """
+    base = (TareaScraping.objects.filter(cola=cola).aggregate(m=Max("orden"))["m"] or 0) + 1
+    objs = [
+        TareaScraping(cola=cola, clave=clave, params=params, orden=base + i)
+        for i, (clave, params) in enumerate(tareas)
+    ]
+    antes = TareaScraping.objects.filter(cola=cola).count()
+    TareaScraping.objects.bulk_create(objs, batch_size=500, ignore_conflicts=True)
+    return TareaScraping.objects.filter(cola=cola).count() - antes
+
+
+def reiniciar(cola: str) -> int:
+    borradas, _ = TareaScraping.objects.filter(cola=cola).delete()
+    return borradas
+
+
+def reintentar_fallidas(cola: str) -> int:
+    return TareaScraping.objects.filter(cola=cola, estado="fallida").update(
+        estado="pendiente", intentos=0, ultimo_error=""
+    )
+
+
+def recuperar_huerfanas(cola: str, timeout: timedelta = TIMEOUT) -> int:
+    """
+    Devuelve a pendiente las tareas en_curso de procesos que ya no están
+    (más de `timeout` sin terminar). timeout=0: todas las en_curso.
+    """
+    limite = timezone.now() - timeout
+    return TareaScraping.objects.filter(cola=cola, estado="en_curso", iniciada_en__lte=limite).update(
+        estado="pendiente"
+    )
+
+
+def reclamar(cola: str, trabajador: str, n: int = 1) -> list[TareaScraping]:
+    """
+    Marca como en_curso (para `trabajador`) hasta n tareas pendientes, en orden.
+    """
+    with transaction.atomic():
+        ids = list(
+            TareaScraping.objects.select_for_update(skip_locked=True)
+            .filter(cola=cola, estado="pendiente")
+            .order_by("orden")
+            .values_list("pk", flat=True)[:n]
+        )
+        if not ids:
+            return []
+        # Condicionado al estado: sin FOR UPDATE (SQLite) otro proceso pudo adelantarse
+        TareaScraping.objects.filter(pk__in=ids, estado="pendiente").update(
+            estado="en_curso",
+            intentos=F("intentos") + 1,
+            iniciada_en=timezone.now(),
+            terminada_en=None,
+            trabajador=trabajador,
+        )
+        return list(TareaScraping.objects.filter(pk__in=ids, trabajador=trabajador, estado="en_curso").order_by("orden"))
+
+
+def completar(tarea: TareaScraping):
+    tarea.estado = "hecha"
+    tarea.terminada_en = timezone.now()
+    tarea.ultimo_error = ""
+    tarea.save(update_fields=["estado", "terminada_en", "ultimo_error"])
+
+
+def fallar(tarea: TareaScraping, error: str, max_intentos: int = MAX_INTENTOS):
+    """
+    Vuelve a pendiente si le quedan intentos; si no, fallida.
+    """
+    tarea.estado = "pendiente" if tarea.intentos < max_intentos else "fallida"
+    tarea.terminada_en = timezone.now()
+    tarea.ultimo_error = error[-4000:]
+    tarea.save(update_fields=["estado", "terminada_en", "ultimo_error"])
+
+
+def trabajadores_activos(cola: str, trabajador: str) -> int:
+    otros = set(
+        TareaScraping.objects.filter(cola=cola, estado="en_curso")
+        .exclude(trabajador=trabajador)
+        .values_list("trabajador", flat=True)
+        .distinct()
+    )
+    return len(otros) + 1
+
+
+def rps_trabajador(cola: str, trabajador: str, rps_global: float) -> float:
+    """
+    Parte del presupuesto global de peticiones/segundo que toca a este proceso.
+    """
+    return rps_global / trabajadores_activos(cola, trabajador)
+
+
+def resumen(cola: str) -> dict:
+    cuenta = dict.fromkeys(("pendiente", "en_curso", "hecha", "fallida"), 0)
+    for estado in TareaScraping.objects.filter(cola=cola).values_list("estado", flat=True):
+        cuenta[estado] += 1
+    return cuenta
+
+
+def format_resumen(cola: str) -> str:
+    c = resumen(cola)
+    total = sum(c.values())
+    return (
+        f"[cola {cola}] {c['hecha']}/{total} hechas · {c['pendiente']} pendientes · "
+        f"{c['en_curso']} en curso · {c['fallida']} fallidas"
+    )
+
+
+def drenar(cola: str, ejecutar, trabajador: str | None = None, lote: int = 1, log=None) -> dict:
+    """
+    Reclama y ejecuta tareas hasta vaciar la cola.
+
+    ejecutar(tareas) recibe la lista reclamada (hasta `lote`) y devuelve
+    {pk: None | "mensaje de error"}; las que no aparezcan se dan por hechas.
+    Si ejecutar() lanza, fallan todas las del lote.
+    """
+    trabajador = trabajador or nombre_trabajador()
+    stats = {"hechas": 0, "reintentos": 0, "fallidas": 0}
+    while True:
+        tareas = reclamar(cola, trabajador, lote)
+        if not tareas:
+            return stats
+        try:
+            errores = ejecutar(tareas) or {}
+        except KeyboardInterrupt:
+            # Parada manual: lo reclamado vuelve a la cola sin gastar intento
+            TareaScraping.objects.filter(pk__in=[t.pk for t in tareas], estado="en_curso").update(
+                estado="pendiente", intentos=F("intentos") - 1
+            )
+            raise
+        except Exception:
+            err = traceback.format_exc()
+            errores = {t.pk: err for t in tareas}
+        for t in tareas:
+            err = errores.get(t.pk)
+            if err is None:
+                completar(t)
+                stats["hechas"] += 1
+            else:
+                fallar(t, err)
+                stats["fallidas" if t.estado == "fallida" else "reintentos"] += 1
+                if log:
+                    log(f"[cola {cola}] {t.clave}: intento {t.intentos} fallido → {t.estado}")
+
+
+def add_cola_arguments(parser):
+    parser.add_argument(
+        "--solo-encolar",
+        action="store_true",
+        help="Solo da de alta las tareas en la cola (luego se drena con --solo-drenar, en uno o varios procesos)",
+    )
+    parser.add_argument(
+        "--solo-drenar",
+        action="store_true",
+        help="No encola: solo procesa tareas pendientes (para lanzar trabajadores extra en paralelo)",
+    )
+    parser.add_argument(
+        "--reiniciar",
+        action="store_true",
+        help="Borra la cola y empieza el recorrido desde cero",
+    )
+    parser.add_argument(
+        "--reintentar-fallidas",
+        action="store_true",
+        help="Devuelve a pendiente las tareas fallidas (intentos a 0)",
+    )
+    parser.add_argument(
+        "--recuperar-en-curso",
+        action="store_true",
+        help=f"Devuelve a pendiente todas las tareas en curso (si no hay otro proceso drenando). "
+             f"Sin esto solo las que llevan más de {int(TIMEOUT.total_seconds() // 60)} min",
+    )
+    parser.add_argument(
+        "--rps-global",
+        type=float,
+        default=DEFAULT_RPS,
+        help=f"Peticiones/segundo contra FFCV entre TODOS los procesos que drenan la cola "
+             f"(por defecto: {DEFAULT_RPS}, o SCRAPING_RPS)",
+    )
+
+
+def preparar_cola(cola: str, options, tareas_fn, log) -> bool:
+    """
+    Aplica --reiniciar / --reintentar-fallidas / --recuperar-en-curso y encola
+    (salvo --solo-drenar). tareas_fn() genera los (clave, params).
+    Devuelve False si no hay que drenar (--solo-encolar).
+    """
+    if options.get("reiniciar"):
+        log(f"[cola {cola}] Reiniciada: {reiniciar(cola)} tareas borradas")
+    if options.get("reintentar_fallidas"):
+        log(f"[cola {cola}] {reintentar_fallidas(cola)} tareas fallidas vuelven a pendiente")
+    recuperadas = recuperar_huerfanas(cola, timedelta(0) if options.get("recuperar_en_curso") else TIMEOUT)
+    if recuperadas:
+        log(f"[cola {cola}] {recuperadas} tareas en curso huérfanas vuelven a pendiente")
+    if not options.get("solo_drenar"):
+        log(f"[cola {cola}] {encolar(cola, tareas_fn())} tareas nuevas encoladas")
+    log(format_resumen(cola))
+    return not options.get("solo_encolar")
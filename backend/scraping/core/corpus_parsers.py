@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+import re
+from urllib.parse import urlparse, parse_qs
+
+from scraping.core import parser_lxml
+from scraping.core.config_temporadas import TEMPORADAS
+from scraping.core.parser_equipo_plantilla import parse_equipo_plantilla
+from scraping.core.parser_jugador_ficha import parse_jugador_ficha
+from scraping.core.parser_partido_detalle import parse_partido_detalle
+from scraping.core.parser_partidos import parse_jornada_partidos
+
+# Corpus de regresión para los parsers de scraping/core.
+#
+# Las páginas salen del archivo raw (o de un directorio de .html sueltos) y se
+# identifican por el sha256 de su contenido. Para cada página se guarda una
+# salida "golden" en JSON; el comando bench_parsers compara contra ella
+# cualquier backend/cambio de parser y mide su velocidad y memoria.
+
+# tipo -> {backend: función(html, **kwargs)}
+PARSERS = {
+    "jornada_partidos": {"bs4": parse_jornada_partidos, "lxml": parser_lxml.parse_jornada_partidos},
+    "partido_detalle": {"bs4": parse_partido_detalle, "lxml": parser_lxml.parse_partido_detalle},
+    "equipo_plantilla": {"bs4": parse_equipo_plantilla},
+    "jugador_ficha": {"bs4": parse_jugador_ficha},
+}
+
+DEFAULT_GOLDEN_DIR = os.path.join("data_clean", "golden_parsers")
+
+# Página de FFCV -> tipo de parser
+_TIPO_POR_PAGINA = {
+    "total_partidos.php": "jornada_partidos",
+    "partido.php": "partido_detalle",
+    "equipo_plantilla.php": "equipo_plantilla",
+    "jugador_ficha.php": "jugador_ficha",
+}
+
+# Nombres de los .html antiguos de data_raw (ver comandos scrape_*)
+_TIPO_POR_NOMBRE = [
+    (re.compile(r"_partido_\d+\.html$|_P\d+_LIVE\.html$"), "partido_detalle"),
+    (re.compile(r"_jornada_\d+\.html$|_J\d+_LIVE\.html$"), "jornada_partidos"),
+    (re.compile(r"_equipo_\d+\.html$"), "equipo_plantilla"),
+    (re.compile(r"^(?P<temporada>\d{4}-\d{4})_jugador_(?P<jugador>\d+)\.html$"), "jugador_ficha"),
+]
+
+
+class Pagina:
+    """
+    Una página del corpus: tipo de parser, HTML, sha256 y kwargs extra del parser.
+    """
+
+    __slots__ = ("tipo", "origen", "html", "sha256", "kwargs")
+
+    def __init__(self, tipo: str, origen: str, html: str, sha256: str, kwargs: dict | None = None):
+        self.tipo = tipo
+        self.origen = origen
+        self.html = html
+        self.sha256 = sha256
+        self.kwargs = kwargs or {}
+
+
+def _tipo_de_url(url: str):
+    """
+    Devuelve (tipo, kwargs) para una URL de FFCV, o (None, None) si no hay parser.
+    """
+    u = urlparse(url)
+    tipo = _TIPO_POR_PAGINA.get(os.path.basename(u.path))
+    if tipo != "jugador_ficha":
+        return tipo, ({} if tipo else None)
+    qs = parse_qs(u.query)
+    try:
+        return tipo, {"jugador_id": int(qs["id_jugador"][0]), "id_temp": int(qs["id_temp"][0])}
+    except (KeyError, ValueError, IndexError):
+        return None, None
+
+
+def _tipo_de_fichero(nombre: str):
+    for patron, tipo in _TIPO_POR_NOMBRE:
+        m = patron.search(nombre)
+        if not m:
+            continue
+        if tipo != "jugador_ficha":
+            return tipo, {}
+        cfg = TEMPORADAS.get(m.group("temporada"))
+        if not cfg:
+            return None, None
+        return tipo, {"jugador_id": int(m.group("jugador")), "id_temp": cfg["id_temp"]}
+    return None, None
+
+
+def iter_corpus_archivo(archivo, tipos=None):
+    """
+    Páginas del archivo raw: cada contenido distinto (sha256) una sola vez,
+    en la primera descarga en que aparece (el índice va en orden
+    cronológico). Las versiones distintas de una misma URL entran todas.
+    Las entradas 'file:...' importadas de data_raw se clasifican por nombre.
+    """
+    vistos = set()
+    for d in archivo.iter_descargas():
+        if d["sha256"] in vistos:
+            continue
+        if d["url"].startswith("file:"):
+            tipo, kwargs = _tipo_de_fichero(os.path.basename(d["url"]))
+        else:
+            tipo, kwargs = _tipo_de_url(d["url"])
+        if not tipo or (tipos and tipo not in tipos):
+            continue
+        vistos.add(d["sha256"])
+        body = archivo.get_blob(d["sha256"])
+        html = body.decode(d["encoding"] or "utf-8", errors="replace")
+        yield Pagina(tipo, d["url"], html, d["sha256"], kwargs)
+
+
+def iter_corpus_directorio(raiz: str, tipos=None):
+    """
+    Páginas a partir de .html sueltos (formato antiguo de data_raw).
+    """
+    vistos = set()
+    for dirpath, _dirs, files in os.walk(raiz):
+        for name in sorted(files):
+            tipo, kwargs = _tipo_de_fichero(name)
+            if not tipo or (tipos and tipo not in tipos):
+                continue
+            path = os.path.join(dirpath, name)
+            with open(path, "rb") as f:
+                body = f.read()
+            sha256 = hashlib.sha256(body).hexdigest()
+            if sha256 in vistos:
+                continue
+            vistos.add(sha256)
+            yield Pagina(tipo, path, body.decode("utf-8", errors="replace"), sha256, kwargs)
+
+
+# --------------------
+# Golden
+# --------------------
+def golden_path(golden_dir: str, pagina: Pagina) -> str:
+    return os.path.join(golden_dir, pagina.tipo, f"{pagina.sha256}.json")
+
+
+def normalizar(salida):
+    # Lo mismo que se guarda en disco (tuplas -> listas, claves str, ...)
+    return json.loads(json.dumps(salida, ensure_ascii=False))
+
+
+def cargar_golden(golden_dir: str, pagina: Pagina):
+    path = golden_path(golden_dir, pagina)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def guardar_golden(golden_dir: str, pagina: Pagina, salida):
+    path = golden_path(golden_dir, pagina)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(salida, f, indent=2, ensure_ascii=False, sort_keys=True)
+
+
+def primera_diferencia(a, b, ruta: str = "$"):
+    """
+    Ruta (estilo JSONPath) del primer valor distinto entre a y b, o None si son iguales.
+    """
+    if type(a) is not type(b):
+        return f"{ruta}: {a!r} != {b!r}"
+    if isinstance(a, dict):
+        for k in sorted(set(a) | set(b)):
+            if k not in a or k not in b:
+                return f"{ruta}.{k}: falta en {'golden' if k not in a else 'salida'}"
+            d = primera_diferencia(a[k], b[k], f"{ruta}.{k}")
+            if d:
+                return d
+        return None
+    if isinstance(a, list):
+        for i, (x, y) in enumerate(zip(a, b)):
+            d = primera_diferencia(x, y, f"{ruta}[{i}]")
+            if d:
+                return d
+        if len(a) != len(b):
+            return f"{ruta}: longitud {len(a)} != {len(b)}"
+        return None
+    return None if a == b else f"{ruta}: {a!r} != {b!r}"
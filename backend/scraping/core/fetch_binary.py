@@ -1,14 +1,34 @@
-import requests
 import os
+import time
+
+from scraping.core import replay, telemetria
+from scraping.core.http_client import get_session
+
+def descargar_binario(url: str) -> bytes:
+    """
+    Descarga un recurso binario (png, jpg...) y devuelve sus bytes.
+    En modo offline no hay imágenes archivadas: falla y quien llame lo salta.
+    """
+    if replay.offline():
+        raise replay.PaginaNoArchivada(f"{url}: sin binarios en modo offline")
+    t0 = time.perf_counter()
+    try:
+        resp = get_session().get(url, timeout=15)
+        resp.raise_for_status()
+    except Exception as e:
+        telemetria.descarga(url, getattr(getattr(e, "response", None), "status_code", None), 0,
+                            time.perf_counter() - t0, error=str(e))
+        raise
+    telemetria.descarga(url, resp.status_code, len(resp.content), time.perf_counter() - t0)
+    return resp.content
 
 def fetch_binary(url: str, out_path: str):
     """
     Descarga un recurso binario (png, jpg...) y lo guarda tal cual.
     No hace prints ruidosos, eso lo hace quien llame.
     """
-    resp = requests.get(url, timeout=15)
-    resp.raise_for_status()
+    contenido = descargar_binario(url)
 
     os.makedirs(os.path.dirname(out_path), exist_ok=True)
     with open(out_path, "wb") as f:
-        f.write(resp.content)
+        f.write(contenido)
@@ -0,0 +1,288 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from scraping.core import replay
+from scraping.core.fetcher import fetch_html, fetch_url, fetch_url_conditional
+from scraping.core.fetch_binary import fetch_binary
+
+# Motor de descargas con concurrencia acotada y ritmo por host.
+#
+# Antes la cortesía con FFCV se hacía con time.sleep bloqueantes después de cada
+# petición, así que una temporada se bajaba página a página y casi siempre no
+# había nada en vuelo. Aquí el ritmo lo marca un token bucket por host
+# (peticiones/segundo de media) y un semáforo limita cuántas peticiones hay
+# abiertas a la vez contra ese host. Mientras un hilo espera a la red, el hilo
+# principal sigue parseando y escribiendo en BD.
+#
+# Los buckets son de proceso: si scrape_todo llama a scrape_jornada 200 veces,
+# todas las llamadas comparten el mismo presupuesto contra resultadosffcv.isquad.es.
+# El semáforo de un host también: se queda el primero que se crea, porque
+# cambiarlo mientras otro motor tiene peticiones en vuelo con el anterior
+# dejaría dos topes independientes contra el mismo host.
+
+logger = logging.getLogger(__name__)
+
+# Lo que FFCV veía antes del motor: 1 s de sleep tras cada respuesta, más lo
+# que tarda la propia petición y las pausas de 3 s entre páginas, ≈0.3 pet/s.
+# Subirlo es decisión de quien lanza el comando (--rps o SCRAPING_RPS).
+DEFAULT_RPS = float(os.getenv("SCRAPING_RPS", "0.3"))
+DEFAULT_MAX_IN_FLIGHT = 2
+# En modo offline no hay servidor al que cuidar: el ritmo no debe falsear las medidas
+OFFLINE_RPS = 1_000_000.0
+
+
+class TokenBucket:
+    """
+    Token bucket thread-safe: `rate` tokens por segundo, hasta `capacity` acumulados.
+    acquire() bloquea lo justo para respetar la media.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = float(rate)
+        self.capacity = max(float(capacity), 1.0)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def configure(self, rate: float, capacity: float = 1.0):
+        with self._lock:
+            self.rate = float(rate)
+            self.capacity = max(float(capacity), 1.0)
+            self._tokens = min(self._tokens, self.capacity)
+
+    def acquire(self) -> float:
+        """
+        Consume un token. Devuelve los segundos que ha tenido que esperar.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return waited
+                falta = (1.0 - self._tokens) / self.rate if self.rate > 0 else 1.0
+            time.sleep(falta)
+            waited += falta
+
+
+_registry_lock = threading.Lock()
+_buckets: dict[str, TokenBucket] = {}
+_semaphores: dict[str, tuple[int, threading.BoundedSemaphore]] = {}
+_avisos_semaforo: set = set()
+
+
+def get_bucket(host: str, rps: float, burst: float = 1.0) -> TokenBucket:
+    with _registry_lock:
+        bucket = _buckets.get(host)
+        if bucket is None:
+            bucket = _buckets[host] = TokenBucket(rps, burst)
+        elif bucket.rate != rps or bucket.capacity != max(burst, 1.0):
+            bucket.configure(rps, burst)
+        return bucket
+
+
+def get_host_semaphore(host: str, max_in_flight: int) -> threading.BoundedSemaphore:
+    with _registry_lock:
+        entry = _semaphores.get(host)
+        if entry is None:
+            entry = _semaphores[host] = (max_in_flight, threading.BoundedSemaphore(max_in_flight))
+        elif entry[0] != max_in_flight and (host, max_in_flight) not in _avisos_semaforo:
+            _avisos_semaforo.add((host, max_in_flight))
+            logger.warning(
+                "max_in_flight=%s ignorado para %s: el proceso ya limita ese host a %s",
+                max_in_flight, host, entry[0],
+            )
+        return entry[1]
+
+
+class FetchEngine:
+    """
+    Pool de hilos para descargas con:
+      - rps: presupuesto medio de peticiones/segundo por host
+      - max_in_flight: peticiones simultáneas máximas por host
+      - retries: reintentos ante error (esperando retry_wait segundos entre intentos)
+
+    Uso típico:
+        with FetchEngine(rps=0.3, max_in_flight=2) as engine:
+            for key, html, error in engine.iter_ordered(tareas):
+                ...parsear y guardar mientras siguen las descargas...
+    """
+
+    def __init__(
+        self,
+        rps: float = DEFAULT_RPS,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        burst: float = 1.0,
+        retries: int = 1,
+        retry_wait: float = 3.0,
+        max_workers: int | None = None,
+    ):
+        self.rps = rps
+        self.max_in_flight = max(int(max_in_flight), 1)
+        self.burst = burst
+        self.retries = max(int(retries), 0)
+        self.retry_wait = retry_wait
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or self.max_in_flight * 2,
+            thread_name_prefix="fetch",
+        )
+        self.stats = {"ok": 0, "fallidas": 0, "reintentos": 0, "espera_ritmo_s": 0.0}
+        self._stats_lock = threading.Lock()
+
+    # --------------------
+    # Ciclo de vida
+    # --------------------
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(cancel=exc_type is not None)
+
+    def close(self, cancel: bool = False):
+        self._executor.shutdown(wait=True, cancel_futures=cancel)
+
+    # --------------------
+    # Ejecución
+    # --------------------
+    def _run(self, fn, url: str, *args, **kwargs):
+        host = urlparse(url).hostname or ""
+        bucket = get_bucket(host, self.rps, self.burst)
+        sem = get_host_semaphore(host, self.max_in_flight)
+
+        intento = 0
+        while True:
+            waited = bucket.acquire()
+            try:
+                with sem:
+                    result = fn(url, *args, **kwargs)
+            except replay.PaginaNoArchivada:
+                # Offline: lo que no está en el archivo no aparece reintentando
+                with self._stats_lock:
+                    self.stats["espera_ritmo_s"] += waited
+                    self.stats["fallidas"] += 1
+                raise
+            except Exception:
+                ultimo = intento >= self.retries
+                with self._stats_lock:
+                    self.stats["espera_ritmo_s"] += waited
+                    self.stats["fallidas" if ultimo else "reintentos"] += 1
+                if ultimo:
+                    raise
+                intento += 1
+                # La espera entre intentos no ocupa hueco de "en vuelo"
+                time.sleep(self.retry_wait)
+                continue
+
+            with self._stats_lock:
+                self.stats["espera_ritmo_s"] += waited
+                self.stats["ok"] += 1
+            return result
+
+    def submit(self, fn, url: str, *args, **kwargs):
+        """
+        Programa fn(url, *args, **kwargs) respetando el ritmo del host de `url`.
+        Devuelve un Future.
+        """
+        return self._executor.submit(self._run, fn, url, *args, **kwargs)
+
+    def fetch_url(self, url: str, save_path: str):
+        # El ritmo lo pone el bucket; no hace falta dormir después de cada petición
+        return self.submit(fetch_url, url, save_path, sleep_after=0)
+
+    def fetch_html(self, url: str, save_path: str | None = None):
+        return self.submit(fetch_html, url, save_path, sleep_after=0)
+
+    def fetch_url_conditional(self, url: str, save_path: str | None = None, previo: dict | None = None):
+        return self.submit(fetch_url_conditional, url, save_path, previo, sleep_after=0)
+
+    def fetch_binary(self, url: str, out_path: str):
+        return self.submit(fetch_binary, url, out_path)
+
+    def iter_ordered_futures(self, tareas, lanzar, ventana: int = 16):
+        """
+        Base de iter_ordered*: tareas (clave, *args) → lanzar(*args) devuelve un
+        Future. Rinde (clave, resultado, error) en orden de entrada con como
+        mucho `ventana` futures pendientes (backpressure hacia quien produce).
+        """
+        pendientes = deque()
+        it = iter(tareas)
+        agotado = False
+
+        while True:
+            while not agotado and len(pendientes) < max(ventana, 1):
+                try:
+                    tarea = next(it)
+                except StopIteration:
+                    agotado = True
+                    break
+                pendientes.append((tarea[0], lanzar(*tarea[1:])))
+
+            if not pendientes:
+                return
+
+            clave, fut = pendientes.popleft()
+            try:
+                yield clave, fut.result(), None
+            except Exception as e:
+                yield clave, None, e
+
+    def iter_ordered(self, tareas, ventana: int = 16):
+        """
+        tareas: iterable de (clave, url, save_path)
+        Rinde (clave, html, error) en el MISMO orden de entrada, manteniendo
+        como mucho `ventana` descargas programadas por delante del consumidor.
+        error es None si la descarga fue bien, o la excepción final si falló.
+        save_path solo se usa como copia suelta de depuración (ver fetch_html).
+        """
+        return self.iter_ordered_futures(tareas, self.fetch_html, ventana)
+
+    def iter_ordered_conditional(self, tareas, ventana: int = 16):
+        """
+        tareas: iterable de (clave, url, save_path, previo)
+        Rinde (clave, resultado, error) en orden, donde resultado es el dict de
+        fetch_url_conditional (estado "nuevo" / "cambiado" / "sin_cambios", html).
+        """
+        return self.iter_ordered_futures(tareas, self.fetch_url_conditional, ventana)
+
+    def format_stats(self) -> str:
+        s = self.stats
+        return (
+            f"[fetch] ok={s['ok']} · fallidas={s['fallidas']} · reintentos={s['reintentos']} · "
+            f"espera por ritmo={s['espera_ritmo_s']:.1f}s (rps={self.rps}, max_in_flight={self.max_in_flight})"
+        )
+
+
+def add_engine_arguments(parser):
+    """
+    Argumentos comunes de ritmo para los comandos que usan FetchEngine.
+    """
+    parser.add_argument(
+        "--rps",
+        type=float,
+        default=None,
+        help=f"Peticiones/segundo de media contra FFCV (por defecto: {DEFAULT_RPS}, o SCRAPING_RPS; "
+             f"sin límite con --offline)",
+    )
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=DEFAULT_MAX_IN_FLIGHT,
+        help=f"Peticiones simultáneas máximas contra FFCV (por defecto: {DEFAULT_MAX_IN_FLIGHT})",
+    )
+    replay.add_replay_arguments(parser)
+
+
+def engine_from_options(options) -> FetchEngine:
+    replay.replay_from_options(options)
+    return FetchEngine(
+        rps=options.get("rps") or (OFFLINE_RPS if replay.offline() else DEFAULT_RPS),
+        max_in_flight=options.get("max_in_flight") or DEFAULT_MAX_IN_FLIGHT,
+    )
@@ -1,6 +1,13 @@
+import codecs
+import hashlib
 import os
+import re
 import time
-import requests
+
+from scraping.core import replay, telemetria
+from scraping.core.ffcv_urls import url_canonica
+from scraping.core.http_client import get_session
+from scraping.core.raw_archive import get_archive
 
 # Headers personalizados para simular un navegador real y evitar bloqueos
 # El User-Agent de Chrome es necesario porque FFCV bloquea requests sin User-Agent válido
@@ -20,25 +27,208 @@ BASE_HEADERS = {
     "Referer": "https://resultadosffcv.isquad.es/",
 }
 
-def fetch_url(url: str, save_path: str, sleep_after: float = 1.0) -> str:
+# El HTML crudo va al archivo comprimido (scraping/core/raw_archive.py).
+# Con SCRAPING_RAW_HTML_FILES=1 se deja además una copia suelta en save_path,
+# útil para abrir un acta concreta en el navegador al depurar un parser.
+GUARDAR_HTML_SUELTO = os.getenv("SCRAPING_RAW_HTML_FILES", "0") == "1"
+
+_RE_META_CHARSET = re.compile(rb"""<meta[^>]+charset=["']?([A-Za-z0-9_\-]+)""", re.IGNORECASE)
+
+
+def _fijar_encoding(resp):
     """
-    Descarga una URL y guarda el HTML en disco.
-    Devuelve la ruta final en disco.
+    Si FFCV no manda charset en Content-Type, requests asume ISO-8859-1 y el
+    HTML UTF-8 sale como 'VÃ­ctor' (lo que luego parchea _fix_mojibake campo a
+    campo). Aquí se decodifica una sola vez con el charset que declara el HTML.
+    """
+    if "charset=" in resp.headers.get("Content-Type", "").lower():
+        return
+    m = _RE_META_CHARSET.search(resp.content[:4096])
+    if not m:
+        return
+    try:
+        resp.encoding = codecs.lookup(m.group(1).decode("ascii")).name
+    except LookupError:
+        pass
+
+
+def _guardar_copia(save_path: str, html: str):
+    os.makedirs(os.path.dirname(save_path) or ".", exist_ok=True)
+    with open(save_path, "w", encoding="utf-8") as f:
+        f.write(html)
+
+
+def _get(url: str, headers: dict):
+    """
+    GET con la sesión compartida, midiendo latencia, estado y bytes para la
+    telemetría de la ejecución.
     """
+    t0 = time.perf_counter()
+    try:
+        resp = get_session().get(url, headers=headers, timeout=10)
+    except Exception as e:
+        telemetria.descarga(url, None, 0, time.perf_counter() - t0, error=str(e))
+        raise
+    telemetria.descarga(
+        url, resp.status_code, len(resp.content), time.perf_counter() - t0,
+        error=f"HTTP {resp.status_code}" if resp.status_code >= 400 else "",
+    )
+    return resp
+
+
+def _leer_offline(url: str) -> dict:
+    t0 = time.perf_counter()
+    try:
+        pagina = replay.leer(url)
+    except replay.PaginaNoArchivada as e:
+        telemetria.descarga(url, 404, 0, time.perf_counter() - t0, error=str(e))
+        raise
+    telemetria.descarga(url, 200, len(pagina["html"]), time.perf_counter() - t0)
+    return pagina
+
+
+def _archivar(url: str, resp) -> str:
+    return get_archive().put(
+        url_canonica(url),
+        resp.content,
+        encoding=resp.encoding or "",
+        etag=resp.headers.get("ETag", ""),
+        last_modified=resp.headers.get("Last-Modified", ""),
+    )
+
+
+def fetch_html(url: str, save_path: str | None = None, sleep_after: float = 1.0) -> str:
+    """
+    Descarga una URL, la guarda en el archivo raw y devuelve el HTML como texto.
+    save_path solo se usa si SCRAPING_RAW_HTML_FILES=1.
+    En modo offline (scraping/core/replay.py) lee la copia archivada.
+    """
+    if replay.offline():
+        return _leer_offline(url)["html"]
+
     print(f"[fetch_url] GET {url}")
-    resp = requests.get(url, headers=BASE_HEADERS, timeout=10)
+    resp = _get(url, BASE_HEADERS)
+    _fijar_encoding(resp)
     print(f"[fetch_url] status_code={resp.status_code}")
     print(f"[fetch_url] content_length={len(resp.text)} chars")
 
     resp.raise_for_status()
 
-    # Se guarda en disco para poder revisar el HTML crudo si hay problemas de parsing
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)
-
-    with open(save_path, "w", encoding="utf-8") as f:
-        f.write(resp.text)
+    # Se archiva para poder revisar (o re-parsear) el HTML crudo si hay problemas de parsing
+    _archivar(url, resp)
+    if save_path and GUARDAR_HTML_SUELTO:
+        _guardar_copia(save_path, resp.text)
 
     # Sleep para evitar saturar el servidor de FFCV con requests demasiado rápidos
     time.sleep(sleep_after)
 
+    return resp.text
+
+
+def fetch_url(url: str, save_path: str, sleep_after: float = 1.0) -> str:
+    """
+    Descarga una URL y guarda el HTML en disco (además de en el archivo raw).
+    Devuelve la ruta final en disco.
+
+    Se mantiene para scripts que esperan un fichero; los comandos de scraping
+    usan fetch_html y no generan ficheros sueltos.
+    """
+    html = fetch_html(url, sleep_after=sleep_after)
+    _guardar_copia(save_path, html)
     return save_path
+
+
+def fetch_url_conditional(url: str, save_path: str | None = None, previo: dict | None = None, sleep_after: float = 1.0) -> dict:
+    """
+    Igual que fetch_html pero con GET condicional y hash de contenido.
+
+    previo: validadores guardados de la descarga anterior de esta URL
+            {"etag": ..., "last_modified": ..., "sha256": ...} (o None)
+
+    Solo se mandan If-None-Match / If-Modified-Since si la URL ya está en el
+    archivo raw, para poder devolver el HTML anterior ante un 304.
+    El contenido solo se archiva cuando cambia.
+
+    Devuelve:
+    {
+      "url": ..., "path": save_path, "html": ...,
+      "estado": "nuevo" | "cambiado" | "sin_cambios",
+      "etag": ..., "last_modified": ..., "sha256": ...
+    }
+    """
+    previo = previo or {}
+    if replay.offline():
+        return _conditional_offline(url, save_path, previo)
+
+    archivo = get_archive()
+    headers = dict(BASE_HEADERS)
+    hay_copia = archivo.contiene(url_canonica(url))
+    if hay_copia:
+        if previo.get("etag"):
+            headers["If-None-Match"] = previo["etag"]
+        if previo.get("last_modified"):
+            headers["If-Modified-Since"] = previo["last_modified"]
+
+    print(f"[fetch_url] GET {url}" + (" (condicional)" if len(headers) > len(BASE_HEADERS) else ""))
+    resp = _get(url, headers)
+    _fijar_encoding(resp)
+    print(f"[fetch_url] status_code={resp.status_code}")
+
+    if resp.status_code == 304:
+        time.sleep(sleep_after)
+        return {
+            "url": url,
+            "path": save_path,
+            "html": archivo.get_text(url_canonica(url)),
+            "estado": "sin_cambios",
+            "etag": previo.get("etag", ""),
+            "last_modified": previo.get("last_modified", ""),
+            "sha256": previo.get("sha256", ""),
+        }
+
+    resp.raise_for_status()
+
+    # El hash se calcula sobre los bytes recibidos: si FFCV no manda validadores
+    # (o los cambia sin cambiar el acta) seguimos detectando que no hay cambios.
+    sha256 = hashlib.sha256(resp.content).hexdigest()
+    if hay_copia and previo.get("sha256") == sha256:
+        estado = "sin_cambios"
+    else:
+        estado = "cambiado" if previo.get("sha256") else "nuevo"
+        print(f"[fetch_url] content_length={len(resp.text)} chars")
+        _archivar(url, resp)
+        if save_path and GUARDAR_HTML_SUELTO:
+            _guardar_copia(save_path, resp.text)
+
+    time.sleep(sleep_after)
+
+    return {
+        "url": url,
+        "path": save_path,
+        "html": resp.text,
+        "estado": estado,
+        "etag": resp.headers.get("ETag", ""),
+        "last_modified": resp.headers.get("Last-Modified", ""),
+        "sha256": sha256,
+    }
+
+
+def _conditional_offline(url: str, save_path: str | None, previo: dict) -> dict:
+    """
+    fetch_url_conditional contra el archivo raw: mismo dict de salida, y
+    "sin_cambios" si el sha256 archivado coincide con el de la pasada anterior.
+    """
+    pagina = _leer_offline(url)
+    if previo.get("sha256") == pagina["sha256"]:
+        estado = "sin_cambios"
+    else:
+        estado = "cambiado" if previo.get("sha256") else "nuevo"
+    return {
+        "url": url,
+        "path": save_path,
+        "html": pagina["html"],
+        "estado": estado,
+        "etag": pagina["etag"],
+        "last_modified": pagina["last_modified"],
+        "sha256": pagina["sha256"],
+    }
@@ -0,0 +1,27 @@
+import os
+from urllib.parse import urlencode
+
+# Origen real de FFCV. Las páginas se guardan en el archivo raw (y sus
+# validadores en PaginaDescargada) con URLs de este origen.
+FFCV_ORIGEN = "https://resultadosffcv.isquad.es"
+
+# A dónde se mandan las peticiones. Se cambia para apuntar al servidor local
+# de réplica (comando servidor_ffcv), p.ej. http://127.0.0.1:8765
+FFCV_BASE_URL = os.getenv("SCRAPING_FFCV_BASE_URL", FFCV_ORIGEN).rstrip("/")
+
+
+def ffcv_url(pagina: str, params: dict) -> str:
+    """
+    ffcv_url("partido.php", {...}) -> "<FFCV_BASE_URL>/partido.php?..."
+    """
+    return f"{FFCV_BASE_URL}/{pagina}?{urlencode(params)}"
+
+
+def url_canonica(url: str) -> str:
+    """
+    La misma URL pero con el origen real de FFCV: así una pasada contra el
+    servidor de réplica lee y escribe las mismas entradas del archivo raw.
+    """
+    if FFCV_BASE_URL != FFCV_ORIGEN and url.startswith(FFCV_BASE_URL + "/"):
+        return FFCV_ORIGEN + url[len(FFCV_BASE_URL):]
+    return url
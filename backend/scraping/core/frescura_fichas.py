@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+from datetime import timedelta
+
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from jugadores.models import Jugador
+from partidos.models import AlineacionPartidoJugador
+from scraping.models import FichaJugadorScrapeada
+
+# Qué fichas de jugador hace falta volver a bajar.
+#
+# Cada ficha consultada deja en FichaJugadorScrapeada el sha256 de lo
+# parseado (todas sus temporadas), cuándo se consultó, cuándo cambió y
+# cuántas alineaciones tenía el jugador en BD en ese momento.
+#
+# Las estadísticas de la ficha solo se mueven cuando el jugador juega, así
+# que una ficha se vuelve a pedir si:
+#   - nunca se ha bajado,
+#   - el jugador tiene alineaciones nuevas desde la última consulta, o
+#   - se consultó hace más de REVALIDAR_DIAS (fichajes, fotos...).
+# El resto se salta. Y si al bajarla la huella coincide con la anterior, no
+# se escribe nada en BD.
+#
+# El refresco nocturno (--refresco) se queda solo con las de partidos
+# nuevos (y las nunca bajadas de quien ha jugado en la temporada), del
+# partido más reciente al más antiguo.
+#
+# scrape_jugadores (solo la temporada actual) planifica igual pero con su
+# propia consulta y alineaciones (consulta_actual, apariciones_actual): que
+# haya bajado la temporada actual no dice nada de las anteriores.
+REVALIDAR_DIAS = int(os.getenv("SCRAPING_FICHA_REVALIDAR_DIAS", "14"))
+
+
+def huella(fichas: dict) -> str:
+    """sha256 de las fichas parseadas de un jugador ({temporada: datos})."""
+    return hashlib.sha256(json.dumps(fichas, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()
+
+
+def apariciones(jugadores) -> dict:
+    """
+    {id federación: (nº de alineaciones en BD, fecha del último partido)}
+    para un queryset de Jugador.
+    """
+    out = {}
+    filas = (
+        AlineacionPartidoJugador.objects.filter(jugador__in=jugadores)
+        .values("jugador__identificador_federacion")
+        .annotate(n=Count("id"), ultima=Max("partido__fecha_hora"))
+    )
+    for f in filas:
+        try:
+            out[int(f["jugador__identificador_federacion"])] = (f["n"], f["ultima"])
+        except (TypeError, ValueError):
+            pass
+    return out
+
+
+class PlanFichas:
+    def __init__(self, pendientes, stats):
+        self.pendientes = pendientes  # ids de federación, por prioridad
+        self.stats = stats
+
+    def format_resumen(self) -> str:
+        s = self.stats
+        return (
+            f"[fichas] {len(self.pendientes)} a bajar ({s['partidos_nuevos']} con partidos nuevos · "
+            f"{s['nuevas']} sin bajar nunca · {s['caducadas']} consultadas hace > {s['dias']} días) · "
+            f"{s['saltadas']} saltadas (sin cambios)"
+        )
+
+
+def planificar(candidatos=None, temporada=None, refresco: bool = False,
+               revalidar_dias: int = REVALIDAR_DIAS, actual: bool = False) -> PlanFichas:
+    """
+    candidatos: ids de federación a considerar. Con refresco=True y sin
+    candidatos, los jugadores con alineaciones en `temporada`.
+    actual: plan de scrape_jugadores (solo la temporada actual).
+    """
+    if candidatos is not None:
+        candidatos = list(dict.fromkeys(candidatos))
+        jugadores = Jugador.objects.filter(identificador_federacion__in=[str(i) for i in candidatos])
+    else:
+        jugadores = Jugador.objects.filter(
+            alineaciones_en_partidos__partido__grupo__temporada=temporada
+        ).distinct()
+    vistas = apariciones(jugadores)
+    if candidatos is None:
+        candidatos = list(vistas)
+
+    registros = {
+        r.jugador_federacion: r
+        for r in FichaJugadorScrapeada.objects.filter(jugador_federacion__in=candidatos)
+    }
+    limite = timezone.now() - timedelta(days=revalidar_dias)
+    stats = dict.fromkeys(("partidos_nuevos", "nuevas", "caducadas", "saltadas"), 0)
+    stats["dias"] = revalidar_dias
+    prioridad = []  # (grupo de prioridad, -timestamp del último partido, orden original, id)
+    for orden, fed_id in enumerate(candidatos):
+        n, ultima = vistas.get(fed_id, (0, None))
+        reg = registros.get(fed_id)
+        if reg is None:
+            consulta, antes = None, 0
+        elif actual:
+            consulta, antes = reg.consulta_actual, reg.apariciones_actual
+        else:
+            # Sin huella no se ha bajado entera nunca
+            consulta, antes = (reg.ultima_consulta if reg.contenido_sha256 else None), reg.apariciones
+        if consulta is not None and n > antes:
+            motivo, grupo = "partidos_nuevos", 0
+        elif consulta is None and (not refresco or n):
+            motivo, grupo = "nuevas", 1
+        elif consulta is not None and not refresco and consulta < limite:
+            motivo, grupo = "caducadas", 2
+        else:
+            stats["saltadas"] += 1
+            continue
+        stats[motivo] += 1
+        prioridad.append((grupo, -(ultima.timestamp() if ultima else 0), orden, fed_id))
+    return PlanFichas([fed_id for *_, fed_id in sorted(prioridad)], stats)
+
+
+def registrar_consulta(fed_id: int, sha256: str | None) -> bool:
+    """
+    Apunta la consulta de la ficha de `fed_id`. Devuelve True si el
+    contenido ha cambiado respecto a la anterior (o es la primera).
+
+    sha256=None (scrape_jugadores, que solo baja la temporada actual): se
+    apunta en consulta_actual / apariciones_actual; la consulta, las
+    alineaciones y la huella de todas las temporadas (scrape_jugadores_todos)
+    no se tocan.
+    """
+    ahora = timezone.now()
+    n = AlineacionPartidoJugador.objects.filter(jugador__identificador_federacion=str(fed_id)).count()
+    if sha256 is None:
+        FichaJugadorScrapeada.objects.update_or_create(
+            jugador_federacion=fed_id, defaults={"consulta_actual": ahora, "apariciones_actual": n},
+        )
+        return False
+    reg = FichaJugadorScrapeada.objects.filter(jugador_federacion=fed_id).first()
+    cambiada = reg is None or reg.contenido_sha256 != sha256
+    defaults = {"ultima_consulta": ahora, "apariciones": n, "contenido_sha256": sha256}
+    if cambiada:
+        defaults["ultimo_cambio"] = ahora
+    FichaJugadorScrapeada.objects.update_or_create(jugador_federacion=fed_id, defaults=defaults)
+    return cambiada
+
+
+def sin_cambios(fed_id: int, sha256: str) -> bool:
+    return FichaJugadorScrapeada.objects.filter(jugador_federacion=fed_id, contenido_sha256=sha256).exists()
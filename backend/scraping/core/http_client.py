@@ -0,0 +1,111 @@
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Sesión HTTP compartida por todo el proceso de scraping.
+# Cada acta, plantilla y ficha de FFCV pagaba un handshake TCP+TLS nuevo porque
+# se usaba requests.get a nivel de módulo. Con una única Session y un pool de
+# conexiones keep-alive por host, las peticiones a resultadosffcv.isquad.es
+# reutilizan la misma conexión durante todo un scrape_todo/scrape_semana.
+#
+# El tamaño del pool se puede ajustar con variables de entorno:
+# - SCRAPING_HTTP_POOL_CONNECTIONS: nº de hosts distintos que se mantienen en caché
+# - SCRAPING_HTTP_POOL_SIZE: nº máximo de conexiones abiertas por host
+DEFAULT_POOL_CONNECTIONS = int(os.getenv("SCRAPING_HTTP_POOL_CONNECTIONS", "4"))
+DEFAULT_POOL_SIZE = int(os.getenv("SCRAPING_HTTP_POOL_SIZE", "8"))
+
+_lock = threading.Lock()
+_session = None
+_adapter = None
+
+
+def _crear_sesion(pool_connections: int | None, pool_size: int | None) -> requests.Session:
+    # Con _lock tomado
+    global _session, _adapter
+    if _session is not None:
+        _session.close()
+
+    _adapter = HTTPAdapter(
+        pool_connections=pool_connections or DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize=pool_size or DEFAULT_POOL_SIZE,
+        # Si el pool está lleno esperamos a que quede una conexión libre
+        # en vez de abrir otra nueva (que se descartaría al devolverla).
+        pool_block=True,
+    )
+    _session = requests.Session()
+    _session.mount("https://", _adapter)
+    _session.mount("http://", _adapter)
+    return _session
+
+
+def configurar_sesion(pool_connections: int | None = None, pool_size: int | None = None) -> requests.Session:
+    """
+    (Re)crea la sesión compartida con el tamaño de pool indicado.
+    Si ya existía una sesión se cierra (y con ella sus conexiones abiertas).
+    """
+    with _lock:
+        return _crear_sesion(pool_connections, pool_size)
+
+
+def get_session() -> requests.Session:
+    """
+    Devuelve la sesión HTTP del proceso, creándola la primera vez.
+    La misma sesión la usan fetch_url, fetch_binary y cualquier comando de scraping.
+    """
+    session = _session
+    if session is None:
+        # Los hilos del FetchEngine pueden llegar aquí a la vez: solo el
+        # primero la crea, el resto usa esa (y no cierran la del otro)
+        with _lock:
+            if _session is None:
+                _crear_sesion(None, None)
+            session = _session
+    return session
+
+
+def get_stats() -> dict:
+    """
+    Estadísticas de conexiones por host a partir de los pools de urllib3:
+    {
+      "resultadosffcv.isquad.es": {"peticiones": 120, "conexiones_nuevas": 2, "reutilizadas": 118},
+      ...
+    }
+    Cada conexión nueva implica un handshake TCP(+TLS); el resto son reutilizadas.
+    """
+    stats: dict = {}
+    if _adapter is None:
+        return stats
+
+    pools = _adapter.poolmanager.pools
+    for key in list(pools.keys()):
+        pool = pools.get(key)
+        if pool is None:
+            continue
+        host = pool.host
+        entry = stats.setdefault(host, {"peticiones": 0, "conexiones_nuevas": 0, "reutilizadas": 0})
+        entry["peticiones"] += pool.num_requests
+        entry["conexiones_nuevas"] += pool.num_connections
+
+    for entry in stats.values():
+        entry["reutilizadas"] = max(entry["peticiones"] - entry["conexiones_nuevas"], 0)
+    return stats
+
+
+def format_stats() -> str:
+    """
+    Resumen en una línea por host, pensado para imprimir al final de cada comando.
+    """
+    stats = get_stats()
+    if not stats:
+        return "[http] Sin peticiones en esta ejecución."
+
+    lineas = []
+    for host, s in sorted(stats.items()):
+        pct = (s["reutilizadas"] / s["peticiones"] * 100) if s["peticiones"] else 0.0
+        lineas.append(
+            f"[http] {host}: {s['peticiones']} peticiones · "
+            f"{s['conexiones_nuevas']} handshakes · {s['reutilizadas']} reutilizadas ({pct:.0f}%)"
+        )
+    return "\n".join(lineas)
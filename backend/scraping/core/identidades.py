@@ -0,0 +1,159 @@
+from django.db import transaction
+
+from arbitros.models import ArbitrajePartido
+from clubes.models import Club, ClubEnGrupo
+from jugadores.models import JugadorEnClubTemporada
+from partidos.models import Partido
+
+# Mapa de identidades de la ejecución: identificador_federacion / nombre -> pk.
+#
+# Los mismos clubs, jugadores y árbitros aparecen en decenas de actas de una
+# misma pasada; sin esto cada aparición es otra consulta. Al empezar se
+# precarga lo que ya conocemos de la temporada (unas pocas consultas) y se va
+# completando con lo que se crea o encuentra durante la ejecución.
+#
+# Es de la ejecución: cada comando crea el suyo en handle() (y si scrape_todo /
+# scrape_semana llaman muchas veces a scrape_jornada, cada llamada precarga de
+# nuevo). Así nada de lo que vio una ejecución que se deshizo pasa a la
+# siguiente.
+#
+# Solo se guardan pks y, de los clubs, una copia inmutable de sus columnas:
+# club() / club_por_nombre() devuelven cada vez una instancia nueva, y lo que
+# un comando cambie sobre ella no entra en el mapa hasta que lo registre.
+# Lo registrado se aplica con transaction.on_commit: si el lote se deshace, el
+# mapa no se queda con pks que ya no existen ni con valores que no se guardaron.
+#
+# Tipos:
+#   "club"         id federación -> pk de Club
+#   "club_nombre"  nombre_oficial -> pk de Club
+#   "jugador"      id federación -> pk de Jugador
+#   "arbitro"      nombre -> pk de Arbitro
+TIPOS = ("club", "club_nombre", "jugador", "arbitro")
+
+
+class IdentityMap:
+    def __init__(self):
+        self._mapas = {tipo: {} for tipo in TIPOS}
+        # pk de Club -> valores de sus columnas (en el orden de _CAMPOS_CLUB)
+        self._clubs = {}
+        self._aciertos = dict.fromkeys(TIPOS, 0)
+        self._fallos = dict.fromkeys(TIPOS, 0)
+        self._precargadas = set()
+        self._consultas_precarga = 0
+
+    # -------------------------
+    # PRECARGA
+    # -------------------------
+    def precargar(self, temporada_obj):
+        """
+        Carga clubs, jugadores y árbitros ya vistos en la temporada. Idempotente.
+        """
+        if temporada_obj.pk in self._precargadas:
+            return
+        self._precargadas.add(temporada_obj.pk)
+
+        club_ids = set(
+            ClubEnGrupo.objects.filter(grupo__temporada=temporada_obj).values_list("club_id", flat=True)
+        )
+        for local_id, visit_id in Partido.objects.filter(grupo__temporada=temporada_obj).values_list(
+            "local_id", "visitante_id"
+        ):
+            club_ids.update((local_id, visit_id))
+        for club in Club.objects.filter(pk__in=club_ids):
+            self._guardar_club(_valores_club(club))
+
+        jugadores = self._mapas["jugador"]
+        for fed_id, pk in (
+            JugadorEnClubTemporada.objects.filter(temporada=temporada_obj, jugador__identificador_federacion__isnull=False)
+            .exclude(jugador__nombre="")
+            .values_list("jugador__identificador_federacion", "jugador_id")
+            .distinct()
+        ):
+            jugadores[fed_id] = pk
+
+        arbitros = self._mapas["arbitro"]
+        for nombre, pk in (
+            ArbitrajePartido.objects.filter(partido__grupo__temporada=temporada_obj)
+            .values_list("arbitro__nombre", "arbitro_id")
+            .distinct()
+        ):
+            # get_or_create por nombre se queda con el primero; aquí igual
+            if nombre not in arbitros or pk < arbitros[nombre]:
+                arbitros[nombre] = pk
+
+        self._consultas_precarga += 5
+
+    def _guardar_club(self, valores: tuple):
+        pk = valores[_CAMPOS_CLUB.index(Club._meta.pk.attname)]
+        fed_id = valores[_CAMPOS_CLUB.index("identificador_federacion")]
+        self._clubs[pk] = valores
+        if fed_id:
+            self._mapas["club"][fed_id] = pk
+        self._mapas["club_nombre"].setdefault(valores[_CAMPOS_CLUB.index("nombre_oficial")], pk)
+
+    def _instancia_club(self, pk):
+        valores = self._clubs.get(pk)
+        return None if valores is None else Club.from_db(None, _CAMPOS_CLUB, valores)
+
+    # -------------------------
+    # CONSULTA / REGISTRO
+    # -------------------------
+    def buscar(self, tipo: str, clave):
+        """
+        Devuelve lo registrado para `clave` o None (y cuenta acierto/fallo).
+        """
+        if clave is None:
+            return None
+        valor = self._mapas[tipo].get(clave)
+        if valor is None:
+            self._fallos[tipo] += 1
+        else:
+            self._aciertos[tipo] += 1
+        return valor
+
+    def registrar(self, tipo: str, clave, valor):
+        if clave is None or valor is None:
+            return
+        if tipo in ("club", "club_nombre"):
+            # Los valores de ahora, no la instancia (que el comando puede seguir tocando)
+            valores = _valores_club(valor)
+            transaction.on_commit(lambda: self._guardar_club(valores))
+        else:
+            transaction.on_commit(lambda: self._mapas[tipo].__setitem__(clave, valor))
+
+    def club(self, fed_id, cargar):
+        """
+        Club por id de federación; si no está en el mapa, cargar() (consulta a BD).
+        """
+        fed_id = str(fed_id) if fed_id else None
+        club = self._instancia_club(self.buscar("club", fed_id))
+        if club is None and fed_id:
+            club = cargar()
+            self.registrar("club", fed_id, club)
+        return club
+
+    def club_por_nombre(self, nombre: str, cargar):
+        club = self._instancia_club(self.buscar("club_nombre", nombre))
+        if club is None:
+            club = cargar()
+            self.registrar("club_nombre", nombre, club)
+        return club
+
+    def format_stats(self) -> str:
+        partes = []
+        for tipo in TIPOS:
+            total = self._aciertos[tipo] + self._fallos[tipo]
+            if total:
+                partes.append(f"{tipo} {self._aciertos[tipo]} aciertos / {self._fallos[tipo]} fallos")
+        tamanos = ", ".join(f"{len(m)} {t}" for t, m in self._mapas.items())
+        return (
+            f"[identidades] {' · '.join(partes) or 'sin consultas'} "
+            f"(en mapa: {tamanos}; precarga {self._consultas_precarga} consultas)"
+        )
+
+
+_CAMPOS_CLUB = tuple(f.attname for f in Club._meta.concrete_fields)
+
+
+def _valores_club(club) -> tuple:
+    return tuple(getattr(club, campo) for campo in _CAMPOS_CLUB)
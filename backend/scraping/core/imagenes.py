@@ -0,0 +1,235 @@
+import base64
+import binascii
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import BytesIO
+from typing import NamedTuple
+
+from django.utils import timezone
+
+from nucleo.media import TAMANOS_IMAGEN, ruta_miniatura, ruta_original
+from scraping.core.fetch_binary import descargar_binario
+from scraping.models import ImagenMedia, OrigenImagen
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow es opcional: sin él se deduplica pero no hay miniaturas
+    Image = None
+
+# Ingesta de imágenes (escudos, fotos de jugadores).
+#
+# Antes cada escudo se reescribía en media/escudos/<id>.png en cada pasada y
+# cada foto se bajaba en serie a media/jugadores/<id>.png, aunque cientos de
+# jugadores tengan el mismo placeholder. Aquí:
+#
+#   1) Las URLs ya conocidas (OrigenImagen, verificadas hace menos de
+#      REVALIDAR) no se vuelven a pedir.
+#   2) El resto se bajan en paralelo con el FetchEngine del comando (mismo
+#      ritmo y concurrencia por host que las páginas).
+#   3) Se identifica cada contenido por su sha256: si ya está en ImagenMedia
+#      no se escribe nada. Los nuevos se guardan una vez (img/ab/<sha>.<ext>)
+#      y, con Pillow, se generan las miniaturas WebP de TAMANOS_IMAGEN en un
+#      pool de hilos.
+#
+# Lo que se guarda en escudo_url / foto_url es ImagenMedia.ruta_publica (la
+# miniatura mayor); nucleo.media.norm_media deriva las demás.
+MEDIA_DIR = "media"
+HILOS = int(os.getenv("SCRAPING_IMG_HILOS", "4"))
+REVALIDAR = timedelta(days=int(os.getenv("SCRAPING_IMG_REVALIDAR_DIAS", "30")))
+CALIDAD_WEBP = int(os.getenv("SCRAPING_IMG_CALIDAD_WEBP", "80"))
+
+_FIRMAS = ((b"\x89PNG", "png"), (b"\xff\xd8", "jpg"), (b"GIF8", "gif"))
+
+
+class FuenteImagen(NamedTuple):
+    clave: object  # lo que identifica al dueño (id de jugador, de equipo...)
+    origen: str  # URL http(s) o base64 (con o sin prefijo data:)
+    es_base64: bool = False
+
+
+def formato_imagen(datos: bytes) -> str | None:
+    if datos[:4] == b"RIFF" and datos[8:12] == b"WEBP":
+        return "webp"
+    for firma, fmt in _FIRMAS:
+        if datos.startswith(firma):
+            return fmt
+    return None
+
+
+def _escribir(media_dir: str, ruta: str, datos: bytes):
+    destino = os.path.join(media_dir, ruta)
+    # Direccionado por contenido: si existe, es idéntico
+    if os.path.exists(destino):
+        return
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    tmp = f"{destino}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(datos)
+    os.replace(tmp, destino)
+
+
+def guardar_imagen(sha256: str, datos: bytes, formato: str, tamanos=TAMANOS_IMAGEN,
+                   media_dir: str = MEDIA_DIR) -> dict:
+    """
+    Escribe original y miniaturas; devuelve los campos de ImagenMedia.
+    No toca la BD (se ejecuta en los hilos del pool).
+    """
+    ruta = ruta_original(sha256, formato)
+    _escribir(media_dir, ruta, datos)
+    meta = {
+        "sha256": sha256, "formato": formato, "bytes": len(datos),
+        "ruta": ruta, "ruta_publica": ruta, "ancho": None, "alto": None, "miniaturas": {},
+    }
+    if Image is None:
+        return meta
+
+    with Image.open(BytesIO(datos)) as img:
+        img.load()
+        meta["ancho"], meta["alto"] = img.size
+        base = img if img.mode in ("RGB", "RGBA") else img.convert("RGBA")
+        for tam in tamanos:
+            mini = base.copy()
+            # thumbnail() conserva la proporción y nunca amplía
+            mini.thumbnail((tam, tam), Image.LANCZOS)
+            buf = BytesIO()
+            mini.save(buf, "WEBP", quality=CALIDAD_WEBP, method=6)
+            r = ruta_miniatura(sha256, tam)
+            _escribir(media_dir, r, buf.getvalue())
+            meta["miniaturas"][str(tam)] = {"ruta": r, "ancho": mini.width, "alto": mini.height}
+    if meta["miniaturas"]:
+        meta["ruta_publica"] = meta["miniaturas"][str(max(tamanos))]["ruta"]
+    return meta
+
+
+def _decodificar_base64(origen: str) -> bytes:
+    # "data:image/png;base64,iVBOR..." o el base64 suelto
+    return base64.b64decode(origen.rpartition(",")[2])
+
+
+class IngestaImagenes:
+    """
+    Uso:
+        with IngestaImagenes(engine) as ingesta:
+            rutas = ingesta.ingerir([FuenteImagen(jugador_id, url), ...])
+        # rutas: {clave: ruta_publica}; las que fallan quedan en ingesta.errores
+    """
+
+    def __init__(self, engine, hilos: int = HILOS, tamanos=TAMANOS_IMAGEN,
+                 media_dir: str = MEDIA_DIR, revalidar: timedelta = REVALIDAR):
+        self.engine = engine
+        self.tamanos = tuple(tamanos)
+        self.media_dir = media_dir
+        self.revalidar = revalidar
+        self._pool = ThreadPoolExecutor(max_workers=max(int(hilos), 1), thread_name_prefix="img")
+        self.errores: dict = {}
+        self.stats = {"descargadas": 0, "url_conocida": 0, "repetidas": 0, "nuevas": 0, "fallidas": 0}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+    def _fallo(self, claves, error):
+        for clave in claves:
+            self.errores[clave] = str(error)
+            self.stats["fallidas"] += 1
+
+    def ingerir(self, fuentes) -> dict:
+        ahora = timezone.now()
+        rutas = {}
+        por_url: dict[str, list] = {}
+        contenidos = []  # (claves, url | None, datos)
+
+        for f in fuentes:
+            if not f.origen:
+                continue
+            if f.es_base64:
+                try:
+                    contenidos.append(([f.clave], None, _decodificar_base64(f.origen)))
+                except (binascii.Error, ValueError) as e:
+                    self._fallo([f.clave], f"base64 inválido: {e}")
+            elif f.origen.lower().startswith("http"):
+                por_url.setdefault(f.origen, []).append(f.clave)
+
+        # 1) URLs ya conocidas y recientes
+        conocidas = OrigenImagen.objects.filter(
+            url__in=list(por_url), verificada_en__gte=ahora - self.revalidar
+        ).select_related("imagen")
+        for origen in conocidas:
+            if os.path.exists(os.path.join(self.media_dir, origen.imagen.ruta_publica)):
+                for clave in por_url.pop(origen.url):
+                    rutas[clave] = origen.imagen.ruta_publica
+                    self.stats["url_conocida"] += 1
+
+        # 2) Descargas en paralelo (ritmo y concurrencia del engine)
+        futuros = [(url, claves, self.engine.submit(descargar_binario, url)) for url, claves in por_url.items()]
+        for url, claves, fut in futuros:
+            try:
+                contenidos.append((claves, url, fut.result()))
+                self.stats["descargadas"] += 1
+            except Exception as e:
+                self._fallo(claves, e)
+
+        # 3) Deduplicar por contenido
+        por_sha: dict[str, list] = {}
+        for claves, url, datos in contenidos:
+            sha = hashlib.sha256(datos).hexdigest()
+            por_sha.setdefault(sha, []).append((claves, url, datos))
+
+        imagenes = ImagenMedia.objects.in_bulk(list(por_sha), field_name="sha256")
+        trabajos = []
+        for sha, usos in por_sha.items():
+            if sha in imagenes and os.path.exists(os.path.join(self.media_dir, imagenes[sha].ruta_publica)):
+                continue
+            datos = usos[0][2]
+            formato = formato_imagen(datos)
+            if formato is None:
+                self._fallo([c for claves, _, _ in usos for c in claves], "no es una imagen")
+                continue
+            trabajos.append((sha, self._pool.submit(guardar_imagen, sha, datos, formato, self.tamanos, self.media_dir)))
+
+        nuevas = []
+        for sha, fut in trabajos:
+            try:
+                nuevas.append(fut.result())
+            except Exception as e:
+                usos = por_sha.pop(sha)
+                self._fallo([c for claves, _, _ in usos for c in claves], e)
+        # Si ya estaba en BD y solo faltaban los ficheros, se han reescrito y basta
+        creadas = {m["sha256"] for m in nuevas} - set(imagenes)
+        if creadas:
+            ImagenMedia.objects.bulk_create(
+                [ImagenMedia(**m) for m in nuevas if m["sha256"] in creadas], ignore_conflicts=True
+            )
+            self.stats["nuevas"] += len(creadas)
+            # ignore_conflicts no devuelve pk: se releen (y así vale con otro proceso a la vez)
+            imagenes = ImagenMedia.objects.in_bulk(list(por_sha), field_name="sha256")
+
+        # 4) Resultado y URL → imagen
+        for sha, usos in por_sha.items():
+            imagen = imagenes.get(sha)
+            if imagen is None:
+                continue
+            for i, (claves, url, _) in enumerate(usos):
+                for clave in claves:
+                    rutas[clave] = imagen.ruta_publica
+                # Todo lo que no es la primera aparición de un contenido nuevo no ha escrito nada
+                self.stats["repetidas"] += len(claves) - (1 if i == 0 and sha in creadas else 0)
+                if url:
+                    OrigenImagen.objects.update_or_create(
+                        url=url, defaults={"imagen": imagen, "verificada_en": ahora}
+                    )
+        return rutas
+
+    def format_stats(self) -> str:
+        s = self.stats
+        return (
+            f"[imagenes] {s['descargadas']} descargadas · {s['url_conocida']} ya conocidas por URL · "
+            f"{s['nuevas']} nuevas · {s['repetidas']} repetidas (sin escribir) · {s['fallidas']} fallidas"
+        )
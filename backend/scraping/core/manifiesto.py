@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+import re
+
+from scraping.models import PlantillaParseada
+
+# Manifiesto de las plantillas parseadas (scraping.models.PlantillaParseada).
+#
+# scrape_equipos escribe data_clean/equipos/<temporada>_<comp>_<grupo>_equipo_<id>.json
+# y, en el mismo paso, registra en el manifiesto los jugador_id de la
+# plantilla con el sha256 del fichero. Montar la lista de jugadores es
+# entonces una consulta en vez de abrir todos los JSON de todas las
+# temporadas.
+#
+# sincronizar() pone al día el manifiesto con la carpeta: solo se leen los
+# ficheros nuevos o cuyo tamaño/mtime ha cambiado (p.ej. los de antes de que
+# existiera el manifiesto o los copiados a mano), y se quitan los borrados.
+DIR_EQUIPOS = os.path.join("data_clean", "equipos")
+
+_RE_ARCHIVO = re.compile(r"^([^_]+)_([^_]+)_(.+)_equipo_(\d+)\.json$")
+
+
+def _jugador_ids(equipo_clean: dict) -> list[int]:
+    # Solo IDs válidos (enteros) para evitar errores en el scraping posterior
+    return sorted({
+        j.get("jugador_id") for j in (equipo_clean.get("jugadores") or [])
+        if isinstance(j.get("jugador_id"), int)
+    })
+
+
+def _fila(archivo: str, datos: bytes, equipo_clean: dict, st: os.stat_result) -> dict | None:
+    m = _RE_ARCHIVO.match(archivo)
+    if not m:
+        return None
+    temporada, competicion, grupo, equipo_id = m.groups()
+    return {
+        "temporada": temporada, "competicion": competicion, "grupo": grupo, "equipo_id": int(equipo_id),
+        "jugador_ids": _jugador_ids(equipo_clean), "sha256": hashlib.sha256(datos).hexdigest(),
+        "tamano": st.st_size, "mtime": st.st_mtime,
+    }
+
+
+def guardar_plantilla(ruta: str, equipo_clean: dict):
+    """
+    Escribe el JSON limpio de una plantilla y lo registra en el manifiesto
+    (sin tocar la fila si el contenido no ha cambiado).
+    """
+    datos = json.dumps(equipo_clean, indent=2, ensure_ascii=False).encode("utf-8")
+    with open(ruta, "wb") as f:
+        f.write(datos)
+    archivo = os.path.basename(ruta)
+    fila = _fila(archivo, datos, equipo_clean, os.stat(ruta))
+    if fila is None:
+        return
+    actual = PlantillaParseada.objects.filter(archivo=archivo).first()
+    if actual is not None and actual.sha256 == fila["sha256"]:
+        # Mismo contenido reescrito: solo cambia el mtime
+        PlantillaParseada.objects.filter(pk=actual.pk).update(tamano=fila["tamano"], mtime=fila["mtime"])
+        return
+    PlantillaParseada.objects.update_or_create(archivo=archivo, defaults=fila)
+
+
+def sincronizar(clean_equipos_dir: str = DIR_EQUIPOS) -> dict:
+    """
+    Indexa los JSON nuevos o modificados de la carpeta y borra del
+    manifiesto los que ya no están. Devuelve las cuentas.
+    """
+    stats = {"indexadas": 0, "sin_cambios": 0, "borradas": 0, "ilegibles": 0}
+    if not os.path.isdir(clean_equipos_dir):
+        return stats
+    conocidas = {
+        archivo: (pk, tamano, mtime)
+        for pk, archivo, tamano, mtime in PlantillaParseada.objects.values_list("pk", "archivo", "tamano", "mtime")
+    }
+    vistas = set()
+    for entrada in os.scandir(clean_equipos_dir):
+        if not entrada.name.endswith(".json") or not _RE_ARCHIVO.match(entrada.name):
+            continue
+        vistas.add(entrada.name)
+        st = entrada.stat()
+        previa = conocidas.get(entrada.name)
+        if previa is not None and previa[1:] == (st.st_size, st.st_mtime):
+            stats["sin_cambios"] += 1
+            continue
+        try:
+            with open(entrada.path, "rb") as f:
+                datos = f.read()
+            equipo_clean = json.loads(datos)
+        except (OSError, ValueError) as e:
+            # Si un archivo está corrupto o no se puede leer, lo saltamos
+            print(f"[manifiesto] No pude leer {entrada.path}: {e}")
+            stats["ilegibles"] += 1
+            continue
+        PlantillaParseada.objects.update_or_create(
+            archivo=entrada.name, defaults=_fila(entrada.name, datos, equipo_clean, st)
+        )
+        stats["indexadas"] += 1
+
+    borradas = [pk for archivo, (pk, _, _) in conocidas.items() if archivo not in vistas]
+    if borradas:
+        PlantillaParseada.objects.filter(pk__in=borradas).delete()
+    stats["borradas"] = len(borradas)
+    return stats
+
+
+def jugadores_de(temporada: str | None = None) -> list[int]:
+    """
+    IDs de jugador únicos de las plantillas del manifiesto (de una temporada
+    o de todas), ordenados.
+    """
+    qs = PlantillaParseada.objects.all()
+    if temporada:
+        qs = qs.filter(temporada=temporada)
+    ids = set()
+    for lista in qs.values_list("jugador_ids", flat=True):
+        ids.update(lista)
+    return sorted(ids)
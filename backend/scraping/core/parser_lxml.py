@@ -0,0 +1,543 @@
+import re
+from urllib.parse import urlparse, parse_qs
+
+import lxml.html
+
+from scraping.core.parser_partido_detalle import _clean_ws, _fix_mojibake
+
+# Backend lxml/XPath para parse_partido_detalle y parse_jornada_partidos.
+#
+# Cada acta construía un árbol BeautifulSoup completo y luego lo recorría con
+# find/find_all/select una y otra vez. Aquí se usa el árbol de lxml directamente
+# (el mismo parser HTML que ya usaba BeautifulSoup por debajo, "lxml") y las
+# búsquedas son XPath compiladas una sola vez.
+#
+# La salida tiene que ser IDÉNTICA a la de los parsers BeautifulSoup: por eso
+# cada función replica paso a paso su equivalente (incluidos los decompose()
+# que mutan el árbol y la semántica de get_text(sep, strip=True)).
+# bench_parsers compara ambos backends contra el corpus golden.
+
+
+def _cls(nombre: str) -> str:
+    # Equivalente XPath de class_="nombre" / ".nombre" (token dentro de @class)
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {nombre} ')"
+
+
+def _xp(expr: str) -> lxml.html.etree.XPath:
+    return lxml.html.etree.XPath(expr)
+
+
+# Tipos de texto que BeautifulSoup no devuelve en get_text() de un ancestro
+_SIN_TEXTO = {"script", "style", "template", "rt", "rp"}
+
+
+def _strings(el):
+    """
+    Mismo recorrido que Tag._all_strings de BeautifulSoup: texto propio, hijos
+    en orden y el texto que sigue a cada hijo (tail). Comentarios, <script>,
+    <style>... no aportan texto, pero el tail que les sigue sí.
+    """
+    if el.text and isinstance(el.tag, str):
+        yield el.text
+    for child in el:
+        if isinstance(child.tag, str) and child.tag not in _SIN_TEXTO:
+            yield from _strings(child)
+        if child.tail:
+            yield child.tail
+
+
+def _get_text(el, sep: str = "") -> str:
+    # get_text(sep, strip=True)
+    return sep.join(s for s in (s.strip() for s in _strings(el)) if s)
+
+
+def _safe_text(el) -> str:
+    if el is None:
+        return ""
+    return _clean_ws(_get_text(el, " "))
+
+
+def _first(xpath, el):
+    res = xpath(el)
+    return res[0] if res else None
+
+
+def _decompose(el):
+    """
+    Como Tag.decompose(): se saca del árbol conservando el texto que le sigue
+    (tail) y se vacía todo el subárbol, así que cualquier referencia que
+    tuviéramos a un nodo de dentro (p.ej. un <ul> ya localizado) queda vacía.
+    """
+    parent = el.getparent()
+    if parent is not None:
+        # Un comentario vacío en su lugar: no aporta texto pero mantiene
+        # separados el texto anterior y el tail (BeautifulSoup no los fusiona).
+        marca = lxml.html.etree.Comment("")
+        marca.tail, el.tail = el.tail, None
+        parent.replace(el, marca)
+    for d in list(el.iter()):
+        d.clear()
+
+
+def _class_tokens(el) -> list:
+    return (el.get("class") or "").split()
+
+
+def _id_de_href(href: str, clave: str):
+    qs = parse_qs(urlparse(href).query)
+    if clave in qs:
+        try:
+            return int(qs[clave][0])
+        except (ValueError, IndexError):
+            return None
+    return None
+
+
+def _parse_html(html_text: str):
+    # lxml no acepta documentos vacíos; BeautifulSoup sí (y no encuentra nada)
+    if not html_text or not html_text.strip():
+        html_text = "<html></html>"
+    return lxml.html.document_fromstring(html_text)
+
+
+# =====================================================================
+# Acta de partido (partido.php)
+# =====================================================================
+
+_X_CONT_EQUIPOS = _xp(f"//div[{_cls('contenedor_equipos_info')}]")
+_X_BLOQUES_EQUIPO = _xp(f".//div[{_cls('equipo')}]")
+_X_LINK_NOMBRE_EQUIPO = _xp(f".//a[{_cls('enlace_nombre_equipo_info')}]")
+_X_MARCADOR = _xp(f".//div[{_cls('resultados-cuentaatras')}]")
+
+_X_INPUT_FECHA = _xp("//input[@id='fecha']")
+_X_INPUT_HORA = _xp("//input[@id='hora']")
+_X_BARRA = _xp(f"//div[{_cls('estadio_barra')}]")
+_X_PRIMER_A = _xp(".//a")
+_X_P_NOMBRE_CAMPO = _xp(f".//p[{_cls('nombre_campo')}]")
+_X_SIG_P_NOMBRE_CAMPO = _xp(f"following-sibling::p[{_cls('nombre_campo')}][1]")
+
+_X_LI_JUGADOR = _xp(f"li[{_cls('listaJugador')}]")
+_X_LI = _xp("li")
+_X_A_PLANTILLA = _xp(f".//a[{_cls('lista_plantilla_jugadores')}]")
+_X_SPANS = _xp(".//span")
+_X_SPAN_ETIQUETA = _xp(f".//span[{_cls('span_etiqueta_alin')}]")
+_X_SPAN_MINUTOS = _xp(f".//span[{_cls('minutos')}]")
+_X_IMGS = _xp(".//img")
+_X_DIV = _xp(".//div")
+_X_PS = _xp(".//p")
+_X_SIG_UL = _xp("following-sibling::ul[1]")
+_X_SPANS_HIJOS = _xp("span")
+_X_BOTON_EQUIPACION = _xp(f".//span[{_cls('boton_equipacion')}]")
+
+_X_TIMELINE = _xp(f"//div[{_cls('timeLineContainer')}]")
+_X_EVENTOS = _xp(f".//div[parent::*[{_cls('eventosTimeLine')}]]")
+_X_HEADER_EVENTO = _xp(f".//header[{_cls('eventoInfoCabecera')}]")
+_X_MINUTO_EVENTO = _xp(f".//time[{_cls('eventoInfoMinuto')}]")
+_X_JUGADOR_EVENTO = _xp(f".//a[{_cls('eventoInfoJugadorNombre')}]")
+
+_X_COLUMNAS_ALINEACION = _xp(
+    f"//div[{_cls('col-lg-4')}][{_cls('col-md-6')}]"
+    f"[parent::div[{_cls('row')}]"
+    f"[ancestor::div[{_cls('container')}][ancestor::div[{_cls('contenido-partido')}]]]]"
+)
+
+
+def _extract_equipo_info_header(doc):
+    cont = _first(_X_CONT_EQUIPOS, doc)
+    if cont is None:
+        return (
+            {"id_equipo": None, "nombre": ""},
+            {"id_equipo": None, "nombre": ""},
+            (None, None),
+        )
+
+    bloques_equipo = _X_BLOQUES_EQUIPO(cont)
+
+    def parse_equipo_div(eq_div):
+        link_nombre = _first(_X_LINK_NOMBRE_EQUIPO, eq_div)
+        nombre = _fix_mojibake(_safe_text(link_nombre))
+        href = link_nombre.get("href", "") if link_nombre is not None else ""
+        return {
+            "id_equipo": _id_de_href(href, "id_equipo"),
+            "nombre": nombre,
+        }
+
+    if len(bloques_equipo) >= 2:
+        info_local = parse_equipo_div(bloques_equipo[0])
+        info_visit = parse_equipo_div(bloques_equipo[-1])
+    elif len(bloques_equipo) == 1:
+        info_local = parse_equipo_div(bloques_equipo[0])
+        info_visit = {"id_equipo": None, "nombre": ""}
+    else:
+        info_local = {"id_equipo": None, "nombre": ""}
+        info_visit = {"id_equipo": None, "nombre": ""}
+
+    marcador_div = _first(_X_MARCADOR, cont)
+    local_goles = None
+    visit_goles = None
+    if marcador_div is not None:
+        nums = re.findall(r"\d+", _get_text(marcador_div, " "))
+        if len(nums) >= 2:
+            local_goles = int(nums[0])
+            visit_goles = int(nums[1])
+
+    return info_local, info_visit, (local_goles, visit_goles)
+
+
+_RE_FECHA = re.compile(r"\d{2}-\d{2}-\d{4}$")
+_RE_HORA = re.compile(r"\d{1,2}:\d{2}$")
+
+
+def _extract_info_partido(doc):
+    fecha_input = _first(_X_INPUT_FECHA, doc)
+    hora_input = _first(_X_INPUT_HORA, doc)
+    fecha_txt = fecha_input.get("value", "").strip() if fecha_input is not None else ""
+    hora_txt = hora_input.get("value", "").strip() if hora_input is not None else ""
+
+    pabellon = ""
+    arbitros = []
+
+    barra = _first(_X_BARRA, doc)
+    if barra is not None:
+        primer_a = _first(_X_PRIMER_A, barra)
+        if primer_a is not None:
+            p_pab = _first(_X_P_NOMBRE_CAMPO, primer_a)
+            if p_pab is not None:
+                raw_pab = _get_text(p_pab, " ").rstrip("|").strip()
+                pabellon = _fix_mojibake(raw_pab)
+
+        img_arbitros = None
+        for h in barra:
+            if h.tag == "img" and "arbitros" in h.get("src", ""):
+                img_arbitros = h
+                break
+
+        if img_arbitros is not None:
+            p_detalles = _first(_X_SIG_P_NOMBRE_CAMPO, img_arbitros)
+            if p_detalles is not None:
+                trozos = [t.strip() for t in _get_text(p_detalles, "|").split("|")]
+                trozos = [t for t in trozos if t]
+                for pieza in trozos:
+                    if _RE_FECHA.match(pieza.strip()):
+                        if not fecha_txt:
+                            fecha_txt = pieza
+                        continue
+                    if _RE_HORA.match(pieza.strip()):
+                        if not hora_txt:
+                            hora_txt = pieza
+                        continue
+                    arbitros.append(_fix_mojibake(pieza))
+
+    return {
+        "fecha": fecha_txt,
+        "hora": hora_txt,
+        "pabellon": pabellon,
+        "arbitros": arbitros,
+    }
+
+
+def _clean_player_info_block(info_div, dorsal_num, etiqueta_txt):
+    for sp in _X_SPAN_MINUTOS(info_div):
+        _decompose(sp)
+    for sp in _X_SPAN_ETIQUETA(info_div):
+        _decompose(sp)
+    for img in _X_IMGS(info_div):
+        _decompose(img)
+
+    texto_bruto = _safe_text(info_div)
+    if dorsal_num is not None:
+        texto_bruto = re.sub(rf"\b{dorsal_num}\b", "", texto_bruto).strip()
+    if etiqueta_txt:
+        texto_bruto = re.sub(rf"\b{re.escape(etiqueta_txt)}\b", "", texto_bruto).strip()
+    texto_bruto = re.sub(r"\b\d{1,2}'\b", "", texto_bruto).strip()
+    texto_bruto = _clean_ws(texto_bruto)
+    return _fix_mojibake(texto_bruto)
+
+
+def _parse_players_from_ul(ul_tag):
+    jugadores = []
+    if ul_tag is None:
+        return jugadores
+
+    for li in _X_LI_JUGADOR(ul_tag):
+        a = _first(_X_A_PLANTILLA, li)
+        if a is None:
+            continue
+
+        jugador_id = _id_de_href(a.get("href", ""), "id_jugador")
+
+        dorsal_span = None
+        for sp in _X_SPANS(a):
+            if "#ffa500" in sp.get("style", ""):
+                dorsal_span = sp
+        dorsal = None
+        if dorsal_span is not None:
+            m = re.search(r"\d+", _get_text(dorsal_span))
+            if m:
+                dorsal = int(m.group(0))
+
+        etiqueta_span = _first(_X_SPAN_ETIQUETA, a)
+        etiqueta = _clean_ws(_get_text(etiqueta_span) if etiqueta_span is not None else "")
+
+        info_div = _first(_X_DIV, a)
+        nombre_jugador = ""
+        if info_div is not None:
+            nombre_jugador = _clean_player_info_block(info_div, dorsal, etiqueta)
+
+        jugadores.append({
+            "jugador_id": jugador_id,
+            "nombre": nombre_jugador,
+            "dorsal": dorsal,
+            "etiqueta": etiqueta,
+        })
+
+    return jugadores
+
+
+def _parse_tecnicos_from_ul(ul_tag):
+    tecnicos = []
+    if ul_tag is None:
+        return tecnicos
+
+    for li in _X_LI(ul_tag):
+        a = _first(_X_A_PLANTILLA, li)
+        if a is None:
+            continue
+        info_div = _first(_X_DIV, a)
+        if info_div is None:
+            continue
+
+        rol_span = _first(_X_SPANS, info_div)
+        rol = ""
+        if rol_span is not None:
+            rol = _safe_text(rol_span)
+            _decompose(rol_span)
+
+        tecnicos.append({
+            "nombre": _fix_mojibake(_safe_text(info_div)),
+            "rol": _fix_mojibake(rol),
+        })
+
+    return tecnicos
+
+
+def _find_section_ul(block_div, titulo_text):
+    for cand in _X_PS(block_div):
+        if titulo_text.lower() in _get_text(cand).lower():
+            return _first(_X_SIG_UL, cand)
+    return None
+
+
+def _parse_lineup_block(block_div, lado):
+    nombre_equipo = ""
+    for sp in _X_SPANS_HIJOS(block_div):
+        if sp.get("id") or _class_tokens(sp):
+            continue
+        txt = _safe_text(sp)
+        if txt:
+            nombre_equipo = txt
+            break
+    nombre_equipo = _fix_mojibake(nombre_equipo)
+
+    boton_span = _first(_X_BOTON_EQUIPACION, block_div)
+    id_equipo = None
+    if boton_span is not None and "id" in boton_span.attrib:
+        m = re.search(r"_(\d+)$", boton_span.get("id"))
+        if m:
+            id_equipo = int(m.group(1))
+
+    ul_tit = _find_section_ul(block_div, "Titulares")
+    ul_sup = _find_section_ul(block_div, "Suplentes")
+    ul_tec = _find_section_ul(block_div, "Técnicos")
+
+    return {
+        "id_equipo": id_equipo,
+        "nombre": nombre_equipo,
+        "titulares": _parse_players_from_ul(ul_tit),
+        "suplentes": _parse_players_from_ul(ul_sup),
+        "tecnicos": _parse_tecnicos_from_ul(ul_tec),
+        "lado": lado,
+    }
+
+
+def _parse_timeline_events(doc):
+    out = []
+    timeline = _first(_X_TIMELINE, doc)
+    if timeline is None:
+        return out
+
+    for ev_div in _X_EVENTOS(timeline):
+        clases = _class_tokens(ev_div)
+        if "eventosLocalTimeLine" in clases:
+            equipo = "local"
+        elif "eventosVisitanteTimeLine" in clases:
+            equipo = "visitante"
+        else:
+            continue
+
+        header = _first(_X_HEADER_EVENTO, ev_div)
+        if header is None:
+            continue
+
+        minuto_raw = _safe_text(_first(_X_MINUTO_EVENTO, header))
+        minuto_num = None
+        if minuto_raw:
+            m = re.search(r"(\d+)", minuto_raw)
+            if m:
+                minuto_num = int(m.group(1))
+
+        header_text = _safe_text(header)
+        tipo = header_text.replace(minuto_raw, "").strip() if minuto_raw else header_text
+        tipo = _clean_ws(tipo)
+
+        jugador_a = _first(_X_JUGADOR_EVENTO, ev_div)
+        jugador_nombre = _fix_mojibake(_safe_text(jugador_a))
+        jugador_id = _id_de_href(jugador_a.get("href", ""), "id_jugador") if jugador_a is not None else None
+
+        out.append({
+            "minuto": minuto_num,
+            "tipo": tipo,
+            "jugador_id": jugador_id,
+            "jugador_nombre": jugador_nombre,
+            "equipo": equipo,
+        })
+
+    return out
+
+
+def parse_partido_detalle(html_text: str):
+    """
+    Versión lxml de parser_partido_detalle.parse_partido_detalle (misma salida).
+    """
+    doc = _parse_html(html_text)
+
+    info_partido = _extract_info_partido(doc)
+    info_local_hdr, info_visit_hdr, (g_local, g_visit) = _extract_equipo_info_header(doc)
+
+    alineacion_cols = _X_COLUMNAS_ALINEACION(doc)
+    equipo_local_data = _parse_lineup_block(alineacion_cols[0], "local") if len(alineacion_cols) > 0 else {}
+    equipo_visitante_data = _parse_lineup_block(alineacion_cols[-1], "visitante") if len(alineacion_cols) > 0 else {}
+
+    if info_local_hdr.get("id_equipo") and not equipo_local_data.get("id_equipo"):
+        equipo_local_data["id_equipo"] = info_local_hdr["id_equipo"]
+    if info_local_hdr.get("nombre") and not equipo_local_data.get("nombre"):
+        equipo_local_data["nombre"] = info_local_hdr["nombre"]
+
+    if info_visit_hdr.get("id_equipo") and not equipo_visitante_data.get("id_equipo"):
+        equipo_visitante_data["id_equipo"] = info_visit_hdr["id_equipo"]
+    if info_visit_hdr.get("nombre") and not equipo_visitante_data.get("nombre"):
+        equipo_visitante_data["nombre"] = info_visit_hdr["nombre"]
+
+    return {
+        "info_partido": info_partido,
+        "marcador": {
+            "local": g_local,
+            "visitante": g_visit,
+        },
+        "equipos": {
+            "local": equipo_local_data,
+            "visitante": equipo_visitante_data,
+        },
+        "eventos": _parse_timeline_events(doc),
+    }
+
+
+# =====================================================================
+# Listado de jornada (partidos de una jornada)
+# =====================================================================
+
+_X_BOTON_JORNADA = _xp(
+    f"//div[{_cls('dropdown-jornadas')}]//button[{_cls('boton_selector')}]//div"
+)
+_X_TBODY = _xp(f"//table[{_cls('sobrestante')}]//tbody")
+_X_TR = _xp("tr")
+_X_TD = _xp("td")
+_X_FECHA_DIV = _xp(f".//div[{_cls('fecha')}]")
+_X_NOMBRE_EQUIPO_TABLA = _xp(f".//a[{_cls('nombre_equipos_tabla')}]")
+_X_SPAN_MARCADOR = _xp(f".//span[{_cls('marcador')}]")
+_X_ENLACE_PARTIDO = _xp(".//a[contains(@href, 'partido.php')]")
+_X_BTN_HISTORIAL = _xp(".//*[contains(@onclick, 'modalHistorial')]")
+
+
+def _extraer_jornada_actual(doc):
+    boton_jornada = _first(_X_BOTON_JORNADA, doc)
+    if boton_jornada is None:
+        return None
+    m = re.search(r"Jornada\s+(\d+)", _get_text(boton_jornada), re.IGNORECASE)
+    if m:
+        return int(m.group(1))
+    return None
+
+
+def _extraer_partidos_y_fechas(doc):
+    partidos = []
+
+    tbody = _first(_X_TBODY, doc)
+    if tbody is None:
+        return partidos
+
+    current_fecha_texto = None
+
+    for tr in _X_TR(tbody):
+        if "sinsombra" in _class_tokens(tr):
+            fecha_div = _first(_X_FECHA_DIV, tr)
+            if fecha_div is not None:
+                current_fecha_texto = _get_text(fecha_div)
+            continue
+
+        celdas = _X_TD(tr)
+        if len(celdas) < 6:
+            continue
+
+        a_local = _first(_X_NOMBRE_EQUIPO_TABLA, celdas[0])
+        local_nombre = _get_text(a_local) if a_local is not None else None
+
+        spans_marcador = _X_SPAN_MARCADOR(celdas[2])
+        goles_local = None
+        goles_visitante = None
+        if len(spans_marcador) >= 2:
+            goles_local = _get_text(spans_marcador[0])
+            goles_visitante = _get_text(spans_marcador[1])
+
+        a_visitante = _first(_X_NOMBRE_EQUIPO_TABLA, celdas[4])
+        visitante_nombre = _get_text(a_visitante) if a_visitante is not None else None
+
+        pabellon_div = _first(_X_DIV, celdas[5])
+        pabellon_txt = _get_text(pabellon_div) if pabellon_div is not None else None
+
+        enlace_partido = _first(_X_ENLACE_PARTIDO, tr)
+        id_partido = None
+        if enlace_partido is not None and "href" in enlace_partido.attrib:
+            m_id = re.search(r"id_partido=(\d+)", enlace_partido.get("href"))
+            if m_id:
+                id_partido = int(m_id.group(1))
+
+        if not id_partido:
+            btn_hist = _first(_X_BTN_HISTORIAL, tr)
+            if btn_hist is not None and "onclick" in btn_hist.attrib:
+                m2 = re.search(r"modalHistorial\((\d+)", btn_hist.get("onclick"))
+                if m2:
+                    id_partido = int(m2.group(1))
+
+        partidos.append({
+            "fecha_texto": current_fecha_texto,
+            "local_nombre": local_nombre,
+            "visitante_nombre": visitante_nombre,
+            "goles_local": goles_local,
+            "goles_visitante": goles_visitante,
+            "pabellon": pabellon_txt,
+            "id_partido": id_partido,
+        })
+
+    return partidos
+
+
+def parse_jornada_partidos(html_text: str):
+    """
+    Versión lxml de parser_partidos.parse_jornada_partidos (misma salida).
+    """
+    doc = _parse_html(html_text)
+    return {
+        "jornada": _extraer_jornada_actual(doc),
+        "partidos": _extraer_partidos_y_fechas(doc),
+    }
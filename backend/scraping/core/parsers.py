@@ -0,0 +1,46 @@
+import os
+from typing import Callable, NamedTuple
+
+from scraping.core import parser_lxml
+from scraping.core.parser_partido_detalle import parse_partido_detalle
+from scraping.core.parser_partidos import parse_jornada_partidos
+
+# Selección del backend de parsing para listados de jornada y actas.
+#   - "bs4":  parsers originales con BeautifulSoup (referencia)
+#   - "lxml": parser_lxml, misma salida y bastante menos CPU por acta
+# Cada comando acepta --parser; SCRAPING_PARSER fija el valor por defecto
+# (útil para scrape_todo / scrape_semana, que llaman a scrape_jornada).
+PARSER_BACKENDS = ("bs4", "lxml")
+DEFAULT_PARSER = os.getenv("SCRAPING_PARSER", "bs4")
+
+
+class ParserSet(NamedTuple):
+    jornada_partidos: Callable
+    partido_detalle: Callable
+
+
+_PARSERS = {
+    "bs4": ParserSet(parse_jornada_partidos, parse_partido_detalle),
+    "lxml": ParserSet(parser_lxml.parse_jornada_partidos, parser_lxml.parse_partido_detalle),
+}
+
+
+def get_parsers(backend: str | None = None) -> ParserSet:
+    backend = (backend or DEFAULT_PARSER).lower()
+    if backend not in _PARSERS:
+        raise ValueError(f"Parser '{backend}' no soportado. Usa uno de: {', '.join(PARSER_BACKENDS)}")
+    return _PARSERS[backend]
+
+
+def add_parser_argument(parser):
+    parser.add_argument(
+        "--parser",
+        type=str,
+        choices=PARSER_BACKENDS,
+        default=DEFAULT_PARSER,
+        help=f"Backend de parsing de jornadas y actas (por defecto: {DEFAULT_PARSER})",
+    )
+
+
+def parsers_from_options(options) -> ParserSet:
+    return get_parsers(options.get("parser"))
@@ -0,0 +1,551 @@
+from collections import Counter, defaultdict
+
+from django.db import connection, transaction
+from django.utils.text import slugify
+
+from arbitros.models import Arbitro, ArbitrajePartido
+from estadisticas import grupo_info
+from jugadores import trayectoria
+from jugadores.models import Jugador, JugadorEnClubTemporada
+from partidos.models import AlineacionPartidoJugador, EventoPartido
+from staff.models import StaffClub, StaffEnPartido
+from status import instantaneas, versiones
+
+# Persistencia por lotes de las actas scrapeadas.
+#
+# Antes cada acta eran decenas de get_or_create (jugador a jugador, evento a
+# evento...). Aquí los comandos van añadiendo actas con add_partido() y al
+# final del lote guardar() resuelve todo lo que ya existe con unas pocas
+# consultas IN y escribe con bulk_create / bulk_update en una transacción.
+#
+# Se mantiene la deduplicación de siempre:
+#   - Jugador: primero por identificador_federacion, si no por nombre; se
+#     rellenan nombre / identificador_federacion si faltaban.
+#   - Alineaciones, eventos, staff y árbitros: una fila por combinación de
+#     campos (lo que hacía get_or_create), así re-procesar un acta no duplica.
+#   - JugadorEnClubTemporada: las estadísticas solo suman por alineaciones y
+#     eventos que se insertan de verdad. OJO, no es lo que hacía el
+#     get_or_create de antes, que sumaba cada vez que se procesaba el acta
+#     aunque la fila ya existiera: ahora re-procesar un acta no infla los
+#     contadores, pero tampoco corrige los que ya se inflaron (eso solo lo
+#     arregla recalcularlos desde las alineaciones y eventos).
+#   - Eventos: el acta manda. Dos goles del mismo jugador en el mismo minuto
+#     son dos filas y cuentan dos; re-procesarla solo inserta los que falten
+#     respecto a las filas que ya tiene el partido.
+#
+# bulk_create no lanza señales. Cada lote confirmado apunta (on_commit) sus
+# (grupo, jornada) y los jugadores con estadísticas nuevas, y terminar(), al
+# acabar la ejecución, lo invalida todo de una vez: rehace la trayectoria de
+# esos jugadores (jugadores.trayectoria), sube la versión de datos de sus
+# grupos (status.versiones) y borra las instantáneas de esas jornadas
+# (status.instantaneas) y las secciones de la pantalla del grupo que
+# dependen de ellas (estadisticas.grupo_info). Los lotes deshechos no
+# apuntan nada.
+
+BATCH_SIZE = 500
+
+STATS_CAMPOS = ("partidos_jugados", "titular", "suplente", "goles", "tarjetas_amarillas", "tarjetas_rojas")
+
+ROL_STAFF_DEFECTO = "Cuerpo técnico"
+
+
+def tipo_evento_desde_acta(tipo_raw: str) -> str:
+    tipo_raw = (tipo_raw or "").lower()
+    if "gol" in tipo_raw and "pp" in tipo_raw:
+        return "gol_pp"
+    if "gol" in tipo_raw:
+        return "gol"
+    if "doble" in tipo_raw and "amarilla" in tipo_raw:
+        return "doble_amarilla"
+    if "amarilla" in tipo_raw:
+        return "amarilla"
+    if "roja" in tipo_raw:
+        return "roja"
+    return "mvp" if "mvp" in tipo_raw else "gol"
+
+
+def _ref_jugador(nombre, jugador_id):
+    """
+    Clave de un jugador tal como viene del acta: (nombre limpio, id federación o None).
+    """
+    clean_name = (nombre or "").strip() or "DESCONOCIDO"
+    return clean_name, (str(jugador_id) if jugador_id is not None else None)
+
+
+class ResumenBD:
+    """
+    Filas insertadas / actualizadas / sin cambios por modelo.
+    """
+
+    ESTADOS = ("insertados", "actualizados", "sin_cambios")
+
+    def __init__(self):
+        self.por_modelo = {}
+
+    def sumar(self, modelo: str, estado: str, n: int = 1):
+        if n:
+            fila = self.por_modelo.setdefault(modelo, dict.fromkeys(self.ESTADOS, 0))
+            fila[estado] += n
+
+    def merge(self, otro: "ResumenBD"):
+        for modelo, fila in otro.por_modelo.items():
+            for estado, n in fila.items():
+                self.sumar(modelo, estado, n)
+
+    def format(self) -> str:
+        if not self.por_modelo:
+            return "sin escrituras"
+        return " · ".join(
+            f"{modelo} +{f['insertados']} ~{f['actualizados']} ={f['sin_cambios']}"
+            for modelo, f in self.por_modelo.items()
+        )
+
+
+class PersistenciaActas:
+    """
+    Acumula alineaciones, eventos, staff y árbitros de varias actas de una
+    temporada y los escribe de golpe con guardar().
+
+    El Partido y los clubs los crea el comando (son una o dos filas por acta y
+    fantasy escucha post_save de Partido); aquí llega ya con pk.
+
+    El comando llama a terminar() cuando acaba con todos los lotes.
+    """
+
+    def __init__(self, temporada_obj, identidades=None, cambios=None):
+        self.temporada = temporada_obj
+        self.identidades = identidades  # IdentityMap de scraping.core.identidades (opcional)
+        self.cambios = cambios  # RegistroCambios de scraping.core.cambios (opcional)
+        self.resumen = ResumenBD()
+        # De los lotes confirmados, pendiente de terminar()
+        self._por_invalidar = defaultdict(set)  # grupo_id -> jornadas
+        self._por_reconstruir = set()           # jugador_ids (trayectoria)
+        self._reset()
+
+    def _reset(self):
+        self._partido_ids = set()
+        self._jornadas = set()   # (grupo_id, jornada) de las actas del lote
+        self._alineaciones = []  # (partido_id, club_id, ref, dorsal, titular, etiqueta)
+        self._eventos = []       # (partido_id, minuto, tipo_evento, ref | None, club_id | None)
+        self._staff = []         # (partido_id, club_id, nombre, rol)
+        self._arbitros = []      # (partido_id, nombre)
+
+    def __len__(self):
+        return len(self._partido_ids)
+
+    # -------------------------
+    # RECOGIDA
+    # -------------------------
+    def add_partido(self, partido_obj, partido_data: dict, club_local_obj, club_visitante_obj):
+        """
+        Añade las filas de un acta. No toca la BD: si el acta viene mal formada
+        lanza aquí sin dejar nada a medias en el lote.
+        """
+        pid = partido_obj.pk
+        alineaciones, eventos, staff, arbitros = [], [], [], []
+
+        for lado, club_obj in (("local", club_local_obj), ("visitante", club_visitante_obj)):
+            equipo = partido_data["equipos"][lado]
+            for es_titular, bloque in ((True, equipo.get("titulares", [])), (False, equipo.get("suplentes", []))):
+                for jinfo in bloque:
+                    alineaciones.append((
+                        pid,
+                        club_obj.pk,
+                        _ref_jugador(jinfo.get("nombre"), jinfo.get("jugador_id")),
+                        str(jinfo.get("dorsal") or "")[:10],
+                        es_titular,
+                        jinfo.get("etiqueta") or "",
+                    ))
+            for tinfo in equipo.get("tecnicos", []):
+                nombre_staff = (tinfo.get("nombre") or "").strip()
+                if nombre_staff:
+                    staff.append((pid, club_obj.pk, nombre_staff, (tinfo.get("rol") or "").strip() or ROL_STAFF_DEFECTO))
+
+        for ev in partido_data.get("eventos", []) or []:
+            lado = ev.get("equipo")  # "local" / "visitante"
+            ev_club = club_local_obj if lado == "local" else club_visitante_obj if lado == "visitante" else None
+            ref = None
+            if ev.get("jugador_nombre") or ev.get("jugador_id"):
+                ref = _ref_jugador(ev.get("jugador_nombre") or "", ev.get("jugador_id"))
+            eventos.append((
+                pid,
+                ev.get("minuto"),
+                tipo_evento_desde_acta(ev.get("tipo")),
+                ref,
+                ev_club.pk if ev_club else None,
+            ))
+
+        for a_nombre in partido_data.get("info_partido", {}).get("arbitros", []):
+            clean_arbitro_nombre = (a_nombre or "").strip()
+            if clean_arbitro_nombre:
+                arbitros.append((pid, clean_arbitro_nombre))
+
+        if pid in self._partido_ids:
+            # La misma acta dos veces en el lote: vale la última (los eventos se cuentan, no se deduplican)
+            self._eventos = [e for e in self._eventos if e[0] != pid]
+        self._partido_ids.add(pid)
+        self._jornadas.add((partido_obj.grupo_id, partido_obj.jornada_numero))
+        self._alineaciones += alineaciones
+        self._eventos += eventos
+        self._staff += staff
+        self._arbitros += arbitros
+
+    # -------------------------
+    # ESCRITURA
+    # -------------------------
+    def guardar(self) -> ResumenBD:
+        """
+        Escribe todo lo acumulado en una transacción y vacía el buffer.
+        Devuelve el resumen de este lote (y lo acumula en self.resumen).
+        """
+        resumen = ResumenBD()
+        jornadas = set(self._jornadas)
+        try:
+            if self._partido_ids:
+                with transaction.atomic():
+                    jugadores = self._resolver_jugadores(resumen)
+                    stats = {}
+                    self._guardar_alineaciones(jugadores, stats, resumen)
+                    self._guardar_eventos(jugadores, stats, resumen)
+                    jugador_ids = self._guardar_stats(stats, resumen)
+                    self._guardar_staff(resumen)
+                    self._guardar_arbitros(resumen)
+                    # Solo si el lote (y la transacción del comando) se confirma
+                    transaction.on_commit(lambda: self._apuntar(jornadas, jugador_ids))
+        finally:
+            # Si falla, el lote se descarta entero (el comando deshace sus partidos)
+            self._reset()
+        self.resumen.merge(resumen)
+        return resumen
+
+    def _apuntar(self, jornadas, jugador_ids):
+        for grupo_id, jornada in jornadas:
+            self._por_invalidar[grupo_id].add(jornada)
+        self._por_reconstruir.update(jugador_ids)
+
+    def terminar(self):
+        """
+        Invalida de una vez lo que han cambiado los lotes confirmados desde la
+        última llamada (ver la cabecera del módulo). Dentro de una transacción
+        espera a que se confirme.
+        """
+        por_grupo, jugador_ids = self._por_invalidar, self._por_reconstruir
+        self._por_invalidar, self._por_reconstruir = defaultdict(set), set()
+
+        def _invalidar():
+            if jugador_ids:
+                trayectoria.reconstruir(jugador_ids)
+            if por_grupo:
+                versiones.subir_grupos(set(por_grupo))
+                for grupo_id, jornadas in por_grupo.items():
+                    instantaneas.invalidar(grupo_id, jornadas)
+                    grupo_info.invalidar([grupo_id], ("eventos", "arbitros", "jugadores"), jornadas)
+
+        transaction.on_commit(_invalidar)
+
+    def _resolver_jugadores(self, resumen: ResumenBD) -> dict:
+        """
+        {ref: Jugador con pk} para todas las refs del lote, con la misma
+        prioridad que el antiguo _upsert_jugador aplicada en orden de aparición.
+        """
+        refs = list(dict.fromkeys(
+            [a[2] for a in self._alineaciones] + [e[3] for e in self._eventos if e[3] is not None]
+        ))
+        if not refs:
+            return {}
+
+        # Los que ya están en el mapa de identidades no se consultan (solo se usa su pk;
+        # el mapa solo guarda jugadores con nombre, así que no hay nada que rellenar)
+        por_id = {}
+        for nombre, fed_id in refs:
+            pk = self.identidades.buscar("jugador", fed_id) if self.identidades and fed_id else None
+            if pk is not None:
+                por_id[fed_id] = Jugador(pk=pk, nombre=nombre, identificador_federacion=fed_id)
+        conocidos = set(por_id)
+
+        pendientes = {i for _, i in refs if i is not None and i not in conocidos}
+        if pendientes:
+            por_id.update(
+                (j.identificador_federacion, j) for j in Jugador.objects.filter(identificador_federacion__in=pendientes)
+            )
+        nombres = {n for n, i in refs if i is None or i not in por_id}
+        por_nombre = {}
+        for j in Jugador.objects.filter(nombre__in=nombres).order_by("pk"):
+            por_nombre.setdefault(j.nombre, j)
+
+        out, nuevos, tocados = {}, [], {}
+        for nombre, fed_id in refs:
+            j = por_id.get(fed_id) if fed_id is not None else None
+            if j is not None:
+                if not j.nombre:
+                    j.nombre = nombre
+                    if j.pk:
+                        tocados[j.pk] = j
+            else:
+                j = por_nombre.get(nombre)
+                if j is None:
+                    j = Jugador(nombre=nombre, identificador_federacion=fed_id, activo=True)
+                    nuevos.append(j)
+                    por_nombre[nombre] = j
+                elif fed_id is not None and not j.identificador_federacion:
+                    j.identificador_federacion = fed_id
+                    if j.pk:
+                        tocados[j.pk] = j
+                if fed_id is not None and j.identificador_federacion == fed_id:
+                    por_id[fed_id] = j
+            out[(nombre, fed_id)] = j
+
+        if tocados:
+            Jugador.objects.bulk_update(list(tocados.values()), ["nombre", "identificador_federacion"], batch_size=BATCH_SIZE)
+        resumen.sumar("Jugador", "actualizados", len(tocados))
+        resumen.sumar("Jugador", "sin_cambios", len({j.pk for j in out.values() if j.pk}) - len(tocados))
+
+        if nuevos:
+            self._crear_jugadores(nuevos)
+            resumen.sumar("Jugador", "insertados", len(nuevos))
+
+        if self.identidades:
+            for j in out.values():
+                if j.identificador_federacion and j.identificador_federacion not in conocidos and j.nombre:
+                    self.identidades.registrar("jugador", j.identificador_federacion, j.pk)
+        return out
+
+    def _crear_jugadores(self, nuevos: list):
+        # bulk_create no pasa por Jugador.save(): el slug se calcula aquí con la
+        # misma regla (slug del nombre; si ya existe, "<slug>-<id>").
+        base = {}
+        for j in nuevos:
+            base[id(j)] = slugify(j.nombre.strip())[:195] or None
+        ocupados = set(
+            Jugador.objects.filter(slug__in={s for s in base.values() if s}).values_list("slug", flat=True)
+        )
+        repetidos = []
+        for j in nuevos:
+            slug = base[id(j)]
+            if slug and slug in ocupados:
+                repetidos.append(j)
+                slug = None
+            elif slug:
+                ocupados.add(slug)
+            j.slug = slug
+
+        Jugador.objects.bulk_create(nuevos, batch_size=BATCH_SIZE)
+
+        # MySQL no devuelve las pk de un bulk_create
+        sin_pk = [j for j in nuevos if j.pk is None]
+        if sin_pk:
+            pks = dict(
+                Jugador.objects.filter(slug__in=[j.slug for j in sin_pk if j.slug]).values_list("slug", "pk")
+            )
+            # Con el nombre repetido vale la última pk (la del que acabamos de crear):
+            # dict() se queda con el último par de cada nombre
+            pks_sin_slug = dict(
+                Jugador.objects.filter(slug__isnull=True, nombre__in=[j.nombre for j in sin_pk if not j.slug])
+                .order_by("pk").values_list("nombre", "pk")
+            )
+            for j in sin_pk:
+                j.pk = pks.get(j.slug) if j.slug else pks_sin_slug.get(j.nombre)
+
+        if repetidos:
+            for j in repetidos:
+                j.slug = f"{base[id(j)][:190]}-{j.pk}"
+            Jugador.objects.bulk_update(repetidos, ["slug"], batch_size=BATCH_SIZE)
+
+    def _guardar_alineaciones(self, jugadores: dict, stats: dict, resumen: ResumenBD):
+        existentes = set(
+            AlineacionPartidoJugador.objects.filter(partido_id__in=self._partido_ids)
+            .values_list("partido_id", "club_id", "jugador_id", "dorsal", "titular", "etiqueta")
+        )
+        nuevas = []
+        for partido_id, club_id, ref, dorsal, titular, etiqueta in self._alineaciones:
+            jugador_id = jugadores[ref].pk
+            clave = (partido_id, club_id, jugador_id, dorsal, titular, etiqueta)
+            if clave in existentes:
+                resumen.sumar("AlineacionPartidoJugador", "sin_cambios")
+                continue
+            existentes.add(clave)
+            nuevas.append(AlineacionPartidoJugador(
+                partido_id=partido_id, club_id=club_id, jugador_id=jugador_id,
+                dorsal=dorsal, titular=titular, etiqueta=etiqueta,
+            ))
+            s = self._stats_de(stats, jugador_id, club_id)
+            if dorsal and not s["dorsal"]:
+                s["dorsal"] = dorsal
+            s["partidos_jugados"] += 1
+            s["titular" if titular else "suplente"] += 1
+
+        AlineacionPartidoJugador.objects.bulk_create(nuevas, batch_size=BATCH_SIZE)
+        resumen.sumar("AlineacionPartidoJugador", "insertados", len(nuevas))
+        self._marcar_cambio(nuevas, "alineaciones")
+
+    def _guardar_eventos(self, jugadores: dict, stats: dict, resumen: ResumenBD):
+        # Cuántas veces está ya cada evento: solo se insertan las apariciones de más
+        existentes = Counter(
+            EventoPartido.objects.filter(partido_id__in=self._partido_ids, nota="")
+            .values_list("partido_id", "minuto", "tipo_evento", "jugador_id", "club_id")
+        )
+        vistos = Counter()
+        nuevos = []
+        for partido_id, minuto, tipo_evento, ref, club_id in self._eventos:
+            jugador_id = jugadores[ref].pk if ref is not None else None
+            clave = (partido_id, minuto, tipo_evento, jugador_id, club_id)
+            vistos[clave] += 1
+            if vistos[clave] <= existentes[clave]:
+                resumen.sumar("EventoPartido", "sin_cambios")
+                continue
+            nuevos.append(EventoPartido(
+                partido_id=partido_id, minuto=minuto, tipo_evento=tipo_evento,
+                jugador_id=jugador_id, club_id=club_id, nota="",
+            ))
+            if jugador_id and club_id:
+                s = self._stats_de(stats, jugador_id, club_id)
+                s["goles"] += 1 if tipo_evento == "gol" else 0
+                s["tarjetas_amarillas"] += 1 if tipo_evento in ("amarilla", "doble_amarilla") else 0
+                s["tarjetas_rojas"] += 1 if tipo_evento == "roja" else 0
+
+        EventoPartido.objects.bulk_create(nuevos, batch_size=BATCH_SIZE)
+        resumen.sumar("EventoPartido", "insertados", len(nuevos))
+        self._marcar_cambio(nuevos, "eventos")
+
+    def _marcar_cambio(self, filas, tipo: str):
+        if self.cambios is not None:
+            for partido_id in {f.partido_id for f in filas}:
+                self.cambios.marcar(partido_id, tipo)
+
+    @staticmethod
+    def _stats_de(stats: dict, jugador_id, club_id) -> dict:
+        s = stats.get((jugador_id, club_id))
+        if s is None:
+            s = stats[(jugador_id, club_id)] = dict.fromkeys(STATS_CAMPOS, 0)
+            s["dorsal"] = ""
+        return s
+
+    def _guardar_stats(self, stats: dict, resumen: ResumenBD) -> set:
+        """
+        Suma a JugadorEnClubTemporada lo de las filas recién insertadas (ver
+        la cabecera). Devuelve los jugadores cuya fila ha cambiado.
+        """
+        if not stats:
+            return set()
+        actuales = {
+            (r.jugador_id, r.club_id): r
+            for r in JugadorEnClubTemporada.objects.filter(
+                temporada=self.temporada,
+                jugador_id__in={j for j, _ in stats},
+                club_id__in={c for _, c in stats},
+            )
+        }
+        filas = []
+        for (jugador_id, club_id), delta in stats.items():
+            rec = actuales.get((jugador_id, club_id))
+            fila = JugadorEnClubTemporada(
+                jugador_id=jugador_id,
+                club_id=club_id,
+                temporada=self.temporada,
+                dorsal=(rec.dorsal if rec else "") or delta["dorsal"],
+                **{c: (getattr(rec, c) if rec else 0) + delta[c] for c in STATS_CAMPOS},
+                convocados=rec.convocados if rec else 0,
+            )
+            if rec is not None and all(getattr(rec, c) == getattr(fila, c) for c in STATS_CAMPOS + ("dorsal",)):
+                resumen.sumar("JugadorEnClubTemporada", "sin_cambios")
+                continue
+            resumen.sumar("JugadorEnClubTemporada", "actualizados" if rec else "insertados")
+            filas.append(fila)
+
+        # Un solo INSERT ... ON CONFLICT/ON DUPLICATE KEY con los valores finales
+        # (nuevas y existentes) sobre unique_together (jugador, club, temporada).
+        unique_fields = None
+        if connection.features.supports_update_conflicts_with_target:
+            unique_fields = ["jugador", "club", "temporada"]
+        JugadorEnClubTemporada.objects.bulk_create(
+            filas,
+            batch_size=BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=list(STATS_CAMPOS) + ["dorsal"],
+        )
+        return {f.jugador_id for f in filas}
+
+    def _guardar_staff(self, resumen: ResumenBD):
+        if not self._staff:
+            return
+        club_ids = {club_id for _, club_id, _, _ in self._staff}
+        nombres = {nombre for _, _, nombre, _ in self._staff}
+
+        def _cargar():
+            por_clave = {}
+            qs = StaffClub.objects.filter(temporada=self.temporada, club_id__in=club_ids, nombre__in=nombres)
+            for s in qs.order_by("pk"):
+                por_clave.setdefault((s.club_id, s.nombre), s)
+            return por_clave
+
+        staff_club = _cargar()
+        nuevos = {}
+        for _, club_id, nombre, rol in self._staff:
+            if (club_id, nombre) not in staff_club and (club_id, nombre) not in nuevos:
+                nuevos[(club_id, nombre)] = StaffClub(
+                    club_id=club_id, temporada=self.temporada, nombre=nombre, rol=rol, activo=True,
+                )
+        if nuevos:
+            StaffClub.objects.bulk_create(list(nuevos.values()), batch_size=BATCH_SIZE)
+            staff_club = _cargar()
+        resumen.sumar("StaffClub", "insertados", len(nuevos))
+
+        existentes = set(
+            StaffEnPartido.objects.filter(partido_id__in=self._partido_ids)
+            .values_list("partido_id", "club_id", "staff_id", "nombre", "rol")
+        )
+        en_partido = []
+        for partido_id, club_id, nombre, rol in self._staff:
+            clave = (partido_id, club_id, staff_club[(club_id, nombre)].pk, nombre, rol)
+            if clave in existentes:
+                resumen.sumar("StaffEnPartido", "sin_cambios")
+                continue
+            existentes.add(clave)
+            en_partido.append(StaffEnPartido(
+                partido_id=partido_id, club_id=club_id, staff_id=clave[2], nombre=nombre, rol=rol,
+            ))
+        StaffEnPartido.objects.bulk_create(en_partido, batch_size=BATCH_SIZE)
+        resumen.sumar("StaffEnPartido", "insertados", len(en_partido))
+
+    def _guardar_arbitros(self, resumen: ResumenBD):
+        if not self._arbitros:
+            return
+        nombres = {nombre for _, nombre in self._arbitros}
+
+        arbitros = {}  # nombre -> pk
+        if self.identidades:
+            for nombre in nombres:
+                pk = self.identidades.buscar("arbitro", nombre)
+                if pk is not None:
+                    arbitros[nombre] = pk
+        conocidos = set(arbitros)
+
+        def _cargar(pendientes):
+            for a in Arbitro.objects.filter(nombre__in=pendientes).order_by("pk"):
+                arbitros.setdefault(a.nombre, a.pk)
+
+        if nombres - conocidos:
+            _cargar(nombres - conocidos)
+        nuevos = [Arbitro(nombre=n, identificador_federacion=None, activo=True) for n in sorted(nombres - set(arbitros))]
+        if nuevos:
+            Arbitro.objects.bulk_create(nuevos, batch_size=BATCH_SIZE)
+            _cargar([a.nombre for a in nuevos])
+        resumen.sumar("Arbitro", "insertados", len(nuevos))
+        if self.identidades:
+            for nombre in nombres - conocidos:
+                self.identidades.registrar("arbitro", nombre, arbitros[nombre])
+
+        existentes = set(
+            ArbitrajePartido.objects.filter(partido_id__in=self._partido_ids).values_list("partido_id", "arbitro_id")
+        )
+        arbitrajes = []
+        for partido_id, nombre in self._arbitros:
+            clave = (partido_id, arbitros[nombre])
+            if clave in existentes:
+                resumen.sumar("ArbitrajePartido", "sin_cambios")
+                continue
+            existentes.add(clave)
+            arbitrajes.append(ArbitrajePartido(partido_id=partido_id, arbitro_id=clave[1], rol=""))
+        ArbitrajePartido.objects.bulk_create(arbitrajes, batch_size=BATCH_SIZE)
+        resumen.sumar("ArbitrajePartido", "insertados", len(arbitrajes))
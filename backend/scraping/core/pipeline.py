@@ -0,0 +1,171 @@
+import atexit
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from scraping.core import telemetria
+
+# Pipeline de scraping en tres etapas:
+#
+#   descarga (hilos de FetchEngine, I/O)
+#     → parseo (ProcessPoolExecutor, CPU: BeautifulSoup/lxml fuera del GIL del proceso principal)
+#       → persistencia (un único hilo, el del comando, que escribe por lotes)
+#
+# Entre etapas no hay colas explícitas: cada página es un Future encadenado
+# (descarga → parseo) y el consumidor los recorre en orden con una ventana
+# acotada, así que nunca hay más de `ventana` páginas descargadas o parseadas
+# esperando a la BD (backpressure). La BD solo la toca el hilo principal.
+#
+# El pool de procesos es de proceso (como los buckets de FetchEngine): si
+# scrape_todo llama 200 veces a scrape_jornada se arranca una sola vez.
+DEFAULT_PARSE_WORKERS = int(os.getenv("SCRAPING_PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+DEFAULT_LOTE = int(os.getenv("SCRAPING_LOTE_BD", "20"))
+
+
+class ParsePool:
+    """
+    Pool de procesos para parsear. Con workers=0 parsea en el propio hilo que
+    termina la descarga (útil para depurar o donde no se quieran procesos).
+    """
+
+    def __init__(self, workers: int = DEFAULT_PARSE_WORKERS):
+        self.workers = max(int(workers), 0)
+        self._executor = None
+        if self.workers:
+            # spawn: los hijos no heredan hilos de descarga, locks ni conexiones a BD
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+    def submit(self, fn, *args) -> Future:
+        if self._executor is not None:
+            return self._executor.submit(fn, *args)
+        fut = Future()
+        try:
+            fut.set_result(fn(*args))
+        except Exception as e:
+            fut.set_exception(e)
+        return fut
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+_pools: dict[int, ParsePool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_parse_pool(workers: int = DEFAULT_PARSE_WORKERS) -> ParsePool:
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = _pools[workers] = ParsePool(workers)
+        return pool
+
+
+@atexit.register
+def _cerrar_pools():
+    for pool in list(_pools.values()):
+        pool.close()
+
+
+def _parse_cronometrado(parse_fn, html):
+    """
+    Se ejecuta en el proceso de parseo: devuelve (segundos, datos) para que
+    la telemetría mida el parseo y no la espera en la cola del pool.
+    """
+    t0 = time.perf_counter()
+    datos = parse_fn(html)
+    return time.perf_counter() - t0, datos
+
+
+def _encadenar(fetch_fut: Future, pool: ParsePool, parse_fn, parsear_si) -> Future:
+    """
+    Future que termina con (resultado_descarga, datos_parseados). Si
+    parsear_si(resultado) es False no se parsea y datos_parseados es None.
+    """
+    out = Future()
+
+    def _parse_hecho(res, pf):
+        exc = pf.exception()
+        if exc is not None:
+            out.set_exception(exc)
+        else:
+            segundos, datos = pf.result()
+            telemetria.parseo(res.get("url"), segundos)
+            out.set_result((res, datos))
+
+    def _descarga_hecha(f):
+        exc = f.exception()
+        if exc is not None:
+            out.set_exception(exc)
+            return
+        res = f.result()
+        if parsear_si is not None and not parsear_si(res):
+            out.set_result((res, None))
+            return
+        try:
+            pf = pool.submit(_parse_cronometrado, parse_fn, res["html"])
+        except Exception as e:
+            out.set_exception(e)
+            return
+        pf.add_done_callback(lambda p: _parse_hecho(res, p))
+
+    fetch_fut.add_done_callback(_descarga_hecha)
+    return out
+
+
+def iter_pipeline(engine, pool: ParsePool, tareas, parse_fn, ventana: int = 16, parsear_si=None):
+    """
+    tareas: iterable de (clave, url, save_path, previo) como en
+            FetchEngine.iter_ordered_conditional.
+    parse_fn: función de parseo a nivel de módulo (se envía al pool de procesos).
+    Rinde (clave, resultado_descarga, datos, error) en el orden de entrada.
+    """
+    def lanzar(url, save_path, previo):
+        return _encadenar(engine.fetch_url_conditional(url, save_path, previo), pool, parse_fn, parsear_si)
+
+    for clave, resultado, error in engine.iter_ordered_futures(tareas, lanzar, ventana):
+        if error is not None:
+            yield clave, None, None, error
+        else:
+            yield clave, resultado[0], resultado[1], None
+
+
+def iter_lotes(items, tam: int = DEFAULT_LOTE):
+    """
+    Agrupa un iterable en listas de hasta `tam` elementos.
+    """
+    lote = []
+    for item in items:
+        lote.append(item)
+        if len(lote) >= tam:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def add_pipeline_arguments(parser):
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=DEFAULT_PARSE_WORKERS,
+        help=f"Procesos para parsear actas (0 = en el mismo proceso; por defecto: {DEFAULT_PARSE_WORKERS})",
+    )
+    parser.add_argument(
+        "--lote-bd",
+        type=int,
+        default=DEFAULT_LOTE,
+        help=f"Partidos por transacción en la etapa de persistencia (por defecto: {DEFAULT_LOTE})",
+    )
+
+
+def pool_from_options(options) -> ParsePool:
+    workers = options.get("parse_workers")
+    return get_parse_pool(DEFAULT_PARSE_WORKERS if workers is None else workers)
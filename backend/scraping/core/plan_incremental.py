@@ -0,0 +1,166 @@
+import os
+from collections import Counter, defaultdict
+from datetime import timedelta
+from typing import NamedTuple
+
+from django.db.models import Count, Exists, Max, OuterRef, Q
+from django.utils import timezone
+
+from clubes.models import ClubEnGrupo
+from partidos.models import AlineacionPartidoJugador, EventoPartido, Partido
+from scraping.models import SeguimientoPartido
+
+# Plan incremental de scraping a partir de lo que ya hay en BD.
+#
+# En lugar de recorrer todas las competiciones/grupos y reescanear sus
+# jornadas, se pregunta a la BD qué falta y solo se pide eso:
+#
+#   actas     partidos concretos a volver a descargar:
+#               aplazado          sin jugar en una jornada ya superada por el grupo
+#               sin_jugar         sin jugar y con la fecha ya pasada
+#               sin_eventos       jugado con goles pero sin eventos guardados
+#               sin_alineaciones  jugado y sin alineaciones guardadas, de hace
+#                                 menos de ALINEACIONES_MAX_EDAD
+#   listados  (grupo, jornada) cuyo listado hay que leer porque en BD faltan
+#             partidos de esa jornada (jornada recién empezada)
+#
+# Muchas actas de categorías inferiores no traen nunca alineaciones: pasado
+# ALINEACIONES_MAX_EDAD desde el partido se dejan como están en vez de
+# volver a pedirlas cada semana. Lo que falla al descargarse no se apunta en
+# ningún sitio: sigue faltando en BD y entra en el plan siguiente.
+#
+# Las actas van directas al pipeline de descarga (GET condicional: lo que no
+# ha cambiado en FFCV cuesta un 304). Una semana tranquila son unas pocas
+# decenas de peticiones en vez de dos jornadas enteras por grupo.
+
+# Un partido que empezó hace menos de esto puede seguir en juego: no es "sin jugar"
+MARGEN_EN_JUEGO = timedelta(hours=3)
+# Jugado sin alineaciones hace más de esto: ya no van a aparecer
+ALINEACIONES_MAX_EDAD = timedelta(days=int(os.getenv("SCRAPING_ALINEACIONES_MAX_DIAS", "14")))
+
+MOTIVOS = ("aplazado", "sin_jugar", "sin_eventos", "sin_alineaciones")
+
+
+class TareaActa(NamedTuple):
+    partido_id: int
+    id_partido: str  # identificador_federacion
+    grupo_id: int
+    jornada: int
+    motivo: str
+
+
+class PlanIncremental:
+    def __init__(self, actas: list[TareaActa], listados: list[tuple[int, int]]):
+        self.actas = actas
+        self.listados = listados
+
+    def grupos(self) -> set[int]:
+        return {t.grupo_id for t in self.actas} | {g for g, _ in self.listados}
+
+    def actas_de(self, grupo_id: int) -> list[TareaActa]:
+        return [t for t in self.actas if t.grupo_id == grupo_id]
+
+    def listados_de(self, grupo_id: int) -> list[int]:
+        return sorted(j for g, j in self.listados if g == grupo_id)
+
+    def format_resumen(self) -> str:
+        motivos = Counter(t.motivo for t in self.actas)
+        detalle = ", ".join(f"{motivos[m]} {m}" for m in MOTIVOS if motivos[m])
+        return (
+            f"[plan] {len(self.actas)} actas ({detalle or 'nada pendiente'}) · "
+            f"{len(self.listados)} listados · {len(self.grupos())} grupos con trabajo"
+        )
+
+
+def construir_plan(temporada_obj, grupos=None, jornada_actual: dict | None = None, ahora=None) -> PlanIncremental:
+    """
+    grupos: limitar a estos Grupo (por defecto, todos los de la temporada).
+    jornada_actual: {grupo_id: jornada} de EstadoScraping, para saber qué
+        listados tocan. Sin él se usa la última jornada con algún partido
+        jugado + 1.
+    """
+    ahora = ahora or timezone.now()
+    partidos = Partido.objects.filter(grupo__temporada=temporada_obj, identificador_federacion__isnull=False)
+    if grupos is not None:
+        partidos = partidos.filter(grupo__in=grupos)
+
+    # Hasta dónde ha llegado cada grupo
+    ultima_jugada = dict(
+        partidos.filter(jugado=True).values("grupo_id").annotate(j=Max("jornada_numero")).values_list("grupo_id", "j")
+    )
+
+    candidatos = (
+        partidos.annotate(
+            tiene_eventos=Exists(EventoPartido.objects.filter(partido=OuterRef("pk"))),
+            tiene_alineaciones=Exists(AlineacionPartidoJugador.objects.filter(partido=OuterRef("pk"))),
+            seguimiento_aplazado=Exists(
+                SeguimientoPartido.objects.filter(partido=OuterRef("pk"), estado="aplazado")
+            ),
+        )
+        .filter(
+            Q(jugado=False) | Q(tiene_eventos=False) | Q(tiene_alineaciones=False)
+        )
+        .values_list(
+            "pk", "identificador_federacion", "grupo_id", "jornada_numero", "fecha_hora", "jugado",
+            "goles_local", "goles_visitante", "tiene_eventos", "tiene_alineaciones", "seguimiento_aplazado",
+        )
+    )
+
+    actas = []
+    for (pk, id_fed, grupo_id, jornada, fecha_hora, jugado,
+         gl, gv, tiene_eventos, tiene_alineaciones, seg_aplazado) in candidatos:
+        motivo = None
+        if not jugado:
+            fecha_pasada = fecha_hora is not None and fecha_hora < ahora - MARGEN_EN_JUEGO
+            superada = jornada < ultima_jugada.get(grupo_id, 0)
+            if seg_aplazado or (superada and (fecha_hora is None or fecha_pasada)):
+                motivo = "aplazado"
+            elif fecha_pasada:
+                motivo = "sin_jugar"
+        elif not tiene_eventos and (gl or 0) + (gv or 0) > 0:
+            motivo = "sin_eventos"
+        elif not tiene_alineaciones and fecha_hora is not None and fecha_hora >= ahora - ALINEACIONES_MAX_EDAD:
+            motivo = "sin_alineaciones"
+        if motivo:
+            actas.append(TareaActa(pk, id_fed, grupo_id, jornada, motivo))
+
+    actas.sort(key=lambda t: (t.grupo_id, t.jornada, t.id_partido))
+
+    grupo_ids = {g.pk for g in grupos} if grupos is not None else (
+        set(ClubEnGrupo.objects.filter(grupo__temporada=temporada_obj).values_list("grupo_id", flat=True))
+        | set(ultima_jugada)
+    )
+    objetivo = {
+        g: (jornada_actual or {}).get(g) or ultima_jugada.get(g, 0) + 1
+        for g in grupo_ids
+    }
+    return PlanIncremental(actas, listados_pendientes(objetivo))
+
+
+def listados_pendientes(objetivo: dict[int, int]) -> list[tuple[int, int]]:
+    """
+    objetivo: {grupo_id: jornada en curso}. Devuelve los (grupo, jornada) cuyo
+    listado hay que leer porque en BD hay menos partidos de esa jornada que
+    clubs/2 del grupo.
+    """
+    if not objetivo:
+        return []
+    esperados = {
+        g: max(n // 2, 1)
+        for g, n in ClubEnGrupo.objects.filter(grupo_id__in=objetivo)
+        .values("grupo_id").annotate(n=Count("id")).values_list("grupo_id", "n")
+    }
+    en_bd = defaultdict(int)
+    filtro = Q()
+    for grupo_id, jornada in objetivo.items():
+        filtro |= Q(grupo_id=grupo_id, jornada_numero=jornada)
+    for grupo_id, n in (
+        Partido.objects.filter(filtro).values("grupo_id").annotate(n=Count("id")).values_list("grupo_id", "n")
+    ):
+        en_bd[grupo_id] = n
+
+    return sorted(
+        (grupo_id, jornada)
+        for grupo_id, jornada in objetivo.items()
+        if en_bd[grupo_id] < esperados.get(grupo_id, 1)
+    )
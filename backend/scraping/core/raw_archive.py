@@ -0,0 +1,271 @@
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import fcntl
+except ImportError:  # Windows: solo bloqueo entre hilos del mismo proceso
+    fcntl = None
+
+try:
+    import zstandard
+except ImportError:  # opcional: sin zstandard se comprime con gzip
+    zstandard = None
+
+# Archivo de HTML crudo de FFCV.
+#
+# Antes cada respuesta se guardaba como un .html suelto en data_raw/...; tras unas
+# cuantas temporadas eran cientos de miles de ficheros pequeños, lentos de listar
+# y de copiar. Aquí el HTML se guarda:
+#   - comprimido (zstd si está instalado `zstandard`, si no gzip)
+#   - direccionado por contenido: el mismo HTML (sha256) se guarda una sola vez,
+#     aunque se descargue cien veces
+#   - en ficheros "pack" de solo-añadir (pack-000001.pak, ...) que rotan al
+#     llegar a SCRAPING_RAW_ARCHIVE_PACK_MB
+#   - con un índice SQLite por URL y fecha de descarga
+#
+# Estructura en disco (SCRAPING_RAW_ARCHIVE_DIR, por defecto data_raw/archivo):
+#   index.sqlite3   blobs (sha256 → pack, offset, tamaño, codec)
+#                   descargas (url, fecha, sha256, encoding, etag, last_modified)
+#   pack-NNNNNN.pak bloques comprimidos concatenados
+#   .lock           bloqueo entre procesos al añadir
+#
+# Los parsers pueden reproducir cualquier descarga con get_text(url) /
+# get_text(url, antes_de=...) o recorrer el histórico con iter_descargas().
+DEFAULT_ARCHIVE_DIR = os.getenv("SCRAPING_RAW_ARCHIVE_DIR", os.path.join("data_raw", "archivo"))
+DEFAULT_PACK_MAX_BYTES = int(os.getenv("SCRAPING_RAW_ARCHIVE_PACK_MB", "64")) * 1024 * 1024
+
+CODEC_ZSTD = "zstd"
+CODEC_GZIP = "gzip"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    sha256      TEXT PRIMARY KEY,
+    pack        INTEGER NOT NULL,
+    offset      INTEGER NOT NULL,
+    longitud    INTEGER NOT NULL,
+    tamano      INTEGER NOT NULL,
+    codec       TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS descargas (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    url           TEXT NOT NULL,
+    descargado_en TEXT NOT NULL,
+    sha256        TEXT NOT NULL REFERENCES blobs(sha256),
+    encoding      TEXT NOT NULL DEFAULT '',
+    etag          TEXT NOT NULL DEFAULT '',
+    last_modified TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS descargas_url_fecha ON descargas (url, descargado_en);
+CREATE INDEX IF NOT EXISTS descargas_fecha ON descargas (descargado_en);
+"""
+
+
+def _comprimir(data: bytes) -> tuple[bytes, str]:
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=10).compress(data), CODEC_ZSTD
+    return gzip.compress(data, compresslevel=6), CODEC_GZIP
+
+
+def _descomprimir(data: bytes, codec: str) -> bytes:
+    if codec == CODEC_GZIP:
+        return gzip.decompress(data)
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("Este bloque está comprimido con zstd: instala `zstandard` para leerlo.")
+        return zstandard.ZstdDecompressor().decompress(data)
+    raise ValueError(f"Codec desconocido en el archivo raw: {codec}")
+
+
+def _ahora_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class RawArchive:
+    """
+    Almacén de HTML crudo comprimido y deduplicado. Seguro entre hilos; entre
+    procesos las escrituras se serializan con flock sobre `.lock`.
+    """
+
+    def __init__(self, root: str = DEFAULT_ARCHIVE_DIR, pack_max_bytes: int = DEFAULT_PACK_MAX_BYTES):
+        self.root = root
+        self.pack_max_bytes = pack_max_bytes
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(root, "index.sqlite3"), check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    # --------------------
+    # Escritura
+    # --------------------
+    @contextmanager
+    def _bloqueo_escritura(self):
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(self.root, ".lock"), "a") as lf:
+                fcntl.flock(lf, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lf, fcntl.LOCK_UN)
+
+    def _pack_path(self, pack: int) -> str:
+        return os.path.join(self.root, f"pack-{pack:06d}.pak")
+
+    def _pack_actual(self) -> int:
+        row = self._db.execute("SELECT MAX(pack) FROM blobs").fetchone()
+        pack = row[0] or 1
+        path = self._pack_path(pack)
+        if os.path.exists(path) and os.path.getsize(path) >= self.pack_max_bytes:
+            pack += 1
+        return pack
+
+    def put(
+        self,
+        url: str,
+        body: bytes,
+        encoding: str = "",
+        etag: str = "",
+        last_modified: str = "",
+        descargado_en: str | None = None,
+    ) -> str:
+        """
+        Registra una descarga de `url` y devuelve el sha256 del contenido.
+        Si ese contenido ya estaba archivado solo se añade la entrada al índice.
+        """
+        sha256 = hashlib.sha256(body).hexdigest()
+        with self._bloqueo_escritura():
+            existe = self._db.execute("SELECT 1 FROM blobs WHERE sha256 = ?", (sha256,)).fetchone()
+            if not existe:
+                comprimido, codec = _comprimir(body)
+                pack = self._pack_actual()
+                with open(self._pack_path(pack), "ab") as f:
+                    offset = f.tell()
+                    f.write(comprimido)
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._db.execute(
+                    "INSERT INTO blobs (sha256, pack, offset, longitud, tamano, codec) VALUES (?, ?, ?, ?, ?, ?)",
+                    (sha256, pack, offset, len(comprimido), len(body), codec),
+                )
+            self._db.execute(
+                "INSERT INTO descargas (url, descargado_en, sha256, encoding, etag, last_modified) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, descargado_en or _ahora_iso(), sha256, encoding or "", etag or "", last_modified or ""),
+            )
+            self._db.commit()
+        return sha256
+
+    # --------------------
+    # Lectura / replay
+    # --------------------
+    def get_blob(self, sha256: str) -> bytes | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT pack, offset, longitud, codec FROM blobs WHERE sha256 = ?", (sha256,)
+            ).fetchone()
+        if not row:
+            return None
+        pack, offset, longitud, codec = row
+        with open(self._pack_path(pack), "rb") as f:
+            f.seek(offset)
+            return _descomprimir(f.read(longitud), codec)
+
+    def ultima_descarga(self, url: str, antes_de: str | None = None) -> dict | None:
+        """
+        Metadatos de la última descarga de `url` (opcionalmente anterior a
+        `antes_de`, ISO 8601 UTC): {url, descargado_en, sha256, encoding, etag, last_modified}
+        """
+        sql = "SELECT url, descargado_en, sha256, encoding, etag, last_modified FROM descargas WHERE url = ?"
+        params: list = [url]
+        if antes_de:
+            sql += " AND descargado_en <= ?"
+            params.append(antes_de)
+        sql += " ORDER BY descargado_en DESC, id DESC LIMIT 1"
+        with self._lock:
+            row = self._db.execute(sql, params).fetchone()
+        if not row:
+            return None
+        return dict(zip(("url", "descargado_en", "sha256", "encoding", "etag", "last_modified"), row))
+
+    def contiene(self, url: str) -> bool:
+        return self.ultima_descarga(url) is not None
+
+    def get_bytes(self, url: str, antes_de: str | None = None) -> bytes | None:
+        meta = self.ultima_descarga(url, antes_de)
+        return self.get_blob(meta["sha256"]) if meta else None
+
+    def get_text(self, url: str, antes_de: str | None = None) -> str | None:
+        """
+        HTML de la última descarga de `url`, decodificado con el mismo charset
+        con el que se descargó (lo que recibían los parsers en su momento).
+        """
+        meta = self.ultima_descarga(url, antes_de)
+        if not meta:
+            return None
+        body = self.get_blob(meta["sha256"])
+        return body.decode(meta["encoding"] or "utf-8", errors="replace")
+
+    def iter_descargas(self, url_prefix: str | None = None, desde: str | None = None, hasta: str | None = None):
+        """
+        Recorre el índice en orden cronológico (para reproducir una ejecución):
+        rinde dicts con los mismos campos que ultima_descarga().
+        """
+        sql = "SELECT url, descargado_en, sha256, encoding, etag, last_modified FROM descargas WHERE 1=1"
+        params: list = []
+        if url_prefix:
+            sql += " AND substr(url, 1, ?) = ?"
+            params.extend([len(url_prefix), url_prefix])
+        if desde:
+            sql += " AND descargado_en >= ?"
+            params.append(desde)
+        if hasta:
+            sql += " AND descargado_en <= ?"
+            params.append(hasta)
+        sql += " ORDER BY descargado_en, id"
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        for row in rows:
+            yield dict(zip(("url", "descargado_en", "sha256", "encoding", "etag", "last_modified"), row))
+
+    def stats(self) -> dict:
+        with self._lock:
+            descargas, urls = self._db.execute("SELECT COUNT(*), COUNT(DISTINCT url) FROM descargas").fetchone()
+            blobs, tamano, comprimido, packs = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(tamano), 0), COALESCE(SUM(longitud), 0), COUNT(DISTINCT pack) FROM blobs"
+            ).fetchone()
+        return {
+            "descargas": descargas,
+            "urls": urls,
+            "blobs": blobs,
+            "packs": packs,
+            "bytes_originales": tamano,
+            "bytes_comprimidos": comprimido,
+        }
+
+
+_archive = None
+_archive_lock = threading.Lock()
+
+
+def get_archive() -> RawArchive:
+    """
+    Archivo raw del proceso (se abre la primera vez que se usa).
+    """
+    global _archive
+    with _archive_lock:
+        if _archive is None:
+            _archive = RawArchive()
+        return _archive
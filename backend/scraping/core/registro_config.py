@@ -0,0 +1,232 @@
+from types import MappingProxyType
+from typing import NamedTuple
+
+from django.core import checks
+
+from scraping.core.config_temporadas import TEMPORADAS
+
+# Registro compilado de config_temporadas.TEMPORADAS.
+#
+# Todos los comandos de scraping resuelven (temporada, competición, grupo)
+# aquí en vez de recorrer el dict anidado en cada llamada. Se compila una
+# sola vez al importar:
+#
+#   seleccionar(temporada, competicion, grupo) -> ConfigGrupo
+#   por_torneo(id_torneo)                      -> ConfigGrupo | None
+#   grupos(temporada, ...)                     -> ConfigGrupo en orden estable
+#   grupo_id(cfg)                              -> pk del Grupo en BD (o None)
+#
+# ConfigGrupo es inmutable; cfg_sel/meta devuelven dicts nuevos con la forma
+# de siempre, así que quien los modifique (overrides por CLI) no toca el
+# registro. Los errores de la config (IDs que faltan, id_torneo repetidos,
+# competiciones desconocidas) se apuntan al compilar y salen en
+# `manage.py check`; esos grupos no se registran.
+
+COMPETICION_NAME_MAP = MappingProxyType({
+    "TERCERA": "Tercera División",
+    "PREFERENTE": "Preferente",
+    "PRIMERA": "Primera Regional",
+    "SEGUNDA": "Segunda Regional",
+})
+
+# Nombre del nodo en otras_competiciones -> clave --competicion
+CLAVE_OTRAS = MappingProxyType({
+    "Preferente": "PREFERENTE",
+    "Primera Regional": "PRIMERA",
+    "Segunda Regional": "SEGUNDA",
+})
+
+JORNADAS_DEFECTO = 30
+
+
+class ConfigGrupo(NamedTuple):
+    temporada: str            # clave de TEMPORADAS ("2025-2026")
+    competicion: str          # clave --competicion (TERCERA, PREFERENTE...)
+    grupo: str                # clave --grupo (XV, G1...)
+    id_temp: int
+    id_modalidad: int
+    id_competicion: int
+    id_torneo: int
+    competicion_nombre: str   # nombre en BD
+    grupo_nombre: str         # nombre en BD
+    provincia: str
+    jornadas: int
+
+    @property
+    def cfg_sel(self) -> dict:
+        return {
+            "id_temp": self.id_temp,
+            "id_modalidad": self.id_modalidad,
+            "id_competicion": self.id_competicion,
+            "id_torneo": self.id_torneo,
+        }
+
+    @property
+    def meta(self) -> dict:
+        return {
+            "competicion_nombre": self.competicion_nombre,
+            "grupo_nombre": self.grupo_nombre,
+            "provincia": self.provincia,
+            "jornadas": self.jornadas,
+        }
+
+    @property
+    def temporada_bd(self) -> str:
+        # Mismo formato que temporadas_utils.get_or_create_temporada
+        return self.temporada.replace("-", "/")
+
+
+def _orden_grupo(k: str) -> tuple:
+    """
+    Ordena G1..G9 por número y deja otros (XIV/XV/…) alfabéticamente.
+    """
+    k = (k or "").upper()
+    if k.startswith("G"):
+        try:
+            return (0, int(k[1:]))
+        except ValueError:
+            return (0, 9999)
+    return (1, k)
+
+
+def _compilar(temporadas: dict):
+    por_clave, raiz, por_temporada, errores = {}, {}, {}, []
+    por_torneo = {}
+
+    def _registrar(cfg: ConfigGrupo):
+        previo = por_torneo.get(cfg.id_torneo)
+        if previo is not None:
+            errores.append(
+                f"{cfg.temporada} {cfg.competicion} {cfg.grupo}: id_torneo {cfg.id_torneo} repetido "
+                f"(ya es {previo.temporada} {previo.competicion} {previo.grupo})"
+            )
+            return
+        por_torneo[cfg.id_torneo] = cfg
+        por_clave[(cfg.temporada, cfg.competicion, cfg.grupo)] = cfg
+        por_temporada[cfg.temporada].append(cfg)
+
+    for tkey, tcfg in temporadas.items():
+        por_temporada[tkey] = []
+        try:
+            id_temp, id_modalidad = int(tcfg["id_temp"]), int(tcfg["id_modalidad"])
+        except (KeyError, TypeError, ValueError):
+            errores.append(f"{tkey}: faltan id_temp / id_modalidad")
+            continue
+        jornadas_temp = tcfg.get("jornadas", JORNADAS_DEFECTO)
+
+        def _grupo(comp_key, gkey, gcfg, id_competicion, nombre_defecto):
+            try:
+                return ConfigGrupo(
+                    temporada=tkey, competicion=comp_key, grupo=gkey.upper(),
+                    id_temp=id_temp, id_modalidad=id_modalidad,
+                    id_competicion=int(id_competicion), id_torneo=int(gcfg["id_torneo"]),
+                    competicion_nombre=COMPETICION_NAME_MAP[comp_key],
+                    grupo_nombre=gcfg.get("grupo_nombre", nombre_defecto),
+                    provincia=gcfg.get("provincia", ""),
+                    jornadas=int(gcfg.get("jornadas", jornadas_temp)),
+                )
+            except (KeyError, TypeError, ValueError) as e:
+                errores.append(f"{tkey} {comp_key} {gkey}: configuración incompleta ({e!r})")
+                return None
+
+        # Tercera: 'grupos' a nivel de temporada; el nivel raíz queda como
+        # compat para los grupos que no estén definidos
+        if tcfg.get("id_competicion") and tcfg.get("id_torneo"):
+            raiz[tkey] = _grupo("TERCERA", "XV", tcfg, tcfg["id_competicion"], "Grupo XV")
+        tercera = tcfg.get("grupos") or {}
+        for gkey in sorted(tercera, key=_orden_grupo):
+            gcfg = tercera[gkey]
+            cfg = _grupo("TERCERA", gkey, gcfg, gcfg.get("id_competicion"), f"Grupo {gkey}")
+            if cfg is not None:
+                _registrar(cfg)
+        if not tercera and raiz.get(tkey) is not None:
+            _registrar(raiz[tkey])
+
+        for comp_label, node in (tcfg.get("otras_competiciones") or {}).items():
+            comp_key = CLAVE_OTRAS.get(comp_label)
+            if comp_key is None:
+                errores.append(f"{tkey}: competición desconocida en otras_competiciones: '{comp_label}'")
+                continue
+            grupos_comp = node.get("grupos") or {}
+            for gkey in sorted(grupos_comp, key=_orden_grupo):
+                cfg = _grupo(comp_key, gkey, grupos_comp[gkey], node.get("id_competicion"), f"{comp_key.title()} - {gkey}")
+                if cfg is not None:
+                    _registrar(cfg)
+
+    return (
+        MappingProxyType(por_clave),
+        MappingProxyType(por_torneo),
+        MappingProxyType({t: tuple(v) for t, v in por_temporada.items()}),
+        MappingProxyType(raiz),
+        tuple(errores),
+    )
+
+
+_POR_CLAVE, _POR_TORNEO, _POR_TEMPORADA, _RAIZ, ERRORES = _compilar(TEMPORADAS)
+
+# (temporada_bd, competicion_nombre, grupo_nombre) -> pk del Grupo; solo aciertos
+_GRUPO_IDS: dict = {}
+
+
+def seleccionar(temporada: str, competicion_key: str, grupo_key: str) -> ConfigGrupo:
+    """
+    Config de un grupo. Lanza ValueError si no existe. Un grupo de Tercera
+    que no esté en 'grupos' usa los IDs del nivel raíz de la temporada
+    (compat con las temporadas antiguas).
+    """
+    compk = (competicion_key or "TERCERA").upper()
+    gkey = (grupo_key or "").upper()
+    cfg = _POR_CLAVE.get((temporada, compk, gkey))
+    if cfg is not None:
+        return cfg
+    if temporada not in _POR_TEMPORADA:
+        raise ValueError(f"Temporada '{temporada}' no está en config_temporadas")
+    if compk == "TERCERA":
+        base = _RAIZ.get(temporada)
+        if base is None:
+            raise ValueError(f"No hay configuración para el grupo '{gkey}' en '{compk}'.")
+        return base._replace(grupo=gkey, grupo_nombre=f"Grupo {gkey or 'XV'}")
+    if compk not in COMPETICION_NAME_MAP or not any(c.competicion == compk for c in _POR_TEMPORADA[temporada]):
+        raise ValueError(f"No hay configuración para la competición '{compk}' en esta temporada.")
+    raise ValueError(f"No hay configuración para el grupo '{gkey}' en '{compk}'.")
+
+
+def por_torneo(id_torneo) -> ConfigGrupo | None:
+    try:
+        return _POR_TORNEO.get(int(id_torneo))
+    except (TypeError, ValueError):
+        return None
+
+
+def grupos(temporada: str, competicion: str | None = None, grupo: str | None = None) -> tuple:
+    """
+    Grupos configurados de la temporada: Tercera primero y luego el resto de
+    competiciones, cada una con sus grupos en orden (G1, G2… / XIV, XV).
+    """
+    out = _POR_TEMPORADA.get(temporada, ())
+    if competicion:
+        out = tuple(c for c in out if c.competicion == competicion.upper())
+    if grupo:
+        out = tuple(c for c in out if c.grupo == grupo.upper())
+    return out
+
+
+def grupo_id(cfg: ConfigGrupo) -> int | None:
+    """
+    pk del Grupo en BD de esa config (None si aún no se ha creado). La
+    primera consulta de una temporada carga todos sus grupos.
+    """
+    clave = (cfg.temporada_bd, cfg.competicion_nombre, cfg.grupo_nombre)
+    if clave not in _GRUPO_IDS:
+        from nucleo.models import Grupo
+
+        for pk, comp, nombre in Grupo.objects.filter(temporada__nombre=cfg.temporada_bd).values_list(
+            "pk", "competicion__nombre", "nombre"
+        ):
+            _GRUPO_IDS.setdefault((cfg.temporada_bd, comp, nombre), pk)
+    return _GRUPO_IDS.get(clave)
+
+
+@checks.register()
+def comprobar_config(app_configs=None, **kwargs):
+    return [checks.Error(e, hint="Revisa scraping/core/config_temporadas.py", id="scraping.E001") for e in ERRORES]
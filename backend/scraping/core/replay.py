@@ -0,0 +1,175 @@
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from scraping.core.ffcv_urls import FFCV_ORIGEN, url_canonica
+from scraping.core.raw_archive import get_archive
+
+# Réplica offline de FFCV a partir del archivo raw.
+#
+# Dos formas de ejecutar cualquier comando de scraping sin red:
+#
+#   1) Modo offline (SCRAPING_OFFLINE=1 o --offline): fetcher no hace
+#      peticiones, lee la última versión archivada de cada URL (opcionalmente
+#      anterior a SCRAPING_OFFLINE_ANTES_DE) con una latencia simulada.
+#      Mide descarga→parseo→BD sin el coste de HTTP.
+#
+#   2) Servidor de réplica (comando servidor_ffcv): un HTTP local que sirve
+#      total_partidos.php, partido.php, jugador_ficha.php... desde el archivo,
+#      con latencia y ETag/304. Los comandos se lanzan con
+#      SCRAPING_FFCV_BASE_URL=http://127.0.0.1:8765 y recorren el camino HTTP
+#      completo (sesión, GET condicional, ritmo por host).
+#
+# En los dos casos lo que no esté archivado falla como un 404 y el comando lo
+# trata como una descarga fallida.
+
+_config = {
+    "offline": os.getenv("SCRAPING_OFFLINE", "0") == "1",
+    "latencia_ms": float(os.getenv("SCRAPING_OFFLINE_LATENCIA_MS", "0")),
+    "antes_de": os.getenv("SCRAPING_OFFLINE_ANTES_DE") or None,
+}
+
+
+class PaginaNoArchivada(Exception):
+    pass
+
+
+def offline() -> bool:
+    return _config["offline"]
+
+
+def activar(latencia_ms: float | None = None, antes_de: str | None = None):
+    """
+    Activa el modo offline para el resto del proceso (p.ej. scrape_todo
+    --offline lo deja activo para todos los scrape_jornada que lanza).
+    """
+    _config["offline"] = True
+    if latencia_ms is not None:
+        _config["latencia_ms"] = float(latencia_ms)
+    if antes_de:
+        _config["antes_de"] = antes_de
+
+
+def leer(url: str) -> dict:
+    """
+    Versión archivada de `url` como la devolvería FFCV:
+    {"html", "sha256", "encoding", "etag", "last_modified"}.
+    """
+    archivo = get_archive()
+    meta = archivo.ultima_descarga(url_canonica(url), antes_de=_config["antes_de"])
+    if meta is None:
+        raise PaginaNoArchivada(f"{url} no está en el archivo raw (modo offline)")
+    body = archivo.get_blob(meta["sha256"])
+    if _config["latencia_ms"]:
+        time.sleep(_config["latencia_ms"] / 1000.0)
+    return {
+        "html": body.decode(meta["encoding"] or "utf-8", errors="replace"),
+        "sha256": meta["sha256"],
+        "encoding": meta["encoding"],
+        "etag": meta["etag"] or "",
+        "last_modified": meta["last_modified"] or "",
+    }
+
+
+def pausa_cortesia(segundos: float):
+    """
+    Pausas "para ser amables con FFCV" de los comandos que encadenan otros:
+    en modo offline no hay a quién molestar.
+    """
+    if not offline():
+        time.sleep(segundos)
+
+
+def add_replay_arguments(parser):
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Sin red: lee las páginas del archivo raw (equivale a SCRAPING_OFFLINE=1)",
+    )
+    parser.add_argument(
+        "--latencia-ms",
+        type=float,
+        default=None,
+        help="Con --offline: latencia simulada por página en ms (SCRAPING_OFFLINE_LATENCIA_MS)",
+    )
+
+
+def replay_from_options(options):
+    if options.get("offline"):
+        activar(latencia_ms=options.get("latencia_ms"))
+
+
+# --------------------
+# Servidor de réplica
+# --------------------
+class _ReplayHandler(BaseHTTPRequestHandler):
+    server_version = "FFCVReplay/1.0"
+
+    def do_GET(self):
+        srv = self.server
+        archivo = get_archive()
+        meta = archivo.ultima_descarga(FFCV_ORIGEN + self.path, antes_de=srv.antes_de)
+
+        srv.dormir()
+        if meta is None:
+            srv.contar("404")
+            self.send_error(404, "No archivada")
+            return
+
+        etag = meta["etag"] or f'"{meta["sha256"]}"'
+        if self.headers.get("If-None-Match") == etag:
+            srv.contar("304")
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        body = archivo.get_blob(meta["sha256"])
+        srv.contar("200")
+        self.send_response(200)
+        ctype = "text/html"
+        if meta["encoding"]:
+            ctype += f"; charset={meta['encoding']}"
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        if meta["last_modified"]:
+            self.send_header("Last-Modified", meta["last_modified"])
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class ServidorReplay(ThreadingHTTPServer):
+    """
+    Sirve el archivo raw como si fuera FFCV. latencia_ms + jitter aleatorio
+    (con semilla, para que dos pasadas sean comparables).
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host: str, puerto: int, latencia_ms: float = 0.0, jitter_ms: float = 0.0,
+                 antes_de: str | None = None, semilla: int = 0, verbose: bool = False):
+        super().__init__((host, puerto), _ReplayHandler)
+        self.latencia_ms = latencia_ms
+        self.jitter_ms = jitter_ms
+        self.antes_de = antes_de
+        self.verbose = verbose
+        self.contadores = {"200": 0, "304": 0, "404": 0}
+        self._rng = random.Random(semilla)
+        self._lock = threading.Lock()
+
+    def dormir(self):
+        with self._lock:
+            ms = self.latencia_ms + (self._rng.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0)
+        if ms > 0:
+            time.sleep(ms / 1000.0)
+
+    def contar(self, clave: str):
+        with self._lock:
+            self.contadores[clave] += 1
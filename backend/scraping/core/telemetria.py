@@ -0,0 +1,230 @@
+import functools
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from django.db import connection
+from django.utils import timezone
+
+# Telemetría de las ejecuciones de scraping (status.EjecucionScraping y
+# status.MedicionPagina).
+#
+#   @instrumentar("scrape_jornada")  en el handle() de cada comando abre la
+#       ejecución; si ya hay una abierta (scrape_todo → scrape_jornada) el
+#       comando anidado cuenta dentro de ella.
+#   descarga()   la llama fetcher/fetch_binary por cada petición (desde los
+#       hilos del FetchEngine): latencia, estado HTTP, bytes.
+#   parseo()     pipeline (con el tiempo medido en el proceso de parseo) o
+#       medir_parseo() para los que parsean en el hilo principal.
+#   medir_bd()   alrededor de la escritura de un lote: tiempo y filas
+#       tocadas (rowcount de cada INSERT/UPDATE/DELETE), repartidos entre
+#       las páginas del lote.
+#
+# Sin ejecución abierta (shell, tests, el proceso de parseo) todo es no-op.
+# Las mediciones se acumulan en memoria y se vuelcan en bloque cada
+# VOLCAR_CADA páginas y al terminar.
+VOLCAR_CADA = int(os.getenv("SCRAPING_TELEMETRIA_VOLCAR_CADA", "500"))
+ACTIVA = os.getenv("SCRAPING_TELEMETRIA", "1") == "1"
+# Una página sin BD (listados, fichas que no llegan a guardarse...) se da por cerrada pasado esto
+ABIERTA_MAX_S = 600.0
+
+_lock = threading.Lock()
+_actual = {"medidor": None}
+
+
+def tipo_de(url: str) -> str:
+    ruta = urlparse(url).path.rsplit("/", 1)[-1]
+    return ruta if ruta.endswith(".php") else "imagen"
+
+
+class Medidor:
+    """
+    Mediciones de una ejecución en curso. Thread-safe: las descargas llegan
+    desde los hilos del motor.
+    """
+
+    def __init__(self, ejecucion):
+        self.ejecucion = ejecucion
+        self._paginas = []  # dicts con los campos de MedicionPagina (+ "_t", "_cerrada")
+        self._ultima = {}  # url -> dict de su última descarga
+        self._lock = threading.Lock()
+
+    def descarga(self, url: str, estado_http, bytes_: int, segundos: float, error: str = ""):
+        e = self.ejecucion
+        pagina = {
+            "url": url[:500], "tipo": tipo_de(url), "momento": timezone.now(),
+            "estado_http": estado_http, "bytes": bytes_, "descarga_ms": segundos * 1000.0,
+            "parseo_ms": None, "bd_ms": None, "filas": 0, "error": (error or "")[:300],
+            "_t": time.monotonic(), "_cerrada": bool(error),
+        }
+        with self._lock:
+            self._paginas.append(pagina)
+            self._ultima[url] = pagina
+            e.peticiones += 1
+            e.bytes += bytes_
+            e.descarga_s += segundos
+            if estado_http == 304:
+                e.no_modificadas += 1
+            if error:
+                e.fallidas += 1
+
+    def parseo(self, url: str, segundos: float):
+        with self._lock:
+            self.ejecucion.parseo_s += segundos
+            pagina = self._ultima.get(url)
+            if pagina is not None:
+                pagina["parseo_ms"] = (pagina["parseo_ms"] or 0.0) + segundos * 1000.0
+
+    def bd(self, urls, segundos: float, filas: int):
+        urls = [u for u in urls if u]
+        with self._lock:
+            self.ejecucion.bd_s += segundos
+            self.ejecucion.filas += filas
+            for i, url in enumerate(urls):
+                pagina = self._ultima.get(url)
+                if pagina is None:
+                    continue
+                # El lote se guarda de una vez: a cada página le toca su parte
+                pagina["bd_ms"] = (pagina["bd_ms"] or 0.0) + segundos * 1000.0 / len(urls)
+                pagina["filas"] += filas // len(urls) + (1 if i < filas % len(urls) else 0)
+                pagina["_cerrada"] = True
+        if len(self._paginas) >= VOLCAR_CADA:
+            self.volcar()
+
+    def volcar(self, todo: bool = False):
+        from status.models import MedicionPagina  # aquí: el proceso de parseo importa este módulo sin Django
+
+        ahora = time.monotonic()
+        with self._lock:
+            listas = [
+                p for p in self._paginas
+                if todo or p["_cerrada"] or ahora - p["_t"] > ABIERTA_MAX_S or self._ultima.get(p["url"]) is not p
+            ]
+            if not listas:
+                return
+            ids = {id(p) for p in listas}
+            self._paginas = [p for p in self._paginas if id(p) not in ids]
+            for p in listas:
+                if self._ultima.get(p["url"]) is p:
+                    del self._ultima[p["url"]]
+        MedicionPagina.objects.bulk_create(
+            [
+                MedicionPagina(ejecucion=self.ejecucion, **{k: v for k, v in p.items() if not k.startswith("_")})
+                for p in listas
+            ],
+            batch_size=500,
+        )
+
+
+def descarga(url: str, estado_http, bytes_: int, segundos: float, error: str = ""):
+    m = _actual["medidor"]
+    if m is not None:
+        m.descarga(url, estado_http, bytes_, segundos, error)
+
+
+def ejecucion_actual():
+    """EjecucionScraping abierta (o None)."""
+    m = _actual["medidor"]
+    return m.ejecucion if m is not None else None
+
+
+def parseo(url: str, segundos: float):
+    m = _actual["medidor"]
+    if m is not None and url:
+        m.parseo(url, segundos)
+
+
+@contextmanager
+def medir_parseo(url: str):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        parseo(url, time.perf_counter() - t0)
+
+
+@contextmanager
+def medir_bd(urls):
+    """
+    Tiempo y filas escritas (INSERT/UPDATE/DELETE) dentro del bloque,
+    repartidos entre `urls`. Se usa alrededor de la transacción del lote.
+    """
+    m = _actual["medidor"]
+    if m is None:
+        yield
+        return
+    filas = [0]
+
+    def _contar(execute, sql, params, many, context):
+        resultado = execute(sql, params, many, context)
+        verbo = sql.lstrip()[:6].upper()
+        if verbo != "SELECT":
+            n = max(context["cursor"].rowcount, 0)
+            # INSERT ... RETURNING (SQLite/PostgreSQL) no da rowcount hasta leerlo: al menos una fila
+            if n == 0 and verbo == "INSERT" and "RETURNING" in sql:
+                n = 1
+            filas[0] += n
+        return resultado
+
+    t0 = time.perf_counter()
+    try:
+        with connection.execute_wrapper(_contar):
+            yield
+    finally:
+        m.bd(list(urls), time.perf_counter() - t0, filas[0])
+
+
+def _abrir(comando: str, options: dict) -> Medidor:
+    from status.models import EjecucionScraping
+
+    argumentos = {
+        k: v for k, v in options.items()
+        if k not in ("stdout", "stderr", "skip_checks", "no_color", "force_color", "traceback", "settings", "pythonpath")
+        and isinstance(v, (str, int, float, bool, type(None)))
+    }
+    ejecucion = EjecucionScraping.objects.create(
+        comando=comando,
+        argumentos=argumentos,
+        trabajador=f"{socket.gethostname()}:{os.getpid()}",
+    )
+    return Medidor(ejecucion)
+
+
+def _cerrar(m: Medidor, error: str = ""):
+    m.volcar(todo=True)
+    e = m.ejecucion
+    e.fin = timezone.now()
+    e.duracion_s = (e.fin - e.inicio).total_seconds()
+    e.estado = "error" if error else "ok"
+    e.error = error[-4000:]
+    e.save()
+
+
+def instrumentar(comando: str):
+    """
+    Decorador para Command.handle: registra la ejecución y sus mediciones.
+    """
+    def decorador(handle):
+        @functools.wraps(handle)
+        def envoltura(self, *args, **options):
+            with _lock:
+                propia = ACTIVA and _actual["medidor"] is None
+                if propia:
+                    _actual["medidor"] = _abrir(comando, options)
+            if not propia:
+                return handle(self, *args, **options)
+            m = _actual["medidor"]
+            try:
+                resultado = handle(self, *args, **options)
+            except BaseException as exc:
+                _actual["medidor"] = None
+                _cerrar(m, f"{type(exc).__name__}: {exc}")
+                raise
+            _actual["medidor"] = None
+            _cerrar(m)
+            return resultado
+        return envoltura
+    return decorador
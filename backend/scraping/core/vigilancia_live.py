@@ -0,0 +1,130 @@
+import math
+import os
+from datetime import timedelta
+
+# Planificador del modo vigilancia de scrape_live_jornada (--vigilar).
+#
+# En vez de reescanear la jornada entera cada vez, cada partido tiene su
+# SeguimientoPartido con la próxima consulta de su acta:
+#
+#   sin_fecha     el acta aún no trae fecha/hora          → se mira cada RECHEQUEO
+#   programado    falta más de PREVIA para el inicio      → nada hasta inicio - PREVIA
+#   en_juego      entre inicio - PREVIA e inicio + DURACION → cada INTERVALO_DIRECTO
+#   post_partido  terminado, el acta aún puede cambiar    → backoff exponencial
+#   cerrado       N consultas seguidas sin cambios (o terminado hace más de
+#                 ACTA_ABIERTA)                           → no se consulta más
+#   aplazado      pasó la ventana sin resultado           → cada RECHEQUEO (nueva fecha)
+#
+# El listado de la jornada (una petición para todos los partidos) se sigue
+# mirando cada pocos minutos para descubrir partidos nuevos y avanzar la
+# jornada_actual; las actas solo se piden cuando les toca.
+#
+# Cada seguimiento recuerda la fecha y el resultado con que se planificó: si
+# otra pasada (un scrape_jornada, una corrección) los cambia, el listado lo
+# reabre aunque estuviera cerrado. Una consulta fallida se apunta (fallos,
+# ultimo_error) y se reintenta con backoff.
+PREVIA = timedelta(minutes=int(os.getenv("SCRAPING_LIVE_PREVIA_MIN", "15")))
+DURACION = timedelta(minutes=int(os.getenv("SCRAPING_LIVE_DURACION_MIN", "120")))
+INTERVALO_DIRECTO = int(os.getenv("SCRAPING_LIVE_INTERVALO_S", "60"))
+BACKOFF_MAX = timedelta(hours=2)
+# Tras el final, el árbitro suele completar el acta (tarjetas, goleadores) un rato después
+CONSULTAS_PARA_CERRAR = 4
+# Terminado hace más de esto: no se vigila (un partido viejo que entra en seguimiento)
+ACTA_ABIERTA = timedelta(hours=24)
+# Sin resultado pasada la ventana: puede ser un acta que se sube tarde o un aplazado
+MARGEN_SIN_RESULTADO = timedelta(hours=3)
+RECHEQUEO = timedelta(hours=12)
+
+
+def planificar(seg, partido, ahora, cambio: bool | None = None, aplazado: bool = False,
+               intervalo_directo: int = INTERVALO_DIRECTO):
+    """
+    Actualiza seg.estado / seg.proxima_consulta (SeguimientoPartido, sin guardar).
+
+    cambio: True/False si se acaba de consultar el acta (cambió o no), None si
+            solo se replanifica (p.ej. partido recién descubierto en el listado).
+    aplazado: el acta lo marca como suspendido/aplazado.
+    """
+    if cambio is not None:
+        seg.consultas += 1
+        seg.ultima_consulta = ahora
+        seg.fallos, seg.ultimo_error = 0, ""
+        if cambio:
+            seg.ultimo_cambio = ahora
+            seg.consultas_sin_cambios = 0
+        else:
+            seg.consultas_sin_cambios += 1
+
+    directo = timedelta(seconds=intervalo_directo)
+    seg.fecha_hora_vista, seg.resultado_visto = partido.fecha_hora, resultado(partido)
+
+    if aplazado:
+        seg.estado, seg.proxima_consulta = "aplazado", ahora + RECHEQUEO
+        return seg
+
+    if partido.fecha_hora is None:
+        seg.estado, seg.proxima_consulta = "sin_fecha", ahora + RECHEQUEO
+        return seg
+
+    inicio = partido.fecha_hora - PREVIA
+    fin = partido.fecha_hora + DURACION
+
+    if ahora < inicio:
+        seg.estado, seg.proxima_consulta = "programado", inicio
+    elif ahora < fin:
+        seg.estado, seg.proxima_consulta = "en_juego", ahora + directo
+    elif not partido.jugado:
+        if ahora < fin + MARGEN_SIN_RESULTADO:
+            seg.estado = "post_partido"
+            seg.proxima_consulta = ahora + _backoff(directo, seg.consultas_sin_cambios)
+        else:
+            seg.estado, seg.proxima_consulta = "aplazado", ahora + RECHEQUEO
+    elif seg.consultas_sin_cambios >= CONSULTAS_PARA_CERRAR or ahora >= fin + ACTA_ABIERTA:
+        seg.estado, seg.proxima_consulta = "cerrado", None
+    else:
+        seg.estado = "post_partido"
+        seg.proxima_consulta = ahora + _backoff(directo, seg.consultas_sin_cambios)
+    return seg
+
+
+def resultado(partido) -> str:
+    if partido.goles_local is None or partido.goles_visitante is None:
+        return ""
+    return f"{partido.goles_local}-{partido.goles_visitante}"
+
+
+def reabrir_si_cambia(seg, partido, ahora, intervalo_directo: int = INTERVALO_DIRECTO) -> bool:
+    """
+    Si la fecha o el resultado del partido ya no son los que se vieron al
+    planificar, vuelve a planificarlo desde cero (sin guardar). Uno cerrado
+    se consulta una vez más ya mismo. True si lo ha reabierto.
+    """
+    if seg.fecha_hora_vista == partido.fecha_hora and seg.resultado_visto == resultado(partido):
+        return False
+    seg.consultas_sin_cambios = 0
+    planificar(seg, partido, ahora, intervalo_directo=intervalo_directo)
+    if seg.proxima_consulta is None:
+        seg.estado, seg.proxima_consulta = "post_partido", ahora
+    return True
+
+
+def registrar_fallo(seg, ahora, error, intervalo_directo: int = INTERVALO_DIRECTO):
+    """Consulta fallida: se apunta y se reintenta con backoff (sin guardar)."""
+    seg.fallos += 1
+    seg.ultimo_error = str(error)[:500]
+    seg.proxima_consulta = ahora + espera_tras_fallo(intervalo_directo, seg.fallos)
+    return seg
+
+
+def espera_tras_fallo(intervalo_directo: int, fallos: int) -> timedelta:
+    return _backoff(timedelta(seconds=intervalo_directo), max(fallos - 1, 0))
+
+
+def _backoff(base: timedelta, sin_cambios: int) -> timedelta:
+    # El exponente se corta donde ya se llega a BACKOFF_MAX: los contadores
+    # (fallos de un acta que siempre da 404) crecen sin límite y base * 2**n
+    # desborda timedelta
+    if base <= timedelta(0):
+        return base
+    tope = max(math.ceil(math.log2(BACKOFF_MAX / base)), 0)
+    return min(base * (2 ** min(sin_cambios + 1, tope)), BACKOFF_MAX)
@@ -0,0 +1,178 @@
+import os
+import re
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand
+
+from scraping.core import registro_config
+from scraping.core.config_temporadas import TEMPORADAS
+from scraping.core.ffcv_urls import ffcv_url, url_canonica
+from scraping.core.raw_archive import get_archive
+from scraping.management.commands.scrape_equipos import build_equipo_plantilla_url, build_url_jornada
+
+# Nombres de los .html sueltos que guardaban los comandos de scraping. Con la
+# temporada, la competición y el grupo del nombre se rehace la URL que
+# pidieron, para que el replay (--offline) los encuentre.
+_T, _CG = r"(?P<temporada>\d{4}-\d{4})", r"(?P<competicion>[A-Z]+)_(?P<grupo>[A-Z0-9]+)"
+_NOMBRES_LEGADO = (
+    ("jornada", re.compile(rf"^{_T}_{_CG}_(?:jornada_|J)(?P<jornada>\d+)(?:_LIVE)?\.html$")),
+    ("partido", re.compile(rf"^{_T}_{_CG}_(?:j(?P<j>\d+)_partido_|J(?P<J>\d+)_P)(?P<partido>\d+)(?:_LIVE)?\.html$")),
+    ("equipo", re.compile(rf"^{_T}_{_CG}_equipo_(?P<equipo>\d+)\.html$")),
+    ("jugador", re.compile(rf"^{_T}_jugador_(?P<jugador>\d+)\.html$")),
+)
+
+
+def _url_partido(cfg_sel: dict, jornada: int, id_partido: int) -> str:
+    # Mismo orden de parámetros que scrape_jornada / scrape_live_jornada
+    return ffcv_url("partido.php", {
+        "id_temp": cfg_sel["id_temp"],
+        "id_modalidad": cfg_sel["id_modalidad"],
+        "id_competicion": cfg_sel["id_competicion"],
+        "id_partido": id_partido,
+        "id_torneo": cfg_sel["id_torneo"],
+        "jornada": jornada,
+    })
+
+
+def _url_jugador(cfg: dict, jugador_id: int) -> str:
+    return ffcv_url("jugador_ficha.php", {
+        "id_temp": cfg["id_temp"],
+        "id_modalidad": cfg["id_modalidad"],
+        "id_competicion": cfg["id_competicion"],
+        "id_jugador": jugador_id,
+    })
+
+
+def urls_legado(nombre: str) -> list:
+    """
+    URLs originales (canónicas) de un .html suelto de data_raw según su nombre.
+    Lista vacía si el nombre no dice de qué grupo es (p.ej. los antiguos
+    <temporada>_jornada_NN_partido_<id>.html) o el grupo no está en config.
+    """
+    for tipo, patron in _NOMBRES_LEGADO:
+        m = patron.match(nombre)
+        if m is None:
+            continue
+        g = m.groupdict()
+        try:
+            if tipo == "jugador":
+                # scrape_jugadores pide la ficha con el primer grupo de la
+                # temporada y scrape_jugadores_todos con los IDs raíz
+                cfgs = [c.cfg_sel for c in registro_config.grupos(g["temporada"])[:1]]
+                raiz = TEMPORADAS.get(g["temporada"]) or {}
+                if raiz.get("id_competicion"):
+                    cfgs.append(raiz)
+                urls = [_url_jugador(cfg, int(g["jugador"])) for cfg in cfgs]
+            else:
+                cfg_sel = registro_config.seleccionar(g["temporada"], g["competicion"], g["grupo"]).cfg_sel
+                if tipo == "jornada":
+                    urls = [build_url_jornada(cfg_sel, int(g["jornada"]))]
+                elif tipo == "partido":
+                    urls = [_url_partido(cfg_sel, int(g["j"] or g["J"]), int(g["partido"]))]
+                else:
+                    urls = [build_equipo_plantilla_url(cfg_sel, int(g["equipo"]))]
+        except (KeyError, ValueError):
+            return []
+        return list(dict.fromkeys(url_canonica(u) for u in urls))
+    return []
+
+
+class Command(BaseCommand):
+    help = (
+        "Gestiona el archivo de HTML crudo (data_raw/archivo): estadísticas, "
+        "consulta de una URL e importación de los .html sueltos antiguos de data_raw."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--mostrar",
+            type=str,
+            default=None,
+            help="URL a mostrar (última versión archivada, o la vigente en --antes-de)",
+        )
+        parser.add_argument(
+            "--antes-de",
+            type=str,
+            default=None,
+            help="Fecha ISO 8601 UTC para --mostrar / --historial (ej: 2025-03-01T12:00:00)",
+        )
+        parser.add_argument(
+            "--historial",
+            type=str,
+            default=None,
+            help="Lista las descargas archivadas de las URLs que empiezan por este prefijo",
+        )
+        parser.add_argument(
+            "--importar-legado",
+            action="store_true",
+            help=(
+                "Mete en el archivo los .html sueltos de data_raw con la URL que se pidió, "
+                "deducida del nombre del fichero, para que el replay (--offline) los encuentre. "
+                "Los que no dicen de qué grupo son quedan con clave file:<ruta> y no se "
+                "pueden reproducir, solo consultar (--mostrar file:<ruta>) o usar en el corpus"
+            ),
+        )
+        parser.add_argument(
+            "--borrar",
+            action="store_true",
+            help="Con --importar-legado: borra cada .html una vez archivado",
+        )
+
+    def handle(self, *args, **options):
+        archivo = get_archive()
+
+        if options.get("mostrar"):
+            html = archivo.get_text(options["mostrar"], antes_de=options.get("antes_de"))
+            if html is None:
+                self.stderr.write(self.style.ERROR(f"[archivo_raw] No hay nada archivado para {options['mostrar']}"))
+                return
+            self.stdout.write(html)
+            return
+
+        if options.get("historial"):
+            for d in archivo.iter_descargas(url_prefix=options["historial"], hasta=options.get("antes_de")):
+                self.stdout.write(f"{d['descargado_en']}  {d['sha256'][:12]}  {d['url']}")
+            return
+
+        if options.get("importar_legado"):
+            self._importar_legado(archivo, borrar=options.get("borrar"))
+
+        s = archivo.stats()
+        ratio = (s["bytes_comprimidos"] / s["bytes_originales"] * 100) if s["bytes_originales"] else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f"[archivo_raw] {s['descargas']} descargas · {s['urls']} URLs · {s['blobs']} contenidos únicos "
+            f"en {s['packs']} packs · {s['bytes_originales'] / 1e6:.1f} MB → "
+            f"{s['bytes_comprimidos'] / 1e6:.1f} MB ({ratio:.0f}%)"
+        ))
+
+    def _importar_legado(self, archivo, borrar: bool = False):
+        raiz = "data_raw"
+        importados, sin_url = 0, 0
+        for dirpath, _dirs, files in os.walk(raiz):
+            if os.path.abspath(dirpath).startswith(os.path.abspath(archivo.root)):
+                continue
+            for name in sorted(files):
+                if not name.endswith(".html"):
+                    continue
+                path = os.path.join(dirpath, name)
+                with open(path, "rb") as f:
+                    body = f.read()
+                fecha = datetime.fromtimestamp(os.path.getmtime(path), tz=timezone.utc)
+                urls = urls_legado(name)
+                if not urls:
+                    urls = [f"file:{os.path.relpath(path, raiz)}"]
+                    sin_url += 1
+                # El contenido se guarda una vez aunque vaya con varias URLs
+                for url in urls:
+                    archivo.put(url, body, encoding="utf-8", descargado_en=fecha.isoformat(timespec="seconds"))
+                importados += 1
+                if borrar:
+                    os.remove(path)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"[archivo_raw] {importados} ficheros .html importados" + (" y borrados" if borrar else "")
+        ))
+        if sin_url:
+            self.stdout.write(self.style.WARNING(
+                f"[archivo_raw] {sin_url} sin URL deducible: quedan como file:<ruta> y el replay no los usa"
+            ))
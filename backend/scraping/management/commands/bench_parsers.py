@@ -0,0 +1,192 @@
+import time
+import tracemalloc
+from statistics import quantiles
+
+from django.core.management.base import BaseCommand, CommandError
+
+from scraping.core.corpus_parsers import (
+    DEFAULT_GOLDEN_DIR,
+    PARSERS,
+    cargar_golden,
+    guardar_golden,
+    iter_corpus_archivo,
+    iter_corpus_directorio,
+    normalizar,
+    primera_diferencia,
+)
+from scraping.core.raw_archive import get_archive
+
+
+def _percentil(valores, p: int) -> float:
+    if len(valores) < 2:
+        return valores[0] if valores else 0.0
+    return quantiles(valores, n=100, method="inclusive")[p - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark y regresión de los parsers de scraping/core sobre un corpus de HTML real "
+        "(archivo raw o .html sueltos): páginas/s, latencia p50/p99, pico de memoria y "
+        "comparación con la salida golden."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dir",
+            type=str,
+            default=None,
+            help="Usar .html sueltos de este directorio en vez del archivo raw (ej: data_raw)",
+        )
+        parser.add_argument(
+            "--tipo",
+            action="append",
+            choices=sorted(PARSERS),
+            help="Parser a medir (repetible). Por defecto: todos",
+        )
+        parser.add_argument(
+            "--backend",
+            action="append",
+            choices=["bs4", "lxml"],
+            help="Backend a medir (repetible). Por defecto: todos los disponibles por parser",
+        )
+        parser.add_argument("--limite", type=int, default=None, help="Máximo de páginas por parser")
+        parser.add_argument(
+            "--golden-dir",
+            type=str,
+            default=DEFAULT_GOLDEN_DIR,
+            help=f"Directorio de salidas golden (por defecto: {DEFAULT_GOLDEN_DIR})",
+        )
+        parser.add_argument(
+            "--actualizar-golden",
+            action="store_true",
+            help="(Re)escribe las golden con la salida del backend bs4 en vez de compararlas",
+        )
+        parser.add_argument(
+            "--sin-memoria",
+            action="store_true",
+            help="No medir el pico de memoria (pasada extra con tracemalloc)",
+        )
+        parser.add_argument(
+            "--max-diferencias",
+            type=int,
+            default=10,
+            help="Cuántas diferencias con golden mostrar en detalle (por defecto: 10)",
+        )
+
+    def handle(self, *args, **options):
+        tipos = options.get("tipo") or sorted(PARSERS)
+        backends = options.get("backend")
+        limite = options.get("limite")
+        golden_dir = options["golden_dir"]
+
+        if options.get("dir"):
+            fuente = iter_corpus_directorio(options["dir"], tipos)
+        else:
+            fuente = iter_corpus_archivo(get_archive(), tipos)
+
+        corpus = {tipo: [] for tipo in tipos}
+        for pagina in fuente:
+            if limite is None or len(corpus[pagina.tipo]) < limite:
+                corpus[pagina.tipo].append(pagina)
+
+        total_distintas = 0
+        for tipo in tipos:
+            paginas = corpus[tipo]
+            if not paginas:
+                self.stdout.write(self.style.WARNING(f"[bench] {tipo}: sin páginas en el corpus"))
+                continue
+
+            for backend, fn in PARSERS[tipo].items():
+                if backends and backend not in backends:
+                    continue
+                if options.get("actualizar_golden") and backend != "bs4":
+                    continue
+                total_distintas += self._medir(
+                    tipo, backend, fn, paginas, golden_dir,
+                    actualizar=options.get("actualizar_golden"),
+                    memoria=not options.get("sin_memoria"),
+                    max_diferencias=options["max_diferencias"],
+                )
+
+        if total_distintas:
+            raise CommandError(f"[bench] {total_distintas} salidas distintas de la golden")
+
+    def _medir(self, tipo, backend, fn, paginas, golden_dir, actualizar, memoria, max_diferencias) -> int:
+        tiempos = []
+        fallos = 0
+        ok = distintas = sin_golden = 0
+        mostradas = 0
+
+        inicio = time.perf_counter()
+        for pagina in paginas:
+            t0 = time.perf_counter()
+            try:
+                salida = fn(pagina.html, **pagina.kwargs)
+            except Exception as e:
+                tiempos.append(time.perf_counter() - t0)
+                fallos += 1
+                self.stderr.write(self.style.WARNING(f"[bench] {tipo} · {backend}: {pagina.origen} lanzó {e!r}"))
+                continue
+            tiempos.append(time.perf_counter() - t0)
+
+            salida = normalizar(salida)
+            if actualizar:
+                guardar_golden(golden_dir, pagina, salida)
+                continue
+
+            golden = cargar_golden(golden_dir, pagina)
+            if golden is None:
+                sin_golden += 1
+            elif golden == salida:
+                ok += 1
+            else:
+                distintas += 1
+                if mostradas < max_diferencias:
+                    mostradas += 1
+                    self.stdout.write(self.style.ERROR(
+                        f"[bench] {tipo} · {backend}: {pagina.origen} ({pagina.sha256[:12]}) → "
+                        f"{primera_diferencia(golden, salida)}"
+                    ))
+        total_s = time.perf_counter() - inicio
+
+        pico_mb = self._pico_memoria(fn, paginas) if memoria else None
+
+        ms = sorted(t * 1000 for t in tiempos)
+        linea = (
+            f"[bench] {tipo} · {backend}: {len(paginas)} páginas · "
+            f"{len(paginas) / total_s if total_s else 0.0:.1f} pág/s · "
+            f"p50 {_percentil(ms, 50):.2f} ms · p99 {_percentil(ms, 99):.2f} ms"
+        )
+        if pico_mb is not None:
+            linea += f" · pico mem {pico_mb:.1f} MB"
+        if fallos:
+            linea += f" · {fallos} con excepción"
+        if actualizar:
+            linea += " · golden actualizadas"
+        else:
+            linea += f" · golden: {ok} iguales / {distintas} distintas / {sin_golden} sin golden"
+
+        estilo = self.style.ERROR if (distintas or fallos) else self.style.SUCCESS
+        self.stdout.write(estilo(linea))
+        return distintas
+
+    def _pico_memoria(self, fn, paginas) -> float:
+        """
+        Pasada aparte con tracemalloc (lo ralentiza todo): pico de memoria
+        asignada durante el parseo de una página, el máximo del corpus.
+        """
+        pico = 0
+        tracemalloc.start()
+        try:
+            for pagina in paginas:
+                tracemalloc.reset_peak()
+                base, _ = tracemalloc.get_traced_memory()
+                try:
+                    fn(pagina.html, **pagina.kwargs)
+                except Exception:
+                    continue
+                _, peak = tracemalloc.get_traced_memory()
+                pico = max(pico, peak - base)
+        finally:
+            tracemalloc.stop()
+        return pico / (1024 * 1024)
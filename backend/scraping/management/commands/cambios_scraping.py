@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+from django.utils import timezone
+
+from nucleo.models import Grupo
+from scraping.core import cambios
+from scraping.models import CambioPartido, ConsumidorCambios
+
+
+class Command(BaseCommand):
+    help = (
+        "Consulta el registro de cambios del scraping (scraping.CambioPartido): qué "
+        "grupos/jornadas han cambiado y qué le queda por procesar a cada recálculo."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dias", type=int, default=7, help="Ventana en días (por defecto: 7)")
+        parser.add_argument("--ejecucion", type=int, default=None, help="Solo los cambios de esta ejecución (status.EjecucionScraping)")
+        parser.add_argument("--consumidor", type=str, default=None, help="Lo pendiente para este consumidor (p.ej. clasificacion)")
+        parser.add_argument(
+            "--confirmar",
+            action="store_true",
+            help="Con --consumidor: da por procesado todo lo registrado hasta ahora",
+        )
+        parser.add_argument(
+            "--purgar-dias",
+            type=int,
+            default=None,
+            help="Borra los cambios de hace más de N días y sale",
+        )
+
+    def handle(self, *args, **options):
+        if options.get("purgar_dias") is not None:
+            borrados = cambios.purgar(options["purgar_dias"])
+            self.stdout.write(self.style.SUCCESS(f"[cambios] {borrados} filas borradas"))
+            return
+
+        consumidor = options.get("consumidor")
+        if consumidor:
+            pares, hasta = cambios.pendientes(consumidor)
+            self._pares(f"Pendiente para {consumidor}", pares)
+            if options.get("confirmar"):
+                cambios.confirmar(consumidor, hasta)
+                self.stdout.write(self.style.SUCCESS(f"[cambios] {consumidor} confirmado hasta #{hasta}"))
+            return
+
+        qs = CambioPartido.objects.all()
+        if options.get("ejecucion"):
+            qs = qs.filter(ejecucion_id=options["ejecucion"])
+        else:
+            qs = qs.filter(creado_en__gte=timezone.now() - timedelta(days=options["dias"]))
+        self._pares("Grupos/jornadas con cambios", cambios.pares_afectados(qs))
+
+        self.stdout.write(self.style.MIGRATE_HEADING("\nConsumidores"))
+        ultimo = CambioPartido.objects.aggregate(m=Max("id"))["m"] or 0
+        for c in ConsumidorCambios.objects.order_by("nombre"):
+            retraso = CambioPartido.objects.filter(id__gt=c.ultimo_cambio_id, id__lte=ultimo).count()
+            linea = f"{c.nombre:<28} hasta #{c.ultimo_cambio_id} ({timezone.localtime(c.actualizado_en):%Y-%m-%d %H:%M}) · {retraso} cambios pendientes"
+            self.stdout.write(self.style.WARNING(linea) if retraso else linea)
+
+    def _pares(self, titulo, pares):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\n{titulo}: {len(pares)} grupo/jornada"))
+        grupos = Grupo.objects.select_related("competicion", "temporada").in_bulk({g for g, _ in pares})
+        for (grupo_id, jornada), tipos in sorted(pares.items()):
+            g = grupos.get(grupo_id)
+            nombre = f"{g.temporada.nombre} {g.competicion.nombre} {g.nombre}" if g else f"grupo {grupo_id}"
+            self.stdout.write(f"  {nombre} · J{jornada}: {', '.join(t for t in cambios.TIPOS_CAMBIO if t in tipos)}")
@@ -0,0 +1,155 @@
+from collections import defaultdict
+from datetime import timedelta
+from statistics import median
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from status.models import EjecucionScraping, MedicionPagina
+
+DIAS = ["lun", "mar", "mié", "jue", "vie", "sáb", "dom"]
+# Una ejecución que tarda más que esto × la mediana de su comando se marca como lenta
+FACTOR_LENTA = 1.5
+
+
+def _percentil(ordenados: list, p: float):
+    if not ordenados:
+        return None
+    return ordenados[min(int(len(ordenados) * p), len(ordenados) - 1)]
+
+
+def _ms(v) -> str:
+    if v is None:
+        return "—"
+    return f"{v / 1000:.1f}s" if v >= 1000 else f"{v:.0f}ms"
+
+
+class Command(BaseCommand):
+    help = (
+        "Resume la telemetría de scraping (status.EjecucionScraping / MedicionPagina): "
+        "evolución de las ejecuciones, tiempos por tipo de página y por día de la semana, "
+        "y las páginas más lentas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--comando", type=str, default=None, help="Solo este comando (p.ej. scrape_semana)")
+        parser.add_argument("--dias", type=int, default=30, help="Ventana en días (por defecto: 30)")
+        parser.add_argument("--ejecucion", type=int, default=None, help="Detalle de una ejecución concreta (id)")
+        parser.add_argument("--top", type=int, default=15, help="Nº de páginas más lentas a mostrar (por defecto: 15)")
+        parser.add_argument(
+            "--purgar-dias",
+            type=int,
+            default=None,
+            help="Borra las ejecuciones (y sus mediciones) de hace más de N días y sale",
+        )
+
+    def handle(self, *args, **options):
+        if options.get("purgar_dias") is not None:
+            limite = timezone.now() - timedelta(days=options["purgar_dias"])
+            borradas, _ = EjecucionScraping.objects.filter(inicio__lt=limite).delete()
+            self.stdout.write(self.style.SUCCESS(f"[telemetria] {borradas} filas borradas (antes de {limite:%Y-%m-%d})"))
+            return
+
+        ejecuciones = EjecucionScraping.objects.all()
+        if options.get("ejecucion"):
+            ejecuciones = ejecuciones.filter(pk=options["ejecucion"])
+        else:
+            ejecuciones = ejecuciones.filter(inicio__gte=timezone.now() - timedelta(days=options["dias"]))
+            if options.get("comando"):
+                ejecuciones = ejecuciones.filter(comando=options["comando"])
+        ejecuciones = list(ejecuciones.order_by("inicio"))
+        if not ejecuciones:
+            self.stdout.write(self.style.WARNING("[telemetria] No hay ejecuciones registradas en esa ventana."))
+            return
+
+        ids = [e.pk for e in ejecuciones]
+        latencias = defaultdict(list)
+        for ejecucion_id, ms in (
+            MedicionPagina.objects.filter(ejecucion_id__in=ids, descarga_ms__isnull=False)
+            .values_list("ejecucion_id", "descarga_ms")
+        ):
+            latencias[ejecucion_id].append(ms)
+        for valores in latencias.values():
+            valores.sort()
+
+        self._ejecuciones(ejecuciones, latencias)
+        self._por_dia(ejecuciones, latencias)
+        self._por_tipo(ids)
+        self._mas_lentas(ids, options["top"])
+
+    def _ejecuciones(self, ejecuciones, latencias):
+        self.stdout.write(self.style.MIGRATE_HEADING("\nEjecuciones"))
+        medianas = defaultdict(list)
+        for e in ejecuciones:
+            if e.duracion_s is not None:
+                medianas[e.comando].append(e.duracion_s)
+        medianas = {c: median(v) for c, v in medianas.items()}
+
+        for e in ejecuciones:
+            inicio = timezone.localtime(e.inicio)
+            lat = latencias.get(e.pk, [])
+            pct_304 = (e.no_modificadas / e.peticiones * 100) if e.peticiones else 0.0
+            linea = (
+                f"#{e.pk:<5} {inicio:%Y-%m-%d} {DIAS[inicio.weekday()]} {inicio:%H:%M}  {e.comando:<22} "
+                f"{(e.duracion_s or 0):7.0f}s · {e.peticiones} pet ({pct_304:.0f}% 304, {e.fallidas} fallidas) · "
+                f"{e.bytes / 1e6:.1f} MB · descarga {e.descarga_s:.0f}s "
+                f"(p50 {_ms(_percentil(lat, 0.5))}, p95 {_ms(_percentil(lat, 0.95))}) · "
+                f"parseo {e.parseo_s:.0f}s · BD {e.bd_s:.0f}s · {e.filas} filas"
+            )
+            mediana = medianas.get(e.comando)
+            if e.estado != "ok":
+                self.stdout.write(self.style.ERROR(f"{linea} · {e.estado}"))
+            elif mediana and e.duracion_s and e.duracion_s > FACTOR_LENTA * mediana:
+                self.stdout.write(self.style.WARNING(f"{linea} · {e.duracion_s / mediana:.1f}x la mediana"))
+            else:
+                self.stdout.write(linea)
+
+    def _por_dia(self, ejecuciones, latencias):
+        self.stdout.write(self.style.MIGRATE_HEADING("\nPor comando y día de la semana (medias)"))
+        grupos = defaultdict(list)
+        for e in ejecuciones:
+            if e.duracion_s is not None:
+                grupos[(e.comando, timezone.localtime(e.inicio).weekday())].append(e)
+        for (comando, dia), lista in sorted(grupos.items()):
+            n = len(lista)
+            p95 = [p for p in (_percentil(latencias.get(e.pk, []), 0.95) for e in lista) if p is not None]
+            self.stdout.write(
+                f"{comando:<22} {DIAS[dia]}  {n:3d} ejecuciones · "
+                f"{sum(e.duracion_s for e in lista) / n:7.0f}s · "
+                f"{sum(e.peticiones for e in lista) / n:6.0f} pet · "
+                f"descarga {sum(e.descarga_s for e in lista) / n:.0f}s · "
+                f"parseo {sum(e.parseo_s for e in lista) / n:.0f}s · BD {sum(e.bd_s for e in lista) / n:.0f}s · "
+                f"p95 latencia {_ms(sum(p95) / len(p95) if p95 else None)}"
+            )
+
+    def _por_tipo(self, ids):
+        self.stdout.write(self.style.MIGRATE_HEADING("\nPor tipo de página"))
+        por_tipo = defaultdict(list)
+        for fila in MedicionPagina.objects.filter(ejecucion_id__in=ids).values_list(
+            "tipo", "descarga_ms", "bytes", "parseo_ms", "bd_ms", "error"
+        ):
+            por_tipo[fila[0]].append(fila)
+        for tipo, filas in sorted(por_tipo.items(), key=lambda kv: -len(kv[1])):
+            lat = sorted(f[1] for f in filas if f[1] is not None)
+            parseos = [f[3] for f in filas if f[3] is not None]
+            bds = [f[4] for f in filas if f[4] is not None]
+            errores = sum(1 for f in filas if f[5])
+            self.stdout.write(
+                f"{tipo:<24} {len(filas):6d} · p50 {_ms(_percentil(lat, 0.5))} · p95 {_ms(_percentil(lat, 0.95))} · "
+                f"máx {_ms(lat[-1] if lat else None)} · {sum(f[2] for f in filas) / len(filas) / 1e3:.1f} KB/pág · "
+                f"parseo {_ms(sum(parseos) / len(parseos) if parseos else None)} · "
+                f"BD {_ms(sum(bds) / len(bds) if bds else None)} · {errores} errores"
+            )
+
+    def _mas_lentas(self, ids, top: int):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\n{top} páginas más lentas"))
+        lentas = (
+            MedicionPagina.objects.filter(ejecucion_id__in=ids, descarga_ms__isnull=False)
+            .order_by("-descarga_ms")[:top]
+        )
+        for m in lentas:
+            self.stdout.write(
+                f"{_ms(m.descarga_ms):>7}  {timezone.localtime(m.momento):%Y-%m-%d %H:%M}  #{m.ejecucion_id:<5} "
+                f"{m.estado_http or '—'}  {m.bytes / 1e3:.0f} KB · parseo {_ms(m.parseo_ms)} · BD {_ms(m.bd_ms)}  "
+                f"{m.url}" + (f"  ({m.error})" if m.error else "")
+            )
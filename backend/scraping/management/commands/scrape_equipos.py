@@ -1,99 +1,33 @@
 # management/commands/scrape_equipos.py
 import os
 import json
-import time
-from urllib.parse import urlencode
 
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from django.db.utils import DataError
 
 from scraping.core.config_temporadas import TEMPORADAS
-from scraping.core.fetcher import fetch_url
-from scraping.core.fetch_binary import fetch_binary
+from scraping.core.ffcv_urls import ffcv_url
+from scraping.core.fetch_engine import add_engine_arguments, engine_from_options
+from scraping.core.http_client import format_stats
+from scraping.core import registro_config, telemetria
+from status import versiones
+from scraping.core.identidades import IdentityMap
+from scraping.core.imagenes import FuenteImagen, IngestaImagenes
+from scraping.core.manifiesto import guardar_plantilla
 from scraping.core.utils_equipo import collect_equipo_ids_from_jornada
 from scraping.core.parser_equipo_plantilla import parse_equipo_plantilla
-from scraping.core.parser_partidos import parse_jornada_partidos
+from scraping.core.parsers import add_parser_argument, parsers_from_options
 from scraping.core.temporadas_utils import get_or_create_temporada
 
+from nucleo.media import es_imagen_ingerida
 from nucleo.models import Temporada
 from clubes.models import Club
 from jugadores.models import Jugador, JugadorEnClubTemporada
+from jugadores import trayectoria
 from staff.models import StaffClub
 
 
-COMPETICION_NAME_MAP = {
-    "TERCERA": "Tercera División",
-    "PREFERENTE": "Preferente",
-    "PRIMERA": "Primera Regional",
-    "SEGUNDA": "Segunda Regional",
-}
-
-def _select_cfg(temporada_cfg: dict, competicion_key: str, grupo_key: str):
-    """
-    Devuelve (cfg_sel, meta):
-      cfg_sel = { id_temp, id_modalidad, id_competicion, id_torneo }
-      meta    = { grupo_nombre, jornadas }
-    """
-    compk = (competicion_key or "TERCERA").upper()
-    gkey = (grupo_key or "").upper()
-
-    if compk == "TERCERA":
-        if "grupos" in temporada_cfg and gkey in temporada_cfg["grupos"]:
-            gcfg = temporada_cfg["grupos"][gkey]
-            cfg_sel = {
-                "id_temp": temporada_cfg["id_temp"],
-                "id_modalidad": temporada_cfg["id_modalidad"],
-                "id_competicion": gcfg["id_competicion"],
-                "id_torneo": gcfg["id_torneo"],
-            }
-            meta = {
-                "grupo_nombre": gcfg.get("grupo_nombre", f"Grupo {gkey}"),
-                "jornadas": gcfg.get("jornadas", temporada_cfg.get("jornadas", 30)),
-            }
-            return cfg_sel, meta
-
-        # Fallback compat si no hay 'grupos'
-        cfg_sel = {
-            "id_temp": temporada_cfg["id_temp"],
-            "id_modalidad": temporada_cfg["id_modalidad"],
-            "id_competicion": temporada_cfg["id_competicion"],
-            "id_torneo": temporada_cfg["id_torneo"],
-        }
-        meta = {
-            "grupo_nombre": f"Grupo {gkey or 'XV'}",
-            "jornadas": temporada_cfg.get("jornadas", 30),
-        }
-        return cfg_sel, meta
-
-    otras = temporada_cfg.get("otras_competiciones", {})
-    node = (
-        otras.get("Preferente") if compk == "PREFERENTE"
-        else otras.get("Primera Regional") if compk == "PRIMERA"
-        else otras.get("Segunda Regional") if compk == "SEGUNDA"
-        else None
-    )
-    if not node:
-        raise ValueError(f"No hay configuración para la competición '{competicion_key}' en esta temporada.")
-
-    grupos = node.get("grupos", {})
-    if gkey not in grupos:
-        raise ValueError(f"No hay configuración para el grupo '{grupo_key}' en '{competicion_key}'.")
-
-    gcfg = grupos[gkey]
-    cfg_sel = {
-        "id_temp": temporada_cfg["id_temp"],
-        "id_modalidad": temporada_cfg["id_modalidad"],
-        "id_competicion": node["id_competicion"],
-        "id_torneo": gcfg["id_torneo"],
-    }
-    meta = {
-        "grupo_nombre": gcfg.get("grupo_nombre", f"{competicion_key.title()} - {gkey}"),
-        "jornadas": gcfg.get("jornadas", temporada_cfg.get("jornadas", 30)),
-    }
-    return cfg_sel, meta
-
-
 def build_equipo_plantilla_url(cfg_sel: dict, id_equipo: int) -> str:
     params = {
         "id_temp":        cfg_sel["id_temp"],
@@ -103,7 +37,7 @@ def build_equipo_plantilla_url(cfg_sel: dict, id_equipo: int) -> str:
         "torneo_equipo":  "",
         "id_torneo":      cfg_sel["id_torneo"],
     }
-    return "https://resultadosffcv.isquad.es/equipo_plantilla.php?" + urlencode(params)
+    return ffcv_url("equipo_plantilla.php", params)
 
 
 def build_url_jornada(cfg_sel: dict, jornada_num: int) -> str:
@@ -114,7 +48,7 @@ def build_url_jornada(cfg_sel: dict, jornada_num: int) -> str:
         "id_modalidad":   cfg_sel["id_modalidad"],
         "id_competicion": cfg_sel["id_competicion"],
     }
-    return "https://resultadosffcv.isquad.es/total_partidos.php?" + urlencode(params)
+    return ffcv_url("total_partidos.php", params)
 
 
 class Command(BaseCommand):
@@ -127,10 +61,37 @@ class Command(BaseCommand):
         parser.add_argument("--temporada", type=str, default="2025-2026")
         parser.add_argument("--j_inicio", type=int, default=1, help="Jornada inicio para fallback (sin partidos_detalle).")
         parser.add_argument("--j_fin", type=int, default=5, help="Jornada fin para fallback (sin partidos_detalle).")
+        add_engine_arguments(parser)
+        add_parser_argument(parser)
 
     # -----------------------
     # Helpers internos (BD)
     # -----------------------
+    def _ingerir_escudos(self, engine, escudos: dict):
+        """
+        escudos: {club_pk: (eid, url)}. Descarga en paralelo, deduplica por
+        contenido y deja en Club.escudo_url la miniatura servible.
+        """
+        if not escudos:
+            return
+        self.stdout.write(self.style.HTTP_INFO(f"[equipos] Procesando {len(escudos)} escudos …"))
+        with IngestaImagenes(engine) as ingesta:
+            rutas = ingesta.ingerir(FuenteImagen(pk, url) for pk, (_, url) in escudos.items())
+        for pk, error in ingesta.errores.items():
+            eid, url = escudos[pk]
+            self.stderr.write(self.style.WARNING(
+                f"[equipos] No se pudo bajar escudo {eid} desde {url}: {error}"
+            ))
+        clubs = Club.objects.in_bulk(list(rutas))
+        cambiados = []
+        for pk, ruta in rutas.items():
+            club = clubs.get(pk)
+            if club is not None and club.escudo_url != ruta:
+                club.escudo_url = ruta
+                cambiados.append(club)
+        Club.objects.bulk_update(cambiados, ["escudo_url"], batch_size=200)
+        self.stdout.write(ingesta.format_stats())
+
     def _get_or_create_club_full(self, equipo_info: dict) -> Club:
         club_id_federacion = equipo_info.get("id_equipo")
         nombre_equipo = (equipo_info.get("nombre_equipo") or "").strip() or "DESCONOCIDO"
@@ -139,13 +100,7 @@ class Command(BaseCommand):
         telefono = (equipo_info.get("telefono") or "")[:50]
         email_contacto = (equipo_info.get("email") or "")[:200]
 
-        club_obj = None
-        if club_id_federacion:
-            club_obj = Club.objects.filter(
-                identificador_federacion=str(club_id_federacion)
-            ).first()
-
-        if club_obj is None:
+        def _crear_por_nombre():
             try:
                 club_obj, _ = Club.objects.get_or_create(
                     nombre_oficial=nombre_equipo,
@@ -174,6 +129,16 @@ class Command(BaseCommand):
                         "activo": True,
                     },
                 )
+            return club_obj
+
+        # El mapa de identidades evita la consulta si el club ya salió en esta ejecución
+        club_obj = self.identidades.club(
+            club_id_federacion,
+            lambda: Club.objects.filter(identificador_federacion=str(club_id_federacion)).first(),
+        )
+
+        if club_obj is None:
+            club_obj = self.identidades.club_por_nombre(nombre_equipo, _crear_por_nombre)
         else:
             dirty_fields = []
             if not club_obj.nombre_corto:
@@ -182,7 +147,8 @@ class Command(BaseCommand):
             if pabellon and club_obj.pabellon != pabellon:
                 club_obj.pabellon = pabellon
                 dirty_fields.append("pabellon")
-            if escudo_url and club_obj.escudo_url != escudo_url:
+            # Si el escudo ya está descargado, la ingesta de imágenes lo mantiene al día
+            if escudo_url and club_obj.escudo_url != escudo_url and not es_imagen_ingerida(club_obj.escudo_url):
                 club_obj.escudo_url = escudo_url
                 dirty_fields.append("escudo_url")
             if telefono and club_obj.telefono != telefono:
@@ -205,12 +171,21 @@ class Command(BaseCommand):
                         dirty_fields = [f for f in dirty_fields if f != "telefono"]
                     if dirty_fields:
                         club_obj.save(update_fields=dirty_fields)
+                self.identidades.registrar("club", club_obj.identificador_federacion, club_obj)
 
         return club_obj
 
-    def _upsert_jugador_desde_plantilla(self, jugador_info: dict) -> tuple[Jugador, str | None]:
+    def _upsert_jugador_desde_plantilla(self, jugador_info: dict) -> tuple[int, str | None]:
+        """
+        Devuelve (pk del Jugador, dorsal). Solo se necesita la pk, así que si el
+        jugador está en el mapa de identidades no se consulta la BD.
+        """
         jugador_id = jugador_info.get("jugador_id")
         nombre = (jugador_info.get("nombre") or "").strip() or "DESCONOCIDO"
+        jugador_pk = self.identidades.buscar("jugador", str(jugador_id)) if jugador_id else None
+        if jugador_pk is not None:
+            return jugador_pk, None
+
         jugador_obj = None
         if jugador_id:
             jugador_obj = Jugador.objects.filter(
@@ -230,17 +205,19 @@ class Command(BaseCommand):
             if jugador_id and not jugador_obj.identificador_federacion:
                 jugador_obj.identificador_federacion = str(jugador_id)
                 jugador_obj.save(update_fields=["identificador_federacion"])
-        return jugador_obj, None
+        if jugador_id and jugador_obj.nombre and jugador_obj.identificador_federacion == str(jugador_id):
+            self.identidades.registrar("jugador", str(jugador_id), jugador_obj.pk)
+        return jugador_obj.pk, None
 
     def _upsert_jugador_en_club_temporada_base(
         self,
-        jugador_obj: Jugador,
+        jugador_pk: int,
         club_obj: Club,
         temporada_obj: Temporada,
         dorsal: str | None,
     ):
         rec, created = JugadorEnClubTemporada.objects.get_or_create(
-            jugador=jugador_obj,
+            jugador_id=jugador_pk,
             club=club_obj,
             temporada=temporada_obj,
             defaults={
@@ -257,6 +234,9 @@ class Command(BaseCommand):
         if dorsal and not rec.dorsal:
             rec.dorsal = (dorsal or "")[:10]
             rec.save(update_fields=["dorsal"])
+        elif not created:
+            return
+        self.trayectorias.add(jugador_pk)
 
     def _upsert_staffclub(self, staff_info_list: list[dict], club_obj: Club, temporada_obj: Temporada):
         for s in staff_info_list:
@@ -275,7 +255,7 @@ class Command(BaseCommand):
     # ID equipos por grupo
     # -----------------------
     def _collect_equipo_ids_para_grupo(
-        self, temporada_key: str, competicion_key: str, grupo_key: str,
+        self, engine, temporada_key: str, competicion_key: str, grupo_key: str,
         cfg_sel: dict, j_inicio: int, j_fin: int
     ) -> list[int]:
         """
@@ -308,32 +288,25 @@ class Command(BaseCommand):
 
         # 2) Fallback: listar jornadas y extraer equipos del HTML de jornada
         raw_dir = os.path.join("data_raw", "html_listados")
-        os.makedirs(raw_dir, exist_ok=True)
 
-        for j in range(j_inicio, j_fin + 1):
-            url_j = build_url_jornada(cfg_sel, j)
-            raw_path = os.path.join(
-                raw_dir, f"{temporada_key}_{competicion_key}_{grupo_key}_jornada_{j:02d}.html"
+        tareas = [
+            (
+                j,
+                build_url_jornada(cfg_sel, j),
+                os.path.join(raw_dir, f"{temporada_key}_{competicion_key}_{grupo_key}_jornada_{j:02d}.html"),
             )
-            # Intento 1
-            try:
-                fetch_url(url_j, raw_path)
-            except Exception as e1:
-                # Espera 3s y reintenta
-                time.sleep(3)
-                try:
-                    fetch_url(url_j, raw_path)
-                except Exception as e2:
-                    # Saltamos esta jornada y seguimos
-                    self.stderr.write(self.style.WARNING(
-                        f"[equipos] Falló listado J{j} ({competicion_key} {grupo_key}): {e2}"
-                    ))
-                    continue
+            for j in range(j_inicio, j_fin + 1)
+        ]
+        # El motor ya reintenta una vez tras 3s; si aun así falla, saltamos la jornada
+        for j, html_text, error in engine.iter_ordered(tareas):
+            if error is not None:
+                self.stderr.write(self.style.WARNING(
+                    f"[equipos] Falló listado J{j} ({competicion_key} {grupo_key}): {error}"
+                ))
+                continue
 
             try:
-                with open(raw_path, "r", encoding="utf-8") as f:
-                    html_text = f.read()
-                jornada_data = parse_jornada_partidos(html_text)
+                jornada_data = self.parsers.jornada_partidos(html_text)
             except Exception:
                 jornada_data = {}
 
@@ -350,7 +323,12 @@ class Command(BaseCommand):
     # -----------------------
     # MAIN
     # -----------------------
+    @telemetria.instrumentar("scrape_equipos")
+    @versiones.al_terminar
     def handle(self, *args, **options):
+        self.parsers = parsers_from_options(options)
+        # Mapa de identidades de esta ejecución (se precarga con la temporada)
+        self.identidades = IdentityMap()
         temporada_key = options["temporada"]
         j_inicio = int(options["j_inicio"])
         j_fin = int(options["j_fin"])
@@ -362,154 +340,136 @@ class Command(BaseCommand):
 
         # Temporada en BD
         temporada_obj = get_or_create_temporada(temporada_key)
+        self.identidades.precargar(temporada_obj)
+        self.trayectorias = set()  # pk de los jugadores con altas/cambios en la plantilla
         self.stdout.write(self.style.MIGRATE_HEADING(f"[equipos] Temporada en BD: {temporada_obj}"))
 
-        # Construir listado de (competicion_cli, grupo_key) a recorrer
-        targets: list[tuple[str, str]] = []
-
-        # TERCERA
-        if "grupos" in tcfg:
-            for gkey in sorted(tcfg["grupos"].keys()):
-                targets.append(("TERCERA", gkey))
-
-        # Otras competiciones
-        otras = tcfg.get("otras_competiciones", {})
-        for comp_name, comp_node in otras.items():
-            comp_cli = ("PREFERENTE" if comp_name == "Preferente"
-                        else "PRIMERA" if comp_name == "Primera Regional"
-                        else "SEGUNDA")
-            for gkey in sorted((comp_node.get("grupos") or {}).keys()):
-                targets.append((comp_cli, gkey))
+        # Grupos a recorrer (Tercera y luego el resto de competiciones)
+        targets = registro_config.grupos(temporada_key)
 
         if not targets:
             self.stderr.write(self.style.ERROR("[equipos] No hay grupos definidos en la temporada."))
             return
 
         raw_equipo_dir = os.path.join("data_raw", "html_equipos")
-        os.makedirs(raw_equipo_dir, exist_ok=True)
         clean_equipo_dir = os.path.join("data_clean", "equipos")
         os.makedirs(clean_equipo_dir, exist_ok=True)
-        escudos_dir = os.path.join("media", "escudos")
-        os.makedirs(escudos_dir, exist_ok=True)
 
-        for competicion_key, grupo_key in targets:
-            # Selección de cfg por grupo
-            try:
-                cfg_sel, meta = _select_cfg(tcfg, competicion_key, grupo_key)
-            except ValueError as e:
-                self.stderr.write(self.style.ERROR(f"[equipos] {e}"))
-                continue
-
-            self.stdout.write(self.style.HTTP_INFO(
-                f"[equipos] {temporada_key} · {competicion_key} · {grupo_key} — "
-                f"colectando equipos (J{j_inicio}..J{j_fin})…"
-            ))
+        # Motor de descargas compartido por todos los grupos: plantillas y escudos
+        # se bajan en paralelo (respetando el ritmo contra FFCV) mientras se parsea y guarda.
+        with engine_from_options(options) as engine:
+            escudos = {}  # club pk -> (eid, url del escudo)
 
-            equipo_ids = self._collect_equipo_ids_para_grupo(
-                temporada_key, competicion_key, grupo_key, cfg_sel, j_inicio, j_fin
-            )
+            for sel in targets:
+                competicion_key, grupo_key = sel.competicion, sel.grupo
+                cfg_sel = sel.cfg_sel
 
-            if not equipo_ids:
-                self.stderr.write(self.style.WARNING(
-                    f"[equipos] Sin equipos detectados en {competicion_key} {grupo_key} (J{j_inicio}-{j_fin})."
+                self.stdout.write(self.style.HTTP_INFO(
+                    f"[equipos] {temporada_key} · {competicion_key} · {grupo_key} — "
+                    f"colectando equipos (J{j_inicio}..J{j_fin})…"
                 ))
-                continue
-
-            self.stdout.write(self.style.NOTICE(
-                f"[equipos] {competicion_key} {grupo_key}: {len(equipo_ids)} equipos → {equipo_ids}"
-            ))
 
-            # ---- Procesar cada equipo de este grupo ----
-            for eid in equipo_ids:
-                url_equipo = build_equipo_plantilla_url(cfg_sel, eid)
-                raw_equipo_path = os.path.join(
-                    raw_equipo_dir, f"{temporada_key}_{competicion_key}_{grupo_key}_equipo_{eid}.html"
+                equipo_ids = self._collect_equipo_ids_para_grupo(
+                    engine, temporada_key, competicion_key, grupo_key, cfg_sel, j_inicio, j_fin
                 )
 
-                self.stdout.write(self.style.HTTP_INFO(f"[equipos] Descargando equipo {eid} …"))
+                if not equipo_ids:
+                    self.stderr.write(self.style.WARNING(
+                        f"[equipos] Sin equipos detectados en {competicion_key} {grupo_key} (J{j_inicio}-{j_fin})."
+                    ))
+                    continue
 
-                # Intento 1
-                try:
-                    fetch_url(url_equipo, raw_equipo_path)
-                except Exception as e1:
-                    time.sleep(3)
-                    # Intento 2
-                    try:
-                        fetch_url(url_equipo, raw_equipo_path)
-                    except Exception as e2:
+                self.stdout.write(self.style.NOTICE(
+                    f"[equipos] {competicion_key} {grupo_key}: {len(equipo_ids)} equipos → {equipo_ids}"
+                ))
+
+                # ---- Procesar cada equipo de este grupo ----
+                tareas = [
+                    (
+                        eid,
+                        build_equipo_plantilla_url(cfg_sel, eid),
+                        os.path.join(raw_equipo_dir, f"{temporada_key}_{competicion_key}_{grupo_key}_equipo_{eid}.html"),
+                    )
+                    for eid in equipo_ids
+                ]
+                self.stdout.write(self.style.HTTP_INFO(f"[equipos] Descargando {len(tareas)} plantillas …"))
+                url_de = {eid: url for eid, url, _ in tareas}
+
+                for eid, equipo_html, error in engine.iter_ordered(tareas):
+                    if error is not None:
                         self.stderr.write(self.style.WARNING(
-                            f"[equipos] FALLÓ equipo {eid} (saltado): {e2}"
+                            f"[equipos] FALLÓ equipo {eid} (saltado): {error}"
                         ))
                         continue
 
-                # Abrir y parsear
-                try:
-                    with open(raw_equipo_path, "r", encoding="utf-8") as f:
-                        equipo_html = f.read()
-                    equipo_clean = parse_equipo_plantilla(equipo_html)
-                except Exception as e:
-                    self.stderr.write(self.style.WARNING(
-                        f"[equipos] No parseable equipo {eid} (saltado): {e}"
-                    ))
-                    continue
+                    # Abrir y parsear
+                    try:
+                        with telemetria.medir_parseo(url_de[eid]):
+                            equipo_clean = parse_equipo_plantilla(equipo_html)
+                    except Exception as e:
+                        self.stderr.write(self.style.WARNING(
+                            f"[equipos] No parseable equipo {eid} (saltado): {e}"
+                        ))
+                        continue
 
-                # Guardar JSON limpio (debug)
-                clean_equipo_path = os.path.join(
-                    clean_equipo_dir,
-                    f"{temporada_key}_{competicion_key}_{grupo_key}_equipo_{eid}.json",
-                )
-                try:
-                    with open(clean_equipo_path, "w", encoding="utf-8") as f:
-                        json.dump(equipo_clean, f, indent=2, ensure_ascii=False)
-                except Exception:
-                    pass
+                    # Guardar JSON limpio y registrarlo en el manifiesto (lista de jugadores)
+                    clean_equipo_path = os.path.join(
+                        clean_equipo_dir,
+                        f"{temporada_key}_{competicion_key}_{grupo_key}_equipo_{eid}.json",
+                    )
+                    try:
+                        guardar_plantilla(clean_equipo_path, equipo_clean)
+                    except Exception:
+                        pass
 
-                # ==== Persistencia en BD ====
-                try:
-                    with transaction.atomic():
-                        equipo_info = (equipo_clean.get("equipo") or {})
-                        club_obj = self._get_or_create_club_full(equipo_info)
-
-                        for jugador_info in (equipo_clean.get("jugadores") or []):
-                            jugador_obj, dorsal = self._upsert_jugador_desde_plantilla(jugador_info)
-                            self._upsert_jugador_en_club_temporada_base(
-                                jugador_obj=jugador_obj,
+                    # ==== Persistencia en BD ====
+                    try:
+                        with telemetria.medir_bd([url_de[eid]]), transaction.atomic():
+                            equipo_info = (equipo_clean.get("equipo") or {})
+                            club_obj = self._get_or_create_club_full(equipo_info)
+
+                            for jugador_info in (equipo_clean.get("jugadores") or []):
+                                jugador_pk, dorsal = self._upsert_jugador_desde_plantilla(jugador_info)
+                                self._upsert_jugador_en_club_temporada_base(
+                                    jugador_pk=jugador_pk,
+                                    club_obj=club_obj,
+                                    temporada_obj=temporada_obj,
+                                    dorsal=dorsal,
+                                )
+
+                            self._upsert_staffclub(
+                                staff_info_list=(equipo_clean.get("tecnicos") or []),
                                 club_obj=club_obj,
                                 temporada_obj=temporada_obj,
-                                dorsal=dorsal,
                             )
-
-                        self._upsert_staffclub(
-                            staff_info_list=(equipo_clean.get("tecnicos") or []),
-                            club_obj=club_obj,
-                            temporada_obj=temporada_obj,
-                        )
-                except DataError as de:
-                    # si el problema vuelve a ser teléfono u otro campo largo, lo dejamos log y seguimos
-                    self.stderr.write(self.style.WARNING(
-                        f"[equipos] DataError guardando equipo {eid} (saltado): {de}"
-                    ))
-                    continue
-                except Exception as e:
-                    self.stderr.write(self.style.WARNING(
-                        f"[equipos] Error guardando equipo {eid} (saltado): {e}"
-                    ))
-                    continue
-
-                # Escudo (best-effort)
-                escudo_url = (equipo_clean.get("equipo") or {}).get("escudo_url", "")
-                if escudo_url:
-                    escudo_path = os.path.join(escudos_dir, f"{eid}.png")
-                    try:
-                        self.stdout.write(self.style.NOTICE(f"[equipos] Descargando escudo {eid} …"))
-                        fetch_binary(escudo_url, escudo_path)
+                    except DataError as de:
+                        # si el problema vuelve a ser teléfono u otro campo largo, lo dejamos log y seguimos
+                        self.stderr.write(self.style.WARNING(
+                            f"[equipos] DataError guardando equipo {eid} (saltado): {de}"
+                        ))
+                        continue
                     except Exception as e:
                         self.stderr.write(self.style.WARNING(
-                            f"[equipos] No se pudo bajar escudo {eid} desde {escudo_url}: {e}"
+                            f"[equipos] Error guardando equipo {eid} (saltado): {e}"
                         ))
+                        continue
 
-                self.stdout.write(self.style.SUCCESS(
-                    f"[equipos] Equipo {eid} procesado OK → {club_obj}"
-                ))
+                    # Escudo (best-effort): se bajan todos juntos al final, deduplicados
+                    escudo_url = (equipo_clean.get("equipo") or {}).get("escudo_url", "")
+                    if escudo_url:
+                        escudos[club_obj.pk] = (eid, escudo_url)
+
+                    self.stdout.write(self.style.SUCCESS(
+                        f"[equipos] Equipo {eid} procesado OK → {club_obj}"
+                    ))
+
+            self._ingerir_escudos(engine, escudos)
+        self.stdout.write(engine.format_stats())
+
+        if self.trayectorias:
+            filas = trayectoria.reconstruir(self.trayectorias)
+            self.stdout.write(f"[equipos] Trayectoria de {len(self.trayectorias)} jugadores rehecha ({filas} líneas)")
 
         self.stdout.write(self.style.SUCCESS("[equipos] Todo listo 👌"))
+        self.stdout.write(format_stats())
+        self.stdout.write(self.identidades.format_stats())
@@ -1,142 +1,48 @@
 # management/commands/scrape_jugadores.py
 import os
 import json
-import base64
+from itertools import groupby
 from typing import Optional, Dict, Any, List
 
-import requests
 from django.core.management.base import BaseCommand
 from django.db import transaction
+from django.utils import timezone
 
 from scraping.core.config_temporadas import TEMPORADAS
-from scraping.core.fetcher import fetch_url
+from scraping.core.ffcv_urls import ffcv_url
+from scraping.core.fetch_engine import add_engine_arguments, engine_from_options
+from scraping.core import cola_tareas, frescura_fichas, registro_config, replay, telemetria
+from status import versiones
+from scraping.core.http_client import format_stats
+from scraping.core.imagenes import FuenteImagen, IngestaImagenes
 from scraping.core.parser_jugador_ficha import parse_jugador_ficha
+from scraping.core.utils_jugadores import collect_jugadores_from_equipos
 from scraping.core.temporadas_utils import get_or_create_temporada
 
-from nucleo.models import Temporada, Competicion, Grupo
+from nucleo.media import es_imagen_ingerida
+from nucleo.models import Temporada
 from clubes.models import Club
 from jugadores.models import (
     Jugador,
     JugadorEnClubTemporada,
-    HistorialJugadorScraped,
 )
+from jugadores import trayectoria
 from staff.models import StaffClub
 from partidos.models import AlineacionPartidoJugador, EventoPartido
 
 RAW_JUGADORES_DIR = os.path.join("data_raw", "html_jugadores")
 CLEAN_JUGADORES_DIR = os.path.join("data_clean", "jugadores")
-MEDIA_JUGADORES_DIR = os.path.join("media", "jugadores")
 
-os.makedirs(RAW_JUGADORES_DIR, exist_ok=True)
 os.makedirs(CLEAN_JUGADORES_DIR, exist_ok=True)
-os.makedirs(MEDIA_JUGADORES_DIR, exist_ok=True)
-
-COMPETICION_NAME_MAP = {
-    "TERCERA": "Tercera División",
-    "PREFERENTE": "Preferente",
-    "PRIMERA": "Primera Regional",
-    "SEGUNDA": "Segunda Regional",
-}
-
-def _select_cfg(temporada_cfg: dict, competicion_key: str, grupo_key: str):
-    compk = (competicion_key or "TERCERA").upper()
-    gkey = (grupo_key or "").upper()
-
-    if compk == "TERCERA":
-        if "grupos" in temporada_cfg and gkey in temporada_cfg["grupos"]:
-            gcfg = temporada_cfg["grupos"][gkey]
-            cfg_sel = {
-                "id_temp": temporada_cfg["id_temp"],
-                "id_modalidad": temporada_cfg["id_modalidad"],
-                "id_competicion": gcfg["id_competicion"],
-                "id_torneo": gcfg["id_torneo"],
-            }
-            meta = {
-                "competicion_nombre": COMPETICION_NAME_MAP[compk],
-                "grupo_nombre": gcfg.get("grupo_nombre", f"Grupo {gkey}"),
-                "jornadas": gcfg.get("jornadas", temporada_cfg.get("jornadas", 30)),
-            }
-            return cfg_sel, meta
-
-        cfg_sel = {
-            "id_temp": temporada_cfg["id_temp"],
-            "id_modalidad": temporada_cfg["id_modalidad"],
-            "id_competicion": temporada_cfg["id_competicion"],
-            "id_torneo": temporada_cfg["id_torneo"],
-        }
-        meta = {
-            "competicion_nombre": COMPETICION_NAME_MAP[compk],
-            "grupo_nombre": f"Grupo {gkey or 'XV'}",
-            "jornadas": temporada_cfg.get("jornadas", 30),
-        }
-        return cfg_sel, meta
-
-    otras = temporada_cfg.get("otras_competiciones", {})
-    node = (
-        otras.get("Preferente") if compk == "PREFERENTE"
-        else otras.get("Primera Regional") if compk == "PRIMERA"
-        else otras.get("Segunda Regional") if compk == "SEGUNDA"
-        else None
-    )
-    if not node:
-        raise ValueError(f"No hay configuración para la competición '{competicion_key}' en esta temporada.")
-
-    grupos = node.get("grupos", {})
-    if gkey not in grupos:
-        raise ValueError(f"No hay configuración para el grupo '{grupo_key}' en '{competicion_key}'.")
-
-    gcfg = grupos[gkey]
-    cfg_sel = {
-        "id_temp": temporada_cfg["id_temp"],
-        "id_modalidad": temporada_cfg["id_modalidad"],
-        "id_competicion": node["id_competicion"],
-        "id_torneo": gcfg["id_torneo"],
-    }
-    meta = {
-        "competicion_nombre": COMPETICION_NAME_MAP[compk],
-        "grupo_nombre": gcfg.get("grupo_nombre", f"{competicion_key.title()} - {gkey}"),
-        "jornadas": gcfg.get("jornadas", temporada_cfg.get("jornadas", 30)),
-    }
-    return cfg_sel, meta
 
 def _build_url_jugador(cfg: Dict[str, Any], jugador_id: int) -> str:
-    from urllib.parse import urlencode
     params = {
         "id_temp": cfg["id_temp"],
         "id_modalidad": cfg["id_modalidad"],
         "id_competicion": cfg["id_competicion"],
         "id_jugador": jugador_id,
     }
-    base = "https://resultadosffcv.isquad.es/jugador_ficha.php"
-    return base + "?" + urlencode(params)
-
-def _save_player_image_and_get_local_path(jugador_id: int, foto_source: str, is_base64: bool) -> Optional[str]:
-    if not foto_source:
-        return None
-    if is_base64:
-        try:
-            _, b64data = foto_source.split(",", 1)
-        except ValueError:
-            b64data = foto_source
-        img_bytes = base64.b64decode(b64data)
-        out_rel = f"jugadores/{jugador_id}.png"
-        out_abs = os.path.join(MEDIA_JUGADORES_DIR, f"{jugador_id}.png")
-        with open(out_abs, "wb") as f:
-            f.write(img_bytes)
-        return out_rel
-    if foto_source.lower().startswith("http"):
-        ext = ".png" if ".png" in foto_source.lower() else ".jpg"
-        out_rel = f"jugadores/{jugador_id}{ext}"
-        out_abs = os.path.join(MEDIA_JUGADORES_DIR, f"{jugador_id}{ext}")
-        try:
-            resp = requests.get(foto_source, timeout=10)
-            resp.raise_for_status()
-            with open(out_abs, "wb") as f:
-                f.write(resp.content)
-            return out_rel
-        except Exception:
-            return None
-    return None
+    return ffcv_url("jugador_ficha.php", params)
 
 class Command(BaseCommand):
     help = (
@@ -151,6 +57,28 @@ class Command(BaseCommand):
         # Los dos siguientes se mantienen por compatibilidad, pero ya no limitan candidatos si no los pasas.
         parser.add_argument("--competicion", type=str, default=None, help="TERCERA | PREFERENTE | PRIMERA | SEGUNDA (opcional)")
         parser.add_argument("--grupo", type=str, default=None, help="TERCERA: XIV/XV; otras: G1..G4 (opcional)")
+        parser.add_argument("--lote-cola", type=int, default=10,
+                            help="Jugadores que reclama cada proceso de la cola de una vez (por defecto: 10)")
+        parser.add_argument(
+            "--refresco",
+            action="store_true",
+            help="Refresco nocturno: solo los jugadores con alineaciones nuevas desde su última ficha "
+                 "(del partido más reciente al más antiguo), en una cola propia por día",
+        )
+        parser.add_argument(
+            "--revalidar-dias",
+            type=int,
+            default=frescura_fichas.REVALIDAR_DIAS,
+            help=f"Sin partidos nuevos, una ficha no se vuelve a bajar hasta pasados N días "
+                 f"(por defecto: {frescura_fichas.REVALIDAR_DIAS})",
+        )
+        parser.add_argument(
+            "--forzar",
+            action="store_true",
+            help="Baja y guarda todas las fichas candidatas aunque no hayan cambiado",
+        )
+        cola_tareas.add_cola_arguments(parser)
+        add_engine_arguments(parser)
 
     # -------- Helpers internos --------
 
@@ -186,7 +114,8 @@ class Command(BaseCommand):
         dirty = []
         if not club_obj.nombre_corto:
             club_obj.nombre_corto = clean_name[:100]; dirty.append("nombre_corto")
-        if escudo_url and club_obj.escudo_url != escudo_url:
+        # Ya descargado: la ingesta de imágenes lo mantiene al día
+        if escudo_url and club_obj.escudo_url != escudo_url and not es_imagen_ingerida(club_obj.escudo_url):
             club_obj.escudo_url = escudo_url; dirty.append("escudo_url")
         if dirty:
             club_obj.save(update_fields=dirty)
@@ -195,7 +124,6 @@ class Command(BaseCommand):
     def _upsert_jugador_obj(self, jugador_id: int, jugador_data) -> Jugador:
         header = jugador_data.get("header", {}) or {}
         datos_generales = jugador_data.get("datos_generales", {}) or {}
-        foto_info = jugador_data.get("foto", {}) or {}
 
         nombre_header = (header.get("nombre_header") or "").strip()
         nombre_completo = (datos_generales.get("nombre_completo") or "").strip()
@@ -206,12 +134,6 @@ class Command(BaseCommand):
         posicion_norm = self._normalize_posicion(datos_generales.get("posicion"))
         fecha_nac = self._parse_fecha_nac_from_ficha(jugador_data)
 
-        foto_local_rel = _save_player_image_and_get_local_path(
-            jugador_id=jugador_id,
-            foto_source=foto_info.get("source", ""),
-            is_base64=foto_info.get("is_base64", False),
-        )
-
         jugador_obj = Jugador.objects.filter(identificador_federacion=str(jugador_id)).first()
         if jugador_obj is None:
             jugador_obj = Jugador(
@@ -220,7 +142,7 @@ class Command(BaseCommand):
                 apodo="",
                 posicion_principal=posicion_norm,
                 fecha_nacimiento=fecha_nac,
-                foto_url=foto_local_rel or "",
+                foto_url="",
                 activo=True,
             )
             if fecha_nac is None and isinstance(edad_scrapeada, int):
@@ -236,8 +158,6 @@ class Command(BaseCommand):
             jugador_obj.posicion_principal = posicion_norm; dirty.append("posicion_principal")
         if fecha_nac and jugador_obj.fecha_nacimiento != fecha_nac:
             jugador_obj.fecha_nacimiento = fecha_nac; dirty.append("fecha_nacimiento")
-        if foto_local_rel and jugador_obj.foto_url != foto_local_rel:
-            jugador_obj.foto_url = foto_local_rel; dirty.append("foto_url")
         if (jugador_obj.fecha_nacimiento is None and not getattr(jugador_obj, "edad_estimacion_bloqueada", False)
             and isinstance(edad_scrapeada, int)):
             if jugador_obj.edad_estimacion != edad_scrapeada:
@@ -293,108 +213,44 @@ class Command(BaseCommand):
                 defaults={"rol": rol_staff, "activo": True},
             )
 
-    def _sync_historial_scraped_global(self, jugador_obj: Jugador, jugador_data_any_temporada: Dict[str, Any]):
-        hist_list = jugador_data_any_temporada.get("historico", []) or []
-        HistorialJugadorScraped.objects.filter(jugador=jugador_obj).delete()
-        bulk_objs = []
-        for h in hist_list:
-            bulk_objs.append(
-                HistorialJugadorScraped(
-                    jugador=jugador_obj,
-                    temporada_texto=(h.get("temporada") or "").strip(),
-                    competicion_texto=(h.get("competicion") or "").strip(),
-                    equipo_texto=(h.get("equipo") or "").strip(),
-                )
-            )
-        if bulk_objs:
-            HistorialJugadorScraped.objects.bulk_create(bulk_objs)
-
     # ===== NUEVO: recolectar candidatos de TODAS las divisiones/grupos =====
 
-    def _build_targets_from_config(self, temporada_cfg: dict) -> List[tuple[str, str, str]]:
+    def _gather_candidate_ids_for_group(self, sel: registro_config.ConfigGrupo) -> List[int]:
         """
-        Devuelve lista de tuplas: (competicion_nombre_bd, competicion_cli, grupo_nombre_bd)
-        """
-        targets: List[tuple[str, str, str]] = []
-
-        # Tercera
-        if "grupos" in temporada_cfg:
-            for gkey, gnode in temporada_cfg["grupos"].items():
-                targets.append((
-                    COMPETICION_NAME_MAP["TERCERA"],  # nombre en BD
-                    "TERCERA",                        # clave CLI
-                    gnode.get("grupo_nombre", f"Grupo {gkey}"),
-                ))
-
-        # Otras
-        otras = temporada_cfg.get("otras_competiciones", {})
-        for comp_label, comp_node in otras.items():
-            comp_cli = ("PREFERENTE" if comp_label == "Preferente"
-                        else "PRIMERA" if comp_label == "Primera Regional"
-                        else "SEGUNDA")
-            for gkey, gnode in (comp_node.get("grupos") or {}).items():
-                targets.append((
-                    COMPETICION_NAME_MAP[comp_cli],   # nombre en BD
-                    comp_cli,
-                    gnode.get("grupo_nombre", f"{comp_label} - {gkey}"),
-                ))
-        return targets
-
-    def _gather_candidate_ids_for_group(
-        self,
-        temporada_obj: Temporada,
-        competicion_nombre_bd: str,
-        grupo_nombre_bd: str,
-    ) -> List[int]:
-        """
-        Usa BD (alineaciones y eventos) filtrando por Grupo (competición + temporada + nombre).
-        Busca por nombre exacto (no slug) para evitar desajustes.
+        Usa BD (alineaciones y eventos) del Grupo de esa config (competición +
+        temporada + nombre exacto, resuelto por el registro).
         """
         ids = set()
-        try:
-            comp_obj = Competicion.objects.get(nombre=competicion_nombre_bd)
-        except Competicion.DoesNotExist:
+        grupo_id = registro_config.grupo_id(sel)
+        if grupo_id is None:
             return []
 
-        try:
-            grupo_obj = Grupo.objects.get(
-                competicion=comp_obj,
-                temporada=temporada_obj,
-                nombre=grupo_nombre_bd,
+        # Solo hace falta el id de federación: DISTINCT en BD en vez de cargar cada fila
+        for modelo in (AlineacionPartidoJugador, EventoPartido):
+            fed_ids = (
+                modelo.objects
+                .filter(partido__grupo_id=grupo_id, jugador__identificador_federacion__isnull=False)
+                .values_list("jugador__identificador_federacion", flat=True)
+                .distinct()
             )
-        except Grupo.DoesNotExist:
-            return []
-
-        qs_ali = (
-            AlineacionPartidoJugador.objects
-            .select_related("partido", "jugador", "partido__grupo")
-            .filter(partido__grupo=grupo_obj)
-        )
-        for ali in qs_ali:
-            j = ali.jugador
-            if j and j.identificador_federacion:
-                try:
-                    ids.add(int(j.identificador_federacion))
-                except ValueError:
-                    pass
-
-        qs_ev = (
-            EventoPartido.objects
-            .select_related("partido", "jugador", "partido__grupo")
-            .filter(partido__grupo=grupo_obj)
-        )
-        for ev in qs_ev:
-            j = ev.jugador
-            if j and j.identificador_federacion:
+            for fed_id in fed_ids:
                 try:
-                    ids.add(int(j.identificador_federacion))
+                    ids.add(int(fed_id))
                 except ValueError:
                     pass
 
         return sorted(ids)
 
+    def _log(self, msg):
+        self.stdout.write(self.style.NOTICE(msg))
+
+    def _log_error(self, msg):
+        self.stderr.write(self.style.WARNING(f"[jugadores] {msg}"))
+
     # ---------------- MAIN ----------------
 
+    @telemetria.instrumentar("scrape_jugadores_todos")
+    @versiones.al_terminar
     def handle(self, *args, **options):
         temporada_base_key = options["temporada"]
         jugador_forced_id = options["jugador_id"]
@@ -407,76 +263,179 @@ class Command(BaseCommand):
         temporada_base_obj = get_or_create_temporada(temporada_base_key)
         self.stdout.write(self.style.SUCCESS(f"[jugadores] Temporada base en BD: {temporada_base_obj}"))
 
-        # 1) Candidatos (todos los grupos/competiciones de la temporada base)
-        if jugador_forced_id:
-            jugadores_ids = [jugador_forced_id]
-            self.stdout.write(self.style.SUCCESS(f"[jugadores] Forzado solo jugador {jugador_forced_id}"))
-        else:
-            candidatos_all: set[int] = set()
-            targets = self._build_targets_from_config(tcfg)
-            if not targets:
-                self.stdout.write(self.style.WARNING("[jugadores] No hay grupos definidos en el config para esta temporada."))
+        with engine_from_options(options) as engine:
+            self.forzar = options["forzar"]
+
+            # Un jugador concreto: directo, sin pasar por la cola
+            if jugador_forced_id:
+                self.forzar = True
+                self.stdout.write(self.style.SUCCESS(f"[jugadores] Forzado solo jugador {jugador_forced_id}"))
+                self._procesar_jugadores([jugador_forced_id], engine)
+                self.stdout.write(engine.format_stats())
                 return
 
-            for competicion_nombre_bd, comp_cli, grupo_nombre_bd in targets:
-                ids_group = self._gather_candidate_ids_for_group(
-                    temporada_obj=temporada_base_obj,
-                    competicion_nombre_bd=competicion_nombre_bd,
-                    grupo_nombre_bd=grupo_nombre_bd,
-                )
-                if ids_group:
-                    self.stdout.write(self.style.NOTICE(
-                        f"[jugadores] {competicion_nombre_bd} · {grupo_nombre_bd}: {len(ids_group)} jugadores"
-                    ))
-                candidatos_all.update(ids_group)
+            # 1) Cola persistente: un jugador por tarea. Si el proceso se cae, volver
+            # a lanzarlo sigue por el primer jugador sin hacer; con --solo-drenar se
+            # suman procesos que reparten el --rps-global.
+            cola = f"scrape_jugadores_todos:{temporada_base_key}"
+            if options["refresco"]:
+                # Cola por día: la de anoche ya está hecha y no se mezcla con el recorrido completo
+                cola += f":refresco:{timezone.localdate():%Y%m%d}"
+
+            def _tareas_cola():
+                if options["refresco"]:
+                    plan = frescura_fichas.planificar(
+                        temporada=temporada_base_obj, refresco=True, revalidar_dias=options["revalidar_dias"],
+                    )
+                else:
+                    candidatos = self._candidatos(temporada_base_key)
+                    plan = None if self.forzar else frescura_fichas.planificar(
+                        candidatos, revalidar_dias=options["revalidar_dias"],
+                    )
+                if plan is not None:
+                    self.stdout.write(plan.format_resumen())
+                    candidatos = plan.pendientes
+                for jugador_id in candidatos:
+                    yield f"jugador:{jugador_id}", {"jugador_id": jugador_id}
 
-            jugadores_ids = sorted(candidatos_all)
-            self.stdout.write(self.style.SUCCESS(
-                f"[jugadores] IDs candidatos totales ({len(jugadores_ids)}): {jugadores_ids}"
+            if not cola_tareas.preparar_cola(cola, options, _tareas_cola, self._log):
+                return
+
+            trabajador = cola_tareas.nombre_trabajador()
+
+            def _ejecutar(tareas):
+                if not replay.offline():
+                    engine.rps = cola_tareas.rps_trabajador(cola, trabajador, options["rps_global"])
+                por_jugador = {t.params["jugador_id"]: t.pk for t in tareas}
+                errores = self._procesar_jugadores(list(por_jugador), engine)
+                return {por_jugador[jid]: err for jid, err in errores.items()}
+
+            stats = cola_tareas.drenar(
+                cola, _ejecutar, trabajador=trabajador, lote=max(options["lote_cola"], 1), log=self._log_error,
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"[jugadores] Cola drenada por {trabajador}: {stats['hechas']} jugadores hechos · "
+            f"{stats['reintentos']} a reintentar · {stats['fallidas']} fallidos"
+        ))
+        self.stdout.write(cola_tareas.format_resumen(cola))
+        self.stdout.write(self.style.SUCCESS("[jugadores] Scrape multitemporada completado ✅"))
+        self.stdout.write(engine.format_stats())
+        self.stdout.write(format_stats())
+
+    def _candidatos(self, temporada_base_key: str) -> List[int]:
+        """
+        IDs de federación de los jugadores con alineaciones/eventos en
+        cualquier grupo de la temporada base, más los de las plantillas que
+        ha parseado scrape_equipos (manifiesto de data_clean/equipos), que
+        incluyen a quien aún no ha jugado.
+        """
+        candidatos_all: set[int] = set()
+        targets = registro_config.grupos(temporada_base_key)
+        if not targets:
+            self.stdout.write(self.style.WARNING("[jugadores] No hay grupos definidos en el config para esta temporada."))
+            return []
+
+        for sel in targets:
+            ids_group = self._gather_candidate_ids_for_group(sel)
+            if ids_group:
+                self.stdout.write(self.style.NOTICE(
+                    f"[jugadores] {sel.competicion_nombre} · {sel.grupo_nombre}: {len(ids_group)} jugadores"
+                ))
+            candidatos_all.update(ids_group)
+
+        ids_plantillas = collect_jugadores_from_equipos(os.path.join("data_clean", "equipos"), temporada_base_key)
+        if ids_plantillas:
+            self.stdout.write(self.style.NOTICE(
+                f"[jugadores] Plantillas parseadas: {len(ids_plantillas)} jugadores "
+                f"({len(set(ids_plantillas) - candidatos_all)} sin partidos en BD)"
             ))
+        candidatos_all.update(ids_plantillas)
 
+        jugadores_ids = sorted(candidatos_all)
+        self.stdout.write(self.style.SUCCESS(
+            f"[jugadores] IDs candidatos totales ({len(jugadores_ids)}): {jugadores_ids}"
+        ))
         if not jugadores_ids:
             self.stdout.write(self.style.WARNING("[jugadores] No hay jugadores candidatos que scrapear."))
-            return
+        return jugadores_ids
 
-        # 2) Para cada jugador, recorremos TODAS las TEMPORADAS (histórico completo)
-        for jugador_id in jugadores_ids:
-            self.stdout.write(self.style.SUCCESS(f"[jugadores] Procesando jugador {jugador_id} ..."))
-            ultima_ficha_data = None
+    def _procesar_jugadores(self, jugadores_ids: List[int], engine) -> Dict[int, Optional[str]]:
+        """
+        Descarga, parsea y guarda las fichas de todas las temporadas de cada
+        jugador. Devuelve {jugador_id: None si fue bien | error}.
+        """
+        resultados: Dict[int, Optional[str]] = {}
+        # Fotos y escudos vistos en las fichas (la última ficha manda); se bajan todos juntos al final
+        imagenes: Dict[tuple, FuenteImagen] = {}
+        historicos: Dict[int, list] = {}  # jugador_id -> histórico de la ficha
+
+        # 2) Para cada jugador, recorremos TODAS las TEMPORADAS (histórico completo).
+        # Las fichas (jugador × temporada) se descargan por delante en el motor mientras
+        # aquí se parsean y guardan en orden; groupby reagrupa por jugador.
+        def _tareas_fichas():
+            for jugador_id in jugadores_ids:
+                for temporada_key, cfg_temp in TEMPORADAS.items():
+                    prefix = f"{temporada_key}_jugador_{jugador_id}"
+                    yield (
+                        (jugador_id, temporada_key),
+                        _build_url_jugador(cfg_temp, jugador_id),
+                        os.path.join(RAW_JUGADORES_DIR, f"{prefix}.html"),
+                    )
 
-            for temporada_key, cfg_temp in TEMPORADAS.items():
-                temporada_obj = get_or_create_temporada(temporada_key)
-                jugador_url = _build_url_jugador(cfg_temp, jugador_id)
+        fichas = engine.iter_ordered(_tareas_fichas(), ventana=4 * len(TEMPORADAS))
 
-                # Prefijos de archivo
-                prefix = f"{temporada_key}_jugador_{jugador_id}"
-                raw_path = os.path.join(RAW_JUGADORES_DIR, f"{prefix}.html")
-                clean_out_path = os.path.join(CLEAN_JUGADORES_DIR, f"{prefix}.json")
+        for jugador_id, fichas_jugador in groupby(fichas, key=lambda t: t[0][0]):
+            self.stdout.write(self.style.SUCCESS(f"[jugadores] Procesando jugador {jugador_id} ..."))
+            error_jugador = None
+            parseadas = []  # (temporada_key, url_ficha, jugador_data)
 
-                self.stdout.write(self.style.HTTP_INFO(
-                    f"[jugadores]   Descargando ficha {jugador_id} en {temporada_key} ..."
-                ))
-                try:
-                    fetch_url(jugador_url, raw_path)
-                except Exception as e:
+            for (_, temporada_key), html_text, error in fichas_jugador:
+                cfg_temp = TEMPORADAS[temporada_key]
+
+                if error is not None:
+                    error_jugador = f"descarga {temporada_key}: {error}"
                     self.stderr.write(self.style.WARNING(
-                        f"[jugadores]   ⚠️  No pude bajar ficha {jugador_id} en {temporada_key}: {e}"
+                        f"[jugadores]   ⚠️  No pude bajar ficha {jugador_id} en {temporada_key}: {error}"
                     ))
                     continue
 
+                url_ficha = _build_url_jugador(cfg_temp, jugador_id)
                 try:
-                    with open(raw_path, "r", encoding="utf-8") as f:
-                        html_text = f.read()
-                    jugador_data = parse_jugador_ficha(
-                        html_text,
-                        jugador_id=jugador_id,
-                        id_temp=cfg_temp["id_temp"],
-                    )
+                    with telemetria.medir_parseo(url_ficha):
+                        jugador_data = parse_jugador_ficha(
+                            html_text,
+                            jugador_id=jugador_id,
+                            id_temp=cfg_temp["id_temp"],
+                        )
                 except Exception as e:
                     self.stderr.write(self.style.WARNING(
                         f"[jugadores]   ⚠️  No pude parsear ficha {jugador_id} en {temporada_key}: {e}"
                     ))
                     continue
+                parseadas.append((temporada_key, url_ficha, jugador_data))
+
+            # Fichas que no existen en alguna temporada son normales; sin ninguna
+            # ficha el jugador se da por fallido
+            if not parseadas:
+                resultados[jugador_id] = error_jugador or "sin fichas"
+                continue
+
+            # Mismo contenido que la última consulta: no hay nada que escribir
+            sha = frescura_fichas.huella({t: datos for t, _, datos in parseadas})
+            if not self.forzar and frescura_fichas.sin_cambios(jugador_id, sha):
+                frescura_fichas.registrar_consulta(jugador_id, sha)
+                resultados[jugador_id] = None
+                self.stdout.write(f"[jugadores] = Jugador {jugador_id} sin cambios desde la última consulta")
+                continue
+
+            fallo_bd = False
+            for temporada_key, url_ficha, jugador_data in parseadas:
+                temporada_obj = get_or_create_temporada(temporada_key)
+
+                # Prefijos de archivo
+                prefix = f"{temporada_key}_jugador_{jugador_id}"
+                clean_out_path = os.path.join(CLEAN_JUGADORES_DIR, f"{prefix}.json")
 
                 try:
                     with open(clean_out_path, "w", encoding="utf-8") as f:
@@ -486,43 +445,96 @@ class Command(BaseCommand):
                         f"[jugadores]   ⚠️  No pude guardar JSON limpio para {jugador_id} en {temporada_key}: {e}"
                     ))
 
-                ultima_ficha_data = jugador_data
-
-                with transaction.atomic():
-                    jugador_obj = self._upsert_jugador_obj(jugador_id, jugador_data)
-
-                    equipo_actual_nombre = jugador_data.get("datos_generales", {}).get("equipo_actual", "")
-                    escudo_equipo_url = jugador_data.get("header", {}).get("escudo_equipo_url", "")
-                    club_obj = self._upsert_club_from_equipo_actual(equipo_actual_nombre, escudo_equipo_url)
-
-                    self._upsert_jugador_en_club_temporada(
-                        jugador_obj=jugador_obj,
-                        club_obj=club_obj,
-                        temporada_obj=temporada_obj,
-                        jugador_data=jugador_data,
-                    )
+                try:
+                    with telemetria.medir_bd([url_ficha]), transaction.atomic():
+                        jugador_obj = self._upsert_jugador_obj(jugador_id, jugador_data)
 
-                    self._upsert_staff_desde_ficha(
-                        club_obj=club_obj,
-                        temporada_obj=temporada_obj,
-                        jugador_data=jugador_data,
-                    )
+                        equipo_actual_nombre = jugador_data.get("datos_generales", {}).get("equipo_actual", "")
+                        escudo_equipo_url = jugador_data.get("header", {}).get("escudo_equipo_url", "")
+                        club_obj = self._upsert_club_from_equipo_actual(equipo_actual_nombre, escudo_equipo_url)
 
-            if ultima_ficha_data is not None:
-                try:
-                    with transaction.atomic():
-                        jugador_obj = Jugador.objects.get(identificador_federacion=str(jugador_id))
-                        self._sync_historial_scraped_global(
+                        self._upsert_jugador_en_club_temporada(
                             jugador_obj=jugador_obj,
-                            jugador_data_any_temporada=ultima_ficha_data,
+                            club_obj=club_obj,
+                            temporada_obj=temporada_obj,
+                            jugador_data=jugador_data,
+                        )
+
+                        self._upsert_staff_desde_ficha(
+                            club_obj=club_obj,
+                            temporada_obj=temporada_obj,
+                            jugador_data=jugador_data,
                         )
+
+                    foto_info = jugador_data.get("foto", {}) or {}
+                    if foto_info.get("source"):
+                        clave = ("jugador", jugador_obj.pk)
+                        imagenes[clave] = FuenteImagen(clave, foto_info["source"], bool(foto_info.get("is_base64")))
+                    if club_obj is not None and escudo_equipo_url:
+                        clave = ("club", club_obj.pk)
+                        imagenes[clave] = FuenteImagen(clave, escudo_equipo_url)
                 except Exception as e:
-                    self.stderr.write(self.style.WARNING(
-                        f"[jugadores]   ⚠️  No pude actualizar historial global para {jugador_id}: {e}"
+                    # Se reintenta el jugador entero (la cola lo vuelve a dejar pendiente)
+                    error_jugador = f"BD {temporada_key}: {e}"
+                    fallo_bd = True
+                    self.stderr.write(self.style.ERROR(
+                        f"[jugadores]   ❌ Error guardando ficha {jugador_id} en {temporada_key}: {e}"
                     ))
 
+            # El "Histórico Equipos" es el mismo en todas las temporadas; se guarda por lotes al final
+            historicos[jugador_id] = parseadas[-1][2].get("historico") or []
+
+            # Con un fallo de BD el jugador se da por fallido (y su ficha no se da por vista)
+            if fallo_bd:
+                resultados[jugador_id] = error_jugador
+                continue
+            frescura_fichas.registrar_consulta(jugador_id, sha)
+            resultados[jugador_id] = None
+
             self.stdout.write(self.style.SUCCESS(
                 f"[jugadores] ✅ Jugador {jugador_id} actualizado (histórico completo)"
             ))
 
-        self.stdout.write(self.style.SUCCESS("[jugadores] Scrape multitemporada completado ✅"))
+        self._guardar_historicos(historicos)
+        self._ingerir_imagenes(engine, imagenes)
+        return resultados
+
+    def _guardar_historicos(self, historicos: Dict[int, list]):
+        if not historicos:
+            return
+        pks = dict(
+            Jugador.objects.filter(identificador_federacion__in=[str(j) for j in historicos])
+            .values_list("identificador_federacion", "pk")
+        )
+        try:
+            filas = trayectoria.guardar_historial(
+                {pks[str(j)]: h for j, h in historicos.items() if str(j) in pks}
+            )
+        except Exception as e:
+            self.stderr.write(self.style.WARNING(
+                f"[jugadores]   ⚠️  No pude actualizar el historial global de {len(historicos)} jugadores: {e}"
+            ))
+            return
+        self.stdout.write(f"[jugadores] Trayectoria de {len(historicos)} jugadores rehecha ({filas} líneas)")
+
+    def _ingerir_imagenes(self, engine, imagenes: Dict[tuple, FuenteImagen]):
+        """
+        Fotos y escudos en paralelo y deduplicados por contenido (best-effort:
+        un fallo no hace fallar al jugador).
+        """
+        if not imagenes:
+            return
+        with IngestaImagenes(engine) as ingesta:
+            rutas = ingesta.ingerir(imagenes.values())
+        for (tipo, pk), error in ingesta.errores.items():
+            self.stderr.write(self.style.WARNING(f"[jugadores]   ⚠️  Imagen de {tipo} {pk} no disponible: {error}"))
+
+        for modelo, tipo, campo in ((Jugador, "jugador", "foto_url"), (Club, "club", "escudo_url")):
+            pks = {pk: ruta for (t, pk), ruta in rutas.items() if t == tipo}
+            cambiados = []
+            for obj in modelo.objects.filter(pk__in=list(pks)):
+                if getattr(obj, campo) != pks[obj.pk]:
+                    setattr(obj, campo, pks[obj.pk])
+                    cambiados.append(obj)
+            modelo.objects.bulk_update(cambiados, [campo], batch_size=200)
+        self.stdout.write(ingesta.format_stats())
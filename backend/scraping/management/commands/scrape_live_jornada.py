@@ -1,95 +1,36 @@
 import os
 import json
-from urllib.parse import urlencode
+import time
+from collections import Counter
+from datetime import timedelta
+
 from django.core.management.base import BaseCommand
-from django.db import transaction
+from django.db import close_old_connections, transaction
+from django.db.models import Count, Min, Q
+from django.utils import timezone
 from django.utils.text import slugify
 
 from scraping.core.config_temporadas import TEMPORADAS
-from scraping.core.fetcher import fetch_url
-from scraping.core.parser_partidos import parse_jornada_partidos
-from scraping.core.parser_partido_detalle import parse_partido_detalle
+from scraping.core.ffcv_urls import ffcv_url
+from scraping.core.fetch_engine import add_engine_arguments, engine_from_options
+from scraping.core.identidades import IdentityMap
+from scraping.core.cache_urls import cargar_validadores, guardar_validadores
+from scraping.core.cambios import RegistroCambios
+from scraping.core.parsers import add_parser_argument, parsers_from_options
+from scraping.core.persistencia import PersistenciaActas
+from scraping.core import registro_config, telemetria
+from scraping.core.plan_incremental import construir_plan, listados_pendientes
+from scraping.core.pipeline import add_pipeline_arguments, iter_lotes, iter_pipeline, pool_from_options
 from scraping.core.temporadas_utils import get_or_create_temporada
+from scraping.core.vigilancia_live import (
+    INTERVALO_DIRECTO, espera_tras_fallo, planificar, reabrir_si_cambia, registrar_fallo,
+)
 
-from scraping.models import EstadoScraping
+from scraping.models import EstadoScraping, SeguimientoPartido
 
 from nucleo.models import Competicion, Grupo
 from clubes.models import Club
-from partidos.models import Partido, EventoPartido, AlineacionPartidoJugador
-from jugadores.models import Jugador, JugadorEnClubTemporada
-from arbitros.models import Arbitro, ArbitrajePartido
-from staff.models import StaffClub, StaffEnPartido
-
-
-# ===== Mapa y selector de configuración =====
-COMPETICION_NAME_MAP = {
-    "TERCERA": "Tercera División",
-    "PREFERENTE": "Preferente",
-    "PRIMERA": "Primera Regional",
-    "SEGUNDA": "Segunda Regional",
-}
-
-def _select_cfg(temporada_cfg: dict, competicion_key: str, grupo_key: str):
-    compk = (competicion_key or "TERCERA").upper()
-    gkey = (grupo_key or "").upper()
-
-    if compk == "TERCERA":
-        if "grupos" in temporada_cfg and gkey in temporada_cfg["grupos"]:
-            gcfg = temporada_cfg["grupos"][gkey]
-            cfg_sel = {
-                "id_temp": temporada_cfg["id_temp"],
-                "id_modalidad": temporada_cfg["id_modalidad"],
-                "id_competicion": gcfg["id_competicion"],
-                "id_torneo": gcfg["id_torneo"],
-            }
-            meta = {
-                "competicion_nombre": COMPETICION_NAME_MAP[compk],
-                "grupo_nombre": gcfg.get("grupo_nombre", f"Grupo {gkey}"),
-                "jornadas": gcfg.get("jornadas", temporada_cfg.get("jornadas", 30)),
-            }
-            return cfg_sel, meta
-
-        # fallback compat
-        cfg_sel = {
-            "id_temp": temporada_cfg["id_temp"],
-            "id_modalidad": temporada_cfg["id_modalidad"],
-            "id_competicion": temporada_cfg["id_competicion"],
-            "id_torneo": temporada_cfg["id_torneo"],
-        }
-        meta = {
-            "competicion_nombre": COMPETICION_NAME_MAP[compk],
-            "grupo_nombre": f"Grupo {gkey or 'XV'}",
-            "jornadas": temporada_cfg.get("jornadas", 30),
-        }
-        return cfg_sel, meta
-
-    otras = temporada_cfg.get("otras_competiciones", {})
-    node = (
-        otras.get("Preferente") if compk == "PREFERENTE"
-        else otras.get("Primera Regional") if compk == "PRIMERA"
-        else otras.get("Segunda Regional") if compk == "SEGUNDA"
-        else None
-    )
-    if not node:
-        raise ValueError(f"No hay configuración para la competición '{compk}' en esta temporada.")
-
-    grupos = node.get("grupos", {})
-    if gkey not in grupos:
-        raise ValueError(f"No hay configuración para el grupo '{gkey}' en '{compk}'.")
-
-    gcfg = grupos[gkey]
-    cfg_sel = {
-        "id_temp": temporada_cfg["id_temp"],
-        "id_modalidad": temporada_cfg["id_modalidad"],
-        "id_competicion": node["id_competicion"],
-        "id_torneo": gcfg["id_torneo"],
-    }
-    meta = {
-        "competicion_nombre": COMPETICION_NAME_MAP[compk],
-        "grupo_nombre": gcfg.get("grupo_nombre", f"{compk.title()} - {gkey}"),
-        "jornadas": gcfg.get("jornadas", temporada_cfg.get("jornadas", 30)),
-    }
-    return cfg_sel, meta
+from partidos.models import Partido
 
 
 class Command(BaseCommand):
@@ -102,6 +43,22 @@ class Command(BaseCommand):
                             help="TERCERA | PREFERENTE | PRIMERA | SEGUNDA")
         parser.add_argument("--grupo", type=str, default="XV",
                             help="TERCERA: XIV/XV; otras: G1..G4")
+        parser.add_argument("--incremental", action="store_true",
+                            help="Solo lo que falta según la BD (aplazados, partidos sin jugar con la fecha "
+                                 "pasada, actas sin eventos/alineaciones y el listado si la jornada es nueva)")
+        parser.add_argument("--vigilar", action="store_true",
+                            help="Proceso continuo: consulta cada acta solo en su ventana de juego "
+                                 "(más a menudo) y espacia o deja de consultar las terminadas")
+        parser.add_argument("--intervalo-directo", type=int, default=INTERVALO_DIRECTO,
+                            help=f"Con --vigilar: segundos entre consultas de un partido en juego "
+                                 f"(por defecto: {INTERVALO_DIRECTO})")
+        parser.add_argument("--intervalo-listado", type=int, default=10,
+                            help="Con --vigilar: minutos entre revisiones del listado de la jornada (por defecto: 10)")
+        parser.add_argument("--ciclos", type=int, default=0,
+                            help="Con --vigilar: parar tras N ciclos (0 = sin límite)")
+        add_engine_arguments(parser)
+        add_parser_argument(parser)
+        add_pipeline_arguments(parser)
 
     # ------------------- utilidades comunes -------------------
 
@@ -113,7 +70,7 @@ class Command(BaseCommand):
             "id_modalidad": cfg["id_modalidad"],
             "id_competicion": cfg["id_competicion"],
         }
-        return "https://resultadosffcv.isquad.es/total_partidos.php?" + urlencode(params)
+        return ffcv_url("total_partidos.php", params)
 
     def _build_url_partido(self, cfg, jornada_num: int, id_partido: int) -> str:
         params = {
@@ -124,7 +81,7 @@ class Command(BaseCommand):
             "id_torneo": cfg["id_torneo"],
             "jornada": jornada_num,
         }
-        return "https://resultadosffcv.isquad.es/partido.php?" + urlencode(params)
+        return ffcv_url("partido.php", params)
 
     def _get_or_create_competicion(self, nombre_comp: str):
         comp, _ = Competicion.objects.get_or_create(
@@ -149,20 +106,22 @@ class Command(BaseCommand):
         club_id_fed = equipo_dict.get("id_equipo")
         nombre_equipo = (equipo_dict.get("nombre") or "").strip() or "DESCONOCIDO"
 
-        club_obj = None
-        if club_id_fed:
-            club_obj = Club.objects.filter(
-                identificador_federacion=str(club_id_fed)
-            ).first()
+        club_obj = self.identidades.club(
+            club_id_fed,
+            lambda: Club.objects.filter(identificador_federacion=str(club_id_fed)).first(),
+        )
 
         if club_obj is None:
-            club_obj, _created = Club.objects.get_or_create(
-                nombre_oficial=nombre_equipo,
-                defaults={
-                    "nombre_corto": nombre_equipo[:100],
-                    "identificador_federacion": str(club_id_fed) if club_id_fed else None,
-                    "activo": True,
-                },
+            club_obj = self.identidades.club_por_nombre(
+                nombre_equipo,
+                lambda: Club.objects.get_or_create(
+                    nombre_oficial=nombre_equipo,
+                    defaults={
+                        "nombre_corto": nombre_equipo[:100],
+                        "identificador_federacion": str(club_id_fed) if club_id_fed else None,
+                        "activo": True,
+                    },
+                )[0],
             )
         dirty_fields = []
         if not club_obj.nombre_corto:
@@ -173,6 +132,7 @@ class Command(BaseCommand):
             dirty_fields.append("identificador_federacion")
         if dirty_fields:
             club_obj.save(update_fields=dirty_fields)
+            self.identidades.registrar("club", club_obj.identificador_federacion, club_obj)
         return club_obj
 
     def _parse_fecha_hora(self, info_partido):
@@ -197,169 +157,12 @@ class Command(BaseCommand):
             return 100
         return int((total_ev / 50) * 100)
 
-    def _upsert_jugador(self, jugador_nombre: str, jugador_id: int | None):
-        clean_name = (jugador_nombre or "").strip() or "DESCONOCIDO"
-        j = None
-        if jugador_id is not None:
-            j = Jugador.objects.filter(identificador_federacion=str(jugador_id)).first()
-            if j and not j.nombre:
-                j.nombre = clean_name
-                j.save(update_fields=["nombre"])
-        if not j:
-            j, _created = Jugador.objects.get_or_create(
-                nombre=clean_name,
-                defaults={
-                    "identificador_federacion": str(jugador_id) if jugador_id is not None else None,
-                    "activo": True,
-                },
-            )
-            if not j.identificador_federacion and jugador_id is not None:
-                j.identificador_federacion = str(jugador_id)
-                j.save(update_fields=["identificador_federacion"])
-        return j
-
-    def _upsert_stats_jugador_en_club_temporada(self, jugador_obj, club_obj, temporada_obj, stats_fuente: dict):
-        rec, _created = JugadorEnClubTemporada.objects.get_or_create(
-            jugador=jugador_obj,
-            club=club_obj,
-            temporada=temporada_obj,
-            defaults={
-                "dorsal": stats_fuente.get("dorsal", "") or "",
-                "partidos_jugados": 0,
-                "goles": 0,
-                "tarjetas_amarillas": 0,
-                "tarjetas_rojas": 0,
-                "convocados": 0,
-                "titular": 0,
-                "suplente": 0,
-            },
-        )
-        dirty = False
-        if stats_fuente.get("dorsal") and not rec.dorsal:
-            rec.dorsal = str(stats_fuente["dorsal"]); dirty = True
-        if stats_fuente.get("jugó_este_partido", False):
-            rec.partidos_jugados += 1; dirty = True
-        if stats_fuente.get("fue_titular"):
-            rec.titular += 1; dirty = True
-        else:
-            if stats_fuente.get("jugó_este_partido", False):
-                rec.suplente += 1; dirty = True
-        rec.goles += stats_fuente.get("goles_en_este_partido", 0)
-        rec.tarjetas_amarillas += stats_fuente.get("amarillas_en_este_partido", 0)
-        rec.tarjetas_rojas += stats_fuente.get("rojas_en_este_partido", 0)
-        if dirty:
-            rec.save()
-
-    def _registrar_alineacion_equipo(self, partido_obj, alineacion_data: dict, club_obj, temporada_obj):
-        for es_titular, bloque in (
-            (True, alineacion_data.get("titulares", [])),
-            (False, alineacion_data.get("suplentes", [])),
-        ):
-            for jinfo in bloque:
-                j_obj = self._upsert_jugador(jinfo.get("nombre"), jinfo.get("jugador_id"))
-                AlineacionPartidoJugador.objects.get_or_create(
-                    partido=partido_obj,
-                    club=club_obj,
-                    jugador=j_obj,
-                    dorsal=str(jinfo.get("dorsal") or "")[:10],
-                    titular=es_titular,
-                    etiqueta=jinfo.get("etiqueta") or "",
-                )
-                self._upsert_stats_jugador_en_club_temporada(
-                    jugador_obj=j_obj,
-                    club_obj=club_obj,
-                    temporada_obj=temporada_obj,
-                    stats_fuente={
-                        "dorsal": jinfo.get("dorsal"),
-                        "jugó_este_partido": True,
-                        "fue_titular": es_titular,
-                        "goles_en_este_partido": 0,
-                        "amarillas_en_este_partido": 0,
-                        "rojas_en_este_partido": 0,
-                    },
-                )
-
-        for tinfo in alineacion_data.get("tecnicos", []):
-            nombre_staff = (tinfo.get("nombre") or "").strip()
-            rol_staff = (tinfo.get("rol") or "").strip()
-            if not nombre_staff:
-                continue
-            staff_obj, _ = StaffClub.objects.get_or_create(
-                club=club_obj,
-                temporada=temporada_obj,
-                nombre=nombre_staff,
-                defaults={"rol": rol_staff or "Cuerpo técnico", "activo": True},
-            )
-            StaffEnPartido.objects.get_or_create(
-                partido=partido_obj,
-                club=club_obj,
-                staff=staff_obj,
-                nombre=nombre_staff,
-                rol=rol_staff or "Cuerpo técnico",
-            )
-
-    def _registrar_eventos(self, partido_obj, partido_data: dict, club_local_obj, club_visitante_obj, temporada_obj):
-        for ev in (partido_data.get("eventos", []) or []):
-            minuto = ev.get("minuto")
-            tipo_raw = (ev.get("tipo") or "").lower()
-            if "gol" in tipo_raw and "pp" in tipo_raw:
-                tipo_evento = "gol_pp"
-            elif "gol" in tipo_raw:
-                tipo_evento = "gol"
-            elif "doble" in tipo_raw and "amarilla" in tipo_raw:
-                tipo_evento = "doble_amarilla"
-            elif "amarilla" in tipo_raw:
-                tipo_evento = "amarilla"
-            elif "roja" in tipo_raw:
-                tipo_evento = "roja"
-            else:
-                tipo_evento = "mvp" if "mvp" in tipo_raw else "gol"
-
-            lado = ev.get("equipo")  # "local"/"visitante"
-            ev_club = club_local_obj if lado == "local" else club_visitante_obj if lado == "visitante" else None
-
-            jugador_obj = None
-            if ev.get("jugador_nombre") or ev.get("jugador_id"):
-                jugador_obj = self._upsert_jugador(ev.get("jugador_nombre") or "", ev.get("jugador_id"))
-
-            EventoPartido.objects.get_or_create(
-                partido=partido_obj,
-                minuto=minuto,
-                tipo_evento=tipo_evento,
-                jugador=jugador_obj,
-                club=ev_club,
-                nota="",
-            )
-
-            if jugador_obj and ev_club:
-                self._upsert_stats_jugador_en_club_temporada(
-                    jugador_obj=jugador_obj,
-                    club_obj=ev_club,
-                    temporada_obj=temporada_obj,
-                    stats_fuente={
-                        "dorsal": None,
-                        "jugó_este_partido": False,
-                        "fue_titular": False,
-                        "goles_en_este_partido": 1 if tipo_evento == "gol" else 0,
-                        "amarillas_en_este_partido": 1 if tipo_evento in ("amarilla", "doble_amarilla") else 0,
-                        "rojas_en_este_partido": 1 if tipo_evento == "roja" else 0,
-                    },
-                )
-
     def _decidir_resultado_y_estado(self, partido_data, info_partido):
         marcador = partido_data.get("marcador", {}) or {}
         gL = marcador.get("local")
         gV = marcador.get("visitante")
 
-        estado_txt_candidates = [
-            info_partido.get("hora", ""),
-            info_partido.get("estado", ""),
-            info_partido.get("detalle_estado", ""),
-            marcador.get("estado", ""),
-        ]
-        estado_lower = " ".join([t for t in estado_txt_candidates if t]).lower()
-        palabras_aplazado = ["susp", "suspend", "aplaz", "apl.", "cancel", "posp", "pospuesto", "no disputado", "sin jugar"]
-        if any(pal in estado_lower for pal in palabras_aplazado):
+        if self._es_aplazado(partido_data):
             return None, None, False
 
         eventos_list = partido_data.get("eventos", []) or []
@@ -369,135 +172,269 @@ class Command(BaseCommand):
             return None, None, False
         return gL, gV, True
 
+    def _es_aplazado(self, partido_data) -> bool:
+        info_partido = partido_data.get("info_partido", {}) or {}
+        marcador = partido_data.get("marcador", {}) or {}
+        estado_txt_candidates = [
+            info_partido.get("hora", ""),
+            info_partido.get("estado", ""),
+            info_partido.get("detalle_estado", ""),
+            marcador.get("estado", ""),
+        ]
+        estado_lower = " ".join([t for t in estado_txt_candidates if t]).lower()
+        palabras_aplazado = ["susp", "suspend", "aplaz", "apl.", "cancel", "posp", "pospuesto", "no disputado", "sin jugar"]
+        return any(pal in estado_lower for pal in palabras_aplazado)
+
     # ------------------- lógica jornada -------------------
 
-    def _scrape_una_jornada_si_hace_falta(self, temporada_key, temporada_obj, grupo_obj, cfg, jornada_num, prefix_suffix):
+    def _persistir_partido(self, pid, partido_data, grupo_obj, jornada_num, persistencia):
+        """
+        Crea o actualiza el partido y deja sus alineaciones, eventos, staff y
+        árbitros en `persistencia` (PersistenciaActas del lote).
+        Se llama desde la etapa de persistencia, dentro de la transacción del lote.
+
+        Devuelve (partido, tipos de cambio, (grupo_id, jornada) anteriores si
+        el partido se ha movido, si no None).
+        """
+        equipo_local_data = partido_data["equipos"]["local"]
+        equipo_visit_data = partido_data["equipos"]["visitante"]
+
+        local_club = self._get_or_create_club_from_equipo_data(equipo_local_data)
+        visit_club = self._get_or_create_club_from_equipo_data(equipo_visit_data)
+
+        info_partido = partido_data.get("info_partido", {})
+        dt_fecha_hora = self._parse_fecha_hora(info_partido)
+        pabellon = info_partido.get("pabellon", "") or ""
+        arbitros_nombres = info_partido.get("arbitros", [])
+
+        goles_local, goles_visit, jugado = self._decidir_resultado_y_estado(partido_data, info_partido)
+        intensidad = self._calcular_indice_intensidad(partido_data)
+
+        partido_obj, creado = Partido.objects.get_or_create(
+            identificador_federacion=str(pid),
+            defaults={
+                "grupo": grupo_obj,
+                "jornada_numero": jornada_num,
+                "fecha_hora": dt_fecha_hora,
+                "local": local_club,
+                "visitante": visit_club,
+                "goles_local": goles_local,
+                "goles_visitante": goles_visit,
+                "jugado": jugado,
+                "pabellon": pabellon,
+                "arbitros": " | ".join(arbitros_nombres),
+                "indice_intensidad": intensidad,
+            },
+        )
+        tipos, anterior = ["alta"] if creado else [], None
+        if not creado:
+            if partido_obj.grupo_id != grupo_obj.id or partido_obj.jornada_numero != jornada_num:
+                anterior = (partido_obj.grupo_id, partido_obj.jornada_numero)
+            dirty = []
+            if partido_obj.grupo_id != grupo_obj.id:
+                partido_obj.grupo = grupo_obj; dirty.append("grupo")
+            if partido_obj.jornada_numero != jornada_num:
+                partido_obj.jornada_numero = jornada_num; dirty.append("jornada_numero")
+            if dt_fecha_hora and partido_obj.fecha_hora != dt_fecha_hora:
+                partido_obj.fecha_hora = dt_fecha_hora; dirty.append("fecha_hora")
+            if partido_obj.local_id != local_club.id:
+                partido_obj.local = local_club; dirty.append("local")
+            if partido_obj.visitante_id != visit_club.id:
+                partido_obj.visitante = visit_club; dirty.append("visitante")
+            if partido_obj.goles_local != goles_local:
+                partido_obj.goles_local = goles_local; dirty.append("goles_local")
+            if partido_obj.goles_visitante != goles_visit:
+                partido_obj.goles_visitante = goles_visit; dirty.append("goles_visitante")
+            if partido_obj.jugado != jugado:
+                partido_obj.jugado = jugado; dirty.append("jugado")
+            if partido_obj.pabellon != pabellon:
+                partido_obj.pabellon = pabellon; dirty.append("pabellon")
+            nuevos_arbis = " | ".join(arbitros_nombres)
+            if partido_obj.arbitros != nuevos_arbis:
+                partido_obj.arbitros = nuevos_arbis; dirty.append("arbitros")
+            if partido_obj.indice_intensidad != intensidad:
+                partido_obj.indice_intensidad = intensidad; dirty.append("indice_intensidad")
+            if dirty:
+                partido_obj.save(update_fields=dirty)
+            if {"goles_local", "goles_visitante"} & set(dirty):
+                tipos.append("resultado")
+            if {"grupo", "jornada_numero", "fecha_hora", "local", "visitante", "jugado"} & set(dirty):
+                tipos.append("estado")
+
+        persistencia.add_partido(partido_obj, partido_data, local_club, visit_club)
+        return partido_obj, tipos, anterior
+
+    def _scrape_una_jornada_si_hace_falta(self, temporada_key, temporada_obj, grupo_obj, cfg, jornada_num, prefix_suffix,
+                                          solo_nuevas=False):
+        """
+        Listado de la jornada y sus actas. Con solo_nuevas (modo --vigilar)
+        solo se piden las actas de partidos que aún no están en BD: las demás
+        las consulta el planificador cuando les toca.
+
+        Devuelve (partidos listados, jugados en BD, en BD), o None si no se
+        pudo bajar o leer el listado (no se toca nada; la siguiente pasada
+        lo vuelve a intentar).
+        """
         raw_dir = os.path.join("data_raw", "html")
-        clean_dir_partidos = os.path.join("data_clean", "partidos_detalle")
-        os.makedirs(raw_dir, exist_ok=True)
-        os.makedirs(clean_dir_partidos, exist_ok=True)
 
         url_jornada = self._build_url_jornada(cfg, jornada_num)
         raw_path_jornada = os.path.join(raw_dir, f"{temporada_key}_{prefix_suffix}_J{jornada_num:02d}_LIVE.html")
-        fetch_url(url_jornada, raw_path_jornada)
-
-        with open(raw_path_jornada, "r", encoding="utf-8") as f:
-            jornada_html = f.read()
-
-        jornada_data = parse_jornada_partidos(jornada_html)
+        # GET condicional: en cada pasada del live casi todas las actas siguen igual.
+        # Si FFCV contesta 304 (o devuelve el mismo contenido, mismo sha256) y el
+        # partido ya está en BD, no se parsea ni se toca la BD.
+        previo_listado = cargar_validadores([url_jornada]).get(url_jornada)
+        try:
+            res_listado = self.engine.fetch_url_conditional(url_jornada, raw_path_jornada, previo_listado).result()
+            with telemetria.medir_parseo(url_jornada):
+                jornada_data = self.parsers.jornada_partidos(res_listado["html"])
+        except Exception as e:
+            self.stderr.write(self.style.WARNING(f"[live] J{jornada_num}: no se pudo bajar/leer el listado: {e}"))
+            return None
+        guardar_validadores(res_listado)
         partidos_list = jornada_data.get("partidos", [])
         if not partidos_list:
             return 0, 0, 0
 
-        for p in partidos_list:
-            pid = p.get("id_partido")
-            if pid is None:
-                continue
+        ids_esperados = [str(p.get("id_partido")) for p in partidos_list if p.get("id_partido") is not None]
+        ya_en_bd = set(
+            Partido.objects.filter(identificador_federacion__in=ids_esperados).values_list("identificador_federacion", flat=True)
+        )
+        jornada_por_pid = {
+            p["id_partido"]: jornada_num
+            for p in partidos_list
+            if p.get("id_partido") is not None and not (solo_nuevas and str(p["id_partido"]) in ya_en_bd)
+        }
 
-            partido_url = self._build_url_partido(cfg, jornada_num, pid)
-            raw_path_partido = os.path.join(raw_dir, f"{temporada_key}_{prefix_suffix}_J{jornada_num:02d}_P{pid}_LIVE.html")
-            fetch_url(partido_url, raw_path_partido)
+        resultados, persistencia = self._procesar_actas(
+            temporada_key, temporada_obj, grupo_obj, cfg, prefix_suffix, jornada_por_pid, ya_en_bd
+        )
+        cuenta = Counter(r["estado"] for r in resultados.values())
 
-            with open(raw_path_partido, "r", encoding="utf-8") as f:
-                partido_html = f.read()
+        self.stdout.write(
+            f"[live] J{jornada_num}: listado {res_listado['estado']} · "
+            f"{cuenta['procesada']} actas procesadas · {cuenta['omitida']} sin cambios (omitidas) · {cuenta['fallida']} fallidas"
+        )
+        if cuenta["procesada"]:
+            self.stdout.write(f"[live] J{jornada_num} filas BD (+insertadas ~actualizadas =sin cambios): {persistencia.resumen.format()}")
+            self.stdout.write(f"[live] J{jornada_num} {persistencia.cambios.format()}")
 
-            partido_data = parse_partido_detalle(partido_html)
+        partidos_en_bd = Partido.objects.filter(identificador_federacion__in=ids_esperados)
+        total_partidos_scraping = len(ids_esperados)
+        total_en_bd = partidos_en_bd.count()
+        total_jugados_en_bd = partidos_en_bd.filter(jugado=True).count()
+        return total_partidos_scraping, total_jugados_en_bd, total_en_bd
 
-            equipo_local_data = partido_data["equipos"]["local"]
-            equipo_visit_data = partido_data["equipos"]["visitante"]
+    def _procesar_actas(self, temporada_key, temporada_obj, grupo_obj, cfg, prefix_suffix, jornada_por_pid, ya_en_bd):
+        """
+        Descarga (GET condicional), parsea y guarda las actas de jornada_por_pid
+        ({id_partido: jornada}). ya_en_bd: ids (str) de partidos que ya están en BD.
 
-            local_club = self._get_or_create_club_from_equipo_data(equipo_local_data)
-            visit_club = self._get_or_create_club_from_equipo_data(equipo_visit_data)
+        Devuelve ({id_partido: {"estado", "aplazado"}}, persistencia), con estado
+        procesada | omitida (sin cambios y ya en BD) | fallida (con su "error").
+        """
+        raw_dir = os.path.join("data_raw", "html")
+        clean_dir_partidos = os.path.join("data_clean", "partidos_detalle")
+        os.makedirs(clean_dir_partidos, exist_ok=True)
 
-            info_partido = partido_data.get("info_partido", {})
-            dt_fecha_hora = self._parse_fecha_hora(info_partido)
-            pabellon = info_partido.get("pabellon", "") or ""
-            arbitros_nombres = info_partido.get("arbitros", [])
+        urls_partido = {
+            pid: self._build_url_partido(cfg, jornada_num, pid)
+            for pid, jornada_num in jornada_por_pid.items()
+        }
+        previos = cargar_validadores(urls_partido.values())
+        resultados = {}
+
+        # Actas que no hace falta parsear si FFCV dice que no han cambiado
+        omitibles = {url for pid, url in urls_partido.items() if str(pid) in ya_en_bd}
+
+        tareas = [
+            (
+                pid,
+                url,
+                os.path.join(raw_dir, f"{temporada_key}_{prefix_suffix}_J{jornada_por_pid[pid]:02d}_P{pid}_LIVE.html"),
+                previos.get(url),
+            )
+            for pid, url in urls_partido.items()
+        ]
 
-            goles_local, goles_visit, jugado = self._decidir_resultado_y_estado(partido_data, info_partido)
-            intensidad = self._calcular_indice_intensidad(partido_data)
+        # Pipeline: descarga en hilos → parseo en el pool de procesos → BD por lotes aquí
+        pipeline = iter_pipeline(
+            self.engine, self.parse_pool, tareas, self.parsers.partido_detalle,
+            parsear_si=lambda res: not (res["estado"] == "sin_cambios" and res["url"] in omitibles),
+        )
+        cambios = RegistroCambios()
+        persistencia = PersistenciaActas(temporada_obj, self.identidades, cambios)
+        for lote in iter_lotes(pipeline, self.lote_bd):
+            guardados = []
+            urls_lote = [res["url"] for _, res, _, _ in lote if res is not None]
+            try:
+                with telemetria.medir_bd(urls_lote), transaction.atomic():
+                    for pid, res_partido, partido_data, error in lote:
+                        if error is not None:
+                            resultados[pid] = {"estado": "fallida", "aplazado": False, "error": error}
+                            self.stderr.write(self.style.WARNING(
+                                f"[live] No se pudo descargar/parsear partido {pid}: {error}"
+                            ))
+                            continue
+                        if partido_data is None:
+                            resultados[pid] = {"estado": "omitida", "aplazado": False}
+                            continue
+                        try:
+                            with transaction.atomic():
+                                partido_obj, tipos, anterior = self._persistir_partido(
+                                    pid, partido_data, grupo_obj, jornada_por_pid[pid], persistencia
+                                )
+                        except Exception as e:
+                            resultados[pid] = {"estado": "fallida", "aplazado": False, "error": e}
+                            self.stderr.write(self.style.ERROR(f"[live] Error guardando partido {pid}: {e}"))
+                            continue
+                        cambios.marcar(partido_obj.pk, *tipos)
+                        if anterior is not None:
+                            # La jornada de la que sale también cambia
+                            cambios.marcar(partido_obj.pk, "estado", grupo_id=anterior[0], jornada=anterior[1])
+                        guardados.append((pid, res_partido, partido_data))
+
+                    persistencia.guardar()
+                    cambios.volcar()
+            except Exception as e:
+                cambios.descartar()
+                for pid, _, _ in guardados:
+                    resultados[pid] = {"estado": "fallida", "aplazado": False, "error": e}
+                self.stderr.write(self.style.ERROR(f"[live] Error guardando lote de {len(guardados)} partidos: {e}"))
+                continue
 
-            with transaction.atomic():
-                partido_obj, creado = Partido.objects.get_or_create(
-                    identificador_federacion=str(pid),
-                    defaults={
-                        "grupo": grupo_obj,
-                        "jornada_numero": jornada_num,
-                        "fecha_hora": dt_fecha_hora,
-                        "local": local_club,
-                        "visitante": visit_club,
-                        "goles_local": goles_local,
-                        "goles_visitante": goles_visit,
-                        "jugado": jugado,
-                        "pabellon": pabellon,
-                        "arbitros": " | ".join(arbitros_nombres),
-                        "indice_intensidad": intensidad,
-                    },
+            for pid, res_partido, partido_data in guardados:
+                jornada_num = jornada_por_pid[pid]
+                clean_partido_path = os.path.join(
+                    clean_dir_partidos,
+                    f"{temporada_key}_{prefix_suffix}_J{jornada_num:02d}_P{pid}_LIVE.json",
                 )
-                if not creado:
-                    dirty = []
-                    if partido_obj.grupo_id != grupo_obj.id:
-                        partido_obj.grupo = grupo_obj; dirty.append("grupo")
-                    if partido_obj.jornada_numero != jornada_num:
-                        partido_obj.jornada_numero = jornada_num; dirty.append("jornada_numero")
-                    if dt_fecha_hora and partido_obj.fecha_hora != dt_fecha_hora:
-                        partido_obj.fecha_hora = dt_fecha_hora; dirty.append("fecha_hora")
-                    if partido_obj.local_id != local_club.id:
-                        partido_obj.local = local_club; dirty.append("local")
-                    if partido_obj.visitante_id != visit_club.id:
-                        partido_obj.visitante = visit_club; dirty.append("visitante")
-                    if partido_obj.goles_local != goles_local:
-                        partido_obj.goles_local = goles_local; dirty.append("goles_local")
-                    if partido_obj.goles_visitante != goles_visit:
-                        partido_obj.goles_visitante = goles_visit; dirty.append("goles_visitante")
-                    if partido_obj.jugado != jugado:
-                        partido_obj.jugado = jugado; dirty.append("jugado")
-                    if partido_obj.pabellon != pabellon:
-                        partido_obj.pabellon = pabellon; dirty.append("pabellon")
-                    nuevos_arbis = " | ".join(arbitros_nombres)
-                    if partido_obj.arbitros != nuevos_arbis:
-                        partido_obj.arbitros = nuevos_arbis; dirty.append("arbitros")
-                    if partido_obj.indice_intensidad != intensidad:
-                        partido_obj.indice_intensidad = intensidad; dirty.append("indice_intensidad")
-                    if dirty:
-                        partido_obj.save(update_fields=dirty)
-
-                self._registrar_alineacion_equipo(partido_obj, partido_data["equipos"]["local"], local_club, temporada_obj)
-                self._registrar_alineacion_equipo(partido_obj, partido_data["equipos"]["visitante"], visit_club, temporada_obj)
-
-                self._registrar_eventos(partido_obj, partido_data, local_club, visit_club, temporada_obj)
-
-                for a_nombre in arbitros_nombres:
-                    clean_arbitro_nombre = (a_nombre or "").strip()
-                    if not clean_arbitro_nombre:
-                        continue
-                    arbitro_obj, _ = Arbitro.objects.get_or_create(
-                        nombre=clean_arbitro_nombre,
-                        defaults={"identificador_federacion": None, "activo": True},
-                    )
-                    ArbitrajePartido.objects.get_or_create(
-                        partido=partido_obj,
-                        arbitro=arbitro_obj,
-                        defaults={"rol": ""},
-                    )
+                with open(clean_partido_path, "w", encoding="utf-8") as f:
+                    json.dump(partido_data, f, indent=2, ensure_ascii=False)
 
-            clean_partido_path = os.path.join(
-                clean_dir_partidos,
-                f"{temporada_key}_{prefix_suffix}_J{jornada_num:02d}_P{pid}_LIVE.json",
-            )
-            with open(clean_partido_path, "w", encoding="utf-8") as f:
-                json.dump(partido_data, f, indent=2, ensure_ascii=False)
+                # Solo tras persistir: si algo falla antes, la próxima pasada vuelve a procesar el acta
+                guardar_validadores(res_partido)
+                resultados[pid] = {"estado": "procesada", "aplazado": self._es_aplazado(partido_data)}
 
-            self.stdout.write(self.style.SUCCESS(f"[live] Partido {pid} actualizado en BD (J{jornada_num}) ✅"))
+                self.stdout.write(self.style.SUCCESS(f"[live] Partido {pid} actualizado en BD (J{jornada_num}) ✅"))
 
-        ids_esperados = [str(p.get("id_partido")) for p in partidos_list if p.get("id_partido") is not None]
-        partidos_en_bd = Partido.objects.filter(identificador_federacion__in=ids_esperados)
-        total_partidos_scraping = len(ids_esperados)
-        total_en_bd = partidos_en_bd.count()
-        total_jugados_en_bd = partidos_en_bd.filter(jugado=True).count()
-        return total_partidos_scraping, total_jugados_en_bd, total_en_bd
+        # Versiones, instantáneas, grupo_info y trayectorias de todos los lotes, una vez
+        persistencia.terminar()
+        return resultados, persistencia
 
+    @telemetria.instrumentar("scrape_live_jornada")
     def handle(self, *args, **options):
+        self.parsers = parsers_from_options(options)
+        self.parse_pool = pool_from_options(options)
+        self.lote_bd = max(options["lote_bd"], 1)
+        # Mapa de identidades de esta ejecución (se precarga con la temporada)
+        self.identidades = IdentityMap()
+        with engine_from_options(options) as engine:
+            self.engine = engine
+            self._live(options)
+            self.stdout.write(engine.format_stats())
+        self.stdout.write(self.identidades.format_stats())
+
+    def _live(self, options):
         temporada_key = options["temporada"]
         competicion_key = (options["competicion"] or "TERCERA").upper()
         grupo_key = (options["grupo"] or "XV").upper()
@@ -508,13 +445,15 @@ class Command(BaseCommand):
             return
 
         try:
-            cfg, meta = _select_cfg(tcfg, competicion_key, grupo_key)
+            sel = registro_config.seleccionar(temporada_key, competicion_key, grupo_key)
         except ValueError as e:
             self.stderr.write(self.style.ERROR(str(e)))
             return
+        cfg, meta = sel.cfg_sel, sel.meta
 
         # asegurar temporada/competicion/grupo en BD
         temporada_obj = get_or_create_temporada(temporada_key)
+        self.identidades.precargar(temporada_obj)
         comp_obj = self._get_or_create_competicion(meta["competicion_nombre"])
         grupo_obj = self._get_or_create_grupo(temporada_obj, comp_obj, meta["grupo_nombre"], provincia="")
 
@@ -534,6 +473,34 @@ class Command(BaseCommand):
             f"→ clave={scoped_temp_key} · pendiente_min={estado.jornada_pendiente_minima} / actual={estado.jornada_actual}"
         ))
 
+        ctx = {
+            "temporada_key": temporada_key,
+            "temporada_obj": temporada_obj,
+            "grupo_obj": grupo_obj,
+            "cfg": cfg,
+            "prefix_suffix": prefix_suffix,
+            "estado": estado,
+            "jornadas": meta["jornadas"],
+        }
+        if options["vigilar"]:
+            self._vigilar(ctx, options)
+        elif options["incremental"]:
+            self._pasada_incremental(ctx)
+        else:
+            self._pasada(ctx)
+
+    def _pasada(self, ctx, solo_nuevas=False):
+        """
+        Una pasada del live: jornada_pendiente_minima (aplazados) y jornada_actual,
+        avanzando los punteros de EstadoScraping según lo jugado.
+        """
+        temporada_key = ctx["temporada_key"]
+        temporada_obj = ctx["temporada_obj"]
+        grupo_obj = ctx["grupo_obj"]
+        cfg = ctx["cfg"]
+        prefix_suffix = ctx["prefix_suffix"]
+        estado = ctx["estado"]
+
         # 1) cerrar aplazados desde pendiente_minima
         jp = estado.jornada_pendiente_minima
         total_scr_p, jug_p, _ = self._scrape_una_jornada_si_hace_falta(
@@ -543,8 +510,11 @@ class Command(BaseCommand):
             cfg=cfg,
             jornada_num=jp,
             prefix_suffix=prefix_suffix,
-        )
-        if total_scr_p > 0 and jug_p == total_scr_p:
+            solo_nuevas=solo_nuevas,
+        ) or (None, 0, 0)
+        if total_scr_p is None:
+            estado.save(update_fields=["ultima_actualizacion"])
+        elif total_scr_p > 0 and jug_p == total_scr_p:
             estado.jornada_pendiente_minima = max(estado.jornada_pendiente_minima, jp + 1)
             estado.save(update_fields=["jornada_pendiente_minima", "ultima_actualizacion"])
             self.stdout.write(self.style.SUCCESS(
@@ -568,8 +538,12 @@ class Command(BaseCommand):
             cfg=cfg,
             jornada_num=ja,
             prefix_suffix=prefix_suffix,
-        )
+            solo_nuevas=solo_nuevas,
+        ) or (None, 0, 0)
 
+        if total_scr_a is None:
+            estado.save(update_fields=["ultima_actualizacion"])
+            return
         if total_scr_a == 0:
             self.stdout.write(self.style.WARNING(f"[live] Jornada {ja} sin partidos listados. Mantengo jornada_actual."))
             estado.save(update_fields=["ultima_actualizacion"])
@@ -596,3 +570,255 @@ class Command(BaseCommand):
                 f"[live] Jornada {ja}: {jug_a}/{total_scr_a} ({int(porcentaje*100)}%). "
                 f"Mantengo jornada_actual en J{estado.jornada_actual} ⏳"
             ))
+
+    # ------------------- modo incremental (--incremental) -------------------
+
+    def _pasada_incremental(self, ctx):
+        """
+        Como _pasada pero guiada por la BD (core/plan_incremental.py): se
+        descargan solo las actas pendientes del grupo y el listado de la
+        jornada en curso si aún faltan partidos suyos en BD.
+
+        Un listado que no se puede bajar (o que no está archivado con
+        --offline) no para la pasada: se cuenta como fallido y, como sus
+        partidos siguen sin estar en BD, la siguiente pasada lo vuelve a pedir.
+        """
+        estado = ctx["estado"]
+        grupo_obj = ctx["grupo_obj"]
+
+        plan = construir_plan(ctx["temporada_obj"], grupos=[grupo_obj], jornada_actual={grupo_obj.pk: estado.jornada_actual})
+        self.stdout.write(plan.format_resumen())
+
+        actas = plan.actas_de(grupo_obj.pk)
+        if actas:
+            jornada_por_pid = {t.id_partido: t.jornada for t in actas}
+            resultados, persistencia = self._procesar_actas(
+                ctx["temporada_key"], ctx["temporada_obj"], grupo_obj, ctx["cfg"], ctx["prefix_suffix"],
+                jornada_por_pid, set(jornada_por_pid),
+            )
+            cuenta = Counter(r["estado"] for r in resultados.values())
+            self.stdout.write(
+                f"[live] incremental: {cuenta['procesada']} actas procesadas · "
+                f"{cuenta['omitida']} sin cambios (omitidas) · {cuenta['fallida']} fallidas"
+            )
+            if cuenta["procesada"]:
+                self.stdout.write(f"[live] filas BD (+insertadas ~actualizadas =sin cambios): {persistencia.resumen.format()}")
+                self.stdout.write(f"[live] {persistencia.cambios.format()}")
+
+        self._avanzar_punteros(ctx)
+
+        # Jornada en curso sin sus partidos en BD (p.ej. recién avanzada): su listado
+        listados = Counter()
+        for _, jornada in listados_pendientes({grupo_obj.pk: estado.jornada_actual}):
+            if jornada > ctx["jornadas"]:
+                continue
+            try:
+                leido = self._scrape_una_jornada_si_hace_falta(
+                    temporada_key=ctx["temporada_key"],
+                    temporada_obj=ctx["temporada_obj"],
+                    grupo_obj=grupo_obj,
+                    cfg=ctx["cfg"],
+                    jornada_num=jornada,
+                    prefix_suffix=ctx["prefix_suffix"],
+                    solo_nuevas=True,
+                )
+            except Exception as e:
+                leido = None
+                self.stderr.write(self.style.ERROR(f"[live] J{jornada}: error procesando el listado: {e}"))
+            listados["leido" if leido is not None else "fallido"] += 1
+        if listados:
+            self.stdout.write(
+                f"[live] incremental: {listados['leido']} listados leídos · "
+                f"{listados['fallido']} fallidos (quedan pendientes)"
+            )
+
+    def _avanzar_punteros(self, ctx):
+        """
+        jornada_actual / jornada_pendiente_minima a partir de lo que hay en BD,
+        con las mismas reglas que _pasada (≥60% jugado para avanzar).
+        """
+        estado = ctx["estado"]
+        ja = estado.jornada_actual
+        cuenta = Partido.objects.filter(grupo=ctx["grupo_obj"], jornada_numero=ja).aggregate(
+            total=Count("id"), jugados=Count("id", filter=Q(jugado=True))
+        )
+        if cuenta["total"] and cuenta["jugados"] / cuenta["total"] >= 0.60:
+            estado.jornada_actual = ja + 1
+
+        pendiente = Partido.objects.filter(
+            grupo=ctx["grupo_obj"],
+            jugado=False,
+            jornada_numero__gte=estado.jornada_pendiente_minima,
+            jornada_numero__lt=estado.jornada_actual,
+        ).aggregate(m=Min("jornada_numero"))["m"]
+        estado.jornada_pendiente_minima = max(estado.jornada_pendiente_minima, pendiente or estado.jornada_actual)
+        estado.save(update_fields=["jornada_actual", "jornada_pendiente_minima", "ultima_actualizacion"])
+
+        if estado.jornada_actual != ja:
+            self.stdout.write(self.style.SUCCESS(
+                f"[live] Jornada {ja} ≥60% ({cuenta['jugados']}/{cuenta['total']}). "
+                f"Avanzamos jornada_actual a J{estado.jornada_actual} 🚀"
+            ))
+        self.stdout.write(
+            f"[live] pendiente_min=J{estado.jornada_pendiente_minima} · actual=J{estado.jornada_actual}"
+        )
+
+    # ------------------- modo vigilancia (--vigilar) -------------------
+
+    def _vigilar(self, ctx, options):
+        """
+        Proceso continuo. Cada pocos minutos revisa el listado (partidos nuevos,
+        avance de jornada_actual); entre medias solo consulta las actas a las
+        que les toca según su SeguimientoPartido (ver core/vigilancia_live.py).
+        """
+        intervalo_directo = max(options["intervalo_directo"], 5)
+        intervalo_listado = timedelta(minutes=max(options["intervalo_listado"], 1))
+        max_ciclos = options["ciclos"]
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"[vigilar] Actas en juego cada {intervalo_directo}s · listado cada {intervalo_listado} "
+            f"· Ctrl+C para parar"
+        ))
+
+        proximo_listado = timezone.now()
+        ciclo = 0
+        fallos_seguidos = 0
+        try:
+            while True:
+                ciclo += 1
+                try:
+                    if timezone.now() >= proximo_listado:
+                        ctx["estado"].refresh_from_db()
+                        self._pasada(ctx, solo_nuevas=True)
+                        self._sincronizar_seguimientos(ctx, intervalo_directo)
+                        proximo_listado = timezone.now() + intervalo_listado
+
+                    consultadas = self._consultar_pendientes(ctx, intervalo_directo)
+                    espera = None if max_ciclos and ciclo >= max_ciclos else self._segundos_hasta_siguiente(
+                        ctx, proximo_listado
+                    )
+                    fallos_seguidos = 0
+                except Exception as e:
+                    # Un ciclo que falla (red, BD caída...) no para la vigilancia:
+                    # se reintenta con backoff; el listado, si tocaba, en el siguiente
+                    fallos_seguidos += 1
+                    close_old_connections()
+                    espera = espera_tras_fallo(intervalo_directo, fallos_seguidos).total_seconds()
+                    self.stderr.write(self.style.ERROR(
+                        f"[vigilar] ciclo {ciclo} fallido ({fallos_seguidos} seguidos): {e!r} · "
+                        f"reintento en {espera:.0f}s"
+                    ))
+                    if max_ciclos and ciclo >= max_ciclos:
+                        break
+                    time.sleep(espera)
+                    continue
+
+                if espera is None:
+                    break
+                self.stdout.write(
+                    f"[vigilar] ciclo {ciclo}: {consultadas} actas consultadas · siguiente en {espera:.0f}s"
+                )
+                time.sleep(espera)
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING("[vigilar] Parado a petición del usuario"))
+
+    def _sincronizar_seguimientos(self, ctx, intervalo_directo):
+        """
+        Da de alta en SeguimientoPartido los partidos de las jornadas vigiladas
+        (pendiente_minima..actual) que aún no lo estén, y reabre los ya dados
+        de alta cuya fecha o resultado ha cambiado desde que se planificaron
+        (aunque estuvieran cerrados).
+        """
+        estado = ctx["estado"]
+        partidos = list(Partido.objects.filter(
+            grupo=ctx["grupo_obj"],
+            jornada_numero__gte=estado.jornada_pendiente_minima,
+            jornada_numero__lte=estado.jornada_actual,
+            identificador_federacion__isnull=False,
+        ))
+        existentes = {seg.partido_id: seg for seg in SeguimientoPartido.objects.filter(partido__in=partidos)}
+        ahora = timezone.now()
+        nuevos = [
+            planificar(SeguimientoPartido(partido=p), p, ahora, intervalo_directo=intervalo_directo)
+            for p in partidos
+            if p.pk not in existentes
+        ]
+        if nuevos:
+            SeguimientoPartido.objects.bulk_create(nuevos, ignore_conflicts=True)
+            self.stdout.write(f"[vigilar] {len(nuevos)} partidos nuevos en seguimiento")
+
+        reabiertos = [
+            existentes[p.pk]
+            for p in partidos
+            if p.pk in existentes and reabrir_si_cambia(existentes[p.pk], p, ahora, intervalo_directo=intervalo_directo)
+        ]
+        if reabiertos:
+            SeguimientoPartido.objects.bulk_update(
+                reabiertos,
+                ["estado", "proxima_consulta", "consultas_sin_cambios", "fecha_hora_vista", "resultado_visto"],
+            )
+            self.stdout.write(f"[vigilar] {len(reabiertos)} partidos reabiertos (cambió su fecha o resultado)")
+
+    def _consultar_pendientes(self, ctx, intervalo_directo) -> int:
+        pendientes = list(
+            SeguimientoPartido.objects.select_related("partido").filter(
+                partido__grupo=ctx["grupo_obj"],
+                proxima_consulta__lte=timezone.now(),
+            )
+        )
+        if not pendientes:
+            return 0
+
+        jornada_por_pid = {seg.partido.identificador_federacion: seg.partido.jornada_numero for seg in pendientes}
+        try:
+            resultados, _ = self._procesar_actas(
+                ctx["temporada_key"], ctx["temporada_obj"], ctx["grupo_obj"], ctx["cfg"], ctx["prefix_suffix"],
+                jornada_por_pid, set(jornada_por_pid),
+            )
+        except Exception as e:
+            # Todas las de esta tanda cuentan como fallidas y se reintentan con backoff
+            close_old_connections()
+            resultados = {pid: {"estado": "fallida", "aplazado": False, "error": e} for pid in jornada_por_pid}
+
+        # fecha_hora / jugado recién guardados
+        partidos = Partido.objects.in_bulk([seg.partido_id for seg in pendientes])
+        ahora = timezone.now()
+        for seg in pendientes:
+            res = resultados.get(seg.partido.identificador_federacion)
+            if res is None or res["estado"] == "fallida":
+                registrar_fallo(
+                    seg, ahora, res["error"] if res else "sin resultado de la consulta",
+                    intervalo_directo=intervalo_directo,
+                )
+                continue
+            planificar(
+                seg,
+                partidos.get(seg.partido_id, seg.partido),
+                ahora,
+                cambio=res["estado"] == "procesada",
+                # acta sin cambios: sigue como estaba
+                aplazado=res["aplazado"] or (res["estado"] == "omitida" and seg.estado == "aplazado"),
+                intervalo_directo=intervalo_directo,
+            )
+        SeguimientoPartido.objects.bulk_update(
+            pendientes,
+            [
+                "estado", "proxima_consulta", "ultima_consulta", "ultimo_cambio", "consultas", "consultas_sin_cambios",
+                "fallos", "ultimo_error", "fecha_hora_vista", "resultado_visto",
+            ],
+        )
+
+        por_estado = Counter("fallida" if seg.fallos else seg.estado for seg in pendientes)
+        self.stdout.write(
+            f"[vigilar] {len(pendientes)} actas consultadas · "
+            + " · ".join(f"{n} {e}" for e, n in sorted(por_estado.items()))
+        )
+        return len(pendientes)
+
+    def _segundos_hasta_siguiente(self, ctx, proximo_listado) -> float:
+        siguiente = SeguimientoPartido.objects.filter(
+            partido__grupo=ctx["grupo_obj"],
+            proxima_consulta__isnull=False,
+        ).aggregate(m=Min("proxima_consulta"))["m"]
+        objetivo = min(proximo_listado, siguiente) if siguiente else proximo_listado
+        return max((objetivo - timezone.now()).total_seconds(), 1.0)
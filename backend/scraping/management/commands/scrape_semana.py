@@ -7,60 +7,16 @@ from django.core.management import call_command
 from django.utils import timezone
 
 from scraping.core.config_temporadas import TEMPORADAS
+from scraping.core.http_client import format_stats
+from scraping.core import registro_config, telemetria
+from scraping.core.plan_incremental import construir_plan
+from scraping.core.replay import add_replay_arguments, pausa_cortesia, replay_from_options
 from scraping.core.temporadas_utils import get_or_create_temporada
+from scraping.models import EstadoScraping
 
 from status.models import DataSyncStatus
 from nucleo.models import Grupo
 
-# Mapa de nombres exactos de config → clave --competicion
-COMP_KEYS = {
-    "Tercera División": "TERCERA",
-    "Preferente": "PREFERENTE",
-    "Primera Regional": "PRIMERA",
-    "Segunda Regional": "SEGUNDA",
-}
-
-def _sortable_group_key(k: str) -> tuple:
-    """
-    Ordena G1..G9 por número y deja otros (XIV/XV/…) alfabéticamente.
-    """
-    k = (k or "").upper()
-    if k.startswith("G"):
-        try:
-            return (0, int(k[1:]))
-        except Exception:
-            return (0, 9999)
-    return (1, k)
-
-def _descubrir_comp_grupos_por_temporada(cfg: dict) -> List[Tuple[str, str]]:
-    """
-    Devuelve pares (competicion_key, grupo_key) a ejecutar para la temporada dada.
-    - Tercera: lee cfg["grupos"] si existe; si no, usa fallback ["XV"].
-    - Preferente/Primera/Segunda: lee cfg["otras_competiciones"][...]["grupos"].
-    """
-    pares: List[Tuple[str, str]] = []
-
-    # --- Tercera ---
-    tercera_grupos = (cfg.get("grupos") or {})
-    if tercera_grupos:
-        for gk in sorted(tercera_grupos.keys(), key=_sortable_group_key):
-            pares.append(("TERCERA", gk.upper()))
-    else:
-        # compat con temporadas antiguas sin 'grupos'
-        pares.append(("TERCERA", "XV"))
-
-    # --- Otras competiciones ---
-    otras = cfg.get("otras_competiciones", {}) or {}
-    for nombre_comp, node in otras.items():
-        comp_key = COMP_KEYS.get(nombre_comp)
-        if not comp_key:
-            continue
-        grupos = (node.get("grupos") or {}).keys()
-        for gk in sorted(grupos, key=_sortable_group_key):
-            pares.append((comp_key, gk.upper()))
-
-    return pares
-
 
 class Command(BaseCommand):
     help = (
@@ -75,7 +31,53 @@ class Command(BaseCommand):
     # Usa el mismo formato de clave que en TEMPORADAS (ej. '2025-2026')
     TEMPORADA_ACTUAL = "2025-2026"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--completo",
+            action="store_true",
+            help="Paso 1 a la antigua: scrape_live_jornada completo en todos los grupos "
+                 "(por defecto solo los grupos con algo pendiente en BD, en modo incremental)",
+        )
+        # --offline queda activo para los comandos de scraping que se lanzan desde aquí
+        add_replay_arguments(parser)
+
+    def _plan_paso_1(self, temporada_obj, configs) -> List[Tuple[str, str, bool]]:
+        """
+        (competicion_key, grupo_key, incremental) a ejecutar en el paso 1.
+        Los grupos que aún no existen en BD van completos; del resto solo los
+        que tienen trabajo según el plan incremental.
+        """
+        completos = []
+        por_grupo = {}
+        jornada_actual = {}
+        for sel in configs:
+            grupo_id = registro_config.grupo_id(sel)
+            if grupo_id is None:
+                completos.append((sel.competicion, sel.grupo))
+                continue
+            por_grupo[grupo_id] = (sel.competicion, sel.grupo)
+            estado = EstadoScraping.objects.filter(temporada_texto=f"{sel.id_temp}:{sel.id_torneo}").first()
+            if estado:
+                jornada_actual[grupo_id] = estado.jornada_actual
+
+        plan = construir_plan(
+            temporada_obj,
+            grupos=list(Grupo.objects.filter(pk__in=por_grupo)),
+            jornada_actual=jornada_actual,
+        )
+        self.stdout.write(self.style.NOTICE(f"   {plan.format_resumen()}"))
+
+        con_trabajo = plan.grupos()
+        pares = [(c, g, False) for c, g in completos]
+        pares += [(c, g, True) for pk, (c, g) in por_grupo.items() if pk in con_trabajo]
+        sin_trabajo = len(por_grupo) - len(con_trabajo & set(por_grupo))
+        if sin_trabajo:
+            self.stdout.write(self.style.NOTICE(f"   {sin_trabajo} grupos sin nada pendiente: no se descargan"))
+        return pares
+
+    @telemetria.instrumentar("scrape_semana")
     def handle(self, *args, **options):
+        replay_from_options(options)
         temporada_key = self.TEMPORADA_ACTUAL
         cfg = TEMPORADAS.get(temporada_key)
         if not cfg:
@@ -89,7 +91,8 @@ class Command(BaseCommand):
         ))
 
         # Descubrir combinaciones competicion+grupo desde el config
-        comp_grupos = _descubrir_comp_grupos_por_temporada(cfg)
+        configs = registro_config.grupos(temporada_key)
+        comp_grupos = [(sel.competicion, sel.grupo) for sel in configs]
         if not comp_grupos:
             self.stderr.write(self.style.ERROR("⚠️ No hay competiciones/grupos configurados para esta temporada."))
             return
@@ -101,9 +104,15 @@ class Command(BaseCommand):
             "📡 Paso 1/3: scrape_live_jornada (partidos en curso / aplazados / avance de jornada)"
         ))
 
-        for idx, (comp_key, grupo_key) in enumerate(comp_grupos, start=1):
+        if options["completo"]:
+            pares = [(comp_key, grupo_key, False) for comp_key, grupo_key in comp_grupos]
+        else:
+            pares = self._plan_paso_1(temporada_obj, configs)
+
+        for idx, (comp_key, grupo_key, incremental) in enumerate(pares, start=1):
             self.stdout.write(self.style.HTTP_INFO(
-                f"   → {idx}/{len(comp_grupos)} · {temporada_key} · {comp_key} · {grupo_key}"
+                f"   → {idx}/{len(pares)} · {temporada_key} · {comp_key} · {grupo_key}"
+                f"{' (incremental)' if incremental else ''}"
             ))
             try:
                 # Requiere que scrape_live_jornada acepte --competicion y --grupo
@@ -112,6 +121,7 @@ class Command(BaseCommand):
                     temporada=temporada_key,
                     competicion=comp_key,
                     grupo=grupo_key,
+                    incremental=incremental,
                 )
             except Exception as e:
                 self.stderr.write(self.style.ERROR(
@@ -119,12 +129,12 @@ class Command(BaseCommand):
                 ))
 
             # Pequeña pausa para ser amable con el origen
-            time.sleep(random.uniform(0.7, 1.5))
+            pausa_cortesia(random.uniform(0.7, 1.5))
 
         # Suave pausa antes de jugadores
         sleep_secs = random.uniform(2.0, 4.0)
         self.stdout.write(self.style.NOTICE(f"⏳ Esperando {sleep_secs:.1f}s antes de actualizar jugadores..."))
-        time.sleep(sleep_secs)
+        pausa_cortesia(sleep_secs)
 
         # -------------------------------
         # Paso 2: Scrape de jugadores
@@ -237,3 +247,4 @@ class Command(BaseCommand):
         )
 
         self.stdout.write(self.style.SUCCESS("✅ scrape_semana terminado y status actualizado"))
+        self.stdout.write(format_stats())
@@ -1,18 +1,34 @@
 # scraping/management/commands/scrape_todo.py
-import time, random
 from django.core.management import call_command
 from django.core.management.base import BaseCommand
+from scraping.core import cola_tareas, replay, telemetria
 from scraping.core.config_temporadas import TEMPORADAS
+from scraping.core.http_client import format_stats
+from scraping.core.replay import add_replay_arguments, replay_from_options
 
-class Command(BaseCommand):
-    help = "Scrapea temporadas en orden descendente. 2025-2026 solo J1–J5 en TODOS los grupos; el resto completas."
+COLA = "scrape_todo"
 
-    def handle(self, *args, **options):
-        self.stdout.write(self.style.MIGRATE_HEADING("🏁 Iniciando scraping múltiple (orden descendente, sólo J1–J5)"))
 
-        temporadas_en_orden = ["2025-2026", "2024-2025", "2023-2024", "2022-2023"]
-
-        for temporada_key in temporadas_en_orden:
+class Command(BaseCommand):
+    help = (
+        "Scrapea temporadas en orden descendente. 2025-2026 solo J1–J5 en TODOS los grupos; el resto completas.\n"
+        "Cada jornada de cada grupo es una tarea de la cola persistente (TareaScraping): si el proceso se cae, "
+        "volver a lanzarlo continúa donde se quedó, y se pueden lanzar más procesos con --solo-drenar."
+    )
+
+    TEMPORADAS_EN_ORDEN = ["2025-2026", "2024-2025", "2023-2024", "2022-2023"]
+
+    def add_arguments(self, parser):
+        cola_tareas.add_cola_arguments(parser)
+        # --offline queda activo para todos los scrape_jornada que se lanzan desde aquí
+        add_replay_arguments(parser)
+
+    def _tareas(self):
+        """
+        (clave, params) de cada jornada a scrapear, en el orden de siempre:
+        temporadas descendentes, TERCERA (XV, XIV, resto) y luego las otras competiciones.
+        """
+        for temporada_key in self.TEMPORADAS_EN_ORDEN:
             cfg = TEMPORADAS.get(temporada_key)
             if not cfg:
                 self.stderr.write(self.style.ERROR(f"⛔ La temporada {temporada_key} no está en config_temporadas.py"))
@@ -28,49 +44,17 @@ class Command(BaseCommand):
             if "grupos" in cfg:
                 # Fuerza orden XV -> XIV si existen
                 if "XV" in cfg["grupos"]:
-                    grupos_tercera.append(("XV", cfg["grupos"]["XV"]))
+                    grupos_tercera.append("XV")
                 if "XIV" in cfg["grupos"]:
-                    grupos_tercera.append(("XIV", cfg["grupos"]["XIV"]))
+                    grupos_tercera.append("XIV")
                 # Si hay más grupos, añádelos después en orden alfabético
                 for k in sorted(cfg["grupos"].keys()):
                     if k not in ("XV", "XIV"):
-                        grupos_tercera.append((k, cfg["grupos"][k]))
+                        grupos_tercera.append(k)
 
-            total_grupos = len(grupos_tercera)
-            self.stdout.write(self.style.NOTICE(
-                f"\n📅 Temporada {temporada_key}: {total_grupos} grupo(s) TERCERA · se procesarán J1–J{total_jornadas}\n"
-            ))
-
-            for idx, (gkey, gmeta) in enumerate(grupos_tercera, start=1):
-                self.stdout.write(self.style.MIGRATE_HEADING(
-                    f"🏷️  {temporada_key} · TERCERA · {gkey}  ({idx}/{total_grupos})"
-                ))
+            for gkey in grupos_tercera:
                 for j in range(1, total_jornadas + 1):
-                    self.stdout.write(self.style.HTTP_INFO(
-                        f"→ Jornada {j}/{total_jornadas} · TERCERA {gkey}"
-                    ))
-                    try:
-                        call_command("scrape_jornada",
-                                     temporada=temporada_key,
-                                     jornada=j,
-                                     competicion="TERCERA",
-                                     grupo=gkey)
-                    except Exception as e:
-                        self.stderr.write(self.style.ERROR(
-                            f"⚠️  Error en {temporada_key} TERCERA {gkey} J{j}: {e}"
-                        ))
-                        continue
-
-                    # pausa cada 5–6 jornadas
-                    if j % random.choice([5, 6]) == 0 and j != total_jornadas:
-                        pausa = random.randint(6, 12)
-                        self.stdout.write(self.style.WARNING(
-                            f"⏳ Pausa entre jornadas ({pausa}s)…"
-                        ))
-                        time.sleep(pausa)
-
-                # pequeña pausa entre grupos
-                time.sleep(random.uniform(3.0, 6.0))
+                    yield self._tarea(temporada_key, "TERCERA", gkey, j)
 
             # === 2.2) OTRAS COMPETICIONES (Preferente / Primera / Segunda) ===
             otras = cfg.get("otras_competiciones", {})
@@ -84,6 +68,10 @@ class Command(BaseCommand):
                         return k
                 grupos_ordenados = sorted(grupos.keys(), key=sort_key)
 
+                # Mapea nombre CLI de competición a tus claves admitidas por scrape_jornada
+                cli_comp = ("PREFERENTE" if "Preferente" in comp_name
+                            else "PRIMERA" if "Primera Regional" in comp_name
+                            else "SEGUNDA")
                 for gk in grupos_ordenados:
                     gmeta = grupos[gk]
                     # jornadas específicas del grupo o las de la temporada;
@@ -91,45 +79,55 @@ class Command(BaseCommand):
                     j_total = gmeta.get("jornadas", jornadas_base)
                     if temporada_key == "2025-2026":
                         j_total = min(j_total, 5)
-
-                    self.stdout.write(self.style.MIGRATE_HEADING(
-                        f"🏷️  {temporada_key} · {comp_name.upper()} · {gk}"
-                    ))
                     for j in range(1, j_total + 1):
-                        self.stdout.write(self.style.HTTP_INFO(
-                            f"→ Jornada {j}/{j_total} · {comp_name.upper()} {gk}"
-                        ))
-                        try:
-                            # Mapea nombre CLI de competición a tus claves admitidas por scrape_jornada
-                            cli_comp = ("PREFERENTE" if "Preferente" in comp_name
-                                        else "PRIMERA" if "Primera Regional" in comp_name
-                                        else "SEGUNDA")
-                            call_command("scrape_jornada",
-                                         temporada=temporada_key,
-                                         jornada=j,
-                                         competicion=cli_comp,
-                                         grupo=gk)
-                        except Exception as e:
-                            self.stderr.write(self.style.ERROR(
-                                f"⚠️  Error en {temporada_key} {comp_name} {gk} J{j}: {e}"
-                            ))
-                            continue
-
-                        if j % random.choice([5, 6]) == 0 and j != j_total:
-                            pausa = random.randint(6, 12)
-                            self.stdout.write(self.style.WARNING(
-                                f"⏳ Pausa entre jornadas ({pausa}s)…"
-                            ))
-                            time.sleep(pausa)
-
-                    time.sleep(random.uniform(3.0, 6.0))
-
-            # Pausa larga entre temporadas
-            if temporada_key != temporadas_en_orden[-1]:
-                pausa_temporada = random.randint(12, 25)
-                self.stdout.write(self.style.WARNING(
-                    f"\n🌙 Pausa entre temporadas ({pausa_temporada}s)…\n"
-                ))
-                time.sleep(pausa_temporada)
-
-        self.stdout.write(self.style.SUCCESS("\n✅ Scraping completado en todas las temporadas/grupos."))
+                        yield self._tarea(temporada_key, cli_comp, gk, j)
+
+    def _tarea(self, temporada_key, competicion, grupo, jornada):
+        clave = f"{temporada_key}:{competicion}:{grupo}:J{jornada:02d}"
+        return clave, {"temporada": temporada_key, "competicion": competicion, "grupo": grupo, "jornada": jornada}
+
+    def _log(self, msg):
+        self.stdout.write(self.style.NOTICE(msg))
+
+    def _log_error(self, msg):
+        self.stderr.write(self.style.ERROR(f"⚠️  {msg}"))
+
+    @telemetria.instrumentar("scrape_todo")
+    def handle(self, *args, **options):
+        replay_from_options(options)
+        self.stdout.write(self.style.MIGRATE_HEADING("🏁 Iniciando scraping múltiple (orden descendente, sólo J1–J5)"))
+
+        if not cola_tareas.preparar_cola(COLA, options, self._tareas, self._log):
+            return
+
+        trabajador = cola_tareas.nombre_trabajador()
+        rps_global = options["rps_global"]
+
+        def _ejecutar(tareas):
+            tarea = tareas[0]
+            p = tarea.params
+            self.stdout.write(self.style.HTTP_INFO(
+                f"→ {p['temporada']} · {p['competicion']} {p['grupo']} · Jornada {p['jornada']} "
+                f"(intento {tarea.intentos})"
+            ))
+            kwargs = {}
+            if not replay.offline():
+                # El presupuesto global se reparte entre los procesos que drenan la cola
+                kwargs["rps"] = cola_tareas.rps_trabajador(COLA, trabajador, rps_global)
+            call_command(
+                "scrape_jornada",
+                temporada=p["temporada"],
+                jornada=p["jornada"],
+                competicion=p["competicion"],
+                grupo=p["grupo"],
+                **kwargs,
+            )
+
+        stats = cola_tareas.drenar(COLA, _ejecutar, trabajador=trabajador, log=self._log_error)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"\n✅ Cola drenada por {trabajador}: {stats['hechas']} jornadas hechas · "
+            f"{stats['reintentos']} a reintentar · {stats['fallidas']} fallidas"
+        ))
+        self.stdout.write(cola_tareas.format_resumen(COLA))
+        self.stdout.write(format_stats())
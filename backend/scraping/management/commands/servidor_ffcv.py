@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+
+from scraping.core.replay import ServidorReplay
+
+
+class Command(BaseCommand):
+    help = (
+        "Servidor HTTP local que sirve el archivo raw como si fuera FFCV "
+        "(latencia configurable, ETag/304). Para medir los comandos de scraping sin red."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", type=str, default="127.0.0.1")
+        parser.add_argument("--puerto", type=int, default=8765)
+        parser.add_argument(
+            "--latencia-ms",
+            type=float,
+            default=0.0,
+            help="Latencia fija por respuesta en ms",
+        )
+        parser.add_argument(
+            "--jitter-ms",
+            type=float,
+            default=0.0,
+            help="Latencia extra aleatoria (0..jitter) por respuesta en ms",
+        )
+        parser.add_argument(
+            "--antes-de",
+            type=str,
+            default=None,
+            help="Fecha ISO 8601 UTC: sirve cada página como estaba antes de esa fecha",
+        )
+        parser.add_argument(
+            "--semilla",
+            type=int,
+            default=0,
+            help="Semilla del jitter (misma semilla = mismas latencias entre pasadas)",
+        )
+        parser.add_argument("--verbose", action="store_true", help="Log de cada petición")
+
+    def handle(self, *args, **options):
+        servidor = ServidorReplay(
+            options["host"],
+            options["puerto"],
+            latencia_ms=options["latencia_ms"],
+            jitter_ms=options["jitter_ms"],
+            antes_de=options.get("antes_de"),
+            semilla=options["semilla"],
+            verbose=options["verbose"],
+        )
+        base = f"http://{options['host']}:{servidor.server_address[1]}"
+        self.stdout.write(self.style.MIGRATE_HEADING(f"🛰️  Réplica de FFCV en {base}"))
+        self.stdout.write(f"   Lanza los comandos con SCRAPING_FFCV_BASE_URL={base}")
+        self.stdout.write("   (o sin servidor: --offline / SCRAPING_OFFLINE=1)")
+
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            servidor.server_close()
+            c = servidor.contadores
+            self.stdout.write(
+                self.style.SUCCESS(f"✅ Servidor parado: {c['200']} × 200, {c['304']} × 304, {c['404']} × 404")
+            )
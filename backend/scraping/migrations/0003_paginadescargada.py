@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraping', '0002_estadoscraping_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaginaDescargada',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url_hash', models.CharField(max_length=40, unique=True)),
+                ('url', models.TextField()),
+                ('etag', models.CharField(blank=True, max_length=255)),
+                ('last_modified', models.CharField(blank=True, max_length=100)),
+                ('contenido_sha256', models.CharField(blank=True, max_length=64)),
+                ('ultima_descarga', models.DateTimeField(auto_now=True)),
+                ('ultimo_cambio', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Página descargada (scraping)',
+                'verbose_name_plural': 'Páginas descargadas (scraping)',
+            },
+        ),
+    ]
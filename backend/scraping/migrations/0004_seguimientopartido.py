@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('partidos', '0003_partido_score_interes'),
+        ('scraping', '0003_paginadescargada'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeguimientoPartido',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('estado', models.CharField(choices=[('sin_fecha', 'Sin fecha'), ('programado', 'Programado'), ('en_juego', 'En juego'), ('post_partido', 'Recién terminado'), ('cerrado', 'Cerrado'), ('aplazado', 'Aplazado')], db_index=True, default='programado', max_length=20)),
+                ('proxima_consulta', models.DateTimeField(blank=True, db_index=True, null=True)),
+                ('ultima_consulta', models.DateTimeField(blank=True, null=True)),
+                ('ultimo_cambio', models.DateTimeField(blank=True, null=True)),
+                ('consultas', models.PositiveIntegerField(default=0)),
+                ('consultas_sin_cambios', models.PositiveIntegerField(default=0)),
+                ('partido', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='seguimiento_live', to='partidos.partido')),
+            ],
+            options={
+                'verbose_name': 'Seguimiento de partido (live)',
+                'verbose_name_plural': 'Seguimiento de partidos (live)',
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraping', '0004_seguimientopartido'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TareaScraping',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cola', models.CharField(max_length=50)),
+                ('clave', models.CharField(max_length=150)),
+                ('params', models.JSONField(default=dict)),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('en_curso', 'En curso'), ('hecha', 'Hecha'), ('fallida', 'Fallida')], default='pendiente', max_length=20)),
+                ('orden', models.PositiveIntegerField(default=0)),
+                ('intentos', models.PositiveIntegerField(default=0)),
+                ('ultimo_error', models.TextField(blank=True)),
+                ('trabajador', models.CharField(blank=True, max_length=100)),
+                ('creada_en', models.DateTimeField(auto_now_add=True)),
+                ('iniciada_en', models.DateTimeField(blank=True, null=True)),
+                ('terminada_en', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Tarea de scraping',
+                'verbose_name_plural': 'Tareas de scraping',
+                'indexes': [models.Index(fields=['cola', 'estado', 'orden'], name='scraping_ta_cola_754d52_idx')],
+                'unique_together': {('cola', 'clave')},
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraping', '0005_tareascraping'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImagenMedia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('formato', models.CharField(max_length=10)),
+                ('ancho', models.PositiveIntegerField(blank=True, null=True)),
+                ('alto', models.PositiveIntegerField(blank=True, null=True)),
+                ('bytes', models.PositiveIntegerField(default=0)),
+                ('ruta', models.CharField(max_length=200)),
+                ('ruta_publica', models.CharField(max_length=200)),
+                ('miniaturas', models.JSONField(blank=True, default=dict)),
+                ('creada_en', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Imagen (scraping)',
+                'verbose_name_plural': 'Imágenes (scraping)',
+            },
+        ),
+        migrations.CreateModel(
+            name='OrigenImagen',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.CharField(max_length=500, unique=True)),
+                ('verificada_en', models.DateTimeField()),
+                ('imagen', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='origenes', to='scraping.imagenmedia')),
+            ],
+            options={
+                'verbose_name': 'Origen de imagen (scraping)',
+                'verbose_name_plural': 'Orígenes de imágenes (scraping)',
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nucleo', '0001_initial'),
+        ('partidos', '0003_partido_score_interes'),
+        ('scraping', '0006_imagenes'),
+        ('status', '0002_telemetria_scraping'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConsumidorCambios',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50, unique=True)),
+                ('ultimo_cambio_id', models.PositiveBigIntegerField(default=0)),
+                ('actualizado_en', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Consumidor de cambios (scraping)',
+                'verbose_name_plural': 'Consumidores de cambios (scraping)',
+            },
+        ),
+        migrations.CreateModel(
+            name='CambioPartido',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jornada', models.PositiveIntegerField()),
+                ('alta', models.BooleanField(default=False)),
+                ('resultado', models.BooleanField(default=False)),
+                ('eventos', models.BooleanField(default=False)),
+                ('alineaciones', models.BooleanField(default=False)),
+                ('estado', models.BooleanField(default=False)),
+                ('creado_en', models.DateTimeField(auto_now_add=True)),
+                ('ejecucion', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='cambios', to='status.ejecucionscraping')),
+                ('grupo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cambios_scraping', to='nucleo.grupo')),
+                ('partido', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cambios_scraping', to='partidos.partido')),
+            ],
+            options={
+                'verbose_name': 'Cambio de partido (scraping)',
+                'verbose_name_plural': 'Cambios de partidos (scraping)',
+                'indexes': [models.Index(fields=['grupo', 'jornada'], name='scraping_ca_grupo_i_be816d_idx'), models.Index(fields=['creado_en'], name='scraping_ca_creado__c8abd9_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraping', '0007_cambios_partido'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlantillaParseada',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('archivo', models.CharField(max_length=200, unique=True)),
+                ('temporada', models.CharField(max_length=20)),
+                ('competicion', models.CharField(max_length=30)),
+                ('grupo', models.CharField(max_length=50)),
+                ('equipo_id', models.PositiveIntegerField()),
+                ('jugador_ids', models.JSONField(default=list)),
+                ('sha256', models.CharField(max_length=64)),
+                ('tamano', models.PositiveIntegerField(default=0)),
+                ('mtime', models.FloatField(default=0)),
+                ('actualizada_en', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Plantilla parseada (scraping)',
+                'verbose_name_plural': 'Plantillas parseadas (scraping)',
+                'indexes': [models.Index(fields=['temporada', 'competicion', 'grupo'], name='scraping_pl_tempora_277ed8_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraping', '0008_plantillas_parseadas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FichaJugadorScrapeada',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jugador_federacion', models.PositiveIntegerField(unique=True)),
+                ('contenido_sha256', models.CharField(blank=True, max_length=64)),
+                ('ultima_consulta', models.DateTimeField()),
+                ('ultimo_cambio', models.DateTimeField(blank=True, null=True)),
+                ('apariciones', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Ficha de jugador (scraping)',
+                'verbose_name_plural': 'Fichas de jugadores (scraping)',
+            },
+        ),
+    ]
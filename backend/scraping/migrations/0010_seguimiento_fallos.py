@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:13
+
+from django.db import migrations, models
+
+
+def rellenar_vistos(apps, schema_editor):
+    # Los seguimientos existentes se dan por planificados con lo que hay ahora
+    SeguimientoPartido = apps.get_model("scraping", "SeguimientoPartido")
+    segs = list(SeguimientoPartido.objects.select_related("partido"))
+    for seg in segs:
+        p = seg.partido
+        seg.fecha_hora_vista = p.fecha_hora
+        if p.goles_local is not None and p.goles_visitante is not None:
+            seg.resultado_visto = f"{p.goles_local}-{p.goles_visitante}"
+    SeguimientoPartido.objects.bulk_update(segs, ["fecha_hora_vista", "resultado_visto"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraping', '0009_fichas_jugador'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='seguimientopartido',
+            name='fallos',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='seguimientopartido',
+            name='fecha_hora_vista',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='seguimientopartido',
+            name='resultado_visto',
+            field=models.CharField(blank=True, default='', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='seguimientopartido',
+            name='ultimo_error',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.RunPython(rellenar_vistos, migrations.RunPython.noop),
+    ]
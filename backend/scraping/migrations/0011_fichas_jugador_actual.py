@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:02
+
+from django.db import migrations, models
+
+
+def separar_actual(apps, schema_editor):
+    # Las filas sin huella solo las había escrito scrape_jugadores: su consulta
+    # y sus alineaciones son las de la temporada actual, no de una bajada completa
+    FichaJugadorScrapeada = apps.get_model("scraping", "FichaJugadorScrapeada")
+    filas = list(FichaJugadorScrapeada.objects.filter(contenido_sha256=""))
+    for f in filas:
+        f.consulta_actual, f.apariciones_actual = f.ultima_consulta, f.apariciones
+        f.ultima_consulta, f.apariciones = None, 0
+    FichaJugadorScrapeada.objects.bulk_update(
+        filas, ["consulta_actual", "apariciones_actual", "ultima_consulta", "apariciones"], batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraping', '0010_seguimiento_fallos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fichajugadorscrapeada',
+            name='apariciones_actual',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='fichajugadorscrapeada',
+            name='consulta_actual',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='fichajugadorscrapeada',
+            name='ultima_consulta',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(separar_actual, migrations.RunPython.noop),
+    ]
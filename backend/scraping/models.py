@@ -17,3 +17,284 @@ class EstadoScraping(models.Model):
     def __str__(self):
         return f"{self.temporada_texto} -> actual J{self.jornada_actual} / pendiente>=J{self.jornada_pendiente_minima}"
 
+
+class SeguimientoPartido(models.Model):
+    """
+    Estado por partido del modo vigilancia de scrape_live_jornada (--vigilar):
+    en qué fase está y cuándo toca volver a consultar su acta.
+    Lo calcula scraping.core.vigilancia_live.planificar.
+    """
+    ESTADOS = [
+        ("sin_fecha", "Sin fecha"),
+        ("programado", "Programado"),
+        ("en_juego", "En juego"),
+        ("post_partido", "Recién terminado"),
+        ("cerrado", "Cerrado"),
+        ("aplazado", "Aplazado"),
+    ]
+
+    partido = models.OneToOneField(
+        "partidos.Partido",
+        on_delete=models.CASCADE,
+        related_name="seguimiento_live",
+    )
+    estado = models.CharField(max_length=20, choices=ESTADOS, default="programado", db_index=True)
+
+    # None = no se consulta hasta que el listado de la jornada lo reactive
+    proxima_consulta = models.DateTimeField(null=True, blank=True, db_index=True)
+    ultima_consulta = models.DateTimeField(null=True, blank=True)
+    ultimo_cambio = models.DateTimeField(null=True, blank=True)
+
+    consultas = models.PositiveIntegerField(default=0)
+    # Consultas seguidas en las que el acta no ha cambiado (backoff tras el final)
+    consultas_sin_cambios = models.PositiveIntegerField(default=0)
+    # Consultas seguidas fallidas (descarga, parseo o BD) y el último error
+    fallos = models.PositiveIntegerField(default=0)
+    ultimo_error = models.TextField(blank=True, default="")
+
+    # Fecha y resultado del partido la última vez que se planificó: si cambian
+    # se reabre el seguimiento (ver vigilancia_live.reabrir_si_cambia)
+    fecha_hora_vista = models.DateTimeField(null=True, blank=True)
+    resultado_visto = models.CharField(max_length=16, blank=True, default="")
+
+    class Meta:
+        verbose_name = "Seguimiento de partido (live)"
+        verbose_name_plural = "Seguimiento de partidos (live)"
+
+    def __str__(self):
+        return f"{self.partido_id} {self.estado} -> {self.proxima_consulta}"
+
+
+
+class PaginaDescargada(models.Model):
+    """
+    Validadores HTTP y hash de la última descarga de cada URL de FFCV.
+    Permite mandar GET condicionales y saltarse el parseo/upsert de actas
+    cuyo contenido no ha cambiado desde la última pasada.
+    """
+    # La URL completa puede pasar del límite de índice de MySQL: indexamos su sha1
+    url_hash = models.CharField(max_length=40, unique=True)
+    url = models.TextField()
+
+    etag = models.CharField(max_length=255, blank=True)
+    last_modified = models.CharField(max_length=100, blank=True)
+    contenido_sha256 = models.CharField(max_length=64, blank=True)
+
+    ultima_descarga = models.DateTimeField(auto_now=True)
+    ultimo_cambio = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Página descargada (scraping)"
+        verbose_name_plural = "Páginas descargadas (scraping)"
+
+    def __str__(self):
+        return f"{self.url} ({self.contenido_sha256[:8]})"
+
+
+class TareaScraping(models.Model):
+    """
+    Cola persistente de trabajo para los scrapes largos (scrape_todo,
+    scrape_jugadores_todos). Cada tarea es una unidad reanudable (una
+    jornada de un grupo, un jugador...). Ver scraping.core.cola_tareas.
+    """
+    ESTADOS = [
+        ("pendiente", "Pendiente"),
+        ("en_curso", "En curso"),
+        ("hecha", "Hecha"),
+        ("fallida", "Fallida"),
+    ]
+
+    cola = models.CharField(max_length=50)
+    clave = models.CharField(max_length=150)
+    params = models.JSONField(default=dict)
+
+    estado = models.CharField(max_length=20, choices=ESTADOS, default="pendiente")
+    # Orden de encolado: las tareas se drenan en el mismo orden que el recorrido original
+    orden = models.PositiveIntegerField(default=0)
+
+    intentos = models.PositiveIntegerField(default=0)
+    ultimo_error = models.TextField(blank=True)
+    # host:pid del proceso que la tiene (o la tuvo) en curso
+    trabajador = models.CharField(max_length=100, blank=True)
+
+    creada_en = models.DateTimeField(auto_now_add=True)
+    iniciada_en = models.DateTimeField(null=True, blank=True)
+    terminada_en = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Tarea de scraping"
+        verbose_name_plural = "Tareas de scraping"
+        unique_together = (("cola", "clave"),)
+        indexes = [
+            models.Index(fields=["cola", "estado", "orden"]),
+        ]
+
+    def __str__(self):
+        return f"[{self.cola}] {self.clave} ({self.estado}, {self.intentos} intentos)"
+
+
+class ImagenMedia(models.Model):
+    """
+    Imagen descargada (escudo, foto de jugador), una fila por contenido:
+    los placeholders que FFCV repite para cientos de jugadores se guardan
+    una vez. Las rutas son relativas a media/ (ver nucleo.media).
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    formato = models.CharField(max_length=10)
+    ancho = models.PositiveIntegerField(null=True, blank=True)
+    alto = models.PositiveIntegerField(null=True, blank=True)
+    bytes = models.PositiveIntegerField(default=0)
+
+    # Original tal cual llegó
+    ruta = models.CharField(max_length=200)
+    # La que se guarda en Club.escudo_url / Jugador.foto_url: la miniatura mayor (o el original sin Pillow)
+    ruta_publica = models.CharField(max_length=200)
+    # {"64": {"ruta": ..., "ancho": .., "alto": ..}, ...}
+    miniaturas = models.JSONField(default=dict, blank=True)
+
+    creada_en = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Imagen (scraping)"
+        verbose_name_plural = "Imágenes (scraping)"
+
+    def __str__(self):
+        return f"{self.sha256[:8]} {self.formato} {self.ancho}x{self.alto}"
+
+
+class OrigenImagen(models.Model):
+    """
+    URL remota → imagen. Evita volver a bajar lo que ya se tiene hasta que
+    toca revalidarla (la foto de un jugador puede cambiar en la misma URL).
+    """
+    url = models.CharField(max_length=500, unique=True)
+    imagen = models.ForeignKey(ImagenMedia, on_delete=models.CASCADE, related_name="origenes")
+    verificada_en = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Origen de imagen (scraping)"
+        verbose_name_plural = "Orígenes de imágenes (scraping)"
+
+    def __str__(self):
+        return f"{self.url} -> {self.imagen.sha256[:8]}"
+
+
+class CambioPartido(models.Model):
+    """
+    Registro de cambios del scraping: una fila por partido y lote guardado
+    con qué ha cambiado. Los recálculos (clasificación, puntos fantasy...)
+    leen de aquí los pares grupo/jornada afectados en vez de recorrer la
+    temporada entera. Ver scraping.core.cambios.
+    """
+    partido = models.ForeignKey("partidos.Partido", on_delete=models.CASCADE, related_name="cambios_scraping")
+    # Grupo/jornada afectados (si el partido se mueve de jornada se registran la vieja y la nueva)
+    grupo = models.ForeignKey("nucleo.Grupo", on_delete=models.CASCADE, related_name="cambios_scraping")
+    jornada = models.PositiveIntegerField()
+
+    alta = models.BooleanField(default=False)
+    resultado = models.BooleanField(default=False)
+    eventos = models.BooleanField(default=False)
+    alineaciones = models.BooleanField(default=False)
+    estado = models.BooleanField(default=False)
+
+    ejecucion = models.ForeignKey(
+        "status.EjecucionScraping",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="cambios",
+    )
+    creado_en = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Cambio de partido (scraping)"
+        verbose_name_plural = "Cambios de partidos (scraping)"
+        indexes = [
+            models.Index(fields=["grupo", "jornada"]),
+            models.Index(fields=["creado_en"]),
+        ]
+
+    def __str__(self):
+        return f"{self.partido_id} G{self.grupo_id} J{self.jornada} {', '.join(self.tipos())}"
+
+    def tipos(self) -> list[str]:
+        return [t for t in TIPOS_CAMBIO if getattr(self, t)]
+
+
+TIPOS_CAMBIO = ("alta", "resultado", "eventos", "alineaciones", "estado")
+
+
+class ConsumidorCambios(models.Model):
+    """
+    Hasta qué CambioPartido ha procesado cada recálculo (cursor por nombre).
+    """
+    nombre = models.CharField(max_length=50, unique=True)
+    ultimo_cambio_id = models.PositiveBigIntegerField(default=0)
+    actualizado_en = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Consumidor de cambios (scraping)"
+        verbose_name_plural = "Consumidores de cambios (scraping)"
+
+    def __str__(self):
+        return f"{self.nombre} -> {self.ultimo_cambio_id}"
+
+
+class PlantillaParseada(models.Model):
+    """
+    Índice de los JSON de plantilla que deja scrape_equipos en
+    data_clean/equipos: qué jugadores trae cada uno, para no releer todos
+    los ficheros al montar la lista de jugadores. Ver scraping.core.manifiesto.
+    """
+    # Nombre del fichero dentro de data_clean/equipos
+    archivo = models.CharField(max_length=200, unique=True)
+    temporada = models.CharField(max_length=20)
+    competicion = models.CharField(max_length=30)
+    grupo = models.CharField(max_length=50)
+    equipo_id = models.PositiveIntegerField()
+    jugador_ids = models.JSONField(default=list)
+
+    sha256 = models.CharField(max_length=64)
+    # Tamaño y mtime del fichero al indexarlo: si no cambian no se relee
+    tamano = models.PositiveIntegerField(default=0)
+    mtime = models.FloatField(default=0)
+    actualizada_en = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Plantilla parseada (scraping)"
+        verbose_name_plural = "Plantillas parseadas (scraping)"
+        indexes = [
+            models.Index(fields=["temporada", "competicion", "grupo"]),
+        ]
+
+    def __str__(self):
+        return f"{self.archivo} ({len(self.jugador_ids)} jugadores)"
+
+
+class FichaJugadorScrapeada(models.Model):
+    """
+    Última consulta de la ficha de cada jugador (todas sus temporadas):
+    cuándo se bajó, cuándo cambió por última vez y cuántas alineaciones
+    tenía entonces en BD. Con esto los refrescos se saltan las fichas que
+    no pueden haber cambiado. Ver scraping.core.frescura_fichas.
+
+    scrape_jugadores (solo la temporada actual) lleva su propia consulta y
+    sus alineaciones en *_actual: no cuenta como bajada completa.
+    """
+    jugador_federacion = models.PositiveIntegerField(unique=True)
+    # Vacío: nunca se ha bajado entera (scrape_jugadores_todos)
+    contenido_sha256 = models.CharField(max_length=64, blank=True)
+    ultima_consulta = models.DateTimeField(null=True, blank=True)
+    ultimo_cambio = models.DateTimeField(null=True, blank=True)
+    # AlineacionPartidoJugador del jugador en BD al consultar: si crece, ha jugado desde entonces
+    apariciones = models.PositiveIntegerField(default=0)
+    consulta_actual = models.DateTimeField(null=True, blank=True)
+    apariciones_actual = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Ficha de jugador (scraping)"
+        verbose_name_plural = "Fichas de jugadores (scraping)"
+
+    def __str__(self):
+        consulta = self.ultima_consulta or self.consulta_actual
+        return f"{self.jugador_federacion} ({consulta:%Y-%m-%d})" if consulta else str(self.jugador_federacion)
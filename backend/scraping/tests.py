@@ -1,3 +1,1210 @@
-from django.test import TestCase
+import base64
+import json
+import os
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import Future
+from datetime import datetime, timedelta, timezone
+from unittest import mock
 
-# Create your tests here.
+import requests
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase
+
+from arbitros.models import ArbitrajePartido
+from clubes.models import Club, ClubEnGrupo
+from jugadores.models import Jugador, JugadorEnClubTemporada
+from nucleo.models import Competicion, Grupo, Temporada
+from partidos.models import AlineacionPartidoJugador, EventoPartido, Partido
+from scraping.core import (
+    cache_urls, cambios, cola_tareas, fetch_engine, fetcher, frescura_fichas, http_client, imagenes, manifiesto,
+    persistencia, pipeline, plan_incremental, registro_config, replay, telemetria, vigilancia_live,
+)
+from scraping.core.ffcv_urls import FFCV_ORIGEN, url_canonica
+from scraping.core.identidades import IdentityMap
+from scraping.core.imagenes import FuenteImagen, IngestaImagenes
+from scraping.core.parsers import get_parsers
+from scraping.core.persistencia import PersistenciaActas
+from scraping.core.raw_archive import RawArchive
+from scraping.management.commands.archivo_raw import urls_legado
+from scraping.management.commands.scrape_equipos import build_url_jornada
+from scraping.models import (
+    CambioPartido, FichaJugadorScrapeada, ImagenMedia, OrigenImagen, PaginaDescargada, PlantillaParseada,
+    SeguimientoPartido, TareaScraping,
+)
+from staff.models import StaffEnPartido
+from status.models import EjecucionScraping, MedicionPagina
+
+
+def _acta(titulares=(), eventos=(), arbitros=(), tecnicos=()):
+    """partido_data mínimo como lo devuelve parse_partido_detalle (todo en el equipo local)."""
+    return {
+        "equipos": {
+            "local": {
+                "titulares": [{"nombre": n, "jugador_id": i, "dorsal": d} for n, i, d in titulares],
+                "tecnicos": [{"nombre": n, "rol": "Entrenador"} for n in tecnicos],
+            },
+            "visitante": {},
+        },
+        "eventos": [
+            {"minuto": m, "tipo": t, "equipo": "local", "jugador_nombre": n, "jugador_id": i}
+            for m, t, n, i in eventos
+        ],
+        "info_partido": {"arbitros": list(arbitros)},
+    }
+
+
+def _respuesta(status_code, body=b"", **headers):
+    """Respuesta de requests ya descargada, como la devolvería la sesión."""
+    resp = requests.Response()
+    resp.status_code = status_code
+    resp._content = body
+    resp.headers["Content-Type"] = "text/html; charset=utf-8"
+    resp.headers.update(headers)
+    resp.encoding = "utf-8"
+    return resp
+
+
+class PersistenciaActasTests(TestCase):
+    def setUp(self):
+        self.temporada = Temporada.objects.create(nombre="2099/2100")
+        competicion = Competicion.objects.create(nombre="Competición de prueba")
+        self.grupo = Grupo.objects.create(nombre="Grupo de prueba", temporada=self.temporada, competicion=competicion)
+        self.local = Club.objects.create(nombre_oficial="Club Local")
+        self.visitante = Club.objects.create(nombre_oficial="Club Visitante")
+        self.partido = Partido.objects.create(
+            grupo=self.grupo, jornada_numero=3, local=self.local, visitante=self.visitante,
+            goles_local=1, goles_visitante=0, jugado=True,
+        )
+        self.otro = Partido.objects.create(
+            grupo=self.grupo, jornada_numero=4, local=self.visitante, visitante=self.local,
+            goles_local=0, goles_visitante=0, jugado=True,
+        )
+        self.acta = _acta(
+            titulares=[("Ana Pérez", 101, 9), ("Luis Gil", None, 4)],
+            eventos=[(10, "Gol", "Ana Pérez", 101), (50, "Amarilla", "Luis Gil", None)],
+            arbitros=["Árbitro Uno"],
+            tecnicos=["Entrenadora"],
+        )
+
+    def _guardar(self, acta=None, partido=None):
+        p = PersistenciaActas(self.temporada)
+        p.add_partido(partido or self.partido, acta or self.acta, self.local, self.visitante)
+        p.guardar()
+        return p
+
+    def test_reprocesar_un_acta_no_duplica_ni_infla(self):
+        self._guardar()
+        segunda = self._guardar()
+
+        self.assertEqual(AlineacionPartidoJugador.objects.filter(partido=self.partido).count(), 2)
+        self.assertEqual(EventoPartido.objects.filter(partido=self.partido).count(), 2)
+        self.assertEqual(ArbitrajePartido.objects.filter(partido=self.partido).count(), 1)
+        self.assertEqual(StaffEnPartido.objects.filter(partido=self.partido).count(), 1)
+        self.assertEqual(Jugador.objects.filter(nombre__in=["Ana Pérez", "Luis Gil"]).count(), 2)
+
+        ana = JugadorEnClubTemporada.objects.get(jugador__identificador_federacion="101")
+        self.assertEqual((ana.partidos_jugados, ana.titular, ana.goles, ana.dorsal), (1, 1, 1, "9"))
+        luis = JugadorEnClubTemporada.objects.get(jugador__nombre="Luis Gil")
+        self.assertEqual(luis.tarjetas_amarillas, 1)
+
+        insertados = {m: f["insertados"] for m, f in segunda.resumen.por_modelo.items()}
+        self.assertFalse(any(insertados.values()), insertados)
+
+    def test_eventos_identicos_cuentan_todos(self):
+        gol = (10, "Gol", "Ana Pérez", 101)
+        acta = _acta(titulares=[("Ana Pérez", 101, 9)], eventos=[gol, gol])
+        self._guardar(acta)
+        segunda = self._guardar(acta)
+
+        goles = EventoPartido.objects.filter(partido=self.partido, tipo_evento="gol")
+        ana = JugadorEnClubTemporada.objects.get(jugador__identificador_federacion="101")
+        self.assertEqual((goles.count(), ana.goles), (2, 2))
+        self.assertEqual(segunda.resumen.por_modelo["EventoPartido"]["insertados"], 0)
+
+        # Un tercero en el mismo minuto (acta corregida) solo añade ese
+        self._guardar(_acta(titulares=[("Ana Pérez", 101, 9)], eventos=[gol, gol, gol]))
+        ana.refresh_from_db()
+        self.assertEqual((goles.count(), ana.goles), (3, 3))
+
+        # La misma acta dos veces en un lote no los duplica
+        p = PersistenciaActas(self.temporada)
+        p.add_partido(self.otro, acta, self.visitante, self.local)
+        p.add_partido(self.otro, acta, self.visitante, self.local)
+        p.guardar()
+        self.assertEqual(EventoPartido.objects.filter(partido=self.otro).count(), 2)
+
+    def test_jugador_por_id_y_si_no_por_nombre(self):
+        por_id = Jugador.objects.create(nombre="Nombre Antiguo", identificador_federacion="101")
+        por_nombre = Jugador.objects.create(nombre="Luis Gil")
+
+        self._guardar(_acta(titulares=[("Ana Pérez", 101, 9), ("Luis Gil", 202, 4)]))
+
+        ids = set(AlineacionPartidoJugador.objects.filter(partido=self.partido).values_list("jugador_id", flat=True))
+        self.assertEqual(ids, {por_id.pk, por_nombre.pk})
+        por_nombre.refresh_from_db()
+        # Se rellena el id de federación que faltaba; el nombre existente no se toca
+        self.assertEqual(por_nombre.identificador_federacion, "202")
+        self.assertEqual(Jugador.objects.get(pk=por_id.pk).nombre, "Nombre Antiguo")
+
+    def test_pks_recuperadas_si_bulk_create_no_las_devuelve(self):
+        # MySQL no devuelve las pk de bulk_create: se recuperan por slug / nombre
+        Jugador.objects.create(nombre="Ana Perez", identificador_federacion="999")  # ocupa el slug ana-perez
+        original = Jugador.objects.bulk_create
+
+        def sin_pks(objs, *args, **kwargs):
+            creados = original(objs, *args, **kwargs)
+            for j in objs:
+                j.pk = None
+            return creados
+
+        with mock.patch.object(Jugador.objects, "bulk_create", side_effect=sin_pks):
+            self._guardar(_acta(titulares=[("Ana Pérez", 101, 9), ("Marta Ruiz", 102, 5)]))
+
+        ana = Jugador.objects.get(identificador_federacion="101")
+        marta = Jugador.objects.get(identificador_federacion="102")
+        self.assertEqual(ana.slug, f"ana-perez-{ana.pk}")
+        self.assertEqual(marta.slug, "marta-ruiz")
+        self.assertEqual(
+            set(AlineacionPartidoJugador.objects.filter(partido=self.partido).values_list("jugador_id", flat=True)),
+            {ana.pk, marta.pk},
+        )
+
+    @mock.patch.object(persistencia.trayectoria, "reconstruir")
+    @mock.patch.object(persistencia.grupo_info, "invalidar")
+    @mock.patch.object(persistencia.instantaneas, "invalidar")
+    @mock.patch.object(persistencia.versiones, "subir_grupos")
+    def test_terminar_invalida_una_vez_lo_confirmado(self, subir_grupos, inst_invalidar, gi_invalidar, reconstruir):
+        p = PersistenciaActas(self.temporada)
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                p.add_partido(self.partido, self.acta, self.local, self.visitante)
+                p.guardar()
+            p.add_partido(self.partido, self.acta, self.local, self.visitante)
+            p.guardar()
+            # Un lote deshecho no apunta nada
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                p.add_partido(self.otro, _acta(titulares=[("Otro", 303, 1)]), self.visitante, self.local)
+                p.guardar()
+                raise RuntimeError
+        subir_grupos.assert_not_called()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            p.terminar()
+        subir_grupos.assert_called_once_with({self.grupo.pk})
+        inst_invalidar.assert_called_once_with(self.grupo.pk, {3})
+        gi_invalidar.assert_called_once_with([self.grupo.pk], ("eventos", "arbitros", "jugadores"), {3})
+        reconstruir.assert_called_once()
+        self.assertEqual(
+            set(reconstruir.call_args.args[0]),
+            set(Jugador.objects.filter(nombre__in=["Ana Pérez", "Luis Gil"]).values_list("pk", flat=True)),
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            p.terminar()
+        subir_grupos.assert_called_once()
+
+
+_JORNADA_HTML = """
+<html><body>
+<div class="dropdown dropdown-jornadas">
+  <button class="btn boton_selector"><div> Jornada&nbsp;7 <!-- actual --></div></button>
+</div>
+<table class="table sobrestante"><tbody>
+  <tr class="sinsombra"><td colspan="6"><div class="fecha">sábado, 11 De octubre</div></td></tr>
+  <tr>
+    <td><a class="nombre_equipos_tabla" href="equipo.php?id_equipo=1"> C.D. Local <b>B</b></a></td>
+    <td><img src="escudo1.png"></td>
+    <td><span class="marcador">3</span> - <span class="marcador">2</span></td>
+    <td><img src="escudo2.png"></td>
+    <td><a class="nombre_equipos_tabla" href="equipo.php?id_equipo=2">Visitante FS</a></td>
+    <td><div>Pabellón <script>var x = 1;</script>Municipal</div>
+        <a href="partido.php?id_partido=555&amp;id_temp=21">Ver</a></td>
+  </tr>
+  <tr><td colspan="6">modal</td></tr>
+  <tr class="sinsombra"><td><div class="fecha">domingo, 12 De octubre</div></td></tr>
+  <tr>
+    <td><a class="nombre_equipos_tabla">Sin Enlace</a></td><td></td>
+    <td></td><td></td>
+    <td><a class="nombre_equipos_tabla">VÃ­ctor FS</a></td>
+    <td><div></div><span onclick="modalHistorial(777, 3)">Historial</span></td>
+  </tr>
+</tbody></table>
+</body></html>
+"""
+
+_ACTA_HTML = """
+<html><body>
+<div class="contenedor_equipos_info">
+  <div class="equipo"><a class="enlace_nombre_equipo_info" href="equipo.php?id_equipo=11">Local  FS</a></div>
+  <div class="resultados-cuentaatras"><span>4</span> : <span>1</span></div>
+  <div class="equipo"><a class="enlace_nombre_equipo_info" href="equipo.php?id_equipo=x">VÃ­ctor FS</a></div>
+</div>
+<input id="fecha" value=" 11-10-2099 "><input id="hora" value="">
+<div class="estadio_barra">
+  <a href="mapa.php"><img class="icono_campo" src="campo.png"><p class="nombre_campo">Pabellón Norte |</p></a>
+  <img class="icono_campo" src="images/arbitros.png">
+  <p class="nombre_campo">Árbitro Uno | <!-- c --> Árbitro Dos|11-10-2099|18:30</p>
+</div>
+<div class="contenido-partido"><div class="container"><div class="row">
+  <div class="col-lg-4 col-md-6 alineacion">
+    <span class="boton_equipacion" id="boton_297544"></span>
+    <span>  Local&nbsp;FS </span>
+    <p>Titulares</p>
+    <ul>
+      <li class="listaJugador"><a class="lista_plantilla_jugadores" href="jugador.php?id_jugador=101">
+        <div><span style="color:#ffa500">10</span> GARCÍA, ANA <span class="span_etiqueta_alin">C</span>
+        <span class="minutos">12'</span><img src="balon.png"></div></a></li>
+      <li class="listaJugador"><a class="lista_plantilla_jugadores" href="jugador.php?id_jugador=abc">
+        <div><span style="color: #ffa500;">7</span>PÃ©REZ 7, LUIS</div></a></li>
+      <li class="listaJugador"><span>sin enlace</span></li>
+    </ul>
+    <p>Suplentes</p>
+    <ul>
+      <li class="listaJugador otra"><a class="lista_plantilla_jugadores" href="jugador.php?id_jugador=103">
+        <div>PORTERA, EVA <span class="span_etiqueta_alin">Pt</span></div></a></li>
+    </ul>
+    <p>Técnicos</p>
+    <ul>
+      <li><a class="lista_plantilla_jugadores"><div><span style="color: orange;">Entrenador</span> RUIZ, MARTA</div></a></li>
+      <li><a class="lista_plantilla_jugadores"></a></li>
+    </ul>
+  </div>
+  <div class="col-lg-4 col-md-6"><p>Titulares</p><ul></ul></div>
+</div></div></div>
+<div class="timeLineContainer"><div class="eventosTimeLine">
+  <div class="eventosFijosTimeLine"><header class="eventoInfoCabecera">Descanso</header></div>
+  <div class="eventosLocalTimeLine">
+    <header class="eventoInfoCabecera"><time class="eventoInfoMinuto">16'</time> Gol </header>
+    <a class="eventoInfoJugadorNombre" href="jugador.php?id_jugador=101">GARCÍA, ANA</a>
+  </div>
+  <div class="eventosVisitanteTimeLine x">
+    <header class="eventoInfoCabecera">Tarjeta  Amarilla</header>
+    <a class="eventoInfoJugadorNombre">VÃ­ctor</a>
+  </div>
+  <div class="eventosLocalTimeLine"><p>sin cabecera</p></div>
+</div></div>
+</body></html>
+"""
+
+
+class ParsersParidadTests(SimpleTestCase):
+    """El backend lxml tiene que devolver exactamente lo mismo que el de BeautifulSoup."""
+
+    def assertMismaSalida(self, funcion, html):
+        esperado = getattr(get_parsers("bs4"), funcion)(html)
+        self.assertEqual(getattr(get_parsers("lxml"), funcion)(html), esperado)
+        return esperado
+
+    def test_listado_de_jornada(self):
+        data = self.assertMismaSalida("jornada_partidos", _JORNADA_HTML)
+        self.assertEqual(data["jornada"], 7)
+        self.assertEqual([p["id_partido"] for p in data["partidos"]], [555, 777])
+        self.assertEqual(data["partidos"][0]["fecha_texto"], "sábado, 11 De octubre")
+
+    def test_acta(self):
+        data = self.assertMismaSalida("partido_detalle", _ACTA_HTML)
+        self.assertEqual(data["marcador"], {"local": 4, "visitante": 1})
+        self.assertEqual(data["info_partido"]["arbitros"], ["Árbitro Uno", "Árbitro Dos"])
+        local = data["equipos"]["local"]
+        self.assertEqual(local["id_equipo"], 297544)
+        self.assertEqual([j["jugador_id"] for j in local["titulares"]], [101, None])
+        self.assertEqual(local["tecnicos"], [{"nombre": "RUIZ, MARTA", "rol": "Entrenador"}])
+        self.assertEqual([e["equipo"] for e in data["eventos"]], ["local", "visitante"])
+
+    def test_paginas_vacias_o_incompletas(self):
+        for html in ("<html></html>", "<p>Mantenimiento</p>", _ACTA_HTML.split("<div class=\"contenido-partido\">")[0]):
+            with self.subTest(html=html[:30]):
+                self.assertMismaSalida("jornada_partidos", html)
+                self.assertMismaSalida("partido_detalle", html)
+
+    def test_backend_desconocido(self):
+        with self.assertRaises(ValueError):
+            get_parsers("html5lib")
+
+
+class PlanIncrementalTests(TestCase):
+    ahora = datetime(2099, 11, 1, 12, 0, tzinfo=timezone.utc)
+
+    def setUp(self):
+        self.temporada = Temporada.objects.create(nombre="2099/2100")
+        competicion = Competicion.objects.create(nombre="Competición de prueba")
+        self.grupo = Grupo.objects.create(nombre="Grupo de prueba", temporada=self.temporada, competicion=competicion)
+        self.clubs = [Club.objects.create(nombre_oficial=f"Club {letra}") for letra in "ABCD"]
+        for club in self.clubs:
+            ClubEnGrupo.objects.create(club=club, grupo=self.grupo)
+        self.n = 0
+
+    def _partido(self, jornada, hace=None, jugado=False, goles=(None, None), eventos=False, alineaciones=False):
+        self.n += 1
+        a, b = self.clubs[:2]
+        partido = Partido.objects.create(
+            grupo=self.grupo, jornada_numero=jornada, local=a, visitante=b,
+            fecha_hora=None if hace is None else self.ahora - hace,
+            goles_local=goles[0], goles_visitante=goles[1], jugado=jugado,
+            identificador_federacion=str(1000 + self.n),
+        )
+        if eventos:
+            EventoPartido.objects.create(partido=partido, tipo_evento="gol", club=a)
+        if alineaciones:
+            AlineacionPartidoJugador.objects.create(partido=partido, club=a)
+        return partido
+
+    def _motivos(self, **kwargs):
+        plan = plan_incremental.construir_plan(self.temporada, ahora=self.ahora, **kwargs)
+        return {t.partido_id: t.motivo for t in plan.actas}, plan
+
+    def test_motivos(self):
+        completo = self._partido(1, timedelta(days=20), True, (1, 0), eventos=True, alineaciones=True)
+        aplazado = self._partido(1, timedelta(days=20))
+        sin_eventos = self._partido(2, timedelta(days=3), True, (2, 1), alineaciones=True)
+        sin_alineaciones = self._partido(2, timedelta(days=3), True, (0, 0))
+        en_juego = self._partido(3, timedelta(hours=1))
+        sin_jugar = self._partido(3, timedelta(hours=5))
+        futuro_aplazado = self._partido(3, -timedelta(days=2))
+        SeguimientoPartido.objects.create(partido=futuro_aplazado, estado="aplazado")
+        Partido.objects.create(  # sin id de FFCV: no se puede pedir
+            grupo=self.grupo, jornada_numero=3, local=self.clubs[2], visitante=self.clubs[3],
+            fecha_hora=self.ahora - timedelta(days=1),
+        )
+
+        motivos, plan = self._motivos()
+
+        self.assertEqual(motivos, {
+            aplazado.pk: "aplazado",
+            sin_eventos.pk: "sin_eventos",
+            sin_alineaciones.pk: "sin_alineaciones",
+            sin_jugar.pk: "sin_jugar",
+            futuro_aplazado.pk: "aplazado",
+        })
+        self.assertNotIn(completo.pk, motivos)
+        self.assertNotIn(en_juego.pk, motivos)
+        self.assertEqual(
+            plan.format_resumen(),
+            "[plan] 5 actas (2 aplazado, 1 sin_jugar, 1 sin_eventos, 1 sin_alineaciones) · 0 listados · 1 grupos con trabajo",
+        )
+
+    def test_sin_alineaciones_caduca(self):
+        reciente = self._partido(1, timedelta(days=2), True, (0, 0))
+        antiguo = self._partido(1, timedelta(days=40), True, (0, 0))
+        sin_fecha = self._partido(1, None, True, (0, 0))
+
+        # Ni el antiguo ni el que no tiene fecha vuelven a pedirse
+        self.assertEqual(self._motivos()[0], {reciente.pk: "sin_alineaciones"})
+        self.assertIsNone(sin_fecha.fecha_hora)
+
+        with mock.patch.object(plan_incremental, "ALINEACIONES_MAX_EDAD", timedelta(days=60)):
+            self.assertEqual(set(self._motivos()[0]), {reciente.pk, antiguo.pk})
+
+    def test_listados_pendientes(self):
+        # 4 clubs: dos partidos por jornada
+        self._partido(1, timedelta(days=10), True, (1, 0), eventos=True, alineaciones=True)
+        self._partido(1, timedelta(days=10), True, (1, 0), eventos=True, alineaciones=True)
+        self._partido(2, -timedelta(days=1))
+
+        # Sin EstadoScraping: la siguiente a la última jugada, que está a medias
+        self.assertEqual(self._motivos()[1].listados, [(self.grupo.pk, 2)])
+        self.assertEqual(self._motivos(jornada_actual={self.grupo.pk: 1})[1].listados, [])
+        self.assertEqual(
+            plan_incremental.listados_pendientes({self.grupo.pk: 3}), [(self.grupo.pk, 3)],
+        )
+        self.assertEqual(plan_incremental.listados_pendientes({}), [])
+
+
+class CambiosCursorTests(TestCase):
+    def setUp(self):
+        temporada = Temporada.objects.create(nombre="2099/2100")
+        competicion = Competicion.objects.create(nombre="Competición de prueba")
+        self.grupo = Grupo.objects.create(nombre="Grupo de prueba", temporada=temporada, competicion=competicion)
+        a, b = Club.objects.create(nombre_oficial="Club A"), Club.objects.create(nombre_oficial="Club B")
+        self.partidos = {
+            j: Partido.objects.create(grupo=self.grupo, jornada_numero=j, local=a, visitante=b) for j in (1, 2, 3)
+        }
+
+    def _cambio(self, jornada, id, hace=timedelta(0)):
+        cambio = CambioPartido.objects.create(
+            id=id, partido=self.partidos[jornada], grupo=self.grupo, jornada=jornada, resultado=True,
+        )
+        CambioPartido.objects.filter(pk=cambio.pk).update(creado_en=cambio.creado_en - hace)
+
+    def _pendientes(self):
+        pares, hasta = cambios.pendientes("prueba")
+        return sorted(j for _, j in pares), hasta
+
+    def test_un_lote_que_confirma_tarde_no_se_salta(self):
+        viejo = cambios.MARGEN_CURSOR + timedelta(minutes=1)
+        self._cambio(1, id=10, hace=viejo)
+        # El lote con id 20 se confirma mientras el que reservó el 15 sigue abierto
+        self._cambio(2, id=20)
+
+        self.assertEqual(self._pendientes(), ([1, 2], 10))
+        cambios.confirmar("prueba", 10)
+
+        # Se confirma el lote del 15: sigue pendiente, y el 20 se repite
+        self._cambio(3, id=15)
+        self.assertEqual(self._pendientes(), ([2, 3], 10))
+
+        CambioPartido.objects.filter(id__in=[15, 20]).update(creado_en=datetime.now(timezone.utc) - viejo)
+        self.assertEqual(self._pendientes(), ([2, 3], 20))
+        cambios.confirmar("prueba", 20)
+        self.assertEqual(self._pendientes(), ([], 20))
+
+
+class ColaTareasTests(TestCase):
+    cola = "prueba"
+
+    def _encolar(self, *claves):
+        return cola_tareas.encolar(self.cola, [(c, {"c": c}) for c in claves])
+
+    def _estados(self):
+        return dict(TareaScraping.objects.filter(cola=self.cola).values_list("clave", "estado"))
+
+    def test_encolar_es_idempotente(self):
+        self.assertEqual(self._encolar("a", "b"), 2)
+        cola_tareas.completar(cola_tareas.reclamar(self.cola, "w1")[0])
+        # Relanzar el comando: solo entra la nueva y la hecha sigue hecha
+        self.assertEqual(self._encolar("a", "b", "c"), 1)
+        self.assertEqual(self._estados(), {"a": "hecha", "b": "pendiente", "c": "pendiente"})
+        self.assertEqual([t.clave for t in cola_tareas.reclamar(self.cola, "w1", n=5)], ["b", "c"])
+
+    def test_reclamar_no_da_dos_veces_la_misma(self):
+        self._encolar("a", "b", "c")
+        primera = cola_tareas.reclamar(self.cola, "w1")
+        segunda = cola_tareas.reclamar(self.cola, "w2", n=5)
+        self.assertEqual(([t.clave for t in primera], [t.clave for t in segunda]), (["a"], ["b", "c"]))
+        self.assertEqual((primera[0].estado, primera[0].intentos, primera[0].trabajador), ("en_curso", 1, "w1"))
+        self.assertEqual(cola_tareas.reclamar(self.cola, "w3"), [])
+        self.assertEqual(cola_tareas.trabajadores_activos(self.cola, "w3"), 3)
+        self.assertEqual(cola_tareas.rps_trabajador(self.cola, "w1", 0.6), 0.3)
+
+    def test_huerfanas_vuelven_a_pendiente(self):
+        self._encolar("a", "b")
+        vieja, reciente = cola_tareas.reclamar(self.cola, "w1", n=2)
+        TareaScraping.objects.filter(pk=vieja.pk).update(
+            iniciada_en=datetime.now(timezone.utc) - cola_tareas.TIMEOUT - timedelta(minutes=1),
+        )
+        self.assertEqual(cola_tareas.recuperar_huerfanas(self.cola), 1)
+        self.assertEqual(self._estados(), {"a": "pendiente", "b": "en_curso"})
+        self.assertEqual(cola_tareas.recuperar_huerfanas(self.cola, timedelta(0)), 1)
+
+    def test_parada_manual_devuelve_el_intento(self):
+        self._encolar("a")
+
+        def parar(tareas):
+            raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            cola_tareas.drenar(self.cola, parar, trabajador="w1")
+        tarea = TareaScraping.objects.get(cola=self.cola, clave="a")
+        self.assertEqual((tarea.estado, tarea.intentos), ("pendiente", 0))
+
+    def test_reintenta_hasta_max_intentos(self):
+        self._encolar("a", "b")
+        llamadas = []
+
+        def ejecutar(tareas):
+            llamadas.append(tareas[0].clave)
+            if tareas[0].clave == "a":
+                raise RuntimeError("acta caída")
+
+        maximo = cola_tareas.MAX_INTENTOS
+        stats = cola_tareas.drenar(self.cola, ejecutar, trabajador="w1")
+        self.assertEqual(stats, {"hechas": 1, "reintentos": maximo - 1, "fallidas": 1})
+        self.assertEqual(llamadas, ["a"] * maximo + ["b"])
+        tarea = TareaScraping.objects.get(cola=self.cola, clave="a")
+        self.assertEqual((tarea.estado, tarea.intentos), ("fallida", maximo))
+        self.assertIn("acta caída", tarea.ultimo_error)
+
+        self.assertEqual(cola_tareas.reintentar_fallidas(self.cola), 1)
+        self.assertEqual(self._estados(), {"a": "pendiente", "b": "hecha"})
+
+
+class IdentityMapTests(TestCase):
+    def setUp(self):
+        self.mapa = IdentityMap()
+
+    def test_lo_de_un_lote_deshecho_no_queda_en_el_mapa(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    club = Club.objects.create(nombre_oficial="Club Nuevo", identificador_federacion="F1")
+                    self.assertEqual(self.mapa.club("F1", lambda: club).pk, club.pk)
+                    self.mapa.registrar("jugador", 501, 99)
+                    raise RuntimeError("falla el lote")
+            except RuntimeError:
+                pass
+
+        self.assertFalse(Club.objects.filter(identificador_federacion="F1").exists())
+        self.assertIsNone(self.mapa.buscar("club", "F1"))
+        self.assertIsNone(self.mapa.buscar("jugador", 501))
+
+    def test_lo_confirmado_se_reutiliza_sin_consultar(self):
+        club = Club.objects.create(nombre_oficial="Club A", identificador_federacion="F2")
+        with self.captureOnCommitCallbacks(execute=True):
+            primero = self.mapa.club("F2", lambda: club)
+            primero.nombre_oficial = "Cambiado sin guardar"
+
+        cargar = mock.Mock()
+        segundo = self.mapa.club("F2", cargar)
+        cargar.assert_not_called()
+        # Instancia nueva con los valores registrados, no los que se tocaron después
+        self.assertEqual((segundo.pk, segundo.nombre_oficial), (club.pk, "Club A"))
+        self.assertIsNot(segundo, primero)
+
+
+class FrescuraFichasTests(TestCase):
+    def setUp(self):
+        temporada = Temporada.objects.create(nombre="2099/2100")
+        competicion = Competicion.objects.create(nombre="Competición de prueba")
+        grupo = Grupo.objects.create(nombre="Grupo de prueba", temporada=temporada, competicion=competicion)
+        self.club = Club.objects.create(nombre_oficial="Club A")
+        rival = Club.objects.create(nombre_oficial="Club B")
+        self.partido = Partido.objects.create(grupo=grupo, jornada_numero=1, local=self.club, visitante=rival)
+        self.jugador = Jugador.objects.create(nombre="Jugador", identificador_federacion="777")
+        self._alinear()
+
+    def _alinear(self):
+        AlineacionPartidoJugador.objects.create(partido=self.partido, club=self.club, jugador=self.jugador)
+
+    def _pendientes(self, **kwargs):
+        return frescura_fichas.planificar([777], **kwargs).pendientes
+
+    def test_la_temporada_actual_no_cuenta_como_bajada_completa(self):
+        # scrape_jugadores baja la ficha de un jugador nuevo...
+        frescura_fichas.registrar_consulta(777, None)
+        self.assertEqual(self._pendientes(actual=True), [])
+        # ...pero scrape_jugadores_todos aún no la ha bajado entera
+        self.assertEqual(self._pendientes(), [777])
+        self.assertEqual(self._pendientes(refresco=True), [777])
+
+        self.assertTrue(frescura_fichas.registrar_consulta(777, "a" * 64))
+        self.assertEqual(self._pendientes(refresco=True), [])
+
+        # Juega otro partido y scrape_jugadores lo baja primero: el refresco
+        # completo sigue viendo el partido nuevo
+        self._alinear()
+        self.assertEqual(self._pendientes(actual=True), [777])
+        frescura_fichas.registrar_consulta(777, None)
+        self.assertEqual(self._pendientes(actual=True), [])
+        plan = frescura_fichas.planificar([777], refresco=True)
+        self.assertEqual((plan.pendientes, plan.stats["partidos_nuevos"]), ([777], 1))
+
+        self.assertFalse(frescura_fichas.registrar_consulta(777, "a" * 64))
+        self.assertEqual(self._pendientes(refresco=True), [])
+
+    def test_fila_sin_huella_cuenta_como_nueva(self):
+        FichaJugadorScrapeada.objects.create(jugador_federacion=777, ultima_consulta=datetime.now(timezone.utc), apariciones=5)
+        plan = frescura_fichas.planificar([777], refresco=True)
+        self.assertEqual((plan.pendientes, plan.stats["nuevas"]), ([777], 1))
+
+
+class _EngineFijo:
+    """FetchEngine de pega: submit() devuelve ya resuelto lo que haya para la URL."""
+
+    def __init__(self, respuestas):
+        self.respuestas = respuestas
+        self.pedidas = []
+
+    def submit(self, fn, url, *args):
+        self.pedidas.append(url)
+        fut = Future()
+        fut.set_result(self.respuestas[url])
+        return fut
+
+
+class IngestaImagenesTests(TestCase):
+    png = b"\x89PNG\r\n\x1a\n" + b"placeholder"
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.media_dir = tmp.name
+        # Sin Pillow: solo original, sin miniaturas
+        patcher = mock.patch.object(imagenes, "Image", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _ingerir(self, engine, fuentes):
+        with IngestaImagenes(engine, hilos=2, tamanos=(), media_dir=self.media_dir) as ingesta:
+            return ingesta.ingerir(fuentes), ingesta
+
+    def test_mismo_contenido_se_guarda_una_vez(self):
+        engine = _EngineFijo({"https://x/1.png": self.png, "https://x/2.png": self.png})
+        rutas, ingesta = self._ingerir(engine, [
+            FuenteImagen(1, "https://x/1.png"),
+            FuenteImagen(2, "https://x/2.png"),
+            FuenteImagen(3, "https://x/1.png"),
+            FuenteImagen(4, "data:image/png;base64," + base64.b64encode(self.png).decode(), es_base64=True),
+        ])
+
+        imagen = ImagenMedia.objects.get()
+        self.assertEqual(rutas, dict.fromkeys((1, 2, 3, 4), imagen.ruta_publica))
+        self.assertEqual(sorted(engine.pedidas), ["https://x/1.png", "https://x/2.png"])
+        self.assertEqual((ingesta.stats["nuevas"], ingesta.stats["repetidas"]), (1, 3))
+        carpeta = os.path.dirname(os.path.join(self.media_dir, imagen.ruta))
+        self.assertEqual(os.listdir(carpeta), [os.path.basename(imagen.ruta)])
+        self.assertEqual(OrigenImagen.objects.filter(imagen=imagen).count(), 2)
+
+    def test_url_conocida_no_se_vuelve_a_pedir(self):
+        self._ingerir(_EngineFijo({"https://x/1.png": self.png}), [FuenteImagen(1, "https://x/1.png")])
+
+        engine = _EngineFijo({})
+        rutas, ingesta = self._ingerir(engine, [FuenteImagen(2, "https://x/1.png")])
+        self.assertEqual((engine.pedidas, ingesta.stats["url_conocida"]), ([], 1))
+        self.assertEqual(rutas, {2: ImagenMedia.objects.get().ruta_publica})
+
+        # Pasado REVALIDAR se vuelve a comprobar
+        OrigenImagen.objects.update(verificada_en=datetime.now(timezone.utc) - imagenes.REVALIDAR - timedelta(days=1))
+        engine = _EngineFijo({"https://x/1.png": self.png})
+        self._ingerir(engine, [FuenteImagen(2, "https://x/1.png")])
+        self.assertEqual(engine.pedidas, ["https://x/1.png"])
+
+    def test_base64_invalido_y_lo_que_no_es_imagen(self):
+        engine = _EngineFijo({"https://x/error.html": b"<html>404</html>"})
+        rutas, ingesta = self._ingerir(engine, [
+            FuenteImagen(1, "abc", es_base64=True),
+            FuenteImagen(2, "https://x/error.html"),
+        ])
+        self.assertEqual(rutas, {})
+        self.assertEqual(set(ingesta.errores), {1, 2})
+        self.assertIn("base64", ingesta.errores[1])
+        self.assertEqual(ingesta.errores[2], "no es una imagen")
+        self.assertEqual(ingesta.stats["fallidas"], 2)
+        self.assertFalse(ImagenMedia.objects.exists())
+
+
+class ManifiestoTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+
+    def _ruta(self, archivo):
+        return os.path.join(self.dir, archivo)
+
+    def test_sincronizar_solo_lee_lo_nuevo(self):
+        manifiesto.guardar_plantilla(
+            self._ruta("2025-2026_TERCERA_G1_equipo_10.json"),
+            {"jugadores": [{"jugador_id": 5}, {"jugador_id": "x"}, {"jugador_id": 3}]},
+        )
+        # Copiado a mano: no está en el manifiesto hasta sincronizar
+        with open(self._ruta("2024-2025_TERCERA_G1_equipo_11.json"), "w") as f:
+            json.dump({"jugadores": [{"jugador_id": 3}, {"jugador_id": 8}]}, f)
+        with open(self._ruta("2025-2026_TERCERA_G1_equipo_12.json"), "w") as f:
+            f.write("{roto")
+        with open(self._ruta("notas.json"), "w") as f:
+            f.write("{}")
+
+        with mock.patch("builtins.print"):
+            stats = manifiesto.sincronizar(self.dir)
+        self.assertEqual(stats, {"indexadas": 1, "sin_cambios": 1, "borradas": 0, "ilegibles": 1})
+        self.assertEqual(manifiesto.jugadores_de("2025-2026"), [3, 5])
+        self.assertEqual(manifiesto.jugadores_de(), [3, 5, 8])
+
+        os.remove(self._ruta("2024-2025_TERCERA_G1_equipo_11.json"))
+        with mock.patch("builtins.print"):
+            self.assertEqual(manifiesto.sincronizar(self.dir)["borradas"], 1)
+        self.assertEqual(manifiesto.jugadores_de(), [3, 5])
+
+    def test_reescribir_lo_mismo_no_cambia_la_fila(self):
+        ruta = self._ruta("2025-2026_TERCERA_G1_equipo_10.json")
+        manifiesto.guardar_plantilla(ruta, {"jugadores": [{"jugador_id": 5}]})
+        antes = PlantillaParseada.objects.get()
+        manifiesto.guardar_plantilla(ruta, {"jugadores": [{"jugador_id": 5}]})
+        self.assertEqual(PlantillaParseada.objects.get().actualizada_en, antes.actualizada_en)
+
+        manifiesto.guardar_plantilla(ruta, {"jugadores": [{"jugador_id": 5}, {"jugador_id": 6}]})
+        fila = PlantillaParseada.objects.get()
+        self.assertEqual((fila.equipo_id, fila.jugador_ids), (10, [5, 6]))
+        self.assertNotEqual(fila.sha256, antes.sha256)
+
+
+class RegistroConfigTests(SimpleTestCase):
+    temporadas = {
+        # Sin 'grupos': el nivel raíz es la Tercera
+        "2030-2031": {
+            "id_temp": 30, "id_modalidad": 33, "id_competicion": 100, "id_torneo": 900,
+            "otras_competiciones": {
+                "Preferente": {"id_competicion": 200, "grupos": {"G2": {"id_torneo": 902}, "G1": {"id_torneo": 901}}},
+                "Juvenil": {"id_competicion": 500, "grupos": {"G1": {"id_torneo": 950}}},
+            },
+        },
+        "2031-2032": {"id_temp": 31, "id_modalidad": 33, "grupos": {"G1": {"id_competicion": 300, "id_torneo": 901}}},
+        "2032-2033": {"id_modalidad": 33},
+    }
+
+    def setUp(self):
+        por_clave, por_torneo, por_temporada, raiz, errores = registro_config._compilar(self.temporadas)
+        patcher = mock.patch.multiple(
+            registro_config, _POR_CLAVE=por_clave, _POR_TORNEO=por_torneo, _POR_TEMPORADA=por_temporada,
+            _RAIZ=raiz, ERRORES=errores,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_seleccionar(self):
+        xv = registro_config.seleccionar("2030-2031", "tercera", "xv")
+        self.assertEqual((xv.id_torneo, xv.grupo_nombre, xv.cfg_sel["id_competicion"]), (900, "Grupo XV", 100))
+        # Tercera sin grupo propio: IDs de la raíz con su nombre
+        xiv = registro_config.seleccionar("2030-2031", "TERCERA", "XIV")
+        self.assertEqual((xiv.grupo, xiv.grupo_nombre, xiv.id_torneo), ("XIV", "Grupo XIV", 900))
+        self.assertEqual(registro_config.seleccionar("2030-2031", "PREFERENTE", "G1").id_competicion, 200)
+        for args in (("2030-2031", "PRIMERA", "G1"), ("2030-2031", "PREFERENTE", "G9"), ("1999-2000", "TERCERA", "XV")):
+            with self.assertRaises(ValueError):
+                registro_config.seleccionar(*args)
+
+    def test_orden_y_errores_de_la_config(self):
+        self.assertEqual(
+            [(c.competicion, c.grupo) for c in registro_config.grupos("2030-2031")],
+            [("TERCERA", "XV"), ("PREFERENTE", "G1"), ("PREFERENTE", "G2")],
+        )
+        # El id_torneo repetido se queda con el primero y el segundo no se registra
+        self.assertEqual(registro_config.por_torneo("901").temporada, "2030-2031")
+        self.assertEqual(registro_config.grupos("2031-2032"), ())
+
+        errores = registro_config.comprobar_config()
+        self.assertEqual({e.id for e in errores}, {"scraping.E001"})
+        self.assertEqual(len(errores), 3)
+        self.assertTrue(any("id_torneo 901 repetido" in e.msg for e in errores))
+        self.assertTrue(any("'Juvenil'" in e.msg for e in errores))
+        self.assertTrue(any(e.msg.startswith("2032-2033: faltan") for e in errores))
+
+
+class RawArchiveTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+        self.archivo = RawArchive(root=self.root)
+        self.addCleanup(self.archivo.close)
+
+    def test_ida_y_vuelta_con_su_charset(self):
+        html = "<p>Pabellón Municipal</p>"
+        sha = self.archivo.put("https://x/partido.php?id_partido=1", html.encode("latin-1"), encoding="ISO-8859-1",
+                               etag='"abc"', descargado_en="2099-10-01T10:00:00+00:00")
+
+        self.assertEqual(self.archivo.get_text("https://x/partido.php?id_partido=1"), html)
+        meta = self.archivo.ultima_descarga("https://x/partido.php?id_partido=1")
+        self.assertEqual((meta["sha256"], meta["etag"]), (sha, '"abc"'))
+        self.assertIsNone(self.archivo.get_text("https://x/otra"))
+        self.assertFalse(self.archivo.contiene("https://x/otra"))
+
+    def test_deduplica_y_reproduce_por_fecha(self):
+        url = "https://x/jornada.php?jornada=1"
+        self.archivo.put(url, b"v1", descargado_en="2099-10-01T10:00:00+00:00")
+        self.archivo.put(url, b"v2", descargado_en="2099-10-02T10:00:00+00:00")
+        self.archivo.put(url, b"v1", descargado_en="2099-10-03T10:00:00+00:00")
+        self.archivo.put("https://y/otra", b"v2", descargado_en="2099-10-01T12:00:00+00:00")
+
+        stats = self.archivo.stats()
+        self.assertEqual((stats["descargas"], stats["urls"], stats["blobs"]), (4, 2, 2))
+        self.assertEqual(self.archivo.get_bytes(url), b"v1")
+        self.assertEqual(self.archivo.get_bytes(url, antes_de="2099-10-02T23:59:59+00:00"), b"v2")
+        self.assertIsNone(self.archivo.get_bytes(url, antes_de="2099-09-30T00:00:00+00:00"))
+        self.assertEqual(
+            [d["descargado_en"][:10] for d in self.archivo.iter_descargas(url_prefix="https://x/", desde="2099-10-02")],
+            ["2099-10-02", "2099-10-03"],
+        )
+
+    def test_rota_packs_y_sobrevive_a_reabrir(self):
+        self.archivo.close()
+        self.archivo = RawArchive(root=self.root, pack_max_bytes=1)
+        cuerpos = [os.urandom(64) for _ in range(3)]  # incompresibles: cada uno llena su pack
+        for i, cuerpo in enumerate(cuerpos):
+            self.archivo.put(f"https://x/{i}", cuerpo)
+        self.archivo.close()
+
+        self.archivo = RawArchive(root=self.root)
+        self.assertEqual(self.archivo.stats()["packs"], 3)
+        self.assertEqual([self.archivo.get_bytes(f"https://x/{i}") for i in range(3)], cuerpos)
+
+    def test_urls_de_los_html_sueltos(self):
+        cfg = registro_config.grupos("2025-2026")[0]
+        prefijo = f"2025-2026_{cfg.competicion}_{cfg.grupo}"
+        jornada = [url_canonica(build_url_jornada(cfg.cfg_sel, 3))]
+
+        self.assertEqual(urls_legado(f"{prefijo}_jornada_03.html"), jornada)
+        self.assertEqual(urls_legado(f"{prefijo}_J3_LIVE.html"), jornada)
+        partido = urls_legado(f"{prefijo}_j03_partido_555.html")
+        self.assertEqual(urls_legado(f"{prefijo}_J3_P555_LIVE.html"), partido)
+        self.assertIn("id_partido=555", partido[0])
+        self.assertEqual(urls_legado("2025-2026_jornada_03_partido_555.html"), [])
+        self.assertEqual(urls_legado("2025-2026_NOEXISTE_G9_jornada_03.html"), [])
+
+
+class HttpClientTests(SimpleTestCase):
+    def test_hilos_a_la_vez_comparten_una_sesion(self):
+        patcher = mock.patch.multiple(http_client, _session=None, _adapter=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        barrera = threading.Barrier(8)
+        sesiones = []
+
+        def pedir():
+            barrera.wait()
+            sesiones.append(http_client.get_session())
+
+        hilos = [threading.Thread(target=pedir) for _ in range(8)]
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+        self.addCleanup(sesiones[0].close)
+        self.assertEqual(len({id(s) for s in sesiones}), 1)
+        self.assertIs(http_client.get_session(), sesiones[0])
+
+
+class FetchCondicionalTests(TestCase):
+    url = "https://resultadosffcv.isquad.es/partido.php?id_partido=1"
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.archivo = RawArchive(root=tmp.name)
+        self.addCleanup(self.archivo.close)
+        self.session = mock.Mock()
+        for patcher in (
+            mock.patch.object(fetcher, "get_archive", return_value=self.archivo),
+            mock.patch.object(fetcher, "get_session", return_value=self.session),
+            mock.patch.dict(fetcher.replay._config, offline=False),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _descargar(self, resp):
+        self.session.get.return_value = resp
+        previo = cache_urls.cargar_validadores([self.url]).get(self.url)
+        resultado = fetcher.fetch_url_conditional(self.url, previo=previo, sleep_after=0)
+        cache_urls.guardar_validadores(resultado)
+        return resultado
+
+    def test_304_devuelve_lo_archivado(self):
+        primero = self._descargar(_respuesta(200, b"<p>acta</p>", ETag='"v1"'))
+        self.assertEqual(primero["estado"], "nuevo")
+        self.assertNotIn("If-None-Match", self.session.get.call_args.kwargs["headers"])
+
+        segundo = self._descargar(_respuesta(304))
+        self.assertEqual(self.session.get.call_args.kwargs["headers"]["If-None-Match"], '"v1"')
+        self.assertEqual(
+            (segundo["estado"], segundo["html"], segundo["sha256"]), ("sin_cambios", "<p>acta</p>", primero["sha256"]),
+        )
+        self.assertEqual(self.archivo.stats()["descargas"], 1)
+
+    def test_mismo_contenido_sin_validadores(self):
+        primero = self._descargar(_respuesta(200, b"<p>acta</p>"))
+        cambio = PaginaDescargada.objects.get().ultimo_cambio
+        segundo = self._descargar(_respuesta(200, b"<p>acta</p>"))
+        self.assertEqual((segundo["estado"], segundo["sha256"]), ("sin_cambios", primero["sha256"]))
+        # No se vuelve a archivar lo que ya estaba
+        self.assertEqual(self.archivo.stats()["descargas"], 1)
+        self.assertEqual(PaginaDescargada.objects.get().ultimo_cambio, cambio)
+
+    def test_contenido_cambiado(self):
+        primero = self._descargar(_respuesta(200, b"<p>acta</p>", ETag='"v1"'))
+        segundo = self._descargar(_respuesta(200, b"<p>acta con goles</p>", ETag='"v2"'))
+
+        self.assertEqual((segundo["estado"], segundo["html"]), ("cambiado", "<p>acta con goles</p>"))
+        self.assertNotEqual(segundo["sha256"], primero["sha256"])
+        self.assertEqual(self.archivo.get_text(self.url), "<p>acta con goles</p>")
+        pagina = PaginaDescargada.objects.get()
+        self.assertEqual((pagina.etag, pagina.contenido_sha256), ('"v2"', segundo["sha256"]))
+        self.assertIsNotNone(pagina.ultimo_cambio)
+
+
+class _Reloj:
+    """Sustituye a `time` en fetch_engine: sleep() avanza el reloj sin dormir."""
+
+    def __init__(self):
+        self.ahora = 0.0
+        self.esperas = []
+        self._lock = threading.Lock()
+
+    def monotonic(self):
+        with self._lock:
+            return self.ahora
+
+    def sleep(self, segundos):
+        with self._lock:
+            self.esperas.append(segundos)
+            self.ahora += segundos
+
+
+class ReplayTests(SimpleTestCase):
+    ruta = "/partido.php?id_partido=7"
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.archivo = RawArchive(root=tmp.name)
+        self.addCleanup(self.archivo.close)
+        self.archivo.put(FFCV_ORIGEN + self.ruta, b"<p>v1</p>", encoding="utf-8", descargado_en="2099-10-01T10:00:00+00:00")
+        self.archivo.put(FFCV_ORIGEN + self.ruta, b"<p>v2</p>", encoding="utf-8", descargado_en="2099-10-08T10:00:00+00:00")
+        for patcher in (
+            mock.patch.object(replay, "get_archive", return_value=self.archivo),
+            mock.patch.dict(replay._config, offline=True, latencia_ms=0, antes_de=None),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_offline_lee_del_archivo(self):
+        url = FFCV_ORIGEN + self.ruta
+        primero = fetcher.fetch_url_conditional(url)
+        self.assertEqual((primero["html"], primero["estado"]), ("<p>v2</p>", "nuevo"))
+        self.assertEqual(fetcher.fetch_url_conditional(url, previo=primero)["estado"], "sin_cambios")
+
+        with mock.patch.dict(replay._config, antes_de="2099-10-05T00:00:00+00:00"):
+            self.assertEqual(fetcher.fetch_html(url), "<p>v1</p>")
+        with self.assertRaises(replay.PaginaNoArchivada):
+            fetcher.fetch_html(FFCV_ORIGEN + "/partido.php?id_partido=8")
+
+    def test_servidor_de_replica(self):
+        servidor = replay.ServidorReplay("127.0.0.1", 0)
+        hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+        hilo.start()
+        self.addCleanup(servidor.server_close)
+        self.addCleanup(servidor.shutdown)
+        base = f"http://127.0.0.1:{servidor.server_address[1]}"
+
+        with urllib.request.urlopen(base + self.ruta) as resp:
+            etag = resp.headers["ETag"]
+            self.assertEqual((resp.status, resp.read()), (200, b"<p>v2</p>"))
+        with self.assertRaises(urllib.error.HTTPError) as ctx:
+            urllib.request.urlopen(urllib.request.Request(base + self.ruta, headers={"If-None-Match": etag}))
+        self.assertEqual(ctx.exception.code, 304)
+        with self.assertRaises(urllib.error.HTTPError) as ctx:
+            urllib.request.urlopen(base + "/partido.php?id_partido=8")
+        self.assertEqual(ctx.exception.code, 404)
+        self.assertEqual(servidor.contadores, {"200": 1, "304": 1, "404": 1})
+
+
+class FetchEngineTests(SimpleTestCase):
+    def setUp(self):
+        self.reloj = _Reloj()
+
+    def _con_reloj(self):
+        return mock.patch.object(fetch_engine, "time", self.reloj)
+
+    def test_token_bucket(self):
+        with self._con_reloj():
+            bucket = fetch_engine.TokenBucket(rate=0.25)
+            self.assertEqual([bucket.acquire() for _ in range(3)], [0.0, 4.0, 4.0])
+            # Parado un rato no acumula más de `capacity`
+            self.reloj.ahora += 60
+            self.assertEqual([bucket.acquire() for _ in range(2)], [0.0, 4.0])
+        self.assertEqual(self.reloj.ahora, 72.0)
+
+    def test_reintenta_con_espera(self):
+        intentos = []
+
+        def falla_dos_veces(url):
+            intentos.append(url)
+            if len(intentos) <= 2:
+                raise ConnectionError("reset")
+            return "ok"
+
+        with self._con_reloj(), fetch_engine.FetchEngine(rps=fetch_engine.OFFLINE_RPS, retries=2, retry_wait=3.0) as engine:
+            self.assertEqual(engine.submit(falla_dos_veces, "https://reintentos.test/a").result(), "ok")
+            with self.assertRaises(ConnectionError):
+                engine.submit(mock.Mock(side_effect=ConnectionError("reset")), "https://reintentos.test/b").result()
+        self.assertEqual(len(intentos), 3)
+        self.assertEqual(self.reloj.esperas, [3.0] * 4)
+        self.assertEqual((engine.stats["ok"], engine.stats["reintentos"], engine.stats["fallidas"]), (1, 4, 1))
+
+    def test_pagina_no_archivada_no_se_reintenta(self):
+        fn = mock.Mock(side_effect=fetch_engine.replay.PaginaNoArchivada("no está"))
+        with self._con_reloj(), fetch_engine.FetchEngine(rps=fetch_engine.OFFLINE_RPS, retries=3) as engine:
+            with self.assertRaises(fetch_engine.replay.PaginaNoArchivada):
+                engine.submit(fn, "https://offline.test/a").result()
+        self.assertEqual((fn.call_count, self.reloj.esperas), (1, []))
+        self.assertEqual((engine.stats["reintentos"], engine.stats["fallidas"]), (0, 1))
+
+    def test_tope_de_peticiones_en_vuelo_por_host(self):
+        lock = threading.Lock()
+        en_vuelo = {"semaforo.test": 0, "otro.test": 0}
+        maximo = dict(en_vuelo)
+
+        def descarga(url):
+            host = url.split("/")[2]
+            with lock:
+                en_vuelo[host] += 1
+                maximo[host] = max(maximo[host], en_vuelo[host])
+            time.sleep(0.05)
+            with lock:
+                en_vuelo[host] -= 1
+
+        with fetch_engine.FetchEngine(rps=fetch_engine.OFFLINE_RPS, max_in_flight=2, max_workers=8) as engine:
+            futuros = [engine.submit(descarga, f"https://{host}/{i}") for host in en_vuelo for i in range(4)]
+            for f in futuros:
+                f.result()
+        self.assertEqual(maximo, {"semaforo.test": 2, "otro.test": 2})
+
+    def test_iter_ordered_mantiene_el_orden(self):
+        def fetch_html(url, save_path, sleep_after):
+            n = int(url.rsplit("/", 1)[1])
+            time.sleep((5 - n) * 0.01)  # las primeras tardan más
+            if n == 2:
+                raise ValueError("404")
+            return f"html {n}"
+
+        tareas = [(n, f"https://orden.test/{n}", None) for n in range(5)]
+        with mock.patch.object(fetch_engine, "fetch_html", fetch_html), \
+                fetch_engine.FetchEngine(rps=fetch_engine.OFFLINE_RPS, max_in_flight=5, retries=0) as engine:
+            salida = [(clave, html, error and str(error)) for clave, html, error in engine.iter_ordered(tareas, ventana=3)]
+        self.assertEqual(salida, [
+            (0, "html 0", None), (1, "html 1", None), (2, None, "404"), (3, "html 3", None), (4, "html 4", None),
+        ])
+
+
+def _parse_de_prueba(html):
+    if "roto" in html:
+        raise ValueError("html roto")
+    return html.upper()
+
+
+class PipelineTests(SimpleTestCase):
+    def test_orden_errores_y_parsear_si(self):
+        def fetch_url_conditional(url, save_path, previo, sleep_after):
+            n = int(url.rsplit("/", 1)[1])
+            time.sleep((4 - n) * 0.01)  # las primeras tardan más
+            if n == 3:
+                raise ConnectionError("reset")
+            return {"url": url, "html": "<p>roto</p>" if n == 1 else f"<p>{n}</p>",
+                    "estado": "sin_cambios" if previo else "nuevo"}
+
+        tareas = [(n, f"https://pipeline.test/{n}", None, {"sha256": "x"} if n == 2 else None) for n in range(5)]
+        with mock.patch.object(fetch_engine, "fetch_url_conditional", fetch_url_conditional), \
+                fetch_engine.FetchEngine(rps=fetch_engine.OFFLINE_RPS, max_in_flight=5, retries=0) as engine:
+            salida = [
+                (clave, res and res["estado"], datos, error and str(error))
+                for clave, res, datos, error in pipeline.iter_pipeline(
+                    engine, pipeline.ParsePool(workers=0), tareas, _parse_de_prueba, ventana=2,
+                    parsear_si=lambda res: res["estado"] != "sin_cambios",
+                )
+            ]
+        self.assertEqual(salida, [
+            (0, "nuevo", "<P>0</P>", None),
+            (1, None, None, "html roto"),
+            (2, "sin_cambios", None, None),
+            (3, None, None, "reset"),
+            (4, "nuevo", "<P>4</P>", None),
+        ])
+
+    def test_iter_lotes(self):
+        self.assertEqual(list(pipeline.iter_lotes(range(5), tam=2)), [[0, 1], [2, 3], [4]])
+        self.assertEqual(list(pipeline.iter_lotes([], tam=2)), [])
+
+
+class TelemetriaTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(telemetria, "ACTIVA", True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_una_ejecucion_con_sus_paginas(self):
+        url_a = "https://resultadosffcv.isquad.es/partido.php?id_partido=1"
+        url_b = "https://resultadosffcv.isquad.es/partido.php?id_partido=2"
+
+        class Anidado:
+            @telemetria.instrumentar("anidado")
+            def handle(self):
+                telemetria.descarga(url_b, 304, 0, 0.1)
+
+        class Comando:
+            @telemetria.instrumentar("prueba")
+            def handle(self, **options):
+                telemetria.descarga(url_a, 200, 1000, 0.2)
+                telemetria.parseo(url_a, 0.05)
+                with telemetria.medir_bd([url_a]):
+                    Temporada.objects.create(nombre="2099/2100")
+                Anidado().handle()
+                return "hecho"
+
+        self.assertEqual(Comando().handle(jornada=3), "hecho")
+        self.assertIsNone(telemetria.ejecucion_actual())
+
+        # El comando anidado cuenta dentro de la misma ejecución
+        ejecucion = EjecucionScraping.objects.get()
+        self.assertEqual(
+            (ejecucion.comando, ejecucion.argumentos, ejecucion.estado, ejecucion.peticiones, ejecucion.no_modificadas,
+             ejecucion.bytes),
+            ("prueba", {"jornada": 3}, "ok", 2, 1, 1000),
+        )
+        paginas = {p.url: p for p in MedicionPagina.objects.filter(ejecucion=ejecucion)}
+        self.assertEqual(set(paginas), {url_a, url_b})
+        a = paginas[url_a]
+        self.assertEqual((a.tipo, a.descarga_ms, a.parseo_ms), ("partido.php", 200.0, 50.0))
+        self.assertGreaterEqual(a.filas, 1)
+        self.assertEqual((paginas[url_b].estado_http, paginas[url_b].bd_ms), (304, None))
+
+    def test_un_error_cierra_la_ejecucion(self):
+        class Comando:
+            @telemetria.instrumentar("prueba")
+            def handle(self):
+                raise RuntimeError("FFCV caído")
+
+        with self.assertRaises(RuntimeError):
+            Comando().handle()
+        ejecucion = EjecucionScraping.objects.get()
+        self.assertEqual((ejecucion.estado, ejecucion.error), ("error", "RuntimeError: FFCV caído"))
+        self.assertIsNotNone(ejecucion.duracion_s)
+        self.assertIsNone(telemetria.ejecucion_actual())
+
+
+class VigilanciaLiveTests(SimpleTestCase):
+    ahora = datetime(2099, 11, 1, 12, 0, tzinfo=timezone.utc)
+
+    def _partido(self, empieza_en, jugado=False):
+        return Partido(
+            jornada_numero=1, fecha_hora=None if empieza_en is None else self.ahora + empieza_en,
+            goles_local=1 if jugado else None, goles_visitante=0 if jugado else None, jugado=jugado,
+        )
+
+    def test_fases(self):
+        def fase(empieza_en, jugado=False, **kwargs):
+            seg = vigilancia_live.planificar(SeguimientoPartido(), self._partido(empieza_en, jugado), self.ahora, **kwargs)
+            return seg.estado, seg.proxima_consulta
+
+        inicio = self.ahora + timedelta(hours=3)
+        self.assertEqual(fase(None), ("sin_fecha", self.ahora + vigilancia_live.RECHEQUEO))
+        self.assertEqual(fase(timedelta(hours=3)), ("programado", inicio - vigilancia_live.PREVIA))
+        self.assertEqual(fase(timedelta(0), intervalo_directo=30), ("en_juego", self.ahora + timedelta(seconds=30)))
+        self.assertEqual(fase(-timedelta(hours=3), jugado=True, intervalo_directo=30),
+                         ("post_partido", self.ahora + timedelta(seconds=60)))
+        self.assertEqual(fase(-timedelta(days=2), jugado=True), ("cerrado", None))
+        self.assertEqual(fase(-timedelta(days=2)), ("aplazado", self.ahora + vigilancia_live.RECHEQUEO))
+        self.assertEqual(fase(timedelta(0), aplazado=True)[0], "aplazado")
+
+    def test_se_cierra_tras_consultas_sin_cambios(self):
+        partido = self._partido(-timedelta(hours=3), jugado=True)
+        seg = SeguimientoPartido(fallos=2, ultimo_error="x")
+        esperas = []
+        for _ in range(vigilancia_live.CONSULTAS_PARA_CERRAR):
+            vigilancia_live.planificar(seg, partido, self.ahora, cambio=False, intervalo_directo=60)
+            esperas.append(seg.proxima_consulta and (seg.proxima_consulta - self.ahora).total_seconds())
+        self.assertEqual(esperas, [240, 480, 960, None])
+        self.assertEqual((seg.estado, seg.consultas, seg.fallos, seg.ultimo_error), ("cerrado", 4, 0, ""))
+
+        # Un cambio de resultado lo reabre para consultarlo ya
+        partido.goles_local = 2
+        self.assertTrue(vigilancia_live.reabrir_si_cambia(seg, partido, self.ahora))
+        self.assertEqual((seg.estado, seg.proxima_consulta), ("post_partido", self.ahora + timedelta(seconds=120)))
+
+    def test_backoff_con_contadores_enormes(self):
+        self.assertEqual(vigilancia_live.espera_tras_fallo(60, 1), timedelta(minutes=2))
+        self.assertEqual(vigilancia_live.espera_tras_fallo(60, 3), timedelta(minutes=8))
+        for n in (41, 1000, 10 ** 9):
+            self.assertEqual(vigilancia_live.espera_tras_fallo(60, n), vigilancia_live.BACKOFF_MAX)
+
+        # Un acta que siempre da 404: fallos guardados en la BD sin límite
+        seg = SeguimientoPartido(fallos=10 ** 6)
+        vigilancia_live.registrar_fallo(seg, self.ahora, RuntimeError("404"), intervalo_directo=60)
+        self.assertEqual((seg.fallos, seg.ultimo_error), (10 ** 6 + 1, "404"))
+        self.assertEqual(seg.proxima_consulta, self.ahora + vigilancia_live.BACKOFF_MAX)
+
+        # Sin resultado tras el final: consultas_sin_cambios sigue subiendo
+        seg = SeguimientoPartido(consultas_sin_cambios=10 ** 6)
+        vigilancia_live.planificar(seg, self._partido(-timedelta(hours=3)), self.ahora, cambio=False)
+        self.assertEqual((seg.estado, seg.proxima_consulta), ("post_partido", self.ahora + vigilancia_live.BACKOFF_MAX))
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import DataSyncStatus
+from .models import DataSyncStatus, EjecucionScraping, InstantaneaJornada, VersionDatos
 
 
 @admin.register(DataSyncStatus)
@@ -8,3 +8,25 @@ class DataSyncStatusAdmin(admin.ModelAdmin):
     list_filter = ("fuente",)
     search_fields = ("fuente", "detalle")
     ordering = ("-last_success",)
+
+
+@admin.register(EjecucionScraping)
+class EjecucionScrapingAdmin(admin.ModelAdmin):
+    list_display = ("comando", "inicio", "duracion_s", "estado", "peticiones", "bytes", "filas")
+    list_filter = ("comando", "estado")
+    ordering = ("-inicio",)
+
+
+@admin.register(VersionDatos)
+class VersionDatosAdmin(admin.ModelAdmin):
+    list_display = ("ambito", "objeto_id", "version", "actualizado")
+    list_filter = ("ambito",)
+    ordering = ("-actualizado",)
+
+
+@admin.register(InstantaneaJornada)
+class InstantaneaJornadaAdmin(admin.ModelAdmin):
+    list_display = ("vista", "grupo", "jornada", "rev", "creada")
+    list_filter = ("vista",)
+    exclude = ("datos",)
+    ordering = ("-creada",)
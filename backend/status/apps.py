@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class StatusConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'status'
+
+    def ready(self):
+        """
+        Registra las señales que suben las versiones de datos (status.signals).
+        """
+        import status.signals  # noqa: F401
@@ -0,0 +1,119 @@
+import functools
+import hashlib
+import json
+
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from rest_framework.response import Response
+
+from . import versiones
+
+# Caché de respuestas de la API (estadísticas, valoraciones).
+#
+# @cacheada("grupo") / @cacheada("temporada") envuelve el get() de una vista:
+# la clave es (vista, parámetros GET normalizados, versión de datos del
+# grupo o la temporada que pide), así que cuando status.versiones sube esa
+# versión lo cacheado deja de encontrarse sin tener que borrarlo. Solo se
+# guardan las respuestas 200.
+#
+# El backend es el alias "respuestas" de CACHES (settings, API_CACHE_*):
+#   - locmem: por proceso, con TTL y expulsión LRU al pasar de MAX_ENTRIES
+#   - redis:  compartido entre procesos (LRU con maxmemory-policy del servidor)
+#   - off:    sin caché
+# Cada vista cuenta aciertos y fallos en la propia caché; los muestra
+# `manage.py cache_api`. La respuesta lleva la cabecera X-Cache: HIT / MISS.
+ALIAS = "respuestas"
+PREFIJO = "api"
+
+# Vistas decoradas (para las métricas)
+VISTAS: set = set()
+
+
+def _cache():
+    return caches[ALIAS]
+
+
+def _ambito(vista, request, ambito: str) -> tuple | None:
+    """(grupo_id, temporada_id) de la petición, o None si no se puede cachear."""
+    if ambito == "grupo":
+        param, defecto = "grupo_id", None
+    else:
+        param, defecto = "temporada_id", getattr(vista, "TEMPORADA_ID_BASE", None)
+    try:
+        valor = int(request.GET.get(param) or defecto)
+    except (TypeError, ValueError):
+        return None
+    # Ids que no existen: la vista contesta el 404 sin cachear
+    if ambito == "grupo":
+        return (valor, None) if versiones.temporada_de(valor) is not None else None
+    return (None, valor) if versiones.temporada_existe(valor) else None
+
+
+def clave(nombre: str, request, version: int) -> str:
+    params = sorted((k, sorted(request.GET.getlist(k))) for k in request.GET)
+    huella = hashlib.sha1(json.dumps(params, ensure_ascii=False).encode("utf-8")).hexdigest()
+    return f"{PREFIJO}:{nombre}:{huella}:v{version}"
+
+
+def _contar(nombre: str, evento: str):
+    c = _cache()
+    k = f"{PREFIJO}:metricas:{nombre}:{evento}"
+    try:
+        c.incr(k)
+    except ValueError:
+        # Aún no existe (o la expulsó el LRU)
+        if not c.add(k, 1, timeout=None):
+            c.incr(k)
+
+
+def cacheada(ambito: str = "grupo"):
+    """
+    Decorador para el get() de un APIView. ambito: "grupo" (parámetro
+    grupo_id) o "temporada" (temporada_id, o TEMPORADA_ID_BASE de la vista).
+    """
+    def decorador(get):
+        nombre = get.__qualname__.split(".")[0]
+        VISTAS.add(nombre)
+
+        @functools.wraps(get)
+        def envoltura(self, request, *args, **kwargs):
+            c = _cache()
+            ids = None if isinstance(c, DummyCache) else _ambito(self, request, ambito)
+            if ids is None:
+                return get(self, request, *args, **kwargs)
+
+            grupo_id, temporada_id = ids
+            version = versiones.actuales(grupo_id, temporada_id)[(ambito, grupo_id or temporada_id)]
+            k = clave(nombre, request, version)
+            datos = c.get(k)
+            if datos is not None:
+                _contar(nombre, "hit")
+                return Response(datos, headers={"X-Cache": "HIT"})
+
+            _contar(nombre, "miss")
+            respuesta = get(self, request, *args, **kwargs)
+            if respuesta.status_code == 200:
+                c.set(k, respuesta.data)
+            respuesta["X-Cache"] = "MISS"
+            return respuesta
+
+        return envoltura
+
+    return decorador
+
+
+def metricas() -> dict:
+    """{vista: {"hit": n, "miss": n}} de las vistas decoradas."""
+    claves = {
+        f"{PREFIJO}:metricas:{nombre}:{evento}": (nombre, evento)
+        for nombre in VISTAS for evento in ("hit", "miss")
+    }
+    out = {nombre: {"hit": 0, "miss": 0} for nombre in VISTAS}
+    for k, n in _cache().get_many(list(claves)).items():
+        nombre, evento = claves[k]
+        out[nombre][evento] = n
+    return out
+
+
+def vaciar():
+    _cache().clear()
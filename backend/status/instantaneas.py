@@ -0,0 +1,139 @@
+import functools
+import hashlib
+import json
+
+from django.db import IntegrityError, transaction
+from django.utils.http import parse_etags
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from partidos.models import Partido
+from . import versiones
+from .models import InstantaneaJornada
+
+# Instantáneas de jornadas cerradas (status.models.InstantaneaJornada).
+#
+# @instantanea envuelve el get() de las vistas de una jornada. Cuando la
+# petición trae grupo_id y jornada, y todos los partidos de esa jornada están
+# jugados (fantasy.signals.jornada_completa), la primera respuesta 200 se
+# guarda tal cual la ve el cliente y las siguientes salen de esa fila sin
+# ejecutar la vista.
+#
+# Cabeceras de una instantánea:
+#   - ETag fuerte = rev (sha1 del JSON); If-None-Match -> 304
+#   - con &rev=<rev> en la URL: Cache-Control inmutable a un año (esa URL no
+#     puede cambiar de contenido: si se corrige la jornada, cambia el rev)
+#   - sin rev: no-cache, el navegador revalida con el ETag
+#   - X-Snapshot-Rev: el rev, para construir la URL inmutable
+#
+# Una corrección (Partido o EventoPartido guardado/borrado en status.signals,
+# actas por lotes en scraping.core.persistencia, coeficientes) borra las
+# instantáneas de esa jornada; se rehacen en la siguiente lectura.
+# `manage.py instantaneas_jornada --borrar` las tira a mano.
+PARAMS_PROPIOS = ("grupo_id", "jornada", "rev", "format")
+INMUTABLE = "public, max-age=31536000, immutable"
+
+# Vistas decoradas
+VISTAS: set = set()
+
+
+def _entero(valor) -> int | None:
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parametros(request) -> str:
+    """sha1 de los parámetros GET que no son grupo/jornada ("" si no hay)."""
+    params = sorted((k, sorted(request.GET.getlist(k))) for k in request.GET if k not in PARAMS_PROPIOS)
+    if not params:
+        return ""
+    return hashlib.sha1(json.dumps(params, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _cerrada(grupo_id: int, jornada: int) -> bool:
+    # Import tardío: fantasy.signals importa valoraciones.views
+    from fantasy.signals import jornada_completa
+
+    temporada_id = versiones.temporada_de(grupo_id)
+    return temporada_id is not None and jornada_completa(grupo_id, temporada_id, jornada)
+
+
+def _servir(request, datos, rev: str) -> Response:
+    etag = f'"{rev}"'
+    cabeceras = {
+        "ETag": etag,
+        "X-Snapshot-Rev": rev,
+        "Cache-Control": INMUTABLE if request.GET.get("rev") == rev else "public, no-cache",
+    }
+    if etag in parse_etags(request.headers.get("If-None-Match", "")):
+        return Response(status=304, headers=cabeceras)
+    return Response(datos, headers=cabeceras)
+
+
+def _guardar(nombre: str, grupo_id: int, jornada: int, parametros: str, datos) -> tuple:
+    """Serializa la respuesta como la ve el cliente y la guarda. (datos, rev)"""
+    crudo = JSONRenderer().render(datos)
+    rev = hashlib.sha1(crudo).hexdigest()
+    datos = json.loads(crudo)
+    try:
+        with transaction.atomic():
+            InstantaneaJornada.objects.update_or_create(
+                vista=nombre, grupo_id=grupo_id, jornada=jornada, parametros=parametros,
+                defaults={"datos": datos, "rev": rev},
+            )
+    except IntegrityError:
+        # Otra petición la ha creado a la vez: vale cualquiera de las dos
+        pass
+    return datos, rev
+
+
+def instantanea(get):
+    """Decorador para el get() de una vista de jornada (grupo_id + jornada)."""
+    nombre = get.__qualname__.split(".")[0]
+    VISTAS.add(nombre)
+
+    @functools.wraps(get)
+    def envoltura(self, request, *args, **kwargs):
+        grupo_id = _entero(request.GET.get("grupo_id"))
+        jornada = _entero(request.GET.get("jornada"))
+        if grupo_id is None or jornada is None or jornada < 0:
+            return get(self, request, *args, **kwargs)
+
+        parametros = _parametros(request)
+        fila = (
+            InstantaneaJornada.objects
+            .filter(vista=nombre, grupo_id=grupo_id, jornada=jornada, parametros=parametros)
+            .values_list("datos", "rev")
+            .first()
+        )
+        if fila is not None:
+            return _servir(request, *fila)
+
+        respuesta = get(self, request, *args, **kwargs)
+        if respuesta.status_code != 200 or not _cerrada(grupo_id, jornada):
+            return respuesta
+        return _servir(request, *_guardar(nombre, grupo_id, jornada, parametros, respuesta.data))
+
+    return envoltura
+
+
+def invalidar(grupo_id: int, jornadas=None) -> int:
+    """Borra las instantáneas del grupo (de esas jornadas, o de todas)."""
+    qs = InstantaneaJornada.objects.filter(grupo_id=grupo_id)
+    if jornadas is not None:
+        qs = qs.filter(jornada__in=[j for j in jornadas if j is not None])
+    return qs.delete()[0]
+
+
+def invalidar_partidos(partido_ids) -> int:
+    """Borra las instantáneas de las jornadas de esos partidos."""
+    por_grupo = {}
+    for grupo_id, jornada in Partido.objects.filter(pk__in=list(partido_ids)).values_list("grupo_id", "jornada_numero"):
+        por_grupo.setdefault(grupo_id, set()).add(jornada)
+    return sum(invalidar(grupo_id, jornadas) for grupo_id, jornadas in por_grupo.items())
+
+
+def invalidar_temporada(temporada_id: int) -> int:
+    return InstantaneaJornada.objects.filter(grupo__temporada_id=temporada_id).delete()[0]
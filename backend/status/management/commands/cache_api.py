@@ -0,0 +1,33 @@
+# status/management/commands/cache_api.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.urls import get_resolver
+
+from status import cache_api
+
+
+class Command(BaseCommand):
+    help = "Aciertos/fallos de la caché de respuestas de la API por vista (o --vaciar para borrarla)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--vaciar", action="store_true", help="Borra todas las respuestas cacheadas y las métricas")
+
+    def handle(self, *args, **options):
+        if options.get("vaciar"):
+            cache_api.vaciar()
+            self.stdout.write(self.style.SUCCESS("✓ Caché de respuestas vaciada."))
+            return
+
+        if settings.API_CACHE_BACKEND == "locmem":
+            self.stdout.write(self.style.WARNING(
+                "API_CACHE_BACKEND=locmem: cada proceso tiene su caché; aquí solo se ve la de este "
+                "(las de los workers, en /api/status/cache/)."
+            ))
+
+        # Carga las vistas (y con ellas los @cacheada)
+        get_resolver().url_patterns
+        filas = sorted(cache_api.metricas().items(), key=lambda kv: -(kv[1]["hit"] + kv[1]["miss"]))
+        for nombre, m in filas:
+            total = m["hit"] + m["miss"]
+            ratio = f"{100 * m['hit'] / total:.1f}%" if total else "—"
+            self.stdout.write(f"  {nombre:<40} {m['hit']:>8} aciertos {m['miss']:>8} fallos  {ratio}")
@@ -0,0 +1,30 @@
+# status/management/commands/instantaneas_jornada.py
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from status import instantaneas
+from status.models import InstantaneaJornada
+
+
+class Command(BaseCommand):
+    help = "Instantáneas de jornadas cerradas por vista (o --borrar para tirarlas y que se rehagan al leerlas)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--grupo_id", type=int, default=None, help="Solo este grupo")
+        parser.add_argument("--borrar", action="store_true", help="Borra las instantáneas (del grupo o todas)")
+
+    def handle(self, *args, **options):
+        grupo_id = options.get("grupo_id")
+        if options.get("borrar"):
+            if grupo_id:
+                n = instantaneas.invalidar(grupo_id)
+            else:
+                n = InstantaneaJornada.objects.all().delete()[0]
+            self.stdout.write(self.style.SUCCESS(f"✓ {n} instantáneas borradas."))
+            return
+
+        qs = InstantaneaJornada.objects.all()
+        if grupo_id:
+            qs = qs.filter(grupo_id=grupo_id)
+        for fila in qs.values("vista").annotate(n=Count("id"), grupos=Count("grupo", distinct=True)).order_by("vista"):
+            self.stdout.write(f"  {fila['vista']:<40} {fila['n']:>6} jornadas en {fila['grupos']} grupos")
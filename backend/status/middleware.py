@@ -0,0 +1,75 @@
+import hashlib
+import json
+
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+
+from . import versiones
+
+# ETag por versión de datos para las lecturas de la API.
+#
+# Para un GET/HEAD bajo PREFIJOS el ETag se calcula antes de resolver la
+# vista con la versión del ámbito que pide (status.versiones):
+#   - grupo_id en la query      -> versión del grupo
+#   - temporada_id en la query  -> versión de la temporada
+#   - si no                     -> versión global
+# más la ruta, los parámetros normalizados y el Accept (JSON o la API
+# navegable de DRF). Si If-None-Match coincide se contesta 304 sin llegar a
+# la vista: el único acceso a BD es leer la versión. Las respuestas 200
+# salen con ese ETag y Cache-Control: no-cache para que el navegador
+# revalide siempre.
+PREFIJOS = (
+    "/api/estadisticas/",
+    "/api/valoraciones/",
+    "/api/fantasy/",
+    "/api/clubes/",
+    "/api/jugadores/",
+    "/api/partidos/",
+)
+
+
+def _entero(valor) -> int | None:
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def version_de(request) -> tuple:
+    """(ámbito, id, versión) de los datos que lee la petición."""
+    grupo_id = _entero(request.GET.get("grupo_id"))
+    if grupo_id is not None and versiones.temporada_de(grupo_id) is not None:
+        return ("grupo", grupo_id, versiones.actuales(grupo_id=grupo_id)[("grupo", grupo_id)])
+    temporada_id = _entero(request.GET.get("temporada_id"))
+    if temporada_id is not None and versiones.temporada_existe(temporada_id):
+        return ("temporada", temporada_id, versiones.actuales(temporada_id=temporada_id)[("temporada", temporada_id)])
+    return versiones.GLOBAL + (versiones.actuales(incluir_global=True)[versiones.GLOBAL],)
+
+
+def etag(request) -> str:
+    params = sorted((k, sorted(request.GET.getlist(k))) for k in request.GET)
+    base = [request.path, params, request.headers.get("Accept", ""), *version_de(request)]
+    return '"%s"' % hashlib.sha1(json.dumps(base, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class ETagVersionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method not in ("GET", "HEAD") or not request.path.startswith(PREFIJOS):
+            return self.get_response(request)
+
+        actual = etag(request)
+        if actual in parse_etags(request.headers.get("If-None-Match", "")):
+            respuesta = HttpResponseNotModified()
+            respuesta["ETag"] = actual
+            return respuesta
+
+        respuesta = self.get_response(request)
+        if respuesta.status_code == 200 and not respuesta.has_header("ETag"):
+            respuesta["ETag"] = actual
+            if not respuesta.has_header("Cache-Control"):
+                patch_cache_control(respuesta, no_cache=True)
+        return respuesta
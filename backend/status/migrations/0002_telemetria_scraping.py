@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:24
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('status', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EjecucionScraping',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('comando', models.CharField(max_length=100)),
+                ('argumentos', models.JSONField(blank=True, default=dict)),
+                ('trabajador', models.CharField(blank=True, max_length=100)),
+                ('estado', models.CharField(choices=[('en_curso', 'En curso'), ('ok', 'OK'), ('error', 'Error')], default='en_curso', max_length=20)),
+                ('error', models.TextField(blank=True)),
+                ('inicio', models.DateTimeField(default=django.utils.timezone.now)),
+                ('fin', models.DateTimeField(blank=True, null=True)),
+                ('duracion_s', models.FloatField(blank=True, null=True)),
+                ('peticiones', models.PositiveIntegerField(default=0)),
+                ('no_modificadas', models.PositiveIntegerField(default=0)),
+                ('fallidas', models.PositiveIntegerField(default=0)),
+                ('bytes', models.BigIntegerField(default=0)),
+                ('descarga_s', models.FloatField(default=0.0)),
+                ('parseo_s', models.FloatField(default=0.0)),
+                ('bd_s', models.FloatField(default=0.0)),
+                ('filas', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Ejecución de scraping',
+                'verbose_name_plural': 'Ejecuciones de scraping',
+                'ordering': ['-inicio'],
+                'indexes': [models.Index(fields=['comando', 'inicio'], name='status_ejec_comando_5f25cc_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='MedicionPagina',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.CharField(max_length=500)),
+                ('tipo', models.CharField(max_length=50)),
+                ('momento', models.DateTimeField()),
+                ('estado_http', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('bytes', models.PositiveIntegerField(default=0)),
+                ('descarga_ms', models.FloatField(blank=True, null=True)),
+                ('parseo_ms', models.FloatField(blank=True, null=True)),
+                ('bd_ms', models.FloatField(blank=True, null=True)),
+                ('filas', models.PositiveIntegerField(default=0)),
+                ('error', models.CharField(blank=True, max_length=300)),
+                ('ejecucion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='paginas', to='status.ejecucionscraping')),
+            ],
+            options={
+                'verbose_name': 'Medición de página (scraping)',
+                'verbose_name_plural': 'Mediciones de páginas (scraping)',
+                'indexes': [models.Index(fields=['ejecucion', 'tipo'], name='status_medi_ejecuci_d66416_idx'), models.Index(fields=['momento'], name='status_medi_momento_1aa807_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:53
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('status', '0002_telemetria_scraping'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersionDatos',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ambito', models.CharField(choices=[('grupo', 'Grupo'), ('temporada', 'Temporada')], max_length=20)),
+                ('objeto_id', models.PositiveBigIntegerField()),
+                ('version', models.PositiveBigIntegerField(default=1)),
+                ('actualizado', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Versión de datos',
+                'verbose_name_plural': 'Versiones de datos',
+                'unique_together': {('ambito', 'objeto_id')},
+            },
+        ),
+    ]
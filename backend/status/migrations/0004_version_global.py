@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('status', '0003_version_datos'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='versiondatos',
+            name='ambito',
+            field=models.CharField(choices=[('grupo', 'Grupo'), ('temporada', 'Temporada'), ('global', 'Global')], max_length=20),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:59
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nucleo', '0001_initial'),
+        ('status', '0004_version_global'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InstantaneaJornada',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('vista', models.CharField(max_length=80)),
+                ('jornada', models.PositiveIntegerField()),
+                ('parametros', models.CharField(blank=True, default='', max_length=40)),
+                ('datos', models.JSONField()),
+                ('rev', models.CharField(max_length=40)),
+                ('creada', models.DateTimeField(default=django.utils.timezone.now)),
+                ('grupo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='instantaneas_jornada', to='nucleo.grupo')),
+            ],
+            options={
+                'verbose_name': 'Instantánea de jornada',
+                'verbose_name_plural': 'Instantáneas de jornada',
+                'indexes': [models.Index(fields=['grupo', 'jornada'], name='status_inst_grupo_i_4972bf_idx')],
+                'unique_together': {('vista', 'grupo', 'jornada', 'parametros')},
+            },
+        ),
+    ]
@@ -26,3 +26,135 @@ class DataSyncStatus(models.Model):
 
     def __str__(self):
         return f"{self.fuente} @ {self.last_success}"
+
+
+class EjecucionScraping(models.Model):
+    """
+    Una ejecución de un comando de scraping (los que lanza otro comando,
+    p.ej. scrape_semana → scrape_live_jornada, cuentan dentro de la suya).
+    Los tiempos de descarga/parseo/BD son sumas: con descargas en paralelo
+    descarga_s puede ser mayor que la duración.
+    """
+    ESTADOS = (
+        ("en_curso", "En curso"),
+        ("ok", "OK"),
+        ("error", "Error"),
+    )
+
+    comando = models.CharField(max_length=100)
+    argumentos = models.JSONField(default=dict, blank=True)
+    # host:pid
+    trabajador = models.CharField(max_length=100, blank=True)
+    estado = models.CharField(max_length=20, choices=ESTADOS, default="en_curso")
+    error = models.TextField(blank=True)
+
+    inicio = models.DateTimeField(default=timezone.now)
+    fin = models.DateTimeField(null=True, blank=True)
+    duracion_s = models.FloatField(null=True, blank=True)
+
+    peticiones = models.PositiveIntegerField(default=0)
+    no_modificadas = models.PositiveIntegerField(default=0)
+    fallidas = models.PositiveIntegerField(default=0)
+    bytes = models.BigIntegerField(default=0)
+    descarga_s = models.FloatField(default=0.0)
+    parseo_s = models.FloatField(default=0.0)
+    bd_s = models.FloatField(default=0.0)
+    filas = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Ejecución de scraping"
+        verbose_name_plural = "Ejecuciones de scraping"
+        ordering = ["-inicio"]
+        indexes = [
+            models.Index(fields=["comando", "inicio"]),
+        ]
+
+    def __str__(self):
+        return f"{self.comando} @ {self.inicio} ({self.estado})"
+
+
+class MedicionPagina(models.Model):
+    """
+    Una descarga dentro de una ejecución: latencia, estado HTTP y bytes, y
+    (si la página pasa por el pipeline) lo que costó parsearla y guardarla.
+    bd_ms y filas son la parte proporcional del lote en el que se guardó.
+    """
+    ejecucion = models.ForeignKey(EjecucionScraping, on_delete=models.CASCADE, related_name="paginas")
+    url = models.CharField(max_length=500)
+    # Script de FFCV (partido.php, total_partidos.php...) o "imagen"
+    tipo = models.CharField(max_length=50)
+    momento = models.DateTimeField()
+
+    estado_http = models.PositiveSmallIntegerField(null=True, blank=True)
+    bytes = models.PositiveIntegerField(default=0)
+    descarga_ms = models.FloatField(null=True, blank=True)
+    parseo_ms = models.FloatField(null=True, blank=True)
+    bd_ms = models.FloatField(null=True, blank=True)
+    filas = models.PositiveIntegerField(default=0)
+    error = models.CharField(max_length=300, blank=True)
+
+    class Meta:
+        verbose_name = "Medición de página (scraping)"
+        verbose_name_plural = "Mediciones de páginas (scraping)"
+        indexes = [
+            models.Index(fields=["ejecucion", "tipo"]),
+            models.Index(fields=["momento"]),
+        ]
+
+    def __str__(self):
+        return f"{self.url} {self.estado_http} {self.descarga_ms}ms"
+
+
+class VersionDatos(models.Model):
+    """
+    Versión de los datos de un grupo, una temporada o global (objeto_id 0):
+    sube cada vez que cambian sus partidos, eventos, puntos MVP o
+    coeficientes (status.versiones). La caché de respuestas de la API la
+    lleva en sus claves y el ETag de las respuestas sale de ella, así que
+    subirla invalida lo cacheado de ese ámbito.
+    """
+    AMBITOS = (
+        ("grupo", "Grupo"),
+        ("temporada", "Temporada"),
+        ("global", "Global"),
+    )
+
+    ambito = models.CharField(max_length=20, choices=AMBITOS)
+    objeto_id = models.PositiveBigIntegerField()
+    version = models.PositiveBigIntegerField(default=1)
+    actualizado = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = (("ambito", "objeto_id"),)
+        verbose_name = "Versión de datos"
+        verbose_name_plural = "Versiones de datos"
+
+    def __str__(self):
+        return f"{self.ambito} {self.objeto_id} v{self.version}"
+
+
+class InstantaneaJornada(models.Model):
+    """
+    Respuesta ya serializada de una vista de jornada (resultados, goleadores,
+    sanciones, KPIs, equipo de la jornada) para una jornada cerrada de un
+    grupo (status.instantaneas). Se borra cuando se corrige algo de esa
+    jornada y se vuelve a sacar en la siguiente lectura.
+    """
+    vista = models.CharField(max_length=80)
+    grupo = models.ForeignKey("nucleo.Grupo", on_delete=models.CASCADE, related_name="instantaneas_jornada")
+    jornada = models.PositiveIntegerField()
+    # sha1 del resto de parámetros GET (vacío si no hay)
+    parametros = models.CharField(max_length=40, blank=True, default="")
+    datos = models.JSONField()
+    # sha1 del JSON servido: ETag y parámetro rev de la URL inmutable
+    rev = models.CharField(max_length=40)
+    creada = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = (("vista", "grupo", "jornada", "parametros"),)
+        indexes = [models.Index(fields=["grupo", "jornada"])]
+        verbose_name = "Instantánea de jornada"
+        verbose_name_plural = "Instantáneas de jornada"
+
+    def __str__(self):
+        return f"{self.vista} grupo {self.grupo_id} J{self.jornada} ({self.rev[:8]})"
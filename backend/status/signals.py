@@ -0,0 +1,86 @@
+"""
+Señales que suben la versión de datos (status.versiones) del grupo y la
+temporada afectados, para que la caché de respuestas deje de servir lo
+anterior, y que borran las instantáneas (status.instantaneas) de las
+jornadas corregidas. Las escrituras por lotes (bulk_create del scraping) no
+pasan por aquí: lo hace scraping.core.persistencia.
+
+El resto de modelos de las apps que sirve la API (EDITABLES: clubes,
+jugadores, valoraciones, staff, inscripciones en grupos...) se editan a
+mano en el admin o por la API: cada cambio sube la versión de su grupo o
+partido si lo tiene, y si no todas. Dentro de un comando @al_terminar no
+(versiones.en_comando): el comando las sube todas una vez al acabar.
+"""
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from fantasy.models import PuntosMVPJornada
+from partidos.models import EventoPartido, Partido
+from valoraciones.models import CoeficienteClub, CoeficienteDivision
+from status import instantaneas, versiones
+
+
+@receiver([post_save, post_delete], sender=Partido)
+def version_partido(sender, instance, **kwargs):
+    versiones.subir_grupos([instance.grupo_id])
+    instantaneas.invalidar(instance.grupo_id, [instance.jornada_numero])
+
+
+@receiver(pre_save, sender=Partido)
+def instantanea_partido_movido(sender, instance, **kwargs):
+    # Si el partido cambia de jornada (o de grupo), la de antes también cambia
+    if instance.pk is None:
+        return
+    antes = Partido.objects.filter(pk=instance.pk).values_list("grupo_id", "jornada_numero").first()
+    if antes is not None and antes != (instance.grupo_id, instance.jornada_numero):
+        instantaneas.invalidar(antes[0], [antes[1]])
+
+
+@receiver([post_save, post_delete], sender=EventoPartido)
+def version_evento(sender, instance, **kwargs):
+    versiones.subir_partidos([instance.partido_id])
+    instantaneas.invalidar_partidos([instance.partido_id])
+
+
+@receiver([post_save, post_delete], sender=PuntosMVPJornada)
+def version_puntos_mvp(sender, instance, **kwargs):
+    versiones.subir([instance.grupo_id], [instance.temporada_id])
+
+
+@receiver([post_save, post_delete], sender=CoeficienteClub)
+@receiver([post_save, post_delete], sender=CoeficienteDivision)
+def version_coeficiente(sender, instance, **kwargs):
+    versiones.subir_temporada(instance.temporada_id)
+    instantaneas.invalidar_temporada(instance.temporada_id)
+
+
+EDITABLES = (
+    "nucleo", "clubes", "jugadores", "partidos", "valoraciones", "staff", "arbitros", "fantasy",
+    "destacados", "historial", "clasificaciones",
+)
+# Con receptor propio arriba, o derivados que se rehacen al leer o desde los partidos
+_NO_EDITABLES = {
+    "partidos.partido", "partidos.eventopartido", "fantasy.puntosmvpjornada",
+    "valoraciones.coeficienteclub", "valoraciones.coeficientedivision",
+    "jugadores.trayectoriajugador", "clasificaciones.filaclasificacion", "clasificaciones.resultadoaplicado",
+}
+
+
+def version_edicion(sender, instance, **kwargs):
+    if versiones.en_comando():
+        return
+    grupo_id = getattr(instance, "grupo_id", None)
+    partido_id = getattr(instance, "partido_id", None)
+    if grupo_id is not None:
+        versiones.subir_grupos([grupo_id])
+    elif partido_id is not None:
+        versiones.subir_partidos([partido_id])
+    else:
+        versiones.subir_todo()
+
+
+for _modelo in (m for app in EDITABLES for m in apps.get_app_config(app).get_models()):
+    if _modelo._meta.label_lower not in _NO_EDITABLES:
+        post_save.connect(version_edicion, sender=_modelo, dispatch_uid=f"version_edicion:{_modelo._meta.label_lower}")
+        post_delete.connect(version_edicion, sender=_modelo, dispatch_uid=f"version_edicion:{_modelo._meta.label_lower}")
@@ -1,3 +1,282 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.http import HttpResponse
+from django.test import TestCase, override_settings
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+from clubes.models import Club, ClubEnGrupo
+from jugadores.models import Jugador
+from nucleo.models import Competicion, Grupo, Temporada
+from partidos.models import Partido
+from valoraciones.models import ValoracionJugador
+from . import cache_api, instantaneas, versiones
+from .middleware import ETagVersionMiddleware, version_de
+from .models import InstantaneaJornada
+
+
+class _VistaGrupo(APIView):
+    llamadas = 0
+
+    @cache_api.cacheada("grupo")
+    def get(self, request):
+        type(self).llamadas += 1
+        if request.GET.get("fallo"):
+            return Response({"detail": "no"}, status=400)
+        return Response({"grupo_id": request.GET["grupo_id"], "llamada": self.llamadas})
+
+
+class _VistaTemporada(APIView):
+    llamadas = 0
+
+    @cache_api.cacheada("temporada")
+    def get(self, request):
+        type(self).llamadas += 1
+        return Response({"llamada": self.llamadas})
+
+
+class _VistaJornada(APIView):
+    llamadas = 0
+
+    @instantaneas.instantanea
+    def get(self, request):
+        type(self).llamadas += 1
+        if request.GET.get("fallo"):
+            return Response({"detail": "no"}, status=400)
+        goles = Partido.objects.filter(
+            grupo_id=request.GET["grupo_id"], jornada_numero=request.GET["jornada"],
+        ).values_list("goles_local", flat=True)
+        return Response({"goles": sorted(goles), "orden": request.GET.get("orden", "")})
+
+
+class _BaseVersiones(TestCase):
+    def setUp(self):
+        # Los ids se repiten entre tests (rollback): nada de lo recordado vale
+        versiones._TEMPORADA_DE_GRUPO.clear()
+        versiones._TEMPORADAS.clear()
+        cache_api.vaciar()
+        self.temporada = Temporada.objects.create(nombre="2099/2100")
+        competicion = Competicion.objects.create(nombre="Competición de prueba")
+        self.grupo = Grupo.objects.create(nombre="Grupo de prueba", temporada=self.temporada, competicion=competicion)
+        self.factory = APIRequestFactory()
+
+
+# Independiente de API_CACHE_BACKEND del entorno
+@override_settings(CACHES={
+    **settings.CACHES,
+    cache_api.ALIAS: {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "tests"},
+})
+class CacheApiTests(_BaseVersiones):
+    def setUp(self):
+        super().setUp()
+        _VistaGrupo.llamadas = _VistaTemporada.llamadas = 0
+        self.vista = _VistaGrupo.as_view()
+
+    def _get(self, vista=None, **params):
+        return (vista or self.vista)(self.factory.get("/api/estadisticas/x/", params))
+
+    def test_acierta_hasta_que_sube_la_version(self):
+        primera = self._get(grupo_id=self.grupo.pk)
+        segunda = self._get(grupo_id=self.grupo.pk)
+        self.assertEqual((primera["X-Cache"], segunda["X-Cache"]), ("MISS", "HIT"))
+        self.assertEqual(segunda.data, primera.data)
+        self.assertEqual(_VistaGrupo.llamadas, 1)
+
+        versiones.subir_grupos([self.grupo.pk])
+
+        tercera = self._get(grupo_id=self.grupo.pk)
+        self.assertEqual((tercera["X-Cache"], tercera.data["llamada"]), ("MISS", 2))
+        self.assertEqual(cache_api.metricas()["_VistaGrupo"], {"hit": 1, "miss": 2})
+
+    def test_la_clave_incluye_los_parametros(self):
+        self._get(grupo_id=self.grupo.pk, jornada=1)
+        self.assertEqual(self._get(jornada=1, grupo_id=self.grupo.pk)["X-Cache"], "HIT")
+        self.assertEqual(self._get(grupo_id=self.grupo.pk, jornada=2)["X-Cache"], "MISS")
+
+    def test_no_guarda_errores_ni_ids_inexistentes(self):
+        for _ in range(2):
+            self.assertEqual(self._get(grupo_id=self.grupo.pk, fallo=1).status_code, 400)
+        self.assertEqual(_VistaGrupo.llamadas, 2)
+
+        for _ in range(2):
+            self.assertFalse(self._get(grupo_id=self.grupo.pk + 1000).has_header("X-Cache"))
+            self.assertFalse(self._get(grupo_id="abc").has_header("X-Cache"))
+        self.assertEqual(_VistaGrupo.llamadas, 6)
+
+    def test_ambito_temporada(self):
+        vista = _VistaTemporada.as_view()
+        self._get(vista, temporada_id=self.temporada.pk)
+        self.assertEqual(self._get(vista, temporada_id=self.temporada.pk)["X-Cache"], "HIT")
+
+        # Subir un grupo sube también su temporada
+        versiones.subir_grupos([self.grupo.pk])
+        self.assertEqual(self._get(vista, temporada_id=self.temporada.pk)["X-Cache"], "MISS")
+        # Sin temporada_id ni TEMPORADA_ID_BASE no hay ámbito: no se cachea
+        self.assertFalse(self._get(vista).has_header("X-Cache"))
+
+
+class ETagVersionMiddlewareTests(_BaseVersiones):
+    def setUp(self):
+        super().setUp()
+        self.llamadas = 0
+
+        def vista(request):
+            self.llamadas += 1
+            return HttpResponse("{}", content_type="application/json")
+
+        self.middleware = ETagVersionMiddleware(vista)
+
+    def _get(self, ruta="/api/estadisticas/x/", etag=None, metodo="get", **params):
+        cabeceras = {"HTTP_IF_NONE_MATCH": etag} if etag else {}
+        return self.middleware(getattr(self.factory, metodo)(ruta, params, **cabeceras))
+
+    def test_304_sin_llegar_a_la_vista(self):
+        primera = self._get(grupo_id=self.grupo.pk)
+        etag = primera["ETag"]
+        self.assertIn("no-cache", primera["Cache-Control"])
+
+        revalidada = self._get(etag=etag, grupo_id=self.grupo.pk)
+        self.assertEqual((revalidada.status_code, revalidada["ETag"]), (304, etag))
+        self.assertEqual(self.llamadas, 1)
+        self.assertEqual(self._get(etag=f'W/"x", {etag}', grupo_id=self.grupo.pk).status_code, 304)
+
+    def test_cambia_con_la_version_y_los_parametros(self):
+        etag = self._get(grupo_id=self.grupo.pk)["ETag"]
+        self.assertNotEqual(self._get(grupo_id=self.grupo.pk, jornada=2)["ETag"], etag)
+        self.assertNotEqual(self._get("/api/clubes/x/", grupo_id=self.grupo.pk)["ETag"], etag)
+
+        versiones.subir_grupos([self.grupo.pk])
+
+        respuesta = self._get(etag=etag, grupo_id=self.grupo.pk)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertNotEqual(respuesta["ETag"], etag)
+
+    def test_ambitos_temporada_y_global(self):
+        por_temporada = self._get(temporada_id=self.temporada.pk)["ETag"]
+        por_global = self._get()["ETag"]
+        # Un grupo que no existe cae en la versión global
+        self.assertEqual(version_de(self.factory.get("/", {"grupo_id": self.grupo.pk + 1000}))[:2], versiones.GLOBAL)
+
+        versiones.subir_grupos([self.grupo.pk])
+
+        self.assertNotEqual(self._get(temporada_id=self.temporada.pk)["ETag"], por_temporada)
+        self.assertNotEqual(self._get()["ETag"], por_global)
+
+    def test_editar_un_club_o_un_jugador_cambia_el_etag(self):
+        club = Club.objects.create(nombre_oficial="Club A")
+        jugador = Jugador.objects.create(nombre="Jugador")
+        etags = {self._get("/api/clubes/x/")["ETag"], self._get(grupo_id=self.grupo.pk)["ETag"]}
+
+        club.escudo_url = "https://x/escudo.png"
+        club.save()
+        otros = {self._get("/api/clubes/x/")["ETag"], self._get(grupo_id=self.grupo.pk)["ETag"]}
+        self.assertFalse(etags & otros)
+
+        jugador.nombre = "Otro nombre"
+        jugador.save()
+        self.assertNotIn(self._get("/api/clubes/x/")["ETag"], otros)
+        etag = self._get("/api/jugadores/x/")["ETag"]
+        jugador.delete()
+        self.assertEqual(self._get("/api/jugadores/x/", etag=etag).status_code, 200)
+
+    def test_ediciones_a_mano_cambian_el_etag(self):
+        club = Club.objects.create(nombre_oficial="Club C")
+        jugador = Jugador.objects.create(nombre="Otro jugador")
+        por_grupo = self._get(grupo_id=self.grupo.pk)["ETag"]
+        inscripcion = ClubEnGrupo.objects.create(club=club, grupo=self.grupo)
+        self.assertNotEqual(self._get(grupo_id=self.grupo.pk)["ETag"], por_grupo)
+
+        por_grupo = self._get(grupo_id=self.grupo.pk)["ETag"]
+        inscripcion.posicion_actual = 1
+        inscripcion.save()
+        self.assertNotEqual(self._get(grupo_id=self.grupo.pk)["ETag"], por_grupo)
+
+        etag = self._get("/api/valoraciones/x/")["ETag"]
+        ValoracionJugador.objects.create(jugador=jugador, temporada=self.temporada, ataque=80)
+        self.assertEqual(self._get("/api/valoraciones/x/", etag=etag).status_code, 200)
+
+    def test_un_comando_al_terminar_sube_una_vez(self):
+        etag = self._get("/api/clubes/x/")["ETag"]
+
+        @versiones.al_terminar
+        def handle():
+            with mock.patch.object(versiones, "subir_todo") as subir_todo:
+                for i in range(3):
+                    Club.objects.create(nombre_oficial=f"Club {i}")
+            self.assertEqual(subir_todo.call_count, 0)
+            # Aún sin subir: se sigue contestando 304
+            self.assertEqual(self._get("/api/clubes/x/", etag=etag).status_code, 304)
+
+        handle()
+        self.assertFalse(versiones.en_comando())
+        self.assertEqual(self._get("/api/clubes/x/", etag=etag).status_code, 200)
+
+    def test_fuera_de_la_api_o_escrituras_no_se_tocan(self):
+        self.assertFalse(self._get("/admin/").has_header("ETag"))
+        self.assertFalse(self._get(metodo="post").has_header("ETag"))
+        etag = self._get(grupo_id=self.grupo.pk)["ETag"]
+        self.assertEqual(self._get(etag=etag, metodo="head", grupo_id=self.grupo.pk).status_code, 304)
+
+
+class InstantaneasTests(_BaseVersiones):
+    def setUp(self):
+        super().setUp()
+        _VistaJornada.llamadas = 0
+        self.vista = _VistaJornada.as_view()
+        a, b = Club.objects.create(nombre_oficial="Club A"), Club.objects.create(nombre_oficial="Club B")
+        self.cerrado = Partido.objects.create(
+            grupo=self.grupo, jornada_numero=1, local=a, visitante=b, goles_local=2, goles_visitante=0, jugado=True,
+        )
+        Partido.objects.create(grupo=self.grupo, jornada_numero=2, local=b, visitante=a)
+
+    def _get(self, jornada=1, etag=None, **params):
+        cabeceras = {"HTTP_IF_NONE_MATCH": etag} if etag else {}
+        return self.vista(self.factory.get("/api/estadisticas/x/", {
+            "grupo_id": self.grupo.pk, "jornada": jornada, **params,
+        }, **cabeceras))
+
+    def test_jornada_cerrada_sale_de_la_instantanea(self):
+        primera = self._get()
+        rev = primera["X-Snapshot-Rev"]
+        self.assertEqual(primera.data, {"goles": [2], "orden": ""})
+        self.assertEqual((primera["ETag"], primera["Cache-Control"]), (f'"{rev}"', "public, no-cache"))
+
+        segunda = self._get()
+        self.assertEqual((segunda.data, segunda["ETag"]), (primera.data, primera["ETag"]))
+        self.assertEqual(_VistaJornada.llamadas, 1)
+
+        self.assertEqual(self._get(rev=rev)["Cache-Control"], instantaneas.INMUTABLE)
+        self.assertEqual(self._get(rev="otro")["Cache-Control"], "public, no-cache")
+        self.assertEqual(self._get(etag=f'"{rev}"').status_code, 304)
+        self.assertEqual(_VistaJornada.llamadas, 1)
+
+    def test_solo_jornadas_cerradas_y_respuestas_200(self):
+        for _ in range(2):
+            self.assertFalse(self._get(jornada=2).has_header("X-Snapshot-Rev"))
+            self.assertEqual(self._get(fallo=1).status_code, 400)
+        self.assertEqual(_VistaJornada.llamadas, 4)
+        self.assertFalse(InstantaneaJornada.objects.exists())
+
+    def test_una_por_parametros(self):
+        self._get(orden="asc")
+        self._get(orden="desc")
+        self._get(orden="asc")
+        self.assertEqual(_VistaJornada.llamadas, 2)
+        self.assertEqual(InstantaneaJornada.objects.filter(grupo=self.grupo, jornada=1).count(), 2)
+
+    def test_una_correccion_la_borra(self):
+        rev = self._get()["X-Snapshot-Rev"]
+
+        self.cerrado.goles_local = 3
+        self.cerrado.save()
+
+        corregida = self._get(etag=f'"{rev}"')
+        self.assertEqual((corregida.status_code, corregida.data["goles"]), (200, [3]))
+        self.assertNotEqual(corregida["X-Snapshot-Rev"], rev)
+
+        # Borrado por jornadas y por partidos
+        self.assertEqual(instantaneas.invalidar(self.grupo.pk, [2]), 0)
+        self.assertEqual(instantaneas.invalidar_partidos([self.cerrado.pk]), 1)
+        self.assertFalse(InstantaneaJornada.objects.exists())
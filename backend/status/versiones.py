@@ -0,0 +1,135 @@
+import functools
+import threading
+
+from django.db.models import F, Q
+from django.dispatch import Signal
+from django.utils import timezone
+
+from nucleo.models import Grupo, Temporada
+from partidos.models import Partido
+from .models import VersionDatos
+
+# Versiones de datos por grupo, por temporada y global (status.models.VersionDatos).
+#
+# Las señales de status.signals (Partido, EventoPartido, PuntosMVPJornada,
+# coeficientes) y las escrituras por lotes del scraping llaman a subir();
+# los comandos que reescriben datos sin grupo claro (fichas de jugadores,
+# plantillas, recálculos de fantasy y coeficientes) llaman a subir_todo() al
+# terminar (@al_terminar). Toda subida sube también la global.
+#
+# status.cache_api lee con actuales() la versión de lo que pide cada vista y
+# la mete en la clave; status.middleware la usa para el ETag. Una fila nace
+# con la primera lectura: subir un ámbito que nadie ha leído no hace falta.
+GLOBAL = ("global", 0)
+
+# Lo envía @al_terminar después de subir las versiones, para quien guarde
+# datos derivados de fichas y clubes (estadisticas.grupo_info)
+datos_reescritos = Signal()
+
+# Comandos @al_terminar en marcha en este hilo: sus ediciones fila a fila no
+# suben versiones (status.signals), ya las sube todas el decorador al acabar
+_COMANDO = threading.local()
+
+# grupo_id -> temporada_id (no cambia) y temporadas que existen; solo aciertos
+_TEMPORADA_DE_GRUPO: dict = {}
+_TEMPORADAS: set = set()
+
+
+def temporada_de(grupo_id: int) -> int | None:
+    """Temporada del grupo (None si el grupo no existe)."""
+    if grupo_id not in _TEMPORADA_DE_GRUPO:
+        temporada_id = Grupo.objects.filter(pk=grupo_id).values_list("temporada_id", flat=True).first()
+        if temporada_id is None:
+            return None
+        _TEMPORADA_DE_GRUPO[grupo_id] = temporada_id
+    return _TEMPORADA_DE_GRUPO[grupo_id]
+
+
+def temporada_existe(temporada_id: int) -> bool:
+    if temporada_id not in _TEMPORADAS and Temporada.objects.filter(pk=temporada_id).exists():
+        _TEMPORADAS.add(temporada_id)
+    return temporada_id in _TEMPORADAS
+
+
+def _filtro(grupo_ids, temporada_ids, incluir_global=False) -> Q | None:
+    q = Q(ambito=GLOBAL[0], objeto_id=GLOBAL[1]) if incluir_global else None
+    for ambito, ids in (("grupo", grupo_ids), ("temporada", temporada_ids)):
+        ids = {i for i in ids if i is not None}
+        if ids:
+            parte = Q(ambito=ambito, objeto_id__in=ids)
+            q = parte if q is None else q | parte
+    return q
+
+
+def actuales(grupo_id=None, temporada_id=None, incluir_global=False) -> dict:
+    """
+    {(ámbito, id): versión} de ese grupo, temporada y/o la global, en una
+    consulta. Deben existir (temporada_de / temporada_existe): aquí se crean
+    sus filas.
+    """
+    pedidos = [(a, i) for a, i in (("grupo", grupo_id), ("temporada", temporada_id)) if i is not None]
+    if incluir_global:
+        pedidos.append(GLOBAL)
+    if not pedidos:
+        return {}
+    q = _filtro([grupo_id], [temporada_id], incluir_global)
+    out = {(a, i): v for a, i, v in VersionDatos.objects.filter(q).values_list("ambito", "objeto_id", "version")}
+    nuevos = [VersionDatos(ambito=a, objeto_id=i) for a, i in pedidos if (a, i) not in out]
+    if nuevos:
+        VersionDatos.objects.bulk_create(nuevos, ignore_conflicts=True)
+        out.update({(v.ambito, v.objeto_id): 1 for v in nuevos})
+    return out
+
+
+def subir(grupo_ids=(), temporada_ids=()) -> int:
+    """Sube la versión de esos grupos y temporadas y la global (una sola UPDATE)."""
+    q = _filtro(grupo_ids, temporada_ids)
+    if q is None:
+        return 0
+    q |= Q(ambito=GLOBAL[0], objeto_id=GLOBAL[1])
+    return VersionDatos.objects.filter(q).update(version=F("version") + 1, actualizado=timezone.now())
+
+
+def subir_todo() -> int:
+    """Todas las versiones a la vez (la tabla tiene una fila por grupo/temporada leídos)."""
+    return VersionDatos.objects.update(version=F("version") + 1, actualizado=timezone.now())
+
+
+def al_terminar(handle):
+    """
+    Decorador para el handle() de un comando que reescribe datos de varios
+    ámbitos: sube todas las versiones al acabar, también si falla a medias
+    (lo que llegó a escribir ya está en BD).
+    """
+    @functools.wraps(handle)
+    def envoltura(*args, **kwargs):
+        _COMANDO.nivel = getattr(_COMANDO, "nivel", 0) + 1
+        try:
+            return handle(*args, **kwargs)
+        finally:
+            _COMANDO.nivel -= 1
+            subir_todo()
+            datos_reescritos.send(sender=handle.__module__)
+
+    return envoltura
+
+
+def en_comando() -> bool:
+    """Si corre un comando @al_terminar (que subirá todas las versiones al acabar)."""
+    return getattr(_COMANDO, "nivel", 0) > 0
+
+
+def subir_grupos(grupo_ids) -> int:
+    """Grupos y sus temporadas (las vistas globales van por temporada)."""
+    grupo_ids = {g for g in grupo_ids if g is not None}
+    return subir(grupo_ids, {temporada_de(g) for g in grupo_ids})
+
+
+def subir_partidos(partido_ids) -> int:
+    grupo_ids = set(Partido.objects.filter(pk__in=list(partido_ids)).values_list("grupo_id", flat=True))
+    return subir_grupos(grupo_ids)
+
+
+def subir_temporada(temporada_id) -> int:
+    """La temporada y todos sus grupos (p.ej. al cambiar un coeficiente)."""
+    return subir(Grupo.objects.filter(temporada_id=temporada_id).values_list("id", flat=True), [temporada_id])
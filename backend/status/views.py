@@ -1,7 +1,10 @@
+from django.conf import settings
 from django.utils import timezone
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from . import cache_api
 from .models import DataSyncStatus
 
 
@@ -34,3 +37,19 @@ class LastUpdateView(APIView):
             "last_update_display": format_datetime(obj.last_success, lang),
             "detalle": obj.detalle,
         })
+
+
+class CacheApiView(APIView):
+    """
+    GET /api/status/cache/ (solo staff)
+    Aciertos/fallos de la caché de respuestas por vista, en el proceso que
+    contesta (con locmem cada worker lleva los suyos; con redis son globales).
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            "backend": settings.API_CACHE_BACKEND,
+            "ttl": settings.API_CACHE_TTL,
+            "vistas": cache_api.metricas(),
+        })
@@ -6,6 +6,7 @@ from statistics import mean
 from nucleo.models import Temporada, Grupo, Competicion
 from clubes.models import ClubEnGrupo
 from valoraciones.models import CoeficienteClub, CoeficienteDivision
+from status import versiones
 
 
 def clamp(x: float, lo: float, hi: float) -> float:
@@ -46,6 +47,7 @@ class Command(BaseCommand):
         parser.add_argument("--dry-run", action="store_true", help="No escribe en BD, solo muestra.")
 
     @transaction.atomic
+    @versiones.al_terminar
     def handle(self, *args, **opts):
         temporada_nombre = opts["temporada"]
         jornada_ref = int(opts["jornada"])
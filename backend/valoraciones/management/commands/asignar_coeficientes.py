@@ -6,6 +6,7 @@ from django.db.models import Q
 from nucleo.models import Temporada, Grupo
 from clubes.models import ClubEnGrupo
 from valoraciones.models import CoeficienteClub
+from status import versiones
 
 # Detectamos si existe CSP y qué campos tiene
 try:
@@ -232,6 +233,7 @@ class Command(BaseCommand):
         )
 
     @transaction.atomic
+    @versiones.al_terminar
     def handle(self, *args, **opts):
         temporada_nombre: str = opts["temporada"]
         modo: str = opts["modo"]
@@ -5,10 +5,13 @@ from rest_framework import status
 from django.db.models import Q, Count, Prefetch, Min, Max
 from math import ceil
 from collections import defaultdict
+from nucleo.media import norm_media
 from nucleo.models import Grupo
 from partidos.models import Partido, EventoPartido, AlineacionPartidoJugador
 from jugadores.models import Jugador
 from clubes.models import ClubEnGrupo
+from status.cache_api import cacheada
+from status.instantaneas import instantanea
 from .models import CoeficienteClub, CoeficienteDivision
 
 
@@ -88,6 +91,7 @@ class PartidoEstrellaView(APIView):
         return pen
 
     # ------------------------------------------------------------------
+    @cacheada("grupo")
     def get(self, request, format=None):
         grupo_id = request.GET.get("grupo_id")
         jornada_param = request.GET.get("jornada")
@@ -310,15 +314,8 @@ class EquipoJornadaView(APIView):
     TEMPORADA_ID_BASE = 4
     JORNADA_REF_COEF = 6
 
-    def _norm_media(self, path: str | None) -> str:
-        if not path:
-            return ""
-        path = path.strip()
-        if path.startswith("http://") or path.startswith("https://"):
-            return path
-        if path.startswith("/media/"):
-            return path
-        return "/media/" + path.lstrip("/")
+    def _norm_media(self, path: str | None, tam: int | None = None) -> str:
+        return norm_media(path, tam)
 
     def _bonus_rival_fuerte(self, coef_rival: float) -> float:
         if coef_rival is None:
@@ -361,6 +358,8 @@ class EquipoJornadaView(APIView):
             return 0.15
         return 0.0
 
+    @instantanea
+    @cacheada("grupo")
     def get(self, request, format=None):
         grupo_id = request.GET.get("grupo_id")
         jornada_param = request.GET.get("jornada")
@@ -616,15 +615,8 @@ class JugadoresJornadaView(APIView):
     TEMPORADA_ID_BASE = 4
     JORNADA_REF_COEF = 6
 
-    def _norm_media(self, path: str | None) -> str:
-        if not path:
-            return ""
-        path = path.strip()
-        if path.startswith("http://") or path.startswith("https://"):
-            return path
-        if path.startswith("/media/"):
-            return path
-        return "/media/" + path.lstrip("/")
+    def _norm_media(self, path: str | None, tam: int | None = None) -> str:
+        return norm_media(path, tam)
 
     def _abs_media(self, request, path: str | None) -> str:
         if not path:
@@ -778,6 +770,7 @@ class JugadoresJornadaView(APIView):
             return 0.0
         return float(-(goles_recibidos - 2))
 
+    @cacheada("grupo")
     def get(self, request, format=None):
         grupo_id = request.GET.get("grupo_id")
         jornada_param = request.GET.get("jornada")
@@ -1111,15 +1104,8 @@ def _coef_club_lookup(temporada_id: int, jornada_ref: int | None = None) -> dict
     return out
 
 
-def _norm_media(path: str | None) -> str:
-    if not path:
-        return ""
-    path = path.strip()
-    if path.startswith("http://") or path.startswith("https://"):
-        return path
-    if path.startswith("/media/"):
-        return path
-    return "/media/" + path.lstrip("/")
+def _norm_media(path: str | None, tam: int | None = None) -> str:
+    return norm_media(path, tam)
 
 
 def _abs_media(request, path: str | None) -> str:
@@ -1174,15 +1160,8 @@ class MVPClasificacionView(APIView):
     TEMPORADA_ID_BASE = 4
     JORNADA_REF_COEF = 6
 
-    def _norm_media(self, path: str | None) -> str:
-        if not path:
-            return ""
-        path = path.strip()
-        if path.startswith("http://") or path.startswith("https://"):
-            return path
-        if path.startswith("/media/"):
-            return path
-        return "/media/" + path.lstrip("/")
+    def _norm_media(self, path: str | None, tam: int | None = None) -> str:
+        return norm_media(path, tam)
 
     def _abs_media(self, request, path: str | None) -> str:
         if not path:
@@ -1421,6 +1400,7 @@ class MVPClasificacionView(APIView):
             data["puntos"] = ceil(data["puntos"])
         return ranking_jugadores
 
+    @cacheada("grupo")
     def get(self, request, format=None):
         grupo_id = request.GET.get("grupo_id")
         jornada_param = request.GET.get("jornada")
@@ -1709,6 +1689,7 @@ class EquipoJornadaGlobalView(APIView):
             s, e = self._shift_window_back_one_week(s, e)
         return start_dt, end_dt, False, self.MAX_WEEKS_LOOKBACK, 0
 
+    @cacheada("temporada")
     def get(self, request, format=None):
         from django.utils import timezone
         temporada_id = _get_temporada_id(request, self.TEMPORADA_ID_BASE)
@@ -2053,6 +2034,7 @@ class JugadoresJornadaGlobalView(APIView):
             s, e = self._shift_window_back_one_week(s, e)
         return start_dt, end_dt, False, self.MAX_WEEKS_LOOKBACK, 0
 
+    @cacheada("temporada")
     def get(self, request, format=None):
         from django.utils import timezone
         temporada_id = _get_temporada_id(request, self.TEMPORADA_ID_BASE)
@@ -2434,6 +2416,7 @@ class PartidosTopGlobalView(APIView):
             s, e = self._shift_window_back_one_week(s, e)
         return start_dt, end_dt, False, self.MAX_WEEKS_LOOKBACK, 0
 
+    @cacheada("temporada")
     def get(self, request, format=None):
         from django.utils import timezone
         from arbitros.models import ArbitrajePartido
@@ -3042,6 +3025,7 @@ class MVPGlobalView(APIView):
         ranking_global.sort(key=lambda x: (-x["puntos_global"], -x["puntos"], x["nombre"].lower()))
         return ranking_global
 
+    @cacheada("temporada")
     def get(self, request, format=None):
         from django.utils import timezone
         temporada_id = _get_temporada_id(request, self.TEMPORADA_ID_BASE)